@@ -0,0 +1,56 @@
+"""Add account_balance_snapshots table for point-in-time financial reports.
+
+Revision ID: balance_snapshot_001
+Revises: gl_ledger_sequence_001
+Create Date: 2026-10-16
+
+Additive migration - new table only. Snapshots are written when a financial
+period is closed; until then reports derive as-of balances from the ledger.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+
+# revision identifiers, used by Alembic.
+revision = 'balance_snapshot_001'
+down_revision = 'gl_ledger_sequence_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    if 'account_balance_snapshots' in inspector.get_table_names():
+        return
+
+    op.create_table(
+        'account_balance_snapshots',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True, server_default=sa.text('gen_random_uuid()')),
+        sa.Column(
+            'account_id',
+            UUID(as_uuid=True),
+            sa.ForeignKey('chart_of_accounts.id', ondelete='CASCADE'),
+            nullable=False
+        ),
+        sa.Column(
+            'period_id',
+            UUID(as_uuid=True),
+            sa.ForeignKey('financial_periods.id', ondelete='CASCADE'),
+            nullable=False
+        ),
+        sa.Column('period_end_date', sa.Date, nullable=False),
+        sa.Column('closing_balance', sa.Numeric(15, 2), nullable=False, server_default='0',
+                  comment='Balance as of period_end_date'),
+        sa.Column('materialized_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.UniqueConstraint('account_id', 'period_id', name='uq_account_balance_snapshot_period'),
+    )
+    op.create_index('ix_account_balance_snapshots_account_id', 'account_balance_snapshots', ['account_id'])
+    op.create_index('ix_account_balance_snapshots_period_end_date', 'account_balance_snapshots', ['period_end_date'])
+
+
+def downgrade():
+    op.drop_table('account_balance_snapshots')
@@ -0,0 +1,57 @@
+"""Add customer_rfm_scores table for materialized customer insights.
+
+Revision ID: customer_rfm_001
+Revises: balance_snapshot_001
+Create Date: 2026-10-16
+
+Additive migration - new table only. Scores are backfilled by the
+refresh_customer_rfm job (or the first insights request).
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+
+# revision identifiers, used by Alembic.
+revision = 'customer_rfm_001'
+down_revision = 'balance_snapshot_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    if 'customer_rfm_scores' in inspector.get_table_names():
+        return
+
+    op.create_table(
+        'customer_rfm_scores',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True, server_default=sa.text('gen_random_uuid()')),
+        sa.Column(
+            'customer_id',
+            UUID(as_uuid=True),
+            sa.ForeignKey('customers.id', ondelete='CASCADE'),
+            nullable=False,
+            unique=True
+        ),
+        sa.Column('last_order_date', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('order_count', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('total_spent', sa.Numeric(15, 2), nullable=False, server_default='0'),
+        sa.Column('r_score', sa.Integer, nullable=False, server_default='3'),
+        sa.Column('f_score', sa.Integer, nullable=False, server_default='3'),
+        sa.Column('m_score', sa.Integer, nullable=False, server_default='3'),
+        sa.Column('rfm_score', sa.Integer, nullable=False, server_default='9'),
+        sa.Column('segment', sa.String(30), nullable=False),
+        sa.Column('churn_risk_score', sa.Numeric(5, 2), nullable=False, server_default='0'),
+        sa.Column('refreshed_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index('ix_customer_rfm_scores_segment', 'customer_rfm_scores', ['segment'])
+    op.create_index('ix_customer_rfm_scores_churn_risk', 'customer_rfm_scores', ['churn_risk_score'])
+    op.create_index('ix_customer_rfm_scores_total_spent', 'customer_rfm_scores', ['total_spent'])
+
+
+def downgrade():
+    op.drop_table('customer_rfm_scores')
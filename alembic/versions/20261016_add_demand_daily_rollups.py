@@ -0,0 +1,55 @@
+"""Add demand_daily_rollups table for incremental S&OP demand history.
+
+Revision ID: demand_rollup_001
+Revises: 20260218_dms_phase2
+Create Date: 2026-10-16
+
+Additive migration - new table only. The rollup is backfilled by the
+snop_demand_rollup_refresh job on its first run.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+
+# revision identifiers, used by Alembic.
+revision = 'demand_rollup_001'
+down_revision = '20260218_dms_phase2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    if 'demand_daily_rollups' in inspector.get_table_names():
+        return
+
+    op.create_table(
+        'demand_daily_rollups',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True, server_default=sa.text('gen_random_uuid()')),
+        sa.Column('day', sa.Date, nullable=False, comment='Order creation date'),
+        sa.Column(
+            'product_id',
+            UUID(as_uuid=True),
+            sa.ForeignKey('products.id', ondelete='CASCADE'),
+            nullable=True,
+            comment='NULL = all-product total row'
+        ),
+        sa.Column('warehouse_id', UUID(as_uuid=True), nullable=True),
+        sa.Column('region_id', UUID(as_uuid=True), nullable=True),
+        sa.Column('channel', sa.String(50), nullable=True, comment='Order source'),
+        sa.Column('quantity', sa.Numeric(15, 2), server_default='0'),
+        sa.Column('revenue', sa.Numeric(15, 2), server_default='0'),
+        sa.Column('order_count', sa.Integer, server_default='0'),
+        sa.Column('refreshed_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index('ix_demand_daily_rollups_product_day', 'demand_daily_rollups', ['product_id', 'day'])
+    op.create_index('ix_demand_daily_rollups_day', 'demand_daily_rollups', ['day'])
+    op.create_index('ix_demand_daily_rollups_refreshed', 'demand_daily_rollups', ['refreshed_at'])
+
+
+def downgrade():
+    op.drop_table('demand_daily_rollups')
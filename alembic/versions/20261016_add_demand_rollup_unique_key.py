@@ -0,0 +1,45 @@
+"""Add unique rollup key to demand_daily_rollups.
+
+Revision ID: demand_rollup_002
+Revises: tenant_job_runs_001
+Create Date: 2026-10-16
+
+One row per (day, product, warehouse, region, channel), NULLs compared as
+equal (PostgreSQL 15+). Backs the per-order delta upsert in
+DemandRollupService. Existing rows are cleared first, since concurrent day
+rebuilds could have left duplicates; the snop_demand_rollup_refresh job
+backfills an empty rollup on its next run.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'demand_rollup_002'
+down_revision = 'tenant_job_runs_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    if 'demand_daily_rollups' not in inspector.get_table_names():
+        return
+    if any(ix['name'] == 'uq_demand_daily_rollups_key' for ix in inspector.get_indexes('demand_daily_rollups')):
+        return
+
+    op.execute('DELETE FROM demand_daily_rollups')
+    op.create_index(
+        'uq_demand_daily_rollups_key',
+        'demand_daily_rollups',
+        ['day', 'product_id', 'warehouse_id', 'region_id', 'channel'],
+        unique=True,
+        postgresql_nulls_not_distinct=True,
+    )
+
+
+def downgrade():
+    op.drop_index('uq_demand_daily_rollups_key', table_name='demand_daily_rollups')
@@ -0,0 +1,57 @@
+"""Add ledger_sequence to general_ledger for ordered running balances.
+
+Revision ID: gl_ledger_sequence_001
+Revises: demand_rollup_001
+Create Date: 2026-10-16
+
+Existing rows are numbered in (transaction_date, created_at) order, then the
+column becomes an identity column continuing after the highest number.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import text
+
+
+# revision identifiers, used by Alembic.
+revision = 'gl_ledger_sequence_001'
+down_revision = 'demand_rollup_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    if 'general_ledger' not in inspector.get_table_names():
+        return
+    existing = [c['name'] for c in inspector.get_columns('general_ledger')]
+    if 'ledger_sequence' in existing:
+        return
+
+    op.add_column(
+        'general_ledger',
+        sa.Column('ledger_sequence', sa.BigInteger, nullable=True, comment='Monotonic posting sequence')
+    )
+    conn.execute(text("""
+        UPDATE general_ledger g
+        SET ledger_sequence = numbered.seq
+        FROM (
+            SELECT id, ROW_NUMBER() OVER (ORDER BY transaction_date, created_at, id) AS seq
+            FROM general_ledger
+        ) numbered
+        WHERE g.id = numbered.id
+    """))
+    start = conn.execute(text("SELECT COALESCE(MAX(ledger_sequence), 0) + 1 FROM general_ledger")).scalar()
+    conn.execute(text("ALTER TABLE general_ledger ALTER COLUMN ledger_sequence SET NOT NULL"))
+    conn.execute(text(
+        f"ALTER TABLE general_ledger ALTER COLUMN ledger_sequence "
+        f"ADD GENERATED BY DEFAULT AS IDENTITY (START WITH {int(start)})"
+    ))
+    op.create_index('ix_general_ledger_ledger_sequence', 'general_ledger', ['ledger_sequence'])
+
+
+def downgrade():
+    op.drop_index('ix_general_ledger_ledger_sequence', table_name='general_ledger')
+    op.drop_column('general_ledger', 'ledger_sequence')
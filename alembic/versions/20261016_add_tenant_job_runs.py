@@ -0,0 +1,62 @@
+"""Add tenant job lease and run history tables.
+
+Revision ID: tenant_job_runs_001
+Revises: customer_rfm_001
+Create Date: 2026-10-16
+
+Additive migration - new public-schema tables only. Until it runs, the
+tenant job runner works without cluster leases and does not record runs.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+
+
+# revision identifiers, used by Alembic.
+revision = 'tenant_job_runs_001'
+down_revision = 'customer_rfm_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    existing = inspector.get_table_names(schema='public')
+
+    if 'tenant_job_leases' not in existing:
+        op.create_table(
+            'tenant_job_leases',
+            sa.Column('job_name', sa.String(100), primary_key=True),
+            sa.Column('shard', sa.Integer, primary_key=True),
+            sa.Column('holder', sa.String(255), nullable=False),
+            sa.Column('acquired_at', sa.DateTime(timezone=True), nullable=False),
+            sa.Column('leased_until', sa.DateTime(timezone=True), nullable=False),
+            schema='public'
+        )
+
+    if 'tenant_job_runs' not in existing:
+        op.create_table(
+            'tenant_job_runs',
+            sa.Column('id', UUID(as_uuid=True), primary_key=True, server_default=sa.text('gen_random_uuid()')),
+            sa.Column('job_name', sa.String(100), nullable=False),
+            sa.Column('shard', sa.Integer, nullable=False),
+            sa.Column('shard_count', sa.Integer, nullable=False),
+            sa.Column('worker_id', sa.String(255), nullable=False),
+            sa.Column('started_at', sa.DateTime(timezone=True), nullable=False),
+            sa.Column('completed_at', sa.DateTime(timezone=True), nullable=False),
+            sa.Column('duration_ms', sa.Integer, nullable=False),
+            sa.Column('tenant_count', sa.Integer, nullable=False, server_default='0'),
+            sa.Column('successful', sa.Integer, nullable=False, server_default='0'),
+            sa.Column('failed', sa.Integer, nullable=False, server_default='0'),
+            sa.Column('timed_out', sa.Integer, nullable=False, server_default='0'),
+            sa.Column('tenant_results', JSONB, nullable=False, server_default=sa.text("'[]'::jsonb")),
+            schema='public'
+        )
+        op.create_index('ix_tenant_job_runs_job_started', 'tenant_job_runs', ['job_name', 'started_at'], schema='public')
+
+
+def downgrade():
+    op.drop_table('tenant_job_runs', schema='public')
+    op.drop_table('tenant_job_leases', schema='public')
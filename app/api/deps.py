@@ -9,7 +9,8 @@ from sqlalchemy.orm import selectinload, joinedload
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db, get_db_with_tenant
-from app.core.security import verify_access_token
+from app.core.security import verify_access_token, is_token_blacklisted
+from app.core.principal_cache import get_principal_cache
 from app.core.permissions import PermissionChecker
 from app.models.user import User, UserRole
 from app.models.role import Role, RoleLevel
@@ -22,16 +23,31 @@ logger = logging.getLogger(__name__)
 security = HTTPBearer()
 
 
+def _detach_user(db: AsyncSession, user: User) -> None:
+    """
+    Detach the user and its eagerly loaded roles/region from the request session.
+
+    The session is shared with the handler; detached, the user keeps its
+    loaded attributes even if the handler rolls back.
+    """
+    related = [ur.role for ur in user.user_roles] + list(user.user_roles) + [user.region, user]
+    for obj in related:
+        if obj is not None and obj in db:
+            db.expunge(obj)
+
+
 async def get_current_user(
     request: Request,
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
+    db: Annotated[AsyncSession, Depends(get_db_with_tenant)],
 ) -> User:
     """
     Dependency to get the current authenticated user.
     Validates the JWT token and returns the user object.
 
     IMPORTANT: Uses tenant schema (via request.state.schema) to query users,
-    since users are stored per-tenant, not in public schema.
+    since users are stored per-tenant, not in public schema. The tenant
+    session is the request-scoped one the handler's DB dependency receives.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -52,47 +68,85 @@ async def get_current_user(
         logger.warning(f"Invalid user_id in token: {user_id}")
         raise credentials_exception
 
-    # Get tenant database session - users are in tenant schema, not public!
-    async for db in get_db_with_tenant(request):
-        # Query user with roles eagerly loaded
-        stmt = (
-            select(User)
-            .options(
-                joinedload(User.user_roles).joinedload(UserRole.role),
-                joinedload(User.region)
-            )
-            .where(User.id == user_uuid)
-        )
-        result = await db.execute(stmt)
-        user = result.unique().scalar_one_or_none()
+    if await is_token_blacklisted(db, token):
+        logger.warning(f"Revoked token presented for user {user_id}")
+        raise credentials_exception
 
-        if user is None:
-            schema = getattr(request.state, 'schema', 'unknown')
-            logger.warning(f"User {user_id} not found in schema {schema}")
-            raise credentials_exception
+    # Repeat requests are served from the principal cache without SQL
+    tenant_id = getattr(request.state, 'tenant_id', None)
+    principal_cache = get_principal_cache()
+    version = -1
+    if tenant_id:
+        user = await principal_cache.get_user(tenant_id, user_uuid)
+        if user is not None:
+            if not user.is_active:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="User account is deactivated"
+                )
+            return user
+        # Read the stamp before loading, so a change during the load leaves the entry stale
+        version = await principal_cache.version(tenant_id)
+
+    # Query user with roles eagerly loaded - users are in tenant schema, not public!
+    stmt = (
+        select(User)
+        .options(
+            joinedload(User.user_roles).joinedload(UserRole.role),
+            joinedload(User.region)
+        )
+        .where(User.id == user_uuid)
+    )
+    result = await db.execute(stmt)
+    user = result.unique().scalar_one_or_none()
 
-        if not user.is_active:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="User account is deactivated"
-            )
+    if user is None:
+        schema = getattr(request.state, 'schema', 'unknown')
+        logger.warning(f"User {user_id} not found in schema {schema}")
+        raise credentials_exception
 
-        return user
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User account is deactivated"
+        )
 
-    # Should not reach here
-    raise credentials_exception
+    _detach_user(db, user)
+    if tenant_id:
+        principal_cache.set_user(tenant_id, user, version)
+    return user
 
 
 async def get_user_permissions(
     request: Request,
     user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db_with_tenant)],
 ) -> Set[str]:
     """
     Get all permission codes for the current user.
     Aggregates permissions from all user's roles.
 
-    Uses tenant schema since permissions/roles are per-tenant.
+    Uses tenant schema since permissions/roles are per-tenant, through the
+    same request-scoped session as get_current_user. Cached with the user
+    in the principal cache.
     """
+    tenant_id = getattr(request.state, 'tenant_id', None)
+    principal_cache = get_principal_cache()
+    version = -1
+    if tenant_id:
+        cached = await principal_cache.get_permissions(tenant_id, user.id)
+        if cached is not None:
+            return set(cached)
+        version = await principal_cache.version(tenant_id)
+
+    permissions = await _load_user_permissions(db, user)
+    if tenant_id:
+        principal_cache.set_permissions(tenant_id, user.id, permissions, version)
+    return permissions
+
+
+async def _load_user_permissions(db: AsyncSession, user: User) -> Set[str]:
+    """Permission codes granted by the user's active roles."""
     # SUPER_ADMIN has all permissions
     for role in user.roles:
         if role.level == RoleLevel.SUPER_ADMIN.name:
@@ -105,20 +159,15 @@ async def get_user_permissions(
     if not role_ids:
         return set()
 
-    # Get tenant database session
-    async for db in get_db_with_tenant(request):
-        # Query all permissions for user's roles
-        stmt = (
-            select(Permission.code)
-            .join(RolePermission, Permission.id == RolePermission.permission_id)
-            .where(RolePermission.role_id.in_(role_ids))
-            .where(Permission.is_active == True)
-        )
-        result = await db.execute(stmt)
-        permission_codes = {row[0] for row in result.all()}
-        return permission_codes
-
-    return set()
+    # Query all permissions for user's roles
+    stmt = (
+        select(Permission.code)
+        .join(RolePermission, Permission.id == RolePermission.permission_id)
+        .where(RolePermission.role_id.in_(role_ids))
+        .where(Permission.is_active == True)
+    )
+    result = await db.execute(stmt)
+    return {row[0] for row in result.all()}
 
 
 async def get_permission_checker(
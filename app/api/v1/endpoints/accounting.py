@@ -45,6 +45,8 @@ from app.schemas.accounting import (
 from app.models.accounting import ApprovalLevel
 from app.api.deps import DB, CurrentUser, get_current_user, require_permissions
 from app.services.audit_service import AuditService
+from app.services.gl_posting_service import GLPostingService
+from app.services.account_balance_service import AccountBalanceService
 
 router = APIRouter()
 
@@ -670,6 +672,9 @@ async def close_financial_period(
     period.closed_at = datetime.now(timezone.utc)
     period.closed_by = current_user.id
 
+    # Closing balances for as-of reports
+    await AccountBalanceService(db).materialize_period(period)
+
     await db.commit()
     await db.refresh(period)
 
@@ -1775,35 +1780,8 @@ async def approve_journal_entry(
 
     # Auto-post if requested
     if request.auto_post:
-        # Post to General Ledger
-        for line in journal.lines:
-            # Get account for running balance
-            acc_result = await db.execute(
-                select(ChartOfAccount).where(ChartOfAccount.id == line.account_id)
-            )
-            account = acc_result.scalar_one()
-
-            # Update account balance
-            if account.account_type in [AccountType.ASSET, AccountType.EXPENSE]:
-                account.current_balance += (line.debit_amount - line.credit_amount)
-            else:
-                account.current_balance += (line.credit_amount - line.debit_amount)
-
-            # Create GL entry
-            gl_entry = GeneralLedger(
-                account_id=line.account_id,
-                period_id=journal.period_id,
-                transaction_date=journal.entry_date,
-                journal_entry_id=journal.id,
-                journal_line_id=line.id,
-                debit_amount=line.debit_amount,
-                credit_amount=line.credit_amount,
-                running_balance=account.current_balance,
-                narration=line.description or journal.narration,
-                cost_center_id=line.cost_center_id,
-                channel_id=journal.channel_id,
-            )
-            db.add(gl_entry)
+        # Post to General Ledger (atomic balance deltas)
+        await GLPostingService(db).post(journal, journal.lines)
 
         # Update journal to POSTED
         journal.status = JournalStatus.POSTED.value
@@ -2005,37 +1983,8 @@ async def post_journal_entry(
             detail="Only approved journals can be posted"
         )
 
-    # Create General Ledger entries for each line
-    for line in journal.lines:
-        gl_entry = GeneralLedger(
-            account_id=line.account_id,
-            period_id=journal.period_id,
-            entry_date=journal.entry_date,
-            journal_id=journal.id,
-            entry_number=journal.entry_number,
-            journal_type=journal.journal_type,
-            debit_amount=line.debit_amount,
-            credit_amount=line.credit_amount,
-            balance=line.debit_amount - line.credit_amount,
-            narration=line.narration or journal.narration,
-            cost_center_id=line.cost_center_id,
-            reference_type=journal.reference_type,
-            reference_number=journal.reference_number,
-            created_by=current_user.id,
-        )
-        db.add(gl_entry)
-
-        # Update account balance
-        account_result = await db.execute(
-            select(ChartOfAccount).where(ChartOfAccount.id == line.account_id)
-        )
-        account = account_result.scalar_one()
-
-        # For Assets and Expenses, debit increases; for Liabilities, Equity, Revenue, credit increases
-        if account.account_type in [AccountType.ASSET, AccountType.EXPENSE]:
-            account.current_balance += (line.debit_amount - line.credit_amount)
-        else:  # LIABILITY, EQUITY, REVENUE
-            account.current_balance += (line.credit_amount - line.debit_amount)
+    # Create General Ledger entries and apply balance deltas atomically
+    await GLPostingService(db).post(journal, journal.lines)
 
     # Update journal status
     journal.status = JournalStatus.POSTED.value
@@ -2225,7 +2174,7 @@ async def get_account_ledger(
     total_result = await db.execute(count_query)
     total = total_result.scalar() or 0
 
-    query = query.order_by(GeneralLedger.transaction_date, GeneralLedger.created_at)
+    query = query.order_by(GeneralLedger.transaction_date, GeneralLedger.ledger_sequence)
     query = query.offset(skip).limit(limit)
 
     result = await db.execute(query)
@@ -2274,8 +2223,7 @@ async def get_trial_balance(
     as_of_date: date = Query(default_factory=date.today),
     current_user: User = Depends(get_current_user),
 ):
-    """Get Trial Balance report."""
-    # Get all accounts with balances
+    """Get Trial Balance report as of a date."""
     query = select(ChartOfAccount).where(
         and_(
             ChartOfAccount.is_active == True,
@@ -2286,12 +2234,14 @@ async def get_trial_balance(
     result = await db.execute(query)
     accounts = result.scalars().all()
 
+    balances = await AccountBalanceService(db).balances_as_of(as_of_date)
+
     items = []
     total_debit = Decimal("0")
     total_credit = Decimal("0")
 
     for account in accounts:
-        balance = account.current_balance
+        balance = balances.get(account.id, Decimal("0"))
 
         if balance == 0:
             continue
@@ -2341,46 +2291,32 @@ async def get_balance_sheet(
     as_of_date: date = Query(default_factory=date.today),
     current_user: User = Depends(get_current_user),
 ):
-    """Get Balance Sheet report."""
-    # Assets
-    assets_query = select(
-        ChartOfAccount.account_sub_type,
-        func.sum(ChartOfAccount.current_balance).label("total")
-    ).where(
-        and_(
-            ChartOfAccount.account_type == AccountType.ASSET,
-            ChartOfAccount.is_group == False,
-        )
-    ).group_by(ChartOfAccount.account_sub_type)
-
-    assets_result = await db.execute(assets_query)
-    assets_data = {row.account_sub_type if row.account_sub_type else "other": float(row.total or 0) for row in assets_result.all()}
-
-    # Liabilities
-    liabilities_query = select(
-        ChartOfAccount.account_sub_type,
-        func.sum(ChartOfAccount.current_balance).label("total")
-    ).where(
-        and_(
-            ChartOfAccount.account_type == AccountType.LIABILITY,
-            ChartOfAccount.is_group == False,
+    """Get Balance Sheet report as of a date."""
+    result = await db.execute(
+        select(ChartOfAccount.id, ChartOfAccount.account_type, ChartOfAccount.account_sub_type).where(
+            and_(
+                ChartOfAccount.account_type.in_([AccountType.ASSET, AccountType.LIABILITY, AccountType.EQUITY]),
+                ChartOfAccount.is_group == False,
+            )
         )
-    ).group_by(ChartOfAccount.account_sub_type)
+    )
+    accounts = result.all()
 
-    liabilities_result = await db.execute(liabilities_query)
-    liabilities_data = {row.account_sub_type if row.account_sub_type else "other": float(row.total or 0) for row in liabilities_result.all()}
+    balances = await AccountBalanceService(db).balances_as_of(as_of_date)
 
-    # Equity
-    equity_query = select(
-        func.sum(ChartOfAccount.current_balance)
-    ).where(
-        and_(
-            ChartOfAccount.account_type == AccountType.EQUITY,
-            ChartOfAccount.is_group == False,
-        )
-    )
-    equity_result = await db.execute(equity_query)
-    total_equity = float(equity_result.scalar() or 0)
+    assets_data = {}
+    liabilities_data = {}
+    total_equity = 0.0
+    for account_id, account_type, sub_type in accounts:
+        balance = float(balances.get(account_id, 0))
+        if account_type == AccountType.ASSET:
+            key = sub_type if sub_type else "other"
+            assets_data[key] = assets_data.get(key, 0.0) + balance
+        elif account_type == AccountType.LIABILITY:
+            key = sub_type if sub_type else "other"
+            liabilities_data[key] = liabilities_data.get(key, 0.0) + balance
+        else:
+            total_equity += balance
 
     total_assets = sum(assets_data.values())
     total_liabilities = sum(liabilities_data.values())
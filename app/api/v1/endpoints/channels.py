@@ -2011,7 +2011,8 @@ async def trigger_marketplace_sync(
     # Convert product_ids to list or None
     product_ids = [str(pid) for pid in request.product_ids] if request.product_ids else None
 
-    result = await sync_channel_inventory(db, channel, product_ids)
+    # Only changed SKUs are pushed unless force_sync
+    result = await sync_channel_inventory(db, channel, product_ids, full=request.force_sync)
 
     return MarketplaceSyncResponse(
         channel_id=request.channel_id,
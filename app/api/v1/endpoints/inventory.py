@@ -712,7 +712,7 @@ async def bulk_receive_stock(
     """
     service = InventoryService(db)
 
-    items = await service.bulk_receive_stock(
+    received = await service.bulk_receive_stock(
         warehouse_id=data.warehouse_id,
         grn_number=data.grn_number,
         items=[item.model_dump() for item in data.items],
@@ -722,9 +722,9 @@ async def bulk_receive_stock(
     )
 
     return BulkStockReceiptResponse(
-        message=f"Successfully received {len(items)} stock items",
+        message=f"Successfully received {received} stock items",
         grn_number=data.grn_number,
-        items_count=len(items),
+        items_count=received,
     )
 
 
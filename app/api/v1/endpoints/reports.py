@@ -3,7 +3,7 @@ from typing import Optional, List
 from datetime import date, timedelta
 from decimal import Decimal
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import select, func, and_, case, or_
 from sqlalchemy.orm import aliased
 
@@ -13,6 +13,7 @@ from app.models.order import Order, OrderItem
 from app.models.product_cost import ProductCost
 from app.models.accounting import ChartOfAccount
 from app.core.module_decorators import require_module
+from app.services.account_balance_service import AccountBalanceService
 
 router = APIRouter()
 
@@ -62,6 +63,16 @@ def parse_period(period: str) -> tuple[date, date]:
     return start, end
 
 
+def parse_as_of_date(value: str) -> date:
+    """Parse an as-of date ("today" or YYYY-MM-DD)."""
+    if not value or value == "today":
+        return date.today()
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid as_of_date: {value}")
+
+
 # ==================== Balance Sheet ====================
 
 # Account sub-types that are considered "current"
@@ -69,11 +80,11 @@ CURRENT_ASSET_SUBTYPES = {"CASH", "BANK", "ACCOUNTS_RECEIVABLE", "INVENTORY", "P
 CURRENT_LIABILITY_SUBTYPES = {"ACCOUNTS_PAYABLE", "TAX_PAYABLE", "ACCRUED_EXPENSE", "SHORT_TERM_DEBT", "CURRENT_LIABILITY"}
 
 
-def build_section_items(accounts: list, previous_balances: dict) -> List[dict]:
+def build_section_items(accounts: list, balances: dict, previous_balances: dict) -> List[dict]:
     """Build line items for a balance sheet section."""
     items = []
     for acc in accounts:
-        current = float(acc.current_balance or 0)
+        current = balances.get(str(acc.id), 0.0)
         previous = previous_balances.get(str(acc.id), 0.0)
         variance = current - previous
         variance_pct = (variance / previous * 100) if previous != 0 else 0
@@ -103,11 +114,11 @@ async def get_balance_sheet(
     Get Balance Sheet report with line items and comparison.
 
     Returns assets, liabilities, equity with individual account breakdowns.
+    Balances are as of as_of_date; the comparison column is the end of the
+    previous month.
     """
-    today = date.today()
-
-    # For now, we use current balances from chart_of_accounts
-    # In a full implementation, we'd query GL entries up to as_of_date
+    report_date = parse_as_of_date(as_of_date)
+    previous_date = report_date.replace(day=1) - timedelta(days=1)
 
     # Get all non-group asset accounts
     asset_query = select(ChartOfAccount).where(
@@ -153,29 +164,36 @@ async def get_balance_sheet(
     equity_result = await db.execute(equity_query)
     equity_accounts = equity_result.scalars().all()
 
-    # For comparison, use opening_balance as "previous" (simplified)
-    # In a full implementation, we'd query GL at a previous date
+    # Point-in-time balances (snapshot + ledger movement since)
+    balance_service = AccountBalanceService(db)
+    balances = {
+        str(account_id): float(balance)
+        for account_id, balance in (await balance_service.balances_as_of(report_date)).items()
+    }
     previous_balances = {}
-    for acc in all_assets + all_liabilities + equity_accounts:
-        previous_balances[str(acc.id)] = float(acc.opening_balance or 0)
+    if compare:
+        previous_balances = {
+            str(account_id): float(balance)
+            for account_id, balance in (await balance_service.balances_as_of(previous_date)).items()
+        }
 
     # Build sections
-    current_assets_items = build_section_items(current_assets, previous_balances)
-    non_current_assets_items = build_section_items(non_current_assets, previous_balances)
-    current_liabilities_items = build_section_items(current_liabilities, previous_balances)
-    non_current_liabilities_items = build_section_items(non_current_liabilities, previous_balances)
-    equity_items = build_section_items(equity_accounts, previous_balances)
+    current_assets_items = build_section_items(current_assets, balances, previous_balances)
+    non_current_assets_items = build_section_items(non_current_assets, balances, previous_balances)
+    current_liabilities_items = build_section_items(current_liabilities, balances, previous_balances)
+    non_current_liabilities_items = build_section_items(non_current_liabilities, balances, previous_balances)
+    equity_items = build_section_items(equity_accounts, balances, previous_balances)
 
     # Calculate totals
-    total_current_assets = sum(float(a.current_balance or 0) for a in current_assets)
-    total_non_current_assets = sum(float(a.current_balance or 0) for a in non_current_assets)
+    total_current_assets = sum(balances.get(str(a.id), 0) for a in current_assets)
+    total_non_current_assets = sum(balances.get(str(a.id), 0) for a in non_current_assets)
     total_assets = total_current_assets + total_non_current_assets
 
-    total_current_liabilities = sum(float(l.current_balance or 0) for l in current_liabilities)
-    total_non_current_liabilities = sum(float(l.current_balance or 0) for l in non_current_liabilities)
+    total_current_liabilities = sum(balances.get(str(l.id), 0) for l in current_liabilities)
+    total_non_current_liabilities = sum(balances.get(str(l.id), 0) for l in non_current_liabilities)
     total_liabilities = total_current_liabilities + total_non_current_liabilities
 
-    total_equity = sum(float(e.current_balance or 0) for e in equity_accounts)
+    total_equity = sum(balances.get(str(e.id), 0) for e in equity_accounts)
 
     # Previous totals
     prev_current_assets = sum(previous_balances.get(str(a.id), 0) for a in current_assets)
@@ -200,8 +218,8 @@ async def get_balance_sheet(
     is_balanced = abs(difference) < 0.01
 
     return {
-        "as_of_date": today.isoformat(),
-        "previous_date": (today - timedelta(days=30)).isoformat(),
+        "as_of_date": report_date.isoformat(),
+        "previous_date": previous_date.isoformat(),
         "assets": {
             "current_assets": {
                 "title": "Current Assets",
@@ -278,13 +296,21 @@ async def get_trial_balance(
     result = await db.execute(accounts_query)
     accounts = result.scalars().all()
 
+    # Opening = balance at the end of the day before the period, closing =
+    # balance at period end, movement = ledger postings within the period
+    balance_service = AccountBalanceService(db)
+    opening_balances = await balance_service.balances_as_of(start_date - timedelta(days=1))
+    closing_balances = await balance_service.balances_as_of(end_date)
+    movements = await balance_service.period_movements(start_date, end_date)
+
     account_list = []
     total_debits = Decimal("0")
     total_credits = Decimal("0")
 
     for acc in accounts:
-        current_balance = Decimal(str(acc.current_balance or 0))
-        opening_balance = Decimal(str(acc.opening_balance or 0))
+        current_balance = closing_balances.get(acc.id, Decimal("0"))
+        opening_balance = opening_balances.get(acc.id, Decimal("0"))
+        period_debit, period_credit = movements.get(acc.id, (Decimal("0"), Decimal("0")))
 
         # Determine debit/credit based on account type and balance sign
         # Assets & Expenses: positive = debit, negative = credit
@@ -302,10 +328,6 @@ async def get_trial_balance(
             opening_credit = max(opening_balance, Decimal("0"))
             opening_debit = max(-opening_balance, Decimal("0"))
 
-        # Period movement is the difference
-        period_debit = max(debit_balance - opening_debit, Decimal("0"))
-        period_credit = max(credit_balance - opening_credit, Decimal("0"))
-
         account_list.append({
             "account_code": acc.account_code,
             "account_name": acc.account_name,
@@ -11,7 +11,8 @@ Endpoints for:
 
 from datetime import datetime, timezone
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, String, and_
 
@@ -41,6 +42,7 @@ from app.schemas.serialization import (
     # PO Serials
     POSerialResponse,
     POSerialsListResponse,
+    ScanHistoryResponse,
     # Scanning
     ScanSerialRequest,
     ScanSerialResponse,
@@ -635,20 +637,29 @@ async def get_po_serials(
     status: Optional[SerialStatus] = Query(None, description="Filter by status"),
     limit: int = Query(1000, le=10000),
     offset: int = Query(0, ge=0),
+    after: Optional[str] = Query(None, description="Keyset cursor (next_cursor of the previous page)"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Get all serials for a Purchase Order"""
+    """Get serials for a Purchase Order, one keyset page at a time"""
     service = SerializationService(db)
 
-    serials = await service.get_serials_by_po(po_id, status=status, limit=limit, offset=offset)
+    try:
+        serials = await service.get_serials_by_po(po_id, status=status, limit=limit, offset=offset, after=after)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     counts = await service.get_serials_count_by_po(po_id)
 
+    next_cursor = None
+    if len(serials) == limit:
+        next_cursor = service.encode_serial_cursor(serials[-1].serial_number, serials[-1].barcode)
+
     return POSerialsListResponse(
         po_id=po_id,
         total=counts.get("total", 0),
         by_status=counts,
         serials=[POSerialResponse.model_validate(s) for s in serials],
+        next_cursor=next_cursor,
     )
 
 
@@ -657,36 +668,39 @@ async def get_po_serials(
 async def export_po_serials(
     po_id: str,
     format: str = Query("csv", pattern="^(csv|txt)$"),
+    status: Optional[SerialStatus] = Query(None, description="Filter by status"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
     Export serials for a PO as CSV/TXT file.
 
-    This can be sent to the vendor for barcode printing.
+    This can be sent to the vendor for barcode printing. The file is streamed
+    from a server-side cursor, so label runs of any size use flat memory.
     """
     service = SerializationService(db)
-    serials = await service.get_serials_by_po(po_id, limit=100000)
+    counts = await service.get_serials_count_by_po(po_id)
 
-    if not serials:
+    if not counts.get("total"):
         raise HTTPException(status_code=404, detail="No serials found for this PO")
 
-    if format == "csv":
-        # Generate CSV
-        lines = ["Barcode,Model,Serial,Status"]
-        for s in serials:
-            lines.append(f"{s.barcode},{s.model_code},{s.serial_number},{s.status}")
-        content = "\n".join(lines)
-        media_type = "text/csv"
-        filename = f"serials_{po_id}.csv"
-    else:
-        # Generate plain text (one barcode per line)
-        content = "\n".join([s.barcode for s in serials])
-        media_type = "text/plain"
-        filename = f"serials_{po_id}.txt"
-
-    return Response(
-        content=content,
+    async def lines():
+        if format == "csv":
+            yield "Barcode,Model,Serial,Status\n"
+        # Own session: the request session may be closed before the body is sent
+        async for export_db in get_db():
+            async for chunk in SerializationService(export_db).iter_serials_by_po(po_id, status=status):
+                if format == "csv":
+                    yield "".join(f"{r.barcode},{r.model_code},{r.serial_number},{r.status}\n" for r in chunk)
+                else:
+                    # Plain text (one barcode per line)
+                    yield "".join(f"{r.barcode}\n" for r in chunk)
+
+    media_type = "text/csv" if format == "csv" else "text/plain"
+    filename = f"serials_{po_id}.{format}"
+
+    return StreamingResponse(
+        lines(),
         media_type=media_type,
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
@@ -755,6 +769,59 @@ async def bulk_scan_serials(
     )
 
 
+@router.get("/scan/history", response_model=ScanHistoryResponse)
+@require_module("oms_fulfillment")
+async def get_scan_history(
+    po_id: Optional[str] = Query(None, description="Filter by PO"),
+    grn_id: Optional[str] = Query(None, description="Filter by GRN"),
+    limit: int = Query(100, ge=1, le=1000),
+    before: Optional[str] = Query(None, description="Keyset cursor (next_cursor of the previous page)"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Received (scanned) serials, newest first, one keyset page at a time"""
+    service = SerializationService(db)
+    try:
+        serials = await service.get_scan_history(po_id=po_id, grn_id=grn_id, limit=limit, before=before)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    next_cursor = None
+    if len(serials) == limit:
+        next_cursor = service.encode_scan_cursor(serials[-1].received_at, serials[-1].id)
+
+    return ScanHistoryResponse(
+        items=[POSerialResponse.model_validate(s) for s in serials],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/scan/history/export")
+@require_module("oms_fulfillment")
+async def export_scan_history(
+    po_id: Optional[str] = Query(None, description="Filter by PO"),
+    grn_id: Optional[str] = Query(None, description="Filter by GRN"),
+    current_user: User = Depends(get_current_user),
+):
+    """Export scan history as CSV, streamed from a server-side cursor"""
+
+    async def lines():
+        yield "Barcode,Model,Serial,Status,GRN,Received At,Received By\n"
+        async for export_db in get_db():
+            async for chunk in SerializationService(export_db).iter_scan_history(po_id=po_id, grn_id=grn_id):
+                yield "".join(
+                    f"{r.barcode},{r.model_code},{r.serial_number},{r.status},"
+                    f"{r.grn_id or ''},{r.received_at.isoformat()},{r.received_by or ''}\n"
+                    for r in chunk
+                )
+
+    return StreamingResponse(
+        lines(),
+        media_type="text/csv",
+        headers={"Content-Disposition": "attachment; filename=scan_history.csv"}
+    )
+
+
 # ==================== Serial Lookup ====================
 
 @router.get("/lookup/{barcode}", response_model=SerialLookupResponse)
@@ -17,7 +17,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.api.deps import get_current_user
 from app.models.user import User
-from app.services.serviceability_service import ServiceabilityService
+from app.middleware.tenant import get_current_tenant_id
+from app.services.serviceability_index import get_serviceability_index_registry
+from app.services.serviceability_service import (
+    ServiceabilityService,
+    is_cacheable_check,
+    serviceability_cache_payload,
+)
 from app.services.allocation_service import AllocationService
 from app.services.cache_service import get_cache
 from app.config import settings
@@ -80,11 +86,13 @@ async def check_serviceability(
     """Check if a pincode is serviceable with caching."""
     start_time = time.time()
     cache = get_cache()
+    tenant_id = get_current_tenant_id()
     channel = request.channel_code or "D2C"
+    use_cache = settings.CACHE_ENABLED and tenant_id and is_cacheable_check(request)
 
     # Try cache first
-    if settings.CACHE_ENABLED:
-        cached = await cache.get_serviceability(request.pincode, channel)
+    if use_cache:
+        cached = await cache.get_serviceability(tenant_id, request.pincode, channel)
         if cached:
             response.headers["X-Cache"] = "HIT"
             response.headers["X-Response-Time"] = f"{(time.time() - start_time) * 1000:.2f}ms"
@@ -95,19 +103,11 @@ async def check_serviceability(
     result = await service.check_serviceability(request)
 
     # Cache the result
-    if settings.CACHE_ENABLED:
-        cache_data = result.model_dump()
-        # Convert any non-serializable types
-        if cache_data.get("warehouse_candidates"):
-            for wc in cache_data["warehouse_candidates"]:
-                if wc.get("shipping_cost"):
-                    wc["shipping_cost"] = float(wc["shipping_cost"])
-        if cache_data.get("minimum_shipping_cost"):
-            cache_data["minimum_shipping_cost"] = float(cache_data["minimum_shipping_cost"])
-
+    if use_cache:
         await cache.set_serviceability(
+            tenant_id,
             request.pincode,
-            cache_data,
+            serviceability_cache_payload(result),
             channel,
             ttl=settings.SERVICEABILITY_CACHE_TTL
         )
@@ -133,11 +133,18 @@ async def quick_check_serviceability(
     """Quick pincode serviceability check with caching."""
     start_time = time.time()
     cache = get_cache()
+    tenant_id = get_current_tenant_id()
     channel = channel_code or "D2C"
+    request = ServiceabilityCheckRequest(
+        pincode=pincode,
+        payment_mode=payment_mode,
+        channel_code=channel_code
+    )
+    use_cache = settings.CACHE_ENABLED and tenant_id and is_cacheable_check(request)
 
     # Try cache first
-    if settings.CACHE_ENABLED:
-        cached = await cache.get_serviceability(pincode, channel)
+    if use_cache:
+        cached = await cache.get_serviceability(tenant_id, pincode, channel)
         if cached:
             response.headers["X-Cache"] = "HIT"
             response.headers["X-Response-Time"] = f"{(time.time() - start_time) * 1000:.2f}ms"
@@ -145,26 +152,14 @@ async def quick_check_serviceability(
 
     # Cache miss - query database
     service = ServiceabilityService(db)
-    request = ServiceabilityCheckRequest(
-        pincode=pincode,
-        payment_mode=payment_mode,
-        channel_code=channel_code
-    )
     result = await service.check_serviceability(request)
 
     # Cache the result
-    if settings.CACHE_ENABLED:
-        cache_data = result.model_dump()
-        if cache_data.get("warehouse_candidates"):
-            for wc in cache_data["warehouse_candidates"]:
-                if wc.get("shipping_cost"):
-                    wc["shipping_cost"] = float(wc["shipping_cost"])
-        if cache_data.get("minimum_shipping_cost"):
-            cache_data["minimum_shipping_cost"] = float(cache_data["minimum_shipping_cost"])
-
+    if use_cache:
         await cache.set_serviceability(
+            tenant_id,
             pincode,
-            cache_data,
+            serviceability_cache_payload(result),
             channel,
             ttl=settings.SERVICEABILITY_CACHE_TTL
         )
@@ -249,12 +244,9 @@ async def create_warehouse_serviceability(
 ):
     """Create warehouse serviceability mapping."""
     service = ServiceabilityService(db)
+    # Service invalidates the cached pincode
     item = await service.create_warehouse_serviceability(data)
 
-    # Invalidate cache for this pincode
-    cache = get_cache()
-    await cache.invalidate_serviceability(data.pincode)
-
     return WarehouseServiceabilityResponse(
         id=item.id,
         warehouse_id=item.warehouse_id,
@@ -288,13 +280,8 @@ async def bulk_upload_pincodes(
 ):
     """Bulk upload pincodes for a warehouse."""
     service = ServiceabilityService(db)
-    result = await service.upload_pincodes_bulk(data)
-
-    # Invalidate all serviceability cache after bulk upload
-    cache = get_cache()
-    await cache.invalidate_serviceability()
-
-    return result
+    # Service invalidates the uploaded pincodes
+    return await service.upload_pincodes_bulk(data)
 
 
 @router.post(
@@ -342,7 +329,7 @@ async def add_pincode_range(
         for p in range(start, end + 1)
     ]
 
-    # Upload
+    # Upload (service invalidates the uploaded pincodes)
     service = ServiceabilityService(db)
     result = await service.upload_pincodes_bulk(
         BulkPincodeUploadRequest(
@@ -353,10 +340,6 @@ async def add_pincode_range(
         )
     )
 
-    # Invalidate all serviceability cache after range upload
-    cache = get_cache()
-    await cache.invalidate_serviceability()
-
     return result
 
 
@@ -374,6 +357,7 @@ async def delete_warehouse_serviceability(
     current_user: User = Depends(get_current_user)
 ):
     """Delete warehouse serviceability mapping."""
+    # Service invalidates the cached pincode
     service = ServiceabilityService(db)
     deleted = await service.delete_warehouse_serviceability(warehouse_id, pincode)
     if not deleted:
@@ -382,10 +366,6 @@ async def delete_warehouse_serviceability(
             detail="Mapping not found"
         )
 
-    # Invalidate cache for this pincode
-    cache = get_cache()
-    await cache.invalidate_serviceability(pincode)
-
 
 # ==================== Allocation Rules (Admin) ====================
 
@@ -693,12 +673,13 @@ async def clear_serviceability_cache(
 ):
     """Clear serviceability cache."""
     cache = get_cache()
+    tenant_id = get_current_tenant_id()
 
     if pincode:
-        await cache.invalidate_serviceability(pincode, channel)
+        await cache.invalidate_serviceability(tenant_id, pincode, channel)
         return {"message": f"Cache cleared for pincode {pincode}", "channel": channel}
     else:
-        count = await cache.invalidate_serviceability(channel=channel)
+        count = await cache.invalidate_serviceability(tenant_id, channel=channel)
         return {"message": f"Cache cleared for {count} entries", "channel": channel}
 
 
@@ -717,6 +698,8 @@ async def get_cache_status(
         "redis_configured": bool(settings.REDIS_URL),
         "serviceability_ttl_seconds": settings.SERVICEABILITY_CACHE_TTL,
         "product_ttl_seconds": settings.PRODUCT_CACHE_TTL,
+        "index_enabled": settings.SERVICEABILITY_INDEX_ENABLED,
+        "index": get_serviceability_index_registry().stats(),
     }
 
 
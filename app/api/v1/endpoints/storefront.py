@@ -38,8 +38,9 @@ from app.schemas.serviceability import (
     ServiceabilityCheckRequest,
     ServiceabilityCheckResponse,
 )
+from app.middleware.tenant import get_current_tenant_id
 from app.services.cache_service import get_cache
-from app.services.serviceability_service import ServiceabilityService
+from app.services.serviceability_service import ServiceabilityService, serviceability_cache_payload
 
 router = APIRouter()
 
@@ -818,9 +819,9 @@ async def check_serviceability(
             detail="Invalid pincode format. Must be 6 digits."
         )
 
-    # Try to get from cache
-    cache_key = f"serviceability:d2c:{pincode}"
-    cached_result = await cache.get(cache_key)
+    # Try to get from cache (same tenant key the refresh job pushes)
+    tenant_id = get_current_tenant_id()
+    cached_result = await cache.get_serviceability(tenant_id, pincode, "D2C") if tenant_id else None
     if cached_result:
         response.headers["X-Cache"] = "HIT"
         response.headers["X-Response-Time"] = f"{(time.time() - start_time) * 1000:.2f}ms"
@@ -836,7 +837,8 @@ async def check_serviceability(
     result = await service.check_serviceability(request)
 
     # Cache the result (30 minutes)
-    await cache.set(cache_key, result.model_dump(), ttl=1800)
+    if tenant_id:
+        await cache.set_serviceability(tenant_id, pincode, serviceability_cache_payload(result), "D2C", ttl=1800)
 
     response.headers["X-Cache"] = "MISS"
     response.headers["X-Response-Time"] = f"{(time.time() - start_time) * 1000:.2f}ms"
@@ -19,6 +19,7 @@ from app.schemas.user import (
     RegionBasicInfo,
 )
 from app.services.rbac_service import RBACService
+from app.core.principal_cache import invalidate_principals_on_commit
 from app.services.auth_service import AuthService
 from app.services.audit_service import AuditService
 from app.models.role import RoleLevel
@@ -371,6 +372,7 @@ async def update_user(
     for field, value in data.model_dump(exclude_unset=True).items():
         setattr(user, field, value)
 
+    invalidate_principals_on_commit(db)
     await db.commit()
     await db.refresh(user)
 
@@ -446,6 +448,7 @@ async def delete_user(
 
         # Soft delete - deactivate user
         user.is_active = False
+        invalidate_principals_on_commit(db)
         await db.commit()
 
         # Audit log (non-blocking - don't fail deletion if audit fails)
@@ -17,6 +17,9 @@ class Settings(BaseSettings):
     DB_MAX_OVERFLOW: int = 10  # Extra connections allowed beyond pool_size
     DB_POOL_TIMEOUT: int = 60  # Seconds to wait for connection from pool
     DB_POOL_RECYCLE: int = 300  # Recycle connections every 5 minutes (Supabase Pooler)
+    TENANT_DEDICATED_POOLS: str = ""  # Comma-separated tenant schemas given their own small pool
+    TENANT_DEDICATED_POOL_SIZE: int = 2  # Base connections per dedicated tenant pool
+    TENANT_DEDICATED_POOL_OVERFLOW: int = 3  # Extra connections per dedicated tenant pool
 
     # JWT Settings
     SECRET_KEY: str
@@ -53,6 +56,54 @@ class Settings(BaseSettings):
     CATEGORY_CACHE_TTL: int = 1800  # 30 minutes for categories
     COMPANY_CACHE_TTL: int = 3600  # 1 hour for company info
 
+    # Pincode Serviceability Index (in-process, per tenant)
+    SERVICEABILITY_INDEX_ENABLED: bool = True  # Answer serviceability checks from the index instead of SQL
+    SERVICEABILITY_INDEX_MAX_AGE: int = 900  # Seconds before an index is rebuilt without a change notification
+    SERVICEABILITY_INDEX_VERSION_CHECK: int = 5  # Seconds between checks of the shared version stamp
+
+    # Tenant Registry Cache (in-process tenant resolution for tenant_middleware)
+    TENANT_CACHE_TTL: int = 60  # Seconds a resolved tenant is served without a DB lookup
+    TENANT_NEGATIVE_CACHE_TTL: int = 15  # Seconds an unknown host/tenant id is remembered
+    TENANT_CACHE_MAX_ENTRIES: int = 10000  # Upper bound on cached id/subdomain keys
+
+    # Module Entitlement Cache (enabled-module set per tenant for @require_module)
+    ENTITLEMENT_CACHE_BACKEND: str = "auto"  # Options: auto (redis if configured), redis, memory
+    ENTITLEMENT_CACHE_TTL: int = 300  # Seconds a tenant's module set is cached
+    ENTITLEMENT_LOCAL_TTL: int = 10  # Process-local layer TTL when using the shared backend
+
+    # Principal Cache (authenticated user + permission set per tenant user)
+    PRINCIPAL_CACHE_TTL: int = 300  # Max seconds a cached user/permission set is served (PRINCIPAL_VERSION_CHECK without Redis)
+    PRINCIPAL_VERSION_CHECK: int = 5  # Seconds between checks of the shared RBAC version stamp
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 50000  # Upper bound on cached principals per process
+    TOKEN_BLACKLIST_REFRESH: int = 15  # Seconds between incremental reloads of revoked token JTIs
+
+    # Tenant Job Runner (background jobs across tenants)
+    TENANT_JOB_CONCURRENCY: int = 5  # Default tenants processed in parallel per job
+    TENANT_JOB_TIMEOUT: int = 300  # Default seconds per tenant before a job run is cancelled
+    TENANT_JOB_SHARDS: int = 4  # Tenant shards leased independently, so workers can split a run
+    TENANT_JOB_LEASE_ENABLED: bool = True  # Take cluster leases so each job runs once across workers
+    TENANT_JOB_LEASE_TTL: int = 300  # Seconds a lease survives without renewal (crashed worker takeover)
+    TENANT_JOB_CRON_MIN_GAP: int = 300  # Seconds between cluster-wide starts of cron-scheduled jobs
+    TENANT_JOB_HISTORY_DAYS: int = 14  # Days of run history kept in tenant_job_runs
+    TENANT_JOB_SCAN_BATCHING: bool = True  # Run scan-style jobs as batched UNION ALL queries over tenant schemas
+    TENANT_JOB_SCAN_CHUNK: int = 50  # Tenant schemas per batched scan query
+
+    # S&OP Simulation
+    SNOP_SIMULATION_WORKERS: int = 2  # Worker threads running Monte Carlo off the event loop
+    SNOP_FORECAST_WORKERS: int = 4  # Processes fitting forecast models (0 = default thread executor)
+    SNOP_FORECAST_FIT_TIMEOUT: int = 120  # Seconds before a single model fit is abandoned
+    SNOP_FORECAST_BATCH_SIZE: int = 200  # SKUs per checkpointed chunk in bulk forecast regeneration
+    SNOP_DEMAND_ROLLUP_BACKFILL_DAYS: int = 730  # History loaded into the daily demand rollup on first build
+
+    # OMS Fraud Scoring
+    FRAUD_SCORING_BUDGET_MS: int = 150  # statement_timeout for the inline fraud features query at order creation
+
+    # AI Command Center Snapshots (OMS/WMS/DMS dashboards)
+    AI_SNAPSHOT_FRESH_SECONDS: int = 120  # Snapshot age served without a refresh (also the refresh job interval)
+    AI_SNAPSHOT_MAX_STALE_SECONDS: int = 3600  # Oldest snapshot served while a background refresh runs
+    AI_SNAPSHOT_LOCK_SECONDS: int = 300  # Expiry of the cross-worker refresh lock
+    AI_SNAPSHOT_ACTIVE_SECONDS: int = 1800  # Dashboards read within this window are precomputed by the refresh job
+
     # Razorpay Payment Gateway
     RAZORPAY_KEY_ID: str = ""  # Razorpay Key ID
     RAZORPAY_KEY_SECRET: str = ""  # Razorpay Key Secret
@@ -94,8 +145,10 @@ class Settings(BaseSettings):
     AUTO_REPLENISH_DEFAULT_REORDER_POINT: int = 10  # Default reorder point if not configured
 
     # Marketplace Sync Settings
-    MARKETPLACE_SYNC_INTERVAL_MINUTES: int = 30  # How often to sync to marketplaces
-    MARKETPLACE_SYNC_BATCH_SIZE: int = 100  # Number of items to sync per batch
+    MARKETPLACE_SYNC_ENABLED: bool = False  # Schedule the marketplace push job (enable once real adapters ship)
+    MARKETPLACE_SYNC_INTERVAL_MINUTES: int = 5  # How often to push changed quantities to marketplaces
+    MARKETPLACE_SYNC_BATCH_SIZE: int = 100  # Items per push for adapters without their own batch limit
+    MARKETPLACE_SYNC_CONCURRENCY: int = 4  # Channels pushed in parallel
 
     # Google Maps / Places API (for address autocomplete)
     GOOGLE_MAPS_API_KEY: str = ""  # Google Maps API key with Places API enabled
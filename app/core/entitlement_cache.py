@@ -0,0 +1,191 @@
+"""
+Module entitlement cache for Multi-Tenant SaaS.
+
+Caches the full set of enabled module codes per tenant, so a
+@require_module check is a set lookup instead of a TenantSubscription x
+ErpModule query.
+
+Backends:
+1. memory - per-process dict (development / single worker)
+2. redis  - shared through CacheService, so all uvicorn workers share one
+            load per tenant and see invalidations immediately. A short
+            process-local layer (ENTITLEMENT_LOCAL_TTL) absorbs hot paths.
+
+Invalidation:
+    Call `await invalidate_entitlements(tenant_id)` after any subscription
+    change (subscribe, unsubscribe, expiry, suspension, onboarding).
+"""
+import time
+import asyncio
+import logging
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# CacheService key (tenant prefix added by CacheService)
+_ENTITLEMENT_KEY = "entitlements:modules"
+
+
+class EntitlementCache:
+    """
+    Two-tier cache of enabled module codes per tenant.
+
+    The local tier is always consulted first. When a shared CacheService is
+    configured, local misses fall through to it before hitting the database.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int = 300,
+        local_ttl_seconds: Optional[int] = None,
+        shared=None,
+        max_entries: int = 10000,
+    ):
+        self._ttl = ttl_seconds
+        self._local_ttl = ttl_seconds if local_ttl_seconds is None else local_ttl_seconds
+        self._shared = shared
+        self._max_entries = max_entries
+        # Format: {tenant_id: (module_codes, expires_at_monotonic)}
+        self._local: Dict[str, Tuple[FrozenSet[str], float]] = {}
+        # Per-tenant locks so concurrent misses trigger a single DB load
+        self._load_locks: Dict[str, asyncio.Lock] = {}
+        self._hits = 0
+        self._shared_hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    @staticmethod
+    def _key(tenant_id) -> str:
+        return str(tenant_id).lower()
+
+    @property
+    def backend_name(self) -> str:
+        return "redis" if self._shared is not None else "memory"
+
+    def _get_local(self, tenant_id: str) -> Optional[FrozenSet[str]]:
+        entry = self._local.get(tenant_id)
+        if entry is None:
+            return None
+        modules, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._local[tenant_id]
+            return None
+        return modules
+
+    def _set_local(self, tenant_id: str, modules: FrozenSet[str]) -> None:
+        if self._local_ttl <= 0:
+            return
+        if len(self._local) >= self._max_entries:
+            now = time.monotonic()
+            for key in [k for k, (_, exp) in self._local.items() if exp <= now]:
+                del self._local[key]
+            if len(self._local) >= self._max_entries:
+                self._local.clear()
+        self._local[tenant_id] = (modules, time.monotonic() + self._local_ttl)
+
+    async def _load_from_db(self, tenant_id: str) -> FrozenSet[str]:
+        from app.database import async_session_maker
+        from app.core.module_decorators import get_tenant_enabled_modules
+
+        async with async_session_maker() as db:
+            modules = await get_tenant_enabled_modules(db, tenant_id)
+        return frozenset(modules)
+
+    async def get_enabled_modules(self, tenant_id) -> FrozenSet[str]:
+        """Get the enabled module codes for a tenant (one query per tenant per TTL)."""
+        tenant_id = self._key(tenant_id)
+
+        modules = self._get_local(tenant_id)
+        if modules is not None:
+            self._hits += 1
+            return modules
+
+        lock = self._load_locks.setdefault(tenant_id, asyncio.Lock())
+        async with lock:
+            # Another coroutine may have loaded while we waited
+            modules = self._get_local(tenant_id)
+            if modules is not None:
+                self._hits += 1
+                return modules
+
+            if self._shared is not None:
+                cached = await self._shared.get(tenant_id, _ENTITLEMENT_KEY)
+                if cached is not None:
+                    self._shared_hits += 1
+                    modules = frozenset(cached)
+                    self._set_local(tenant_id, modules)
+                    return modules
+
+            self._misses += 1
+            modules = await self._load_from_db(tenant_id)
+            self._set_local(tenant_id, modules)
+            if self._shared is not None:
+                await self._shared.set(tenant_id, _ENTITLEMENT_KEY, sorted(modules), self._ttl)
+            return modules
+
+    async def has_module(self, tenant_id, module_code: str) -> bool:
+        """Check whether a module is enabled for a tenant."""
+        return module_code in await self.get_enabled_modules(tenant_id)
+
+    def invalidate_local(self, tenant_id: Optional[str] = None) -> None:
+        """Drop process-local entries (all tenants if tenant_id is None)."""
+        if tenant_id is None:
+            self._local.clear()
+        else:
+            self._local.pop(self._key(tenant_id), None)
+        self._invalidations += 1
+
+    async def invalidate(self, tenant_id) -> None:
+        """Drop a tenant's entitlements locally and in the shared backend."""
+        tenant_id = self._key(tenant_id)
+        self.invalidate_local(tenant_id)
+        if self._shared is not None:
+            await self._shared.delete(tenant_id, _ENTITLEMENT_KEY)
+
+    def stats(self) -> dict:
+        """Hit/miss counters for monitoring."""
+        return {
+            "backend": self.backend_name,
+            "entries": len(self._local),
+            "hits": self._hits,
+            "shared_hits": self._shared_hits,
+            "misses": self._misses,
+            "invalidations": self._invalidations,
+        }
+
+
+# Singleton cache instance
+_entitlement_cache: Optional[EntitlementCache] = None
+
+
+def get_entitlement_cache() -> EntitlementCache:
+    """Get the entitlement cache singleton."""
+    global _entitlement_cache
+
+    if _entitlement_cache is None:
+        backend = settings.ENTITLEMENT_CACHE_BACKEND
+        shared = None
+        if backend in ("auto", "redis"):
+            from app.services.cache_service import get_cache
+            cache = get_cache()
+            if cache.is_shared:
+                shared = cache
+            elif backend == "redis":
+                logger.warning("ENTITLEMENT_CACHE_BACKEND=redis but Redis is not configured, using memory")
+
+        _entitlement_cache = EntitlementCache(
+            ttl_seconds=settings.ENTITLEMENT_CACHE_TTL,
+            local_ttl_seconds=settings.ENTITLEMENT_LOCAL_TTL if shared is not None else None,
+            shared=shared,
+        )
+        logger.info(f"Entitlement cache initialized with {_entitlement_cache.backend_name} backend")
+
+    return _entitlement_cache
+
+
+async def invalidate_entitlements(tenant_id) -> None:
+    """Invalidate cached module entitlements after a subscription change."""
+    await get_entitlement_cache().invalidate(tenant_id)
+    logger.info(f"Module entitlements invalidated for tenant {tenant_id}")
@@ -2,42 +2,21 @@
 Module access control decorators for Multi-Tenant SaaS
 
 Provides decorators to check if tenant has access to specific modules.
-Includes automatic cache cleanup to prevent memory bloat.
+Entitlements are served from the shared, invalidation-aware entitlement cache.
 """
 from functools import wraps
 from fastapi import HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, or_
 from app.models.tenant import TenantSubscription, ErpModule
+from app.core.entitlement_cache import get_entitlement_cache
 from datetime import datetime, timezone
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Cache for module access checks (to reduce database queries)
-# Format: {cache_key: (has_access, cache_time)}
-_module_access_cache = {}
-
-# Maximum cache entries before cleanup (prevents unbounded growth)
-_MAX_CACHE_ENTRIES = 10000
-
-# Cache TTL in seconds
-_CACHE_TTL_SECONDS = 300  # 5 minutes
-
-
-def _cleanup_expired_cache_entries():
-    """Remove expired entries from the module access cache."""
-    global _module_access_cache
-    now = datetime.now(timezone.utc)
-    expired_keys = [
-        key for key, (_, cache_time) in _module_access_cache.items()
-        if (now - cache_time).total_seconds() >= _CACHE_TTL_SECONDS
-    ]
-    for key in expired_keys:
-        del _module_access_cache[key]
-
-    if expired_keys:
-        logger.debug(f"Cleaned up {len(expired_keys)} expired cache entries")
+# Enabled-module sets are cached per tenant in the entitlement cache
+# (see app/core/entitlement_cache.py); each check is a set lookup.
 
 
 def require_module(module_code: str):
@@ -86,51 +65,21 @@ def require_module(module_code: str):
                     detail="Tenant context not found. Please login."
                 )
 
-            tenant_id = tenant.id
-
-            # Check cache first (to reduce database queries)
-            cache_key = f"{tenant_id}:{module_code}"
-            if cache_key in _module_access_cache:
-                has_access, cache_time = _module_access_cache[cache_key]
-                # Cache valid for configured TTL
-                if (datetime.now(timezone.utc) - cache_time).total_seconds() < _CACHE_TTL_SECONDS:
-                    if not has_access:
-                        raise HTTPException(
-                            status_code=status.HTTP_403_FORBIDDEN,
-                            detail=f"Module '{module_code}' is not enabled for your account. Please upgrade your subscription."
-                        )
-                    # Access granted, proceed
-                    return await func(*args, **kwargs)
-                else:
-                    # Entry expired, remove it
-                    del _module_access_cache[cache_key]
-
-            # Cleanup if cache is getting too large
-            if len(_module_access_cache) > _MAX_CACHE_ENTRIES:
-                _cleanup_expired_cache_entries()
-
-            # Check if module is enabled for this tenant
-            from app.database import async_session_maker
-
-            async with async_session_maker() as db:
-                has_access = await check_module_access(db, tenant_id, module_code)
-
-                # Update cache
-                _module_access_cache[cache_key] = (has_access, datetime.now(timezone.utc))
-
-                if not has_access:
-                    logger.warning(
-                        f"Module access denied: Tenant {tenant.name} "
-                        f"attempted to access module '{module_code}'"
-                    )
-                    raise HTTPException(
-                        status_code=status.HTTP_403_FORBIDDEN,
-                        detail=f"Module '{module_code}' is not enabled for your account. Please upgrade your subscription."
-                    )
-
-                # Module access granted, proceed with request
-                logger.debug(f"Module access granted: {tenant.name} -> {module_code}")
-                return await func(*args, **kwargs)
+            # Check enabled-module set (one DB load per tenant per TTL)
+            has_access = await get_entitlement_cache().has_module(tenant.id, module_code)
+
+            if not has_access:
+                logger.warning(
+                    f"Module access denied: Tenant {tenant.name} "
+                    f"attempted to access module '{module_code}'"
+                )
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail=f"Module '{module_code}' is not enabled for your account. Please upgrade your subscription."
+                )
+
+            # Module access granted, proceed with request
+            return await func(*args, **kwargs)
 
         return wrapper
     return decorator
@@ -194,25 +143,31 @@ async def get_tenant_enabled_modules(db: AsyncSession, tenant_id: str) -> list[s
         .where(
             and_(
                 TenantSubscription.tenant_id == tenant_id,
-                TenantSubscription.status == 'active'
+                TenantSubscription.status == 'active',
+                or_(
+                    TenantSubscription.expires_at.is_(None),
+                    TenantSubscription.expires_at >= datetime.now(timezone.utc)
+                )
             )
         )
+        .distinct()
     )
     modules = result.scalars().all()
     return list(modules)
 
 
 def clear_module_access_cache():
-    """Clear the module access cache (useful for testing or after subscription changes)"""
-    global _module_access_cache
-    _module_access_cache.clear()
+    """Clear the process-local module access cache (useful for testing)"""
+    get_entitlement_cache().invalidate_local()
     logger.info("Module access cache cleared")
 
 
 def clear_module_access_cache_for_tenant(tenant_id: str):
-    """Clear cache for a specific tenant (when their subscription changes)"""
-    global _module_access_cache
-    keys_to_remove = [key for key in _module_access_cache if key.startswith(f"{tenant_id}:")]
-    for key in keys_to_remove:
-        del _module_access_cache[key]
+    """
+    Clear the process-local cache for a specific tenant.
+
+    Prefer `await invalidate_entitlements(tenant_id)` which also clears the
+    shared backend so every worker sees the change.
+    """
+    get_entitlement_cache().invalidate_local(str(tenant_id))
     logger.info(f"Module access cache cleared for tenant {tenant_id}")
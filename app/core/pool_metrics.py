@@ -0,0 +1,116 @@
+"""
+Per-request database pool occupancy metrics.
+
+Pool checkout/checkin events are attributed to the HTTP request that
+triggered them (through a context variable set by pool_metrics_middleware),
+so we can see how many pooled connections each request takes and holds at
+once. A request that holds more than one connection at a time divides the
+pool's request capacity; auth, permission loading and the handler are
+meant to share the request's single tenant session (get_db_with_tenant).
+
+Exposed through /health as "db_pool".
+"""
+import contextvars
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from fastapi import Request
+
+logger = logging.getLogger(__name__)
+
+# Per-request counters: {"checkouts", "in_use", "peak"}
+_request_stats: contextvars.ContextVar[Optional[Dict[str, int]]] = contextvars.ContextVar(
+    "db_pool_request_stats", default=None
+)
+
+
+class PoolMetrics:
+    """Process-wide aggregates of per-request pool usage."""
+
+    def __init__(self):
+        self._engine = None
+        self.requests = 0
+        self.checkouts = 0
+        self.max_peak = 0
+        # Requests by the most connections they held at once: {0: n, 1: n, 2: n, "3+": n}
+        self.peak_histogram: Dict[Any, int] = {0: 0, 1: 0, 2: 0, "3+": 0}
+        self.total_duration_ms = 0.0
+
+    def install(self, engine) -> None:
+        """Attach checkout/checkin listeners to an AsyncEngine's pool."""
+        from sqlalchemy import event
+
+        self._engine = engine
+        pool = engine.sync_engine.pool
+        event.listen(pool, "checkout", self._on_checkout)
+        event.listen(pool, "checkin", self._on_checkin)
+
+    @staticmethod
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+        stats = _request_stats.get()
+        if stats is None:
+            return
+        stats["checkouts"] += 1
+        stats["in_use"] += 1
+        stats["peak"] = max(stats["peak"], stats["in_use"])
+        # Remember the owning request so checkin is attributed even from another context
+        connection_record.info["request_stats"] = stats
+
+    @staticmethod
+    def _on_checkin(dbapi_connection, connection_record) -> None:
+        stats = connection_record.info.pop("request_stats", None)
+        if stats is not None:
+            stats["in_use"] = max(0, stats["in_use"] - 1)
+
+    def record(self, stats: Dict[str, int], duration_ms: float) -> None:
+        self.requests += 1
+        self.checkouts += stats["checkouts"]
+        self.max_peak = max(self.max_peak, stats["peak"])
+        self.peak_histogram[stats["peak"] if stats["peak"] < 3 else "3+"] += 1
+        self.total_duration_ms += duration_ms
+
+    def stats(self) -> Dict[str, Any]:
+        """Aggregates plus the pool's current occupancy."""
+        result: Dict[str, Any] = {
+            "requests": self.requests,
+            "checkouts_per_request": round(self.checkouts / self.requests, 3) if self.requests else 0,
+            "max_connections_held_by_a_request": self.max_peak,
+            "requests_by_connections_held": {str(k): v for k, v in self.peak_histogram.items()},
+            "avg_request_ms": round(self.total_duration_ms / self.requests, 1) if self.requests else 0,
+        }
+        pool = self._engine.sync_engine.pool if self._engine is not None else None
+        if pool is not None and hasattr(pool, "checkedout"):
+            result.update({
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+                "checked_in": pool.checkedin(),
+            })
+        return result
+
+
+_metrics = PoolMetrics()
+
+
+def get_pool_metrics() -> PoolMetrics:
+    """Get the process-wide pool metrics."""
+    return _metrics
+
+
+async def pool_metrics_middleware(request: Request, call_next):
+    """Attribute pool checkouts to the request and fold them into the aggregates."""
+    stats = {"checkouts": 0, "in_use": 0, "peak": 0}
+    token = _request_stats.set(stats)
+    started = time.perf_counter()
+    try:
+        return await call_next(request)
+    finally:
+        _request_stats.reset(token)
+        duration_ms = (time.perf_counter() - started) * 1000
+        _metrics.record(stats, duration_ms)
+        if stats["peak"] > 1:
+            logger.debug(
+                f"{request.method} {request.url.path} held {stats['peak']} pooled connections at once "
+                f"({stats['checkouts']} checkouts)"
+            )
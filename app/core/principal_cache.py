@@ -0,0 +1,301 @@
+"""
+Principal cache for authenticated requests.
+
+Caches, per tenant and user, what get_current_user and get_user_permissions
+load on every request: the User row with its user_roles -> role and region,
+and the user's permission codes. Repeat requests resolve identity and
+permissions without SQL.
+
+Entries carry the tenant's RBAC version stamp, kept in CacheService
+(checked at most every PRINCIPAL_VERSION_CHECK seconds). The stamp is
+bumped by RBACService when role permissions or user-role assignments
+change, and by user updates; an entry whose stamp no longer matches is
+reloaded. PRINCIPAL_CACHE_TTL bounds the age of any entry.
+
+The stamp only reaches other workers when CacheService is backed by Redis.
+With the in-memory backend each worker has its own stamp and never sees
+another worker's bump, so entries are served for at most
+PRINCIPAL_VERSION_CHECK seconds instead of PRINCIPAL_CACHE_TTL.
+
+Cached rows are kept as plain column values. Each request gets its own
+detached User/UserRole/Role/Region instances built from them, so handlers
+never share ORM objects across requests.
+"""
+import time
+import asyncio
+import logging
+import uuid
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# CacheService key (tenant prefix added by CacheService)
+_VERSION_KEY = "principal:version"
+# session.info key holding tenant ids to bump after the connection commits
+_PENDING_BUMPS_KEY = "principal_cache_pending_bumps"
+
+
+def _columns(obj) -> Dict[str, Any]:
+    """Column attribute values of a loaded ORM instance."""
+    return {attr.key: getattr(obj, attr.key) for attr in inspect(obj).mapper.column_attrs}
+
+
+def _snapshot_user(user) -> Dict[str, Any]:
+    """Plain-value snapshot of a user with its eagerly loaded roles and region."""
+    return {
+        "user": _columns(user),
+        "region": _columns(user.region) if user.region is not None else None,
+        "user_roles": [(_columns(ur), _columns(ur.role)) for ur in user.user_roles],
+    }
+
+
+def _restore_user(snapshot: Dict[str, Any]):
+    """Fresh detached User (with user_roles -> role and region) from a snapshot."""
+    from app.models.user import User, UserRole
+    from app.models.role import Role
+    from app.models.region import Region
+
+    user = User(**snapshot["user"])
+    region = Region(**snapshot["region"]) if snapshot["region"] is not None else None
+    links = []
+    objects = [user]
+    for link_values, role_values in snapshot["user_roles"]:
+        link = UserRole(**link_values)
+        role = Role(**role_values)
+        set_committed_value(link, "role", role)
+        links.append(link)
+        objects.extend((link, role))
+    set_committed_value(user, "user_roles", links)
+    set_committed_value(user, "region", region)
+    if region is not None:
+        objects.append(region)
+
+    # Persistent identity, no pending changes: merging or attaching these
+    # to a session never INSERTs them
+    for obj in objects:
+        make_transient_to_detached(obj)
+    return user
+
+
+class _Entry:
+    __slots__ = ("snapshot", "permissions", "version", "loaded_at")
+
+    def __init__(self, snapshot: Dict[str, Any], version: int, now: float):
+        self.snapshot = snapshot
+        self.permissions: Optional[FrozenSet[str]] = None
+        self.version = version
+        self.loaded_at = now
+
+
+class PrincipalCache:
+    """
+    Per-tenant user/permission snapshots with version-stamp invalidation.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int = 300,
+        version_check_seconds: int = 5,
+        max_entries: int = 50000,
+        shared=None,
+    ):
+        self._ttl = ttl_seconds
+        self._version_check = version_check_seconds
+        self._max_entries = max_entries
+        self._shared = shared
+        # Format: {(tenant_id, user_id): _Entry}
+        self._entries: Dict[Tuple[str, uuid.UUID], _Entry] = {}
+        # Format: {tenant_id: (version, checked_at_monotonic)}
+        self._versions: Dict[str, Tuple[int, float]] = {}
+        self._hits = 0
+        self._misses = 0
+        self._permission_hits = 0
+        self._permission_misses = 0
+        self._invalidations = 0
+
+    @staticmethod
+    def _key(tenant_id) -> str:
+        return str(tenant_id).lower()
+
+    def _cache(self):
+        if self._shared is None:
+            from app.services.cache_service import get_cache
+            self._shared = get_cache()
+        return self._shared
+
+    async def version(self, tenant_id) -> int:
+        """Current RBAC version stamp for a tenant (re-read every version_check seconds)."""
+        tenant_id = self._key(tenant_id)
+        now = time.monotonic()
+        known = self._versions.get(tenant_id)
+        if known is not None and now - known[1] < self._version_check:
+            return known[0]
+        try:
+            version = int(await self._cache().get(tenant_id, _VERSION_KEY) or 0)
+        except Exception as e:
+            logger.warning(f"Principal cache version check failed: {e}")
+            return -1
+        self._versions[tenant_id] = (version, now)
+        return version
+
+    def _max_age(self) -> int:
+        """Entry lifetime: the TTL when bumps reach every worker, else the version check interval."""
+        if self._cache().is_shared:
+            return self._ttl
+        return min(self._ttl, self._version_check)
+
+    async def _current_entry(self, tenant_id: str, user_id: uuid.UUID) -> Optional[_Entry]:
+        entry = self._entries.get((tenant_id, user_id))
+        if entry is None:
+            return None
+        if time.monotonic() - entry.loaded_at >= self._max_age() or entry.version != await self.version(tenant_id):
+            self._entries.pop((tenant_id, user_id), None)
+            return None
+        return entry
+
+    async def get_user(self, tenant_id, user_id: uuid.UUID):
+        """A fresh detached User for a cached principal, or None on a miss."""
+        tenant_id = self._key(tenant_id)
+        entry = await self._current_entry(tenant_id, user_id)
+        if entry is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        return _restore_user(entry.snapshot)
+
+    def set_user(self, tenant_id, user, version: int) -> None:
+        """
+        Cache a loaded user (roles and region eagerly loaded).
+
+        `version` must be read before the user was loaded, so a change
+        committed during the load leaves the entry stale.
+        """
+        if version < 0:
+            return
+        if len(self._entries) >= self._max_entries:
+            self._entries.clear()
+        self._entries[(self._key(tenant_id), user.id)] = _Entry(
+            _snapshot_user(user), version, time.monotonic()
+        )
+
+    async def get_permissions(self, tenant_id, user_id: uuid.UUID) -> Optional[FrozenSet[str]]:
+        """Cached permission codes for a user, or None on a miss."""
+        entry = await self._current_entry(self._key(tenant_id), user_id)
+        if entry is None or entry.permissions is None:
+            self._permission_misses += 1
+            return None
+        self._permission_hits += 1
+        return entry.permissions
+
+    def set_permissions(self, tenant_id, user_id: uuid.UUID, permissions, version: int) -> None:
+        """Attach permission codes to a cached principal loaded at the same version."""
+        entry = self._entries.get((self._key(tenant_id), user_id))
+        if entry is not None and entry.version == version:
+            entry.permissions = frozenset(permissions)
+
+    async def bump(self, tenant_id) -> None:
+        """Invalidate every cached principal of a tenant, in every process."""
+        tenant_id = self._key(tenant_id)
+        for key in [k for k in self._entries if k[0] == tenant_id]:
+            del self._entries[key]
+        self._invalidations += 1
+        try:
+            version = await self._cache().incr_by(tenant_id, _VERSION_KEY, 1)
+            self._versions[tenant_id] = (int(version), time.monotonic())
+        except Exception as e:
+            self._versions.pop(tenant_id, None)
+            logger.warning(f"Principal cache version bump failed: {e}")
+
+    def bump_on_commit(self, db, tenant_id) -> None:
+        """
+        Bump the tenant's stamp once db's transaction commits.
+
+        For changes made in a transaction the caller commits: bumping before
+        the commit would let a concurrent request cache the old rows under
+        the new stamp. Sessions from tenant_session_scope join a transaction
+        the scope commits at connection level (session.commit() does not end
+        it), so the bump is queued on the session and run by the scope after
+        that commit, or dropped on rollback. Other sessions own their
+        transaction and bump from the after_commit event.
+        """
+        if "tenant_schema" in db.info:
+            db.info.setdefault(_PENDING_BUMPS_KEY, set()).add(self._key(tenant_id))
+            return
+
+        loop = asyncio.get_running_loop()
+
+        def _after_commit(session):
+            loop.create_task(self.bump(tenant_id))
+
+        event.listen(db.sync_session, "after_commit", _after_commit, once=True)
+
+    def clear(self) -> None:
+        """Drop every local entry."""
+        self._entries.clear()
+        self._versions.clear()
+        self._invalidations += 1
+
+    def stats(self) -> dict:
+        """Hit/miss counters for monitoring."""
+        return {
+            "entries": len(self._entries),
+            "hits": self._hits,
+            "misses": self._misses,
+            "permission_hits": self._permission_hits,
+            "permission_misses": self._permission_misses,
+            "invalidations": self._invalidations,
+        }
+
+
+# Singleton cache instance
+_principal_cache: Optional[PrincipalCache] = None
+
+
+def get_principal_cache() -> PrincipalCache:
+    """Get the principal cache singleton."""
+    global _principal_cache
+
+    if _principal_cache is None:
+        _principal_cache = PrincipalCache(
+            ttl_seconds=settings.PRINCIPAL_CACHE_TTL,
+            version_check_seconds=settings.PRINCIPAL_VERSION_CHECK,
+            max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+        )
+
+    return _principal_cache
+
+
+async def invalidate_principals(tenant_id=None) -> None:
+    """Invalidate cached principals after a role, permission or user change."""
+    if tenant_id is None:
+        from app.middleware.tenant import get_current_tenant_id
+        tenant_id = get_current_tenant_id()
+    if tenant_id:
+        await get_principal_cache().bump(tenant_id)
+
+
+def invalidate_principals_on_commit(db, tenant_id=None) -> None:
+    """Invalidate cached principals once db's pending changes commit."""
+    if tenant_id is None:
+        from app.middleware.tenant import get_current_tenant_id
+        tenant_id = get_current_tenant_id()
+    if tenant_id:
+        get_principal_cache().bump_on_commit(db, tenant_id)
+
+
+async def run_pending_invalidations(db) -> None:
+    """Bump the stamps queued on db (called after its connection commits)."""
+    cache = get_principal_cache()
+    for tenant_id in db.info.pop(_PENDING_BUMPS_KEY, ()):
+        await cache.bump(tenant_id)
+
+
+def discard_pending_invalidations(db) -> None:
+    """Drop the stamps queued on db (its transaction rolled back)."""
+    db.info.pop(_PENDING_BUMPS_KEY, None)
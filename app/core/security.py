@@ -257,6 +257,9 @@ async def blacklist_token(
     )
 
     db.add(blacklist_entry)
+
+    from app.core.token_blacklist import get_token_blacklist
+    get_token_blacklist().add(jti, expires_at)
     return True
 
 
@@ -264,15 +267,18 @@ async def is_token_blacklisted(db, token: str) -> bool:
     """
     Check if a token is blacklisted.
 
+    Looks the JTI up in the in-process blacklist (app.core.token_blacklist),
+    which is refreshed from public.token_blacklist periodically rather than
+    queried per check.
+
     Args:
-        db: Database session (public schema)
+        db: Database session (unused; kept for existing callers)
         token: The JWT token to check
 
     Returns:
         True if token is blacklisted, False otherwise
     """
-    from sqlalchemy import select
-    from app.models.tenant import TokenBlacklist
+    from app.core.token_blacklist import get_token_blacklist
 
     payload = decode_token(token)
     if payload is None:
@@ -282,11 +288,7 @@ async def is_token_blacklisted(db, token: str) -> bool:
     if not jti:
         return False  # Old tokens without JTI, allow them
 
-    stmt = select(TokenBlacklist).where(TokenBlacklist.jti == jti)
-    result = await db.execute(stmt)
-    blacklisted = result.scalar_one_or_none()
-
-    return blacklisted is not None
+    return await get_token_blacklist().contains(jti)
 
 
 async def cleanup_expired_blacklist_entries(db) -> int:
@@ -218,7 +218,7 @@ async def tenant_db_context(
             )
             items = result.fetchall()
     """
-    from app.database import engine
+    from app.database import tenant_session_scope
 
     # Get tenant info
     tenant = await get_tenant_by_id(tenant_id)
@@ -230,22 +230,9 @@ async def tenant_db_context(
 
     schema = tenant["database_schema"]
 
-    # Create connection with tenant schema
-    async with engine.connect() as conn:
-        # Set search path to tenant schema
-        await conn.execute(text(f'SET search_path TO "{schema}"'))
-
-        # Create session from connection
-        session = AsyncSession(bind=conn, expire_on_commit=False)
-
-        try:
-            yield session
-            await session.commit()
-        except Exception:
-            await session.rollback()
-            raise
-        finally:
-            await session.close()
+    # Session on the tenant schema, committed at the connection level
+    async with tenant_session_scope(schema) as session:
+        yield session
 
 
 def get_tenant_from_request(request: Request) -> dict:
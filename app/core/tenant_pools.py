@@ -0,0 +1,184 @@
+"""
+Tenant connection routing and search_path tracking.
+
+Tenant sessions select their schema with SET search_path on a pooled
+connection. Raw SQL throughout the services (text() queries, COPY, the
+tenant scans) resolves unqualified table names through search_path, so it
+stays the mechanism; schema_translate_map would only cover ORM/Core
+statements. What this module removes is the redundant round trip:
+
+- Each pooled connection remembers the search_path it last committed
+  (connection_record.info). Checking out a connection already on the
+  tenant's schema skips the SET.
+- A SET is only remembered once its transaction commits. A rollback (from
+  the Connection or from the pool's reset-on-return) or a failed statement
+  (COMMIT then rolls back) reverts an uncommitted SET in PostgreSQL, so
+  only that pending value is dropped; a committed path survives them. Any
+  other statement changing search_path, or a new DBAPI connection, drops
+  the remembered value. A connection is never assumed to be on a schema
+  it is not.
+- Schemas listed in TENANT_DEDICATED_POOLS get their own small engine, so
+  hot tenants neither queue behind nor churn the shared pool's paths;
+  their connections stay on one schema and SET once per connection.
+
+Per-schema counters (sessions, SETs issued/skipped) and dedicated pool
+occupancy are exported through /health as "tenant_pools".
+"""
+import logging
+from typing import Callable, Dict, Iterable, Optional
+
+from sqlalchemy import event, text
+
+logger = logging.getLogger(__name__)
+
+# connection_record.info key holding the committed search_path
+_SEARCH_PATH_KEY = "tenant_search_path"
+# Set when a SET ran in the current transaction and is not committed yet
+_PENDING_KEY = "tenant_search_path_pending"
+
+
+def _forget(info) -> None:
+    info.pop(_PENDING_KEY, None)
+    info.pop(_SEARCH_PATH_KEY, None)
+
+
+def _on_commit(conn) -> None:
+    pending = conn.info.pop(_PENDING_KEY, None)
+    if pending is not None:
+        conn.info[_SEARCH_PATH_KEY] = pending
+
+
+def _on_rollback(conn) -> None:
+    # Reverts a SET made in this transaction; a committed path stays
+    conn.info.pop(_PENDING_KEY, None)
+
+
+def _on_error(context) -> None:
+    # COMMIT of a failed transaction rolls back, pending SET included
+    if context.connection is not None:
+        context.connection.info.pop(_PENDING_KEY, None)
+
+
+def _on_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    # Someone else changing the path (schema provisioning, ad-hoc SETs)
+    if statement[:3].upper() == "SET" and "search_path" in statement[:32].lower():
+        _forget(conn.info)
+
+
+def _on_reset(dbapi_connection, connection_record, reset_state) -> None:
+    # Rollback-on-return reverts only a SET that never committed
+    connection_record.info.pop(_PENDING_KEY, None)
+
+
+def _on_connect(dbapi_connection, connection_record) -> None:
+    # New DBAPI connection (first checkout or after invalidation)
+    _forget(connection_record.info)
+
+
+def track_search_path(engine) -> None:
+    """Install the listeners that keep a connection's remembered path honest."""
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, "commit", _on_commit)
+    event.listen(sync_engine, "rollback", _on_rollback)
+    event.listen(sync_engine, "handle_error", _on_error)
+    event.listen(sync_engine, "before_cursor_execute", _on_execute)
+    event.listen(sync_engine.pool, "reset", _on_reset)
+    event.listen(sync_engine.pool, "connect", _on_connect)
+
+
+class _SchemaStats:
+    __slots__ = ("sessions", "sets", "skipped")
+
+    def __init__(self):
+        self.sessions = 0
+        self.sets = 0
+        self.skipped = 0
+
+
+class TenantPoolRegistry:
+    """Routes tenant schemas to engines and sets search_path only when needed."""
+
+    def __init__(
+        self,
+        default_engine,
+        engine_factory: Callable[[str], object],
+        dedicated_schemas: Iterable[str] = (),
+    ):
+        self._default = default_engine
+        self._engine_factory = engine_factory
+        self._dedicated_schemas = {s.strip() for s in dedicated_schemas if s and s.strip()}
+        self._dedicated: Dict[str, object] = {}
+        self._stats: Dict[str, _SchemaStats] = {}
+        track_search_path(default_engine)
+
+    def engine_for(self, schema: str):
+        """The engine serving a tenant schema (dedicated pool if configured)."""
+        if schema not in self._dedicated_schemas:
+            return self._default
+        engine = self._dedicated.get(schema)
+        if engine is None:
+            engine = self._engine_factory(schema)
+            track_search_path(engine)
+            self._dedicated[schema] = engine
+            logger.info(f"Dedicated connection pool created for schema {schema}")
+        return engine
+
+    async def use_schema(self, conn, schema: str) -> None:
+        """
+        Point an AsyncConnection at a tenant schema, skipping the SET if it already is.
+
+        The connection may be left outside a transaction when the SET is
+        skipped; callers begin one before binding a session to it.
+        """
+        stats = self._stats.get(schema)
+        if stats is None:
+            stats = self._stats[schema] = _SchemaStats()
+        stats.sessions += 1
+
+        info = conn.info
+        if info.get(_SEARCH_PATH_KEY) == schema and _PENDING_KEY not in info:
+            stats.skipped += 1
+            return
+        await conn.execute(text(f'SET search_path TO "{schema}"'))
+        info[_PENDING_KEY] = schema
+        stats.sets += 1
+
+    async def dispose(self) -> None:
+        """Close every dedicated pool."""
+        for engine in self._dedicated.values():
+            await engine.dispose()
+        self._dedicated.clear()
+
+    def stats(self) -> dict:
+        """Per-schema SET counters and dedicated pool occupancy."""
+        schemas = {}
+        for schema, stats in self._stats.items():
+            schemas[schema] = {
+                "sessions": stats.sessions,
+                "search_path_sets": stats.sets,
+                "search_path_skipped": stats.skipped,
+            }
+        for schema, engine in self._dedicated.items():
+            pool = engine.sync_engine.pool
+            entry = schemas.setdefault(schema, {})
+            entry["dedicated_pool"] = {
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+                "checked_in": pool.checkedin(),
+            }
+        return {
+            "dedicated_schemas": sorted(self._dedicated_schemas),
+            "schemas": schemas,
+        }
+
+
+_registry: Optional[TenantPoolRegistry] = None
+
+
+def init_tenant_pools(default_engine, engine_factory, dedicated_schemas: Iterable[str] = ()) -> TenantPoolRegistry:
+    """Create the process-wide registry (called once by app.database)."""
+    global _registry
+    _registry = TenantPoolRegistry(default_engine, engine_factory, dedicated_schemas)
+    return _registry
+
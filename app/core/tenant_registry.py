@@ -0,0 +1,204 @@
+"""
+In-process tenant registry cache for request-time tenant resolution.
+
+The tenant middleware resolves a tenant from the X-Tenant-ID header, the
+subdomain or the JWT on every non-public request. Without a cache that is one
+public-schema round trip per API call. This registry keeps resolved tenants
+keyed by id and by subdomain with a TTL, remembers unknown hosts for a short
+negative TTL, and exposes hit/miss counters.
+
+Invalidation:
+    Call invalidate_tenant() whenever a tenant's status, subdomain or schema
+    changes (TenantAdminService, TenantOnboardingService). The cache is
+    per-process, so other workers converge within TENANT_CACHE_TTL.
+
+Usage:
+    registry = get_tenant_registry()
+    hit, tenant = registry.get_by_subdomain("acme")
+    if not hit:
+        tenant = await lookup(...)
+        registry.put_subdomain("acme", tenant)
+"""
+import time
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Sentinel stored for negative entries ("tenant does not exist / not active")
+_MISSING = object()
+
+
+class TenantRegistryCache:
+    """
+    TTL cache of resolved tenants keyed by id and subdomain.
+
+    Entries hold the detached Tenant ORM instance loaded by the middleware,
+    so request.state.tenant keeps its existing shape on cache hits.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int = 60,
+        negative_ttl_seconds: int = 15,
+        max_entries: int = 10000,
+    ):
+        self._ttl = ttl_seconds
+        self._negative_ttl = negative_ttl_seconds
+        self._max_entries = max_entries
+        # Format: {cache_key: (tenant_or_missing, expires_at_monotonic)}
+        self._entries: Dict[str, Tuple[Any, float]] = {}
+        self._hits = 0
+        self._negative_hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    @staticmethod
+    def _id_key(tenant_id: Any) -> str:
+        return f"id:{str(tenant_id).lower()}"
+
+    @staticmethod
+    def _subdomain_key(subdomain: str) -> str:
+        return f"subdomain:{subdomain.lower()}"
+
+    def _get(self, key: str) -> Tuple[bool, Optional[Any]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            if expires_at > time.monotonic():
+                if value is _MISSING:
+                    self._negative_hits += 1
+                    return True, None
+                self._hits += 1
+                return True, value
+            del self._entries[key]
+        self._misses += 1
+        return False, None
+
+    def _put(self, key: str, tenant: Optional[Any]) -> None:
+        if len(self._entries) >= self._max_entries:
+            self._cleanup_expired()
+            if len(self._entries) >= self._max_entries:
+                # Still full: drop the oldest inserted entries
+                for old_key in list(self._entries)[: self._max_entries // 10 or 1]:
+                    del self._entries[old_key]
+
+        if tenant is None:
+            self._entries[key] = (_MISSING, time.monotonic() + self._negative_ttl)
+        else:
+            self._entries[key] = (tenant, time.monotonic() + self._ttl)
+
+    def _cleanup_expired(self) -> int:
+        now = time.monotonic()
+        expired = [k for k, (_, expires_at) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+        return len(expired)
+
+    # ==================== Lookups ====================
+
+    def get_by_id(self, tenant_id: Any) -> Tuple[bool, Optional[Any]]:
+        """Return (hit, tenant). A hit with tenant=None is a negative entry."""
+        return self._get(self._id_key(tenant_id))
+
+    def get_by_subdomain(self, subdomain: str) -> Tuple[bool, Optional[Any]]:
+        """Return (hit, tenant). A hit with tenant=None is a negative entry."""
+        return self._get(self._subdomain_key(subdomain))
+
+    def put_id(self, tenant_id: Any, tenant: Optional[Any]) -> None:
+        """Cache lookup result for a tenant id (None caches a negative entry)."""
+        self._put(self._id_key(tenant_id), tenant)
+        if tenant is not None and tenant.subdomain:
+            self._put(self._subdomain_key(tenant.subdomain), tenant)
+
+    def put_subdomain(self, subdomain: str, tenant: Optional[Any]) -> None:
+        """Cache lookup result for a subdomain (None caches a negative entry)."""
+        self._put(self._subdomain_key(subdomain), tenant)
+        if tenant is not None:
+            self._put(self._id_key(tenant.id), tenant)
+
+    # ==================== Invalidation ====================
+
+    def invalidate(
+        self,
+        tenant_id: Optional[Any] = None,
+        subdomain: Optional[str] = None,
+    ) -> int:
+        """
+        Drop cached entries for a tenant.
+
+        Removes the id entry, the subdomain entry (including negative entries,
+        so a freshly registered subdomain resolves immediately) and any other
+        key still pointing at the same tenant id.
+        """
+        keys = set()
+        if tenant_id is not None:
+            keys.add(self._id_key(tenant_id))
+        if subdomain:
+            keys.add(self._subdomain_key(subdomain))
+        if tenant_id is not None:
+            target = str(tenant_id).lower()
+            for key, (value, _) in self._entries.items():
+                if value is not _MISSING and str(value.id).lower() == target:
+                    keys.add(key)
+
+        removed = 0
+        for key in keys:
+            if self._entries.pop(key, None) is not None:
+                removed += 1
+        self._invalidations += 1
+        return removed
+
+    def clear(self) -> None:
+        """Drop every cached tenant."""
+        self._entries.clear()
+        self._invalidations += 1
+
+    # ==================== Metrics ====================
+
+    def stats(self) -> dict:
+        """Hit/miss counters for monitoring the steady-state DB bypass rate."""
+        lookups = self._hits + self._negative_hits + self._misses
+        return {
+            "entries": len(self._entries),
+            "hits": self._hits,
+            "negative_hits": self._negative_hits,
+            "misses": self._misses,
+            "invalidations": self._invalidations,
+            "hit_ratio": round((self._hits + self._negative_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Singleton registry instance
+_registry_instance: Optional[TenantRegistryCache] = None
+
+
+def get_tenant_registry() -> TenantRegistryCache:
+    """Get the tenant registry cache singleton."""
+    global _registry_instance
+
+    if _registry_instance is None:
+        _registry_instance = TenantRegistryCache(
+            ttl_seconds=settings.TENANT_CACHE_TTL,
+            negative_ttl_seconds=settings.TENANT_NEGATIVE_CACHE_TTL,
+            max_entries=settings.TENANT_CACHE_MAX_ENTRIES,
+        )
+
+    return _registry_instance
+
+
+def invalidate_tenant(tenant_id: Optional[Any] = None, subdomain: Optional[str] = None) -> None:
+    """
+    Invalidate every in-process tenant cache for a tenant.
+
+    Call after a tenant's status, subdomain or schema changes. Also clears the
+    tenant_context lookup cache used by background jobs.
+    """
+    from app.core.tenant_context import clear_tenant_cache
+
+    get_tenant_registry().invalidate(tenant_id=tenant_id, subdomain=subdomain)
+    if tenant_id is not None:
+        clear_tenant_cache(str(tenant_id))
+    logger.info(f"Tenant cache invalidated: id={tenant_id} subdomain={subdomain}")
@@ -0,0 +1,150 @@
+"""
+In-process JTI blacklist for revoked JWTs.
+
+Holds the JTIs of blacklisted tokens that have not expired yet, so a
+blacklist check is a set lookup instead of a public.token_blacklist query.
+The set is refreshed incrementally (rows blacklisted since the last
+refresh) at most every TOKEN_BLACKLIST_REFRESH seconds; tokens blacklisted
+through this process are added immediately. A token revoked on another
+worker is therefore rejected here within one refresh interval.
+
+Expired JTIs are pruned on refresh, so the set stays as small as the number
+of revoked tokens still within their lifetime.
+
+A failed refresh keeps the last known set. Until a refresh succeeds again,
+JTIs not in the set are checked against public.token_blacklist directly,
+and a check that cannot reach the database treats the token as revoked.
+"""
+import time
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Re-read window before the watermark, for inserts committed late
+_WATERMARK_OVERLAP = timedelta(seconds=30)
+
+
+class TokenBlacklistCache:
+    """Blacklisted JTIs with their expiry, refreshed from public.token_blacklist."""
+
+    def __init__(self, refresh_seconds: int = 15):
+        self._refresh_seconds = refresh_seconds
+        # Format: {jti: expires_at_epoch}
+        self._jtis: Dict[str, float] = {}
+        self._watermark: Optional[datetime] = None
+        self._refreshed_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._checks = 0
+        self._refreshes = 0
+        self._refresh_errors = 0
+        self._refresh_failed = False
+        self._direct_checks = 0
+
+    def add(self, jti: str, expires_at: datetime) -> None:
+        """Record a token blacklisted by this process."""
+        self._jtis[jti] = expires_at.timestamp()
+
+    async def refresh(self) -> None:
+        """Load JTIs blacklisted since the last refresh and drop expired ones."""
+        from sqlalchemy import select
+        from app.database import async_session_maker
+        from app.models.tenant import TokenBlacklist
+
+        now = datetime.now(timezone.utc)
+        stmt = select(
+            TokenBlacklist.jti, TokenBlacklist.expires_at, TokenBlacklist.blacklisted_at
+        ).where(TokenBlacklist.expires_at > now)
+        if self._watermark is not None:
+            stmt = stmt.where(TokenBlacklist.blacklisted_at >= self._watermark - _WATERMARK_OVERLAP)
+
+        # Own short session: a failed refresh must not abort a request's transaction
+        try:
+            async with async_session_maker() as session:
+                rows = (await session.execute(stmt)).all()
+        except Exception as e:
+            self._refresh_errors += 1
+            self._refresh_failed = True
+            logger.warning(f"Token blacklist refresh failed: {e}")
+            return
+        finally:
+            self._refreshed_at = time.monotonic()
+
+        for jti, expires_at, blacklisted_at in rows:
+            self._jtis[jti] = expires_at.timestamp()
+            if self._watermark is None or blacklisted_at > self._watermark:
+                self._watermark = blacklisted_at
+        if self._watermark is None:
+            self._watermark = now
+
+        cutoff = now.timestamp()
+        for jti in [j for j, exp in self._jtis.items() if exp <= cutoff]:
+            del self._jtis[jti]
+        self._refreshes += 1
+        self._refresh_failed = False
+
+    async def _lookup(self, jti: str) -> bool:
+        """Check one JTI in public.token_blacklist (used while refreshes fail)."""
+        from sqlalchemy import func, select
+        from app.database import async_session_maker
+        from app.models.tenant import TokenBlacklist
+
+        self._direct_checks += 1
+        try:
+            async with async_session_maker() as session:
+                expires_at = (await session.execute(
+                    select(func.max(TokenBlacklist.expires_at)).where(TokenBlacklist.jti == jti)
+                )).scalar()
+        except Exception as e:
+            # Fail closed: a revoked token must not pass while the table is unreachable
+            logger.warning(f"Token blacklist lookup failed, rejecting token: {e}")
+            return True
+        if expires_at is None:
+            return False
+        self._jtis[jti] = expires_at.timestamp()
+        return expires_at.timestamp() > time.time()
+
+    async def contains(self, jti: str) -> bool:
+        """True if the JTI is blacklisted (refreshing first when the set is due)."""
+        self._checks += 1
+        if self._refreshed_at is None or time.monotonic() - self._refreshed_at >= self._refresh_seconds:
+            async with self._lock:
+                # Another coroutine may have refreshed while we waited
+                if self._refreshed_at is None or time.monotonic() - self._refreshed_at >= self._refresh_seconds:
+                    await self.refresh()
+        expires_at = self._jtis.get(jti)
+        if expires_at is not None:
+            return expires_at > time.time()
+        if self._refresh_failed:
+            # The set may be missing recent revocations: treat as a miss
+            return await self._lookup(jti)
+        return False
+
+    def stats(self) -> dict:
+        """Set size and refresh counters for monitoring."""
+        return {
+            "entries": len(self._jtis),
+            "checks": self._checks,
+            "refreshes": self._refreshes,
+            "refresh_errors": self._refresh_errors,
+            "refresh_failing": self._refresh_failed,
+            "direct_checks": self._direct_checks,
+        }
+
+
+# Singleton cache instance
+_token_blacklist: Optional[TokenBlacklistCache] = None
+
+
+def get_token_blacklist() -> TokenBlacklistCache:
+    """Get the token blacklist singleton."""
+    global _token_blacklist
+
+    if _token_blacklist is None:
+        _token_blacklist = TokenBlacklistCache(refresh_seconds=settings.TOKEN_BLACKLIST_REFRESH)
+
+    return _token_blacklist
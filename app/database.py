@@ -1,13 +1,13 @@
 import json
 from decimal import Decimal
 from datetime import datetime, date
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Sequence
 from uuid import UUID
 
 from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy import DateTime, event, text
+from sqlalchemy import DateTime, event, insert, text
 from sqlalchemy.dialects.postgresql import JSONB
 import psycopg
 from psycopg.types.json import set_json_dumps, set_json_loads
@@ -48,22 +48,14 @@ if database_url.startswith("postgresql+asyncpg://"):
 elif database_url.startswith("postgresql://"):
     database_url = database_url.replace("postgresql://", "postgresql+psycopg://")
 
-# Create async engine with appropriate settings
-if is_sqlite:
-    engine = create_async_engine(
-        settings.DATABASE_URL,
-        echo=settings.DEBUG,
-        future=True,
-        connect_args={"check_same_thread": False},
-    )
-else:
-    engine = create_async_engine(
+def _create_postgres_engine(pool_size: int, max_overflow: int):
+    return create_async_engine(
         database_url,
         echo=settings.DEBUG,
         future=True,
         pool_pre_ping=True,  # Check connection health before use
-        pool_size=settings.DB_POOL_SIZE,  # Base pool size (default: 10)
-        max_overflow=settings.DB_MAX_OVERFLOW,  # Extra connections beyond pool_size (default: 20)
+        pool_size=pool_size,  # Base pool size
+        max_overflow=max_overflow,  # Extra connections beyond pool_size
         pool_timeout=settings.DB_POOL_TIMEOUT,  # Seconds to wait for connection (default: 30)
         pool_recycle=settings.DB_POOL_RECYCLE,  # Recycle connections after N seconds (default: 1800)
         connect_args={
@@ -72,6 +64,33 @@ else:
         },
     )
 
+
+# Create async engine with appropriate settings
+if is_sqlite:
+    engine = create_async_engine(
+        settings.DATABASE_URL,
+        echo=settings.DEBUG,
+        future=True,
+        connect_args={"check_same_thread": False},
+    )
+else:
+    engine = _create_postgres_engine(settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW)
+
+# Per-request pool occupancy metrics (see app.core.pool_metrics)
+from app.core.pool_metrics import get_pool_metrics
+get_pool_metrics().install(engine)
+
+# Tenant schema routing: dedicated pools for hot tenants, search_path
+# tracked per connection (see app.core.tenant_pools)
+from app.core.tenant_pools import init_tenant_pools
+tenant_pools = init_tenant_pools(
+    engine,
+    lambda schema: _create_postgres_engine(
+        settings.TENANT_DEDICATED_POOL_SIZE, settings.TENANT_DEDICATED_POOL_OVERFLOW
+    ),
+    [] if is_sqlite else settings.TENANT_DEDICATED_POOLS.split(","),
+)
+
 # Create async session factory (for default/public schema)
 async_session_factory = async_sessionmaker(
     engine,
@@ -110,6 +129,9 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
 
 from contextlib import asynccontextmanager
 
+from app.core.principal_cache import discard_pending_invalidations, run_pending_invalidations
+
+
 @asynccontextmanager
 async def get_db_session():
     """Context manager for getting database session (for background jobs)."""
@@ -144,27 +166,58 @@ async def init_db() -> None:
             print(f"Database warning: {e}")
 
 
+async def copy_rows(session: AsyncSession, model, columns: Sequence[str], rows: Sequence[tuple]) -> int:
+    """
+    Bulk load rows (tuples in `columns` order) into a model's table.
+
+    Uses COPY FROM STDIN on psycopg connections and an executemany INSERT
+    without RETURNING elsewhere. Runs in the session's transaction and
+    bypasses ORM defaults, so callers supply every column they need.
+    """
+    if not rows:
+        return 0
+    conn = await session.connection()
+    if conn.dialect.name == "postgresql" and conn.dialect.driver == "psycopg":
+        raw = await conn.get_raw_connection()
+        statement = f"COPY {model.__tablename__} ({', '.join(columns)}) FROM STDIN"
+        async with raw.driver_connection.cursor() as cursor:
+            async with cursor.copy(statement) as copy:
+                for row in rows:
+                    await copy.write_row(row)
+    else:
+        await session.execute(insert(model), [dict(zip(columns, row)) for row in rows])
+    return len(rows)
+
+
 # ====================
 # MULTI-TENANT SUPPORT
 # ====================
 
-async def get_tenant_session(schema: str) -> AsyncGenerator[AsyncSession, None]:
+@asynccontextmanager
+async def tenant_session_scope(schema: str) -> AsyncGenerator[AsyncSession, None]:
     """
-    Get database session for a specific tenant schema
+    Session on a tenant schema's connection, committed when the block exits.
+
+    The connection comes from the schema's engine (a dedicated pool for
+    TENANT_DEDICATED_POOLS, the shared pool otherwise) and SET search_path
+    is skipped when the connection is already on the schema. The session
+    joins the connection's transaction, which is committed at the
+    connection level on success and rolled back on error.
 
     Args:
         schema: Tenant database schema name (e.g., 'tenant_customer1')
-
-    Yields:
-        AsyncSession configured for tenant schema
     """
-    # Create connection with tenant schema
-    async with engine.connect() as conn:
-        # Set search_path to tenant schema
-        await conn.execute(text(f'SET search_path TO "{schema}"'))
+    async with tenant_pools.engine_for(schema).connect() as conn:
+        await tenant_pools.use_schema(conn, schema)
+        # The session must join a connection-level transaction whether or not
+        # the SET ran (it autobegins one); psycopg sends BEGIN lazily with the
+        # first statement, so this adds no round trip
+        if not conn.in_transaction():
+            await conn.begin()
 
         # Create session from connection
         async_session = AsyncSession(bind=conn, expire_on_commit=False)
+        async_session.info["tenant_schema"] = schema
 
         try:
             yield async_session
@@ -175,11 +228,29 @@ async def get_tenant_session(schema: str) -> AsyncGenerator[AsyncSession, None]:
             # We must explicitly commit at the connection level.
             await conn.commit()
         except Exception:
+            discard_pending_invalidations(async_session)
             await conn.rollback()
             raise
         finally:
             await async_session.close()
 
+        # Cache invalidations queued by the request, now that its changes are visible
+        await run_pending_invalidations(async_session)
+
+
+async def get_tenant_session(schema: str) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Get database session for a specific tenant schema
+
+    Args:
+        schema: Tenant database schema name (e.g., 'tenant_customer1')
+
+    Yields:
+        AsyncSession configured for tenant schema
+    """
+    async with tenant_session_scope(schema) as async_session:
+        yield async_session
+
 
 async def get_db_with_tenant(request: Request) -> AsyncGenerator[AsyncSession, None]:
     """
@@ -188,6 +259,10 @@ async def get_db_with_tenant(request: Request) -> AsyncGenerator[AsyncSession, N
     This function extracts the tenant schema from the request state
     and returns a session configured for that schema.
 
+    Always resolve it through Depends: FastAPI caches the dependency per
+    request, so authentication (get_current_user), permission loading and
+    the handler share one pooled connection (and at most one SET search_path).
+
     Usage in FastAPI routes:
         @router.get("/api/products")
         async def get_products(db: AsyncSession = Depends(get_db_with_tenant)):
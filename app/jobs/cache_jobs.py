@@ -73,97 +73,15 @@ async def get_redis_client():
 
 async def refresh_serviceability_cache():
     """
-    Refresh serviceability cache from database.
+    Refresh serviceability cache (DEPRECATED).
 
-    This job runs every 15 minutes to keep the cache fresh.
-    Fetches all serviceable pincodes and their delivery estimates
-    from the database and updates Redis/in-memory cache.
-
-    Note: This job operates on tenant-specific tables. In a multi-tenant
-    system, it should be run per-tenant or disabled in public schema.
+    Delegates to the tenant-aware refresh_serviceability_cache job, which
+    pushes only changed pincodes into each tenant's CacheService namespace
+    instead of rewriting every pincode under global keys.
     """
-    global _serviceability_cache, _cache_last_updated
-
-    logger.info("Starting serviceability cache refresh...")
-    start_time = datetime.now(timezone.utc)
-
-    try:
-        # Import here to avoid circular imports
-        from app.database import get_db_session
-        from sqlalchemy import text
-        from sqlalchemy.exc import ProgrammingError
+    from app.jobs.tenant_job_runner import run_tenant_job
 
-        async with get_db_session() as session:
-            # First check if the table exists (may not exist in public schema)
-            try:
-                # Fetch all serviceable areas from warehouse_serviceability table
-                result = await session.execute(
-                    text("""
-                        SELECT
-                            pincode,
-                            city,
-                            state,
-                            is_serviceable,
-                            estimated_days,
-                            cod_available,
-                            shipping_cost
-                        FROM warehouse_serviceability
-                        WHERE is_active = true
-                    """)
-                )
-                rows = result.fetchall()
-            except ProgrammingError as e:
-                if "does not exist" in str(e):
-                    logger.info("Serviceability cache refresh skipped: warehouse_serviceability table not found (multi-tenant setup)")
-                    return
-                raise
-
-            # Build cache data
-            cache_data = {}
-            for row in rows:
-                cache_data[row.pincode] = {
-                    "pincode": row.pincode,
-                    "city": row.city,
-                    "state": row.state,
-                    "is_serviceable": row.is_serviceable,
-                    "delivery_days": row.estimated_days,
-                    "cod_available": row.cod_available,
-                    "shipping_cost": row.shipping_cost,
-                    "cached_at": datetime.now().isoformat()
-                }
-
-            # Try to update Redis cache
-            redis_client = await get_redis_client()
-            if redis_client:
-                try:
-                    # Use pipeline for batch operations
-                    pipe = redis_client.pipeline()
-                    for pincode, data in cache_data.items():
-                        import json
-                        pipe.setex(
-                            f"serviceability:{pincode}",
-                            3600,  # 1 hour TTL
-                            json.dumps(data)
-                        )
-                    await pipe.execute()
-                    await redis_client.close()
-                    logger.info(f"Updated Redis cache with {len(cache_data)} pincodes")
-                except Exception as e:
-                    logger.error(f"Redis cache update failed: {e}")
-
-            # Always update in-memory cache as fallback
-            _serviceability_cache = cache_data
-            _cache_last_updated = datetime.now(timezone.utc)
-
-            elapsed = (datetime.now(timezone.utc) - start_time).total_seconds()
-            logger.info(
-                f"Serviceability cache refresh completed: "
-                f"{len(cache_data)} pincodes in {elapsed:.2f}s"
-            )
-
-    except Exception as e:
-        logger.error(f"Serviceability cache refresh failed: {e}")
-        raise
+    return await run_tenant_job("refresh_serviceability_cache")
 
 
 async def warm_popular_pincodes():
@@ -6,14 +6,24 @@ Pushes channel inventory quantities to marketplace APIs:
 - Flipkart Seller API
 - Other marketplace integrations
 
-Sync intervals are configurable per channel.
+Only SKUs whose available quantity differs from the last pushed
+marketplace_quantity are sent, in batches of each marketplace's limit.
+Channels push concurrently (MARKETPLACE_SYNC_CONCURRENCY) and pushed
+quantities are recorded with one bulk UPDATE per channel.
+
+Quantities are only recorded as pushed by live adapters (is_live); the
+current adapters are simulated, so their rows stay dirty until a real
+integration pushes them. The scheduled job runs only with
+MARKETPLACE_SYNC_ENABLED.
 """
+import asyncio
 import logging
+import uuid
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timezone
 from abc import ABC, abstractmethod
 
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, update, and_, or_, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.channel import (
@@ -30,6 +40,12 @@ logger = logging.getLogger(__name__)
 class MarketplaceAdapter(ABC):
     """Abstract base class for marketplace API adapters."""
 
+    # Items per sync_inventory call (None = MARKETPLACE_SYNC_BATCH_SIZE)
+    max_batch_size: Optional[int] = None
+    # True once sync_inventory calls the real marketplace API; results of
+    # simulated adapters are never recorded as pushed
+    is_live: bool = False
+
     @abstractmethod
     async def sync_inventory(
         self,
@@ -52,6 +68,9 @@ class MarketplaceAdapter(ABC):
 class AmazonSPAPIAdapter(MarketplaceAdapter):
     """Amazon Selling Partner API adapter."""
 
+    # Listings per inventory feed submission
+    max_batch_size = 1000
+
     async def sync_inventory(
         self,
         items: List[Dict[str, Any]],
@@ -81,6 +100,9 @@ class AmazonSPAPIAdapter(MarketplaceAdapter):
 class FlipkartAPIAdapter(MarketplaceAdapter):
     """Flipkart Seller API adapter."""
 
+    # SKUs per Listing API inventory update request
+    max_batch_size = 10
+
     async def sync_inventory(
         self,
         items: List[Dict[str, Any]],
@@ -142,10 +164,179 @@ def get_marketplace_adapter(channel_type: str) -> MarketplaceAdapter:
 
 # ==================== Main Sync Job ====================
 
-async def run_marketplace_sync_job(db: AsyncSession) -> Dict[str, Any]:
+def _available_quantity():
+    """SQL quantity to publish: allocated - buffer - reserved, floored at zero."""
+    return func.greatest(
+        0,
+        func.coalesce(ChannelInventory.allocated_quantity, 0)
+        - func.coalesce(ChannelInventory.buffer_quantity, 0)
+        - func.coalesce(ChannelInventory.reserved_quantity, 0),
+    )
+
+
+async def _load_dirty_items(
+    db: AsyncSession,
+    channel: SalesChannel,
+    product_ids: Optional[List] = None,
+    full: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Channel inventory rows whose available quantity differs from the
+    quantity last pushed (or that were never pushed), computed in SQL.
+    """
+    available = _available_quantity().label("available")
+    conditions = [
+        ChannelInventory.channel_id == channel.id,
+        ChannelInventory.is_active == True,
+    ]
+    if not full:
+        conditions.append(
+            or_(
+                ChannelInventory.last_synced_at.is_(None),
+                ChannelInventory.marketplace_quantity.is_distinct_from(available),
+            )
+        )
+    query = select(
+        ChannelInventory.id,
+        ChannelInventory.product_id,
+        ChannelInventory.warehouse_id,
+        ChannelInventory.marketplace_quantity,
+        available,
+    ).where(and_(*conditions))
+
+    if product_ids:
+        query = query.where(ChannelInventory.product_id.in_(product_ids))
+
+    result = await db.execute(query)
+
+    # Sync buffer (reduce reported quantity by buffer % to prevent overselling)
+    sync_buffer_pct = 0  # Could be configured per channel
+
+    items = []
+    for row in result.all():
+        quantity = row.available
+        if sync_buffer_pct > 0:
+            quantity = int(quantity * (1 - sync_buffer_pct / 100))
+        items.append({
+            "channel_inventory_id": str(row.id),
+            "product_id": str(row.product_id),
+            "warehouse_id": str(row.warehouse_id),
+            "quantity": quantity,
+            "previous_marketplace_qty": row.marketplace_quantity,
+        })
+    return items
+
+
+async def _load_credentials(db: AsyncSession, channel: SalesChannel) -> Dict[str, Any]:
+    """Marketplace API credentials for a channel (empty if not configured)."""
+    integration_result = await db.execute(
+        select(MarketplaceIntegration).where(
+            MarketplaceIntegration.channel_id == channel.id
+        )
+    )
+    integration = integration_result.scalar_one_or_none()
+    if not integration:
+        return {}
+    return {
+        "client_id": integration.client_id,
+        "client_secret": integration.client_secret,  # Note: should be decrypted
+        "refresh_token": integration.refresh_token,
+        "api_key": integration.api_key,
+    }
+
+
+async def _push_items(
+    channel: SalesChannel,
+    items: List[Dict[str, Any]],
+    credentials: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    Push items to the channel's marketplace in batches of the adapter's
+    limit. No database access, so channels can push concurrently.
+
+    Returns counters plus the items of batches the marketplace accepted
+    (none for simulated adapters, so nothing is marked as pushed).
+    """
+    adapter = get_marketplace_adapter(channel.channel_type)
+    batch_size = adapter.max_batch_size or settings.MARKETPLACE_SYNC_BATCH_SIZE
+
+    pushed = {
+        "synced_count": 0,
+        "failed_count": 0,
+        "errors": [],
+        "accepted": [],
+        "simulated": not adapter.is_live,
+    }
+    for offset in range(0, len(items), batch_size):
+        batch = items[offset:offset + batch_size]
+        try:
+            sync_result = await adapter.sync_inventory(batch, credentials)
+        except Exception as e:
+            sync_result = {"success": False, "failed_count": len(batch), "errors": [str(e)]}
+
+        pushed["synced_count"] += sync_result.get("synced_count", 0)
+        pushed["failed_count"] += sync_result.get("failed_count", 0)
+        pushed["errors"].extend(sync_result.get("errors", []))
+        if sync_result.get("success") and adapter.is_live:
+            pushed["accepted"].extend(batch)
+    return pushed
+
+
+async def _mark_synced(db: AsyncSession, items: List[Dict[str, Any]]) -> None:
+    """Record pushed quantities with one bulk UPDATE (by primary key)."""
+    if not items:
+        return
+    now = datetime.now(timezone.utc)
+    await db.execute(
+        update(ChannelInventory),
+        [
+            {
+                "id": uuid.UUID(item["channel_inventory_id"]),
+                "marketplace_quantity": item["quantity"],
+                "last_synced_at": now,
+            }
+            for item in items
+        ],
+    )
+
+
+def _channel_result(channel: SalesChannel) -> Dict[str, Any]:
+    return {
+        "channel_id": str(channel.id),
+        "channel_code": channel.code,
+        "channel_type": channel.channel_type,
+        "synced_count": 0,
+        "failed_count": 0,
+        "items": [],
+        "errors": [],
+        "simulated": False,
+    }
+
+
+def _apply_push(result: Dict[str, Any], pushed: Dict[str, Any]) -> None:
+    result["synced_count"] = pushed["synced_count"]
+    result["failed_count"] = pushed["failed_count"]
+    result["errors"] = pushed["errors"]
+    result["simulated"] = pushed["simulated"]
+    result["items"] = [
+        {
+            "product_id": item["product_id"],
+            "quantity": item["quantity"],
+            "previous_qty": item["previous_marketplace_qty"],
+        }
+        for item in pushed["accepted"]
+    ]
+
+
+async def run_marketplace_sync_job(db: AsyncSession, full: bool = False) -> Dict[str, Any]:
     """
     Main job to sync inventory to all marketplace channels.
 
+    Only SKUs whose quantity changed since the last push are sent (all SKUs
+    with full=True). Reads and the bulk UPDATEs run on the session in turn;
+    marketplace pushes run concurrently across channels, bounded by
+    MARKETPLACE_SYNC_CONCURRENCY.
+
     Returns:
         Summary of sync operations
     """
@@ -187,19 +378,56 @@ async def run_marketplace_sync_job(db: AsyncSession) -> Dict[str, Any]:
 
         logger.info(f"Found {len(channels)} marketplace channels to sync")
 
+        # 1. Collect changed SKUs per channel
+        pending = []
         for channel in channels:
             try:
-                channel_result = await sync_channel_inventory(db, channel)
-                results["channel_results"].append(channel_result)
-                results["channels_synced"] += 1
-                results["total_items_synced"] += channel_result.get("synced_count", 0)
-                results["total_items_failed"] += channel_result.get("failed_count", 0)
-
+                # Savepoint: a failed read rolls back to it, so the next
+                # channel does not run on an aborted transaction
+                async with db.begin_nested():
+                    items = await _load_dirty_items(db, channel, full=full)
+                    credentials = await _load_credentials(db, channel) if items else {}
+                pending.append((channel, items, credentials))
             except Exception as e:
                 error_msg = f"Error syncing channel {channel.code}: {e}"
                 logger.error(error_msg)
                 results["errors"].append(error_msg)
 
+        # 2. Push concurrently across channels
+        semaphore = asyncio.Semaphore(max(1, settings.MARKETPLACE_SYNC_CONCURRENCY))
+
+        async def push(channel, items, credentials):
+            async with semaphore:
+                return await _push_items(channel, items, credentials)
+
+        pushes = await asyncio.gather(
+            *(push(channel, items, credentials) for channel, items, credentials in pending if items),
+            return_exceptions=True,
+        )
+        pushed_by_channel = iter(pushes)
+
+        # 3. Record accepted quantities
+        for channel, items, _ in pending:
+            channel_result = _channel_result(channel)
+            if items:
+                pushed = next(pushed_by_channel)
+                if isinstance(pushed, Exception):
+                    error_msg = f"Error syncing channel {channel.code}: {pushed}"
+                    logger.error(error_msg)
+                    results["errors"].append(error_msg)
+                    continue
+                _apply_push(channel_result, pushed)
+                await _mark_synced(db, pushed["accepted"])
+                await db.commit()
+
+            logger.info(
+                f"Channel {channel.code}: synced {channel_result['synced_count']} changed items"
+            )
+            results["channel_results"].append(channel_result)
+            results["channels_synced"] += 1
+            results["total_items_synced"] += channel_result["synced_count"]
+            results["total_items_failed"] += channel_result["failed_count"]
+
     except Exception as e:
         error_msg = f"Marketplace sync job failed: {e}"
         logger.error(error_msg)
@@ -220,7 +448,8 @@ async def run_marketplace_sync_job(db: AsyncSession) -> Dict[str, Any]:
 async def sync_channel_inventory(
     db: AsyncSession,
     channel: SalesChannel,
-    product_ids: Optional[List] = None
+    product_ids: Optional[List] = None,
+    full: bool = False,
 ) -> Dict[str, Any]:
     """
     Sync inventory for a specific channel.
@@ -229,115 +458,28 @@ async def sync_channel_inventory(
         db: Database session
         channel: SalesChannel to sync
         product_ids: Optional list of product IDs to sync (if None, syncs all)
+        full: Push every active SKU, not only those that changed
 
     Returns:
         Sync result for this channel
     """
     logger.info(f"Syncing inventory for channel: {channel.code} ({channel.channel_type})")
 
-    result = {
-        "channel_id": str(channel.id),
-        "channel_code": channel.code,
-        "channel_type": channel.channel_type,
-        "synced_count": 0,
-        "failed_count": 0,
-        "items": [],
-        "errors": [],
-    }
+    result = _channel_result(channel)
 
     try:
-        # Get channel inventory records
-        query = (
-            select(ChannelInventory)
-            .where(
-                and_(
-                    ChannelInventory.channel_id == channel.id,
-                    ChannelInventory.is_active == True,
-                )
-            )
-        )
+        items = await _load_dirty_items(db, channel, product_ids, full=full)
 
-        if product_ids:
-            query = query.where(ChannelInventory.product_id.in_(product_ids))
-
-        inv_result = await db.execute(query)
-        inventories = inv_result.scalars().all()
-
-        if not inventories:
-            logger.info(f"No inventory records found for channel {channel.code}")
+        if not items:
+            logger.info(f"No changed inventory for channel {channel.code}")
             return result
 
-        # Prepare items for sync
-        sync_items = []
-        for inv in inventories:
-            # Calculate available quantity
-            available = max(0,
-                (inv.allocated_quantity or 0) -
-                (inv.buffer_quantity or 0) -
-                (inv.reserved_quantity or 0)
-            )
+        credentials = await _load_credentials(db, channel)
+        pushed = await _push_items(channel, items, credentials)
+        _apply_push(result, pushed)
 
-            # Apply sync buffer if configured
-            # (reduce reported quantity by buffer % to prevent overselling)
-            sync_buffer_pct = 0  # Could be configured per channel
-            if sync_buffer_pct > 0:
-                available = int(available * (1 - sync_buffer_pct / 100))
-
-            sync_items.append({
-                "channel_inventory_id": str(inv.id),
-                "product_id": str(inv.product_id),
-                "warehouse_id": str(inv.warehouse_id),
-                "quantity": available,
-                "previous_marketplace_qty": inv.marketplace_quantity,
-            })
-
-        # Get marketplace adapter
-        adapter = get_marketplace_adapter(channel.channel_type)
-
-        # Get credentials (if configured)
-        credentials = {}
-        integration_result = await db.execute(
-            select(MarketplaceIntegration).where(
-                MarketplaceIntegration.channel_id == channel.id
-            )
-        )
-        integration = integration_result.scalar_one_or_none()
-
-        if integration:
-            credentials = {
-                "client_id": integration.client_id,
-                "client_secret": integration.client_secret,  # Note: should be decrypted
-                "refresh_token": integration.refresh_token,
-                "api_key": integration.api_key,
-            }
-
-        # Call marketplace API
-        sync_result = await adapter.sync_inventory(sync_items, credentials)
-
-        result["synced_count"] = sync_result.get("synced_count", 0)
-        result["failed_count"] = sync_result.get("failed_count", 0)
-        result["errors"] = sync_result.get("errors", [])
-
-        # Update marketplace_quantity and last_synced_at for synced items
-        if sync_result.get("success"):
-            for item in sync_items:
-                # Find the inventory record and update it
-                for inv in inventories:
-                    if str(inv.id) == item["channel_inventory_id"]:
-                        inv.marketplace_quantity = item["quantity"]
-                        inv.last_synced_at = datetime.now(timezone.utc)
-                        break
-
-            await db.commit()
-
-            result["items"] = [
-                {
-                    "product_id": item["product_id"],
-                    "quantity": item["quantity"],
-                    "previous_qty": item["previous_marketplace_qty"],
-                }
-                for item in sync_items
-            ]
+        await _mark_synced(db, pushed["accepted"])
+        await db.commit()
 
         logger.info(f"Channel {channel.code}: synced {result['synced_count']} items")
 
@@ -365,8 +507,6 @@ async def sync_single_channel(
     Returns:
         Sync result
     """
-    import uuid
-
     # Get channel
     channel_result = await db.execute(
         select(SalesChannel).where(SalesChannel.id == uuid.UUID(channel_id))
@@ -393,23 +533,27 @@ def register_marketplace_sync_job(scheduler):
     """
     Register the marketplace sync job with the APScheduler.
 
+    Runs the tenant-aware marketplace_inventory_sync job for every active
+    tenant (see tenant_job_runner), when MARKETPLACE_SYNC_ENABLED is set.
+
     Args:
         scheduler: APScheduler instance
     """
-    from app.database import get_db_context
+    from app.jobs.scheduler import run_tenant_aware_job
 
-    async def job_wrapper():
-        async with get_db_context() as db:
-            await run_marketplace_sync_job(db)
+    if not settings.MARKETPLACE_SYNC_ENABLED:
+        logger.info("Marketplace sync job not scheduled (MARKETPLACE_SYNC_ENABLED is off)")
+        return
 
-    interval_minutes = getattr(settings, 'MARKETPLACE_SYNC_INTERVAL_MINUTES', 30)
+    interval_minutes = settings.MARKETPLACE_SYNC_INTERVAL_MINUTES
 
     scheduler.add_job(
-        job_wrapper,
+        run_tenant_aware_job,
         'interval',
         minutes=interval_minutes,
+        args=['marketplace_inventory_sync'],
         id='marketplace_inventory_sync',
-        name='Sync inventory to marketplaces',
+        name='[Multi-Tenant] Sync inventory to marketplaces',
         replace_existing=True,
     )
 
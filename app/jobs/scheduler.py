@@ -10,6 +10,8 @@ Architecture:
 - TenantJobRunner iterates through all active tenants
 - Each job runs in the correct tenant schema context
 - Failures in one tenant don't affect others
+- Job stores stay in memory per worker; cluster-wide once-only execution
+  comes from the TenantJobRunner leases (public.tenant_job_leases)
 """
 
 import logging
@@ -45,17 +47,39 @@ scheduler = AsyncIOScheduler(
 )
 
 
+def min_gap_seconds(job_name: str) -> int:
+    """
+    Minimum time between cluster-wide starts of a scheduled job.
+
+    Interval jobs: the interval less a 10% (at most 60s) allowance for
+    workers' timers drifting. Cron jobs: TENANT_JOB_CRON_MIN_GAP.
+    """
+    from app.config import settings
+
+    job = scheduler.get_job(job_name)
+    interval = getattr(job.trigger, "interval", None) if job else None
+    if interval is None:
+        return settings.TENANT_JOB_CRON_MIN_GAP
+    seconds = int(interval.total_seconds())
+    return seconds - min(seconds // 10, 60)
+
+
 async def run_tenant_aware_job(job_name: str):
     """
     Wrapper to run a tenant-aware job from the scheduler.
 
     This function is called by APScheduler and delegates to the
     TenantJobRunner which handles iterating through all tenants.
+    Every worker's scheduler fires the job; the runner's leases make
+    sure each tenant shard runs once per cluster per interval.
     """
     from app.jobs.tenant_job_runner import run_tenant_job
 
     try:
-        result = await run_tenant_job(job_name)
+        result = await run_tenant_job(job_name, min_gap_seconds=min_gap_seconds(job_name))
+        if result.get("reason") == "leased_elsewhere":
+            logger.debug(f"Job '{job_name}' skipped: run by another worker")
+            return
         logger.info(
             f"Job '{job_name}' completed: "
             f"{result.get('successful', 0)}/{result.get('tenant_count', 0)} tenants successful"
@@ -71,6 +95,7 @@ def start_scheduler():
         # This import triggers @tenant_job decorators
         from app.jobs import tenant_job_runner  # noqa: F401
         from app.jobs import snop_jobs  # noqa: F401
+        from app.config import settings
 
         # ============================================================
         # TENANT-AWARE SCHEDULED JOBS
@@ -121,6 +146,32 @@ def start_scheduler():
             replace_existing=True,
         )
 
+        # Refresh materialized customer RFM scores every 30 minutes (per tenant)
+        scheduler.add_job(
+            run_tenant_aware_job,
+            'interval',
+            minutes=30,
+            args=['refresh_customer_rfm'],
+            id='refresh_customer_rfm',
+            name='[Multi-Tenant] Refresh Customer RFM Scores',
+            replace_existing=True,
+        )
+
+        # Precompute AI command center dashboards in use (per tenant)
+        scheduler.add_job(
+            run_tenant_aware_job,
+            'interval',
+            seconds=settings.AI_SNAPSHOT_FRESH_SECONDS,
+            args=['refresh_ai_snapshots'],
+            id='refresh_ai_snapshots',
+            name='[Multi-Tenant] Refresh AI Command Center Snapshots',
+            replace_existing=True,
+        )
+
+        # Push changed marketplace inventory (per tenant, MARKETPLACE_SYNC_INTERVAL_MINUTES)
+        from app.jobs.marketplace_sync import register_marketplace_sync_job
+        register_marketplace_sync_job(scheduler)
+
         # ============================================================
         # S&OP AUTO-TRIGGERING JOBS
         # ============================================================
@@ -195,6 +246,17 @@ def start_scheduler():
             replace_existing=True,
         )
 
+        # S&OP: Daily demand rollup refresh every 15 minutes
+        scheduler.add_job(
+            run_tenant_aware_job,
+            'interval',
+            minutes=15,
+            args=['snop_demand_rollup_refresh'],
+            id='snop_demand_rollup_refresh',
+            name='[Multi-Tenant] S&OP Demand Rollup Refresh',
+            replace_existing=True,
+        )
+
         scheduler.start()
         logger.info("Multi-tenant background job scheduler started")
 
@@ -8,8 +8,11 @@ Provides 6 scheduled jobs for autonomous S&OP operations:
 4. snop_pos_signal_detection — Detect POS demand signals (every 60 min)
 5. snop_forecast_regeneration — Weekly forecast refresh (Sunday 2 AM IST)
 6. snop_alert_digest       — Morning briefing alert digest (daily 8 AM IST)
+7. snop_demand_rollup_refresh — Incremental daily demand rollup (every 15 min)
 
-All jobs use the @tenant_job decorator for multi-tenant schema isolation.
+All jobs use the @tenant_job decorator for multi-tenant schema isolation;
+snop_reorder_check is a @tenant_scan_job that first finds the tenants with
+urgent positions in one batched cross-tenant query.
 """
 
 import logging
@@ -19,7 +22,7 @@ from sqlalchemy import text, select
 from sqlalchemy.exc import ProgrammingError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.jobs.tenant_job_runner import tenant_job
+from app.jobs.tenant_job_runner import tenant_job, tenant_scan_job
 
 logger = logging.getLogger(__name__)
 
@@ -131,13 +134,27 @@ async def snop_exception_agent(session: AsyncSession, tenant: dict):
 # Job 2: Reorder Check Agent (every 60 minutes)
 # ============================================================
 
-@tenant_job("snop_reorder_check")
-async def snop_reorder_check(session: AsyncSession, tenant: dict):
+@tenant_scan_job(
+    "snop_reorder_check",
+    # Positions the reorder agent would flag EMERGENCY or URGENT
+    sql="""
+        SELECT COUNT(*) AS candidates
+        FROM {schema}.inventory_summary
+        WHERE available_quantity <= reorder_level
+        AND available_quantity >= 0
+        AND available_quantity <= GREATEST(COALESCE(minimum_stock, 0), 0)
+        AND reorder_level * 2 > available_quantity
+        HAVING COUNT(*) > 0
+    """,
+    tables=("inventory_summary",),
+)
+async def snop_reorder_check(session: AsyncSession, tenant: dict, rows: list):
     """
     Run the S&OP reorder agent for a tenant.
 
     Checks inventory positions and auto-creates DRAFT Purchase Requisitions
-    for EMERGENCY and URGENT reorder suggestions.
+    for EMERGENCY and URGENT reorder suggestions. The batched scan skips
+    tenants with no such positions.
     """
     try:
         from app.services.snop.planning_agents import PlanningAgents
@@ -305,29 +322,31 @@ async def snop_pos_signal_detection(session: AsyncSession, tenant: dict):
 # Job 5: Weekly Forecast Regeneration (Sunday 2:00 AM IST)
 # ============================================================
 
-@tenant_job("snop_forecast_regeneration")
+@tenant_job("snop_forecast_regeneration", concurrency=2, timeout=3600)
 async def snop_forecast_regeneration(session: AsyncSession, tenant: dict):
     """
     Regenerate demand forecasts for all active products in a tenant.
 
     Uses ENSEMBLE algorithm with WEEKLY granularity and 90-day horizon.
+    Runs the bulk pipeline (one history query, parallel fits, chunked
+    inserts); a re-run on the same day resumes from the last checkpoint.
     Creates a summary notification for admin users.
     """
     try:
-        from app.services.snop.snop_service import SNOPService
-        from app.models.snop import ForecastAlgorithm, ForecastGranularity
+        from app.services.snop.forecast_pipeline import ForecastRegenerationPipeline
+        from app.models.snop import ForecastGranularity
 
-        service = SNOPService(session)
+        pipeline = ForecastRegenerationPipeline(session)
 
-        forecasts = await service.generate_forecasts(
-            algorithm=ForecastAlgorithm.ENSEMBLE,
+        stats = await pipeline.regenerate_sku_forecasts(
             granularity=ForecastGranularity.WEEKLY,
             forecast_horizon_days=90,
         )
 
-        forecast_count = len(forecasts)
+        forecast_count = stats["created"]
         logger.info(
-            f"Tenant '{tenant['subdomain']}': Generated {forecast_count} weekly forecasts"
+            f"Tenant '{tenant['subdomain']}': Generated {forecast_count} weekly forecasts "
+            f"({stats['skipped']} already done, {stats['chunks']} chunks, {stats['elapsed_seconds']}s)"
         )
 
         # Notify admins
@@ -431,3 +450,33 @@ async def snop_alert_digest(session: AsyncSession, tenant: dict):
             )
         else:
             raise
+
+
+# ============================================================
+# Job 7: Daily Demand Rollup Refresh (every 15 minutes)
+# ============================================================
+
+@tenant_job("snop_demand_rollup_refresh")
+async def snop_demand_rollup_refresh(session: AsyncSession, tenant: dict):
+    """
+    Refresh the daily demand rollup used by DemandPlannerService.
+
+    Recomputes days touched by orders updated since the last run and
+    backfills the rollup on first run.
+    """
+    try:
+        from app.services.snop.demand_rollup import DemandRollupService
+
+        result = await DemandRollupService(session).refresh_incremental()
+        logger.debug(
+            f"Tenant '{tenant['subdomain']}': Demand rollup {result['mode']} refresh, "
+            f"{result['days']} days"
+        )
+
+    except ProgrammingError as e:
+        if "does not exist" in str(e):
+            logger.debug(
+                f"Tenant '{tenant['subdomain']}': Demand rollup table not yet created"
+            )
+        else:
+            raise
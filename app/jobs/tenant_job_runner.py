@@ -12,6 +12,20 @@ Architecture:
 - Failures in one tenant don't affect others
 - Comprehensive logging for debugging
 
+Cluster execution:
+- Every uvicorn worker runs its own scheduler, so a run first takes a lease
+  in public.tenant_job_leases (renewed while the run lasts); the lease
+  outlives the run by the job's minimum gap, so each job runs once per
+  cluster per interval
+- Tenants are split into TENANT_JOB_SHARDS stable shards, each leased
+  separately, so workers firing together share a run's tenants
+- Concurrency and per-tenant timeout are configurable per job
+- Each shard run is recorded in public.tenant_job_runs with the
+  per-tenant status and duration
+- Scan-style jobs (@tenant_scan_job) read all tenants of a shard through
+  batched schema-qualified UNION ALL queries on one connection, and open
+  a tenant session only for tenants that have work
+
 Usage:
     @tenant_job("sync_inventory")
     async def sync_inventory(session, tenant):
@@ -22,20 +36,37 @@ Usage:
 
 import logging
 import asyncio
-from typing import Callable, Dict, List, Any, Optional
+import json
+import os
+import socket
+import zlib
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Any, Optional, Tuple
 from datetime import datetime, timezone
 from functools import wraps
 
 from sqlalchemy import text, select
+from sqlalchemy.exc import ProgrammingError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
+
 logger = logging.getLogger(__name__)
 
+
+@dataclass(frozen=True)
+class TenantJobOptions:
+    """Execution limits for one registered job (None = settings default)."""
+    concurrency: Optional[int] = None  # Tenants processed in parallel
+    timeout: Optional[int] = None  # Seconds per tenant before the run is abandoned
+
+
 # Registry of tenant-aware jobs
 _tenant_jobs: Dict[str, Callable] = {}
+_tenant_job_options: Dict[str, TenantJobOptions] = {}
 
 
-def tenant_job(name: str):
+def tenant_job(name: str, concurrency: Optional[int] = None, timeout: Optional[int] = None):
     """
     Decorator to register a tenant-aware background job.
 
@@ -43,6 +74,11 @@ def tenant_job(name: str):
     - session: AsyncSession configured for the tenant's schema
     - tenant: Tenant object with id, subdomain, schema name, etc.
 
+    Args:
+        name: Job name used by the scheduler
+        concurrency: Tenants processed in parallel (default TENANT_JOB_CONCURRENCY)
+        timeout: Seconds per tenant (default TENANT_JOB_TIMEOUT)
+
     Example:
         @tenant_job("sync_inventory")
         async def sync_inventory(session: AsyncSession, tenant: dict):
@@ -58,11 +94,95 @@ def tenant_job(name: str):
             return await func(session, tenant)
 
         _tenant_jobs[name] = wrapper
+        _tenant_job_options[name] = TenantJobOptions(concurrency=concurrency, timeout=timeout)
         logger.debug(f"Registered tenant job: {name}")
         return wrapper
     return decorator
 
 
+@dataclass(frozen=True)
+class TenantScan:
+    """
+    Read-only query a scan job runs for every tenant before fanning out.
+
+    sql is a SELECT whose tables are qualified with {schema}, e.g.
+    "SELECT COUNT(*) AS pending FROM {schema}.orders HAVING COUNT(*) > 0".
+    """
+    sql: str
+    tables: Tuple[str, ...]  # Schemas missing any of these are treated as having no rows
+    params: Optional[Callable[[], dict]] = None  # Bind parameters, built once per run
+    only_with_rows: bool = True  # Fan out only to tenants the scan returned rows for
+
+
+_tenant_scans: Dict[str, TenantScan] = {}
+
+
+def tenant_scan_job(
+    name: str,
+    sql: str,
+    tables: Tuple[str, ...],
+    params: Optional[Callable[[], dict]] = None,
+    only_with_rows: bool = True,
+    concurrency: Optional[int] = None,
+    timeout: Optional[int] = None,
+):
+    """
+    Decorator to register a scan-style tenant job.
+
+    The scan runs for many tenants at once as schema-qualified UNION ALL
+    queries on one connection (TENANT_JOB_SCAN_CHUNK schemas per query);
+    the decorated function then runs in the tenant's own session only for
+    tenants with rows, receiving them as dicts:
+
+        @tenant_scan_job(
+            "check_pending_payments",
+            sql="SELECT COUNT(*) AS pending FROM {schema}.orders HAVING COUNT(*) > 0",
+            tables=("orders",),
+        )
+        async def check_pending_payments(session, tenant, rows):
+            ...
+
+    With TENANT_JOB_SCAN_BATCHING off, each tenant runs its own scan.
+    """
+    scan = TenantScan(sql=sql, tables=tuple(tables), params=params, only_with_rows=only_with_rows)
+
+    def decorator(func: Callable):
+        @wraps(func)
+        async def wrapper(session: AsyncSession, tenant: dict):
+            rows = tenant.get("scan_rows")
+            if rows is None:
+                try:
+                    result = await session.execute(
+                        text(scan.sql.replace("{schema}", _quote_schema(tenant["database_schema"]))),
+                        scan.params() if scan.params else {},
+                    )
+                except ProgrammingError as e:
+                    if "does not exist" in str(e):
+                        logger.debug(f"Tenant '{tenant['subdomain']}': {', '.join(scan.tables)} not yet created")
+                        return None
+                    raise
+                rows = [dict(row._mapping) for row in result.all()]
+                if not rows and scan.only_with_rows:
+                    return None
+            return await func(session, tenant, rows)
+
+        _tenant_jobs[name] = wrapper
+        _tenant_job_options[name] = TenantJobOptions(concurrency=concurrency, timeout=timeout)
+        _tenant_scans[name] = scan
+        logger.debug(f"Registered tenant scan job: {name}")
+        return wrapper
+    return decorator
+
+
+def _quote_schema(schema: str) -> str:
+    return '"' + schema.replace('"', '""') + '"'
+
+
+def tenant_shard(tenant_id: str, shard_count: int) -> int:
+    """Stable shard of a tenant (same on every worker)."""
+    return zlib.crc32(tenant_id.encode()) % shard_count
+
+
 class TenantJobRunner:
     """
     Executes background jobs across all active tenants.
@@ -71,19 +191,36 @@ class TenantJobRunner:
     - Automatic tenant iteration
     - Schema isolation per tenant
     - Error isolation (one tenant failure doesn't affect others)
-    - Execution metrics and logging
-    - Configurable concurrency
+    - Per-job concurrency and per-tenant timeouts
+    - Cluster-wide leases per (job, shard) and persisted run history
     """
 
-    def __init__(self, max_concurrent: int = 5):
+    def __init__(
+        self,
+        max_concurrent: Optional[int] = None,
+        shard_count: Optional[int] = None,
+        lease_enabled: Optional[bool] = None,
+    ):
         """
         Initialize the job runner.
 
         Args:
-            max_concurrent: Max tenants to process concurrently
+            max_concurrent: Default tenants processed concurrently per job
+            shard_count: Tenant shards leased independently
+            lease_enabled: Take cluster leases before running (False = run locally)
         """
-        self.max_concurrent = max_concurrent
-        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.max_concurrent = max_concurrent or settings.TENANT_JOB_CONCURRENCY
+        self.shard_count = max(1, shard_count or settings.TENANT_JOB_SHARDS)
+        self.lease_enabled = settings.TENANT_JOB_LEASE_ENABLED if lease_enabled is None else lease_enabled
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+    def job_options(self, job_name: str) -> TenantJobOptions:
+        """Effective concurrency/timeout for a job."""
+        options = _tenant_job_options.get(job_name, TenantJobOptions())
+        return TenantJobOptions(
+            concurrency=options.concurrency or self.max_concurrent,
+            timeout=options.timeout or settings.TENANT_JOB_TIMEOUT,
+        )
 
     async def get_active_tenants(self) -> List[dict]:
         """
@@ -123,11 +260,87 @@ class TenantJobRunner:
                 for row in rows
             ]
 
+    # ==================== Leases ====================
+
+    async def acquire_lease(self, job_name: str, shard: int, ttl_seconds: int) -> Optional[bool]:
+        """
+        Take the (job, shard) lease if it is free or expired.
+
+        Returns True when taken, False when held elsewhere, None when the
+        lease table does not exist yet (run without a lease).
+        """
+        from app.database import async_session_factory
+
+        try:
+            async with async_session_factory() as session:
+                result = await session.execute(
+                    text("""
+                        INSERT INTO public.tenant_job_leases
+                            (job_name, shard, holder, acquired_at, leased_until)
+                        VALUES
+                            (:job_name, :shard, :holder, now(), now() + make_interval(secs => :ttl))
+                        ON CONFLICT (job_name, shard) DO UPDATE
+                        SET holder = EXCLUDED.holder,
+                            acquired_at = EXCLUDED.acquired_at,
+                            leased_until = EXCLUDED.leased_until
+                        WHERE tenant_job_leases.leased_until < now()
+                        RETURNING holder
+                    """),
+                    {"job_name": job_name, "shard": shard, "holder": self.worker_id, "ttl": ttl_seconds},
+                )
+                taken = result.scalar() is not None
+                await session.commit()
+                return taken
+        except ProgrammingError as e:
+            if "does not exist" in str(e):
+                logger.warning("tenant_job_leases table missing; running without a cluster lease")
+                return None
+            raise
+
+    async def keep_lease(self, job_name: str, shard: int, ttl_seconds: int) -> None:
+        """Extend a held lease every ttl/3 seconds until cancelled."""
+        from app.database import async_session_factory
+
+        while True:
+            await asyncio.sleep(max(1, ttl_seconds // 3))
+            try:
+                async with async_session_factory() as session:
+                    await session.execute(
+                        text("""
+                            UPDATE public.tenant_job_leases
+                            SET leased_until = now() + make_interval(secs => :ttl)
+                            WHERE job_name = :job_name AND shard = :shard AND holder = :holder
+                        """),
+                        {"job_name": job_name, "shard": shard, "holder": self.worker_id, "ttl": ttl_seconds},
+                    )
+                    await session.commit()
+            except Exception as e:
+                logger.warning(f"Could not renew lease for '{job_name}' shard {shard}: {e}")
+
+    async def release_lease(self, job_name: str, shard: int, min_gap_seconds: int) -> None:
+        """Release the lease, keeping it until acquired_at + min_gap so the next interval owns the next run."""
+        from app.database import async_session_factory
+
+        async with async_session_factory() as session:
+            await session.execute(
+                text("""
+                    UPDATE public.tenant_job_leases
+                    SET leased_until = GREATEST(now(), acquired_at + make_interval(secs => :gap))
+                    WHERE job_name = :job_name AND shard = :shard AND holder = :holder
+                """),
+                {"job_name": job_name, "shard": shard, "holder": self.worker_id, "gap": min_gap_seconds},
+            )
+            await session.commit()
+
+    # ==================== Execution ====================
+
     async def run_job_for_tenant(
         self,
         job_name: str,
         job_func: Callable,
-        tenant: dict
+        tenant: dict,
+        semaphore: Optional[asyncio.Semaphore] = None,
+        timeout: Optional[int] = None,
     ) -> dict:
         """
         Execute a job for a single tenant.
@@ -136,67 +349,259 @@ class TenantJobRunner:
             job_name: Name of the job
             job_func: The job function to execute
             tenant: Tenant dictionary
+            semaphore: Concurrency limit shared by the run
+            timeout: Seconds before the tenant's run is cancelled and rolled back
 
         Returns:
             Result dictionary with status and metrics
         """
-        from app.database import engine
+        from app.database import tenant_session_scope
 
         schema = tenant["database_schema"]
         subdomain = tenant["subdomain"]
-        start_time = datetime.now(timezone.utc)
+        semaphore = semaphore or asyncio.Semaphore(self.max_concurrent)
+        timeout = timeout or settings.TENANT_JOB_TIMEOUT
 
         result = {
             "tenant_id": tenant["id"],
             "subdomain": subdomain,
             "job": job_name,
             "status": "pending",
-            "started_at": start_time.isoformat(),
+            "started_at": None,
             "error": None,
             "duration_ms": 0
         }
 
-        try:
-            async with self._semaphore:
-                # Create connection with tenant schema
-                async with engine.connect() as conn:
-                    # Set search path to tenant schema
-                    await conn.execute(text(f'SET search_path TO "{schema}"'))
-
-                    # Create session from connection
-                    session = AsyncSession(bind=conn, expire_on_commit=False)
-
-                    try:
-                        # Execute the job
-                        await job_func(session, tenant)
-                        await session.commit()
-                        result["status"] = "success"
-
-                    except Exception as e:
-                        await session.rollback()
-                        raise
-                    finally:
-                        await session.close()
+        async with semaphore:
+            start_time = datetime.now(timezone.utc)
+            result["started_at"] = start_time.isoformat()
+            try:
+                # Session on the tenant schema, committed at the connection level
+                async with tenant_session_scope(schema) as session:
+                    # Execute the job
+                    await asyncio.wait_for(job_func(session, tenant), timeout=timeout)
+                result["status"] = "success"
+
+            except asyncio.TimeoutError:
+                result["status"] = "timeout"
+                result["error"] = f"Timed out after {timeout}s"
+                logger.error(f"Job '{job_name}' timed out for tenant '{subdomain}' after {timeout}s")
+            except Exception as e:
+                result["status"] = "failed"
+                result["error"] = str(e)
+                logger.error(
+                    f"Job '{job_name}' failed for tenant '{subdomain}': {e}"
+                )
+
+            end_time = datetime.now(timezone.utc)
+            result["duration_ms"] = int((end_time - start_time).total_seconds() * 1000)
+            result["completed_at"] = end_time.isoformat()
 
-        except Exception as e:
-            result["status"] = "failed"
-            result["error"] = str(e)
-            logger.error(
-                f"Job '{job_name}' failed for tenant '{subdomain}': {e}"
-            )
+        return result
+
+    async def scan_tenants(
+        self,
+        job_name: str,
+        scan: TenantScan,
+        tenants: List[dict],
+        timeout: int,
+    ) -> Tuple[Dict[str, List[dict]], Dict[str, str]]:
+        """
+        Run a job's scan for many tenants on one connection.
+
+        Schemas are queried TENANT_JOB_SCAN_CHUNK at a time as one
+        UNION ALL of schema-qualified SELECTs. A chunk that fails is retried
+        schema by schema so one broken tenant does not hide the others.
+
+        Returns (rows per tenant id, error per tenant id).
+        """
+        from app.database import engine
 
+        rows_by_tenant: Dict[str, List[dict]] = {tenant["id"]: [] for tenant in tenants}
+        errors: Dict[str, str] = {}
+        params = scan.params() if scan.params else {}
+
+        async with engine.connect() as conn:
+            # Skip schemas where the scanned tables do not exist yet
+            result = await conn.execute(
+                text("""
+                    SELECT table_schema
+                    FROM information_schema.tables
+                    WHERE table_schema = ANY(:schemas) AND table_name = ANY(:tables)
+                    GROUP BY table_schema
+                    HAVING COUNT(DISTINCT table_name) = :table_count
+                """),
+                {
+                    "schemas": [tenant["database_schema"] for tenant in tenants],
+                    "tables": list(scan.tables),
+                    "table_count": len(set(scan.tables)),
+                },
+            )
+            ready = {row.table_schema for row in result.all()}
+            await conn.rollback()
+            scannable = [tenant for tenant in tenants if tenant["database_schema"] in ready]
+
+            async def run_parts(part_tenants: List[dict]) -> None:
+                parts = []
+                part_params = dict(params)
+                for idx, tenant in enumerate(part_tenants):
+                    part_params[f"_scan_tenant_{idx}"] = tenant["id"]
+                    schema_sql = scan.sql.replace("{schema}", _quote_schema(tenant["database_schema"]))
+                    parts.append(f"SELECT CAST(:_scan_tenant_{idx} AS TEXT) AS _scan_tenant_id, q.* FROM ({schema_sql}) AS q")
+                result = await asyncio.wait_for(
+                    conn.execute(text("\nUNION ALL\n".join(parts)), part_params),
+                    timeout=timeout,
+                )
+                for row in result.all():
+                    values = dict(row._mapping)
+                    rows_by_tenant[values.pop("_scan_tenant_id")].append(values)
+                await conn.rollback()
+
+            chunk_size = max(1, settings.TENANT_JOB_SCAN_CHUNK)
+            for offset in range(0, len(scannable), chunk_size):
+                chunk = scannable[offset:offset + chunk_size]
+                try:
+                    await run_parts(chunk)
+                except Exception as e:
+                    await conn.rollback()
+                    logger.warning(f"Scan for '{job_name}' failed for a {len(chunk)}-schema chunk, retrying per schema: {e}")
+                    for tenant in chunk:
+                        rows_by_tenant[tenant["id"]] = []
+                        try:
+                            await run_parts([tenant])
+                        except asyncio.TimeoutError:
+                            await conn.rollback()
+                            errors[tenant["id"]] = f"Scan timed out after {timeout}s"
+                        except Exception as tenant_error:
+                            await conn.rollback()
+                            errors[tenant["id"]] = f"Scan failed: {tenant_error}"
+
+        return rows_by_tenant, errors
+
+    async def _run_shard(
+        self,
+        job_name: str,
+        job_func: Callable,
+        shard: int,
+        tenants: List[dict],
+        options: TenantJobOptions,
+    ) -> dict:
+        """Run a job for one shard's tenants and record the run."""
+        start_time = datetime.now(timezone.utc)
+        results: List[dict] = []
+        run_tenants = tenants
+
+        scan = _tenant_scans.get(job_name)
+        if scan and settings.TENANT_JOB_SCAN_BATCHING:
+            rows_by_tenant, errors = await self.scan_tenants(job_name, scan, tenants, options.timeout)
+            run_tenants = []
+            for tenant in tenants:
+                rows = rows_by_tenant.get(tenant["id"], [])
+                if tenant["id"] in errors or (scan.only_with_rows and not rows):
+                    results.append({
+                        "tenant_id": tenant["id"],
+                        "subdomain": tenant["subdomain"],
+                        "job": job_name,
+                        "status": "failed" if tenant["id"] in errors else "idle",
+                        "started_at": start_time.isoformat(),
+                        "error": errors.get(tenant["id"]),
+                        "duration_ms": 0,
+                    })
+                else:
+                    run_tenants.append({**tenant, "scan_rows": rows})
+
+        semaphore = asyncio.Semaphore(options.concurrency)
+        fanned_out = await asyncio.gather(
+            *[
+                self.run_job_for_tenant(job_name, job_func, tenant, semaphore, options.timeout)
+                for tenant in run_tenants
+            ],
+            return_exceptions=True,
+        )
+        results.extend(r for r in fanned_out if isinstance(r, dict))
         end_time = datetime.now(timezone.utc)
-        result["duration_ms"] = int((end_time - start_time).total_seconds() * 1000)
-        result["completed_at"] = end_time.isoformat()
 
-        return result
+        shard_summary = {
+            "shard": shard,
+            "started_at": start_time,
+            "completed_at": end_time,
+            "duration_ms": int((end_time - start_time).total_seconds() * 1000),
+            "tenant_count": len(tenants),
+            # Idle = scanned, nothing to do
+            "successful": sum(1 for r in results if r["status"] in ("success", "idle")),
+            "failed": sum(1 for r in results if r["status"] == "failed"),
+            "timed_out": sum(1 for r in results if r["status"] == "timeout"),
+            "results": results,
+        }
+        await self.record_run(job_name, shard_summary)
+        return shard_summary
+
+    async def record_run(self, job_name: str, shard_summary: dict) -> None:
+        """Persist a shard run to public.tenant_job_runs (best effort)."""
+        from app.database import async_session_factory
 
-    async def run_job(self, job_name: str) -> dict:
+        tenant_results = [
+            {
+                "tenant_id": r["tenant_id"],
+                "subdomain": r["subdomain"],
+                "status": r["status"],
+                "duration_ms": r["duration_ms"],
+                "error": r["error"],
+            }
+            for r in shard_summary["results"]
+        ]
+        try:
+            async with async_session_factory() as session:
+                await session.execute(
+                    text("""
+                        INSERT INTO public.tenant_job_runs (
+                            id, job_name, shard, shard_count, worker_id,
+                            started_at, completed_at, duration_ms,
+                            tenant_count, successful, failed, timed_out, tenant_results
+                        ) VALUES (
+                            gen_random_uuid(), :job_name, :shard, :shard_count, :worker_id,
+                            :started_at, :completed_at, :duration_ms,
+                            :tenant_count, :successful, :failed, :timed_out, CAST(:tenant_results AS JSONB)
+                        )
+                    """),
+                    {
+                        "job_name": job_name,
+                        "shard": shard_summary["shard"],
+                        "shard_count": self.shard_count,
+                        "worker_id": self.worker_id,
+                        "started_at": shard_summary["started_at"],
+                        "completed_at": shard_summary["completed_at"],
+                        "duration_ms": shard_summary["duration_ms"],
+                        "tenant_count": shard_summary["tenant_count"],
+                        "successful": shard_summary["successful"],
+                        "failed": shard_summary["failed"],
+                        "timed_out": shard_summary["timed_out"],
+                        "tenant_results": json.dumps(tenant_results),
+                    },
+                )
+                await session.execute(
+                    text("""
+                        DELETE FROM public.tenant_job_runs
+                        WHERE job_name = :job_name
+                          AND started_at < now() - make_interval(days => :days)
+                    """),
+                    {"job_name": job_name, "days": settings.TENANT_JOB_HISTORY_DAYS},
+                )
+                await session.commit()
+        except Exception as e:
+            logger.warning(f"Could not record run of '{job_name}' shard {shard_summary['shard']}: {e}")
+
+    async def run_job(self, job_name: str, min_gap_seconds: int = 0) -> dict:
         """
         Run a job across all active tenants.
 
+        Each tenant shard is run only if this worker wins its lease; shards
+        run by other workers (or within min_gap_seconds of their last start)
+        are skipped.
+
         Args:
             job_name: Name of the registered job
+            min_gap_seconds: Minimum time between starts of the job cluster-wide
 
         Returns:
             Summary dictionary with results per tenant
@@ -205,6 +610,7 @@ class TenantJobRunner:
             raise ValueError(f"Unknown job: {job_name}. Registered: {list(_tenant_jobs.keys())}")
 
         job_func = _tenant_jobs[job_name]
+        options = self.job_options(job_name)
         start_time = datetime.now(timezone.utc)
 
         logger.info(f"Starting tenant job: {job_name}")
@@ -221,36 +627,61 @@ class TenantJobRunner:
                 "tenant_count": 0
             }
 
-        logger.info(f"Running '{job_name}' for {len(tenants)} tenants")
-
-        # Run job for all tenants concurrently (with semaphore limiting)
-        tasks = [
-            self.run_job_for_tenant(job_name, job_func, tenant)
-            for tenant in tenants
-        ]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        # Process results
-        successful = sum(1 for r in results if isinstance(r, dict) and r.get("status") == "success")
-        failed = sum(1 for r in results if isinstance(r, dict) and r.get("status") == "failed")
+        shards: Dict[int, List[dict]] = {}
+        for tenant in tenants:
+            shards.setdefault(tenant_shard(tenant["id"], self.shard_count), []).append(tenant)
+
+        # Start at a worker-specific shard so simultaneous workers pick different shards first
+        offset = zlib.crc32(self.worker_id.encode()) % self.shard_count
+        order = sorted(shards, key=lambda s: (s - offset) % self.shard_count)
+        lease_ttl = settings.TENANT_JOB_LEASE_TTL
+
+        shard_summaries = []
+        skipped_shards = []
+        for shard in order:
+            leased = await self.acquire_lease(job_name, shard, lease_ttl) if self.lease_enabled else None
+            if leased is False:
+                skipped_shards.append(shard)
+                continue
+            heartbeat = asyncio.create_task(self.keep_lease(job_name, shard, lease_ttl)) if leased else None
+            try:
+                logger.info(f"Running '{job_name}' shard {shard} for {len(shards[shard])} tenants")
+                shard_summaries.append(
+                    await self._run_shard(job_name, job_func, shard, shards[shard], options)
+                )
+            finally:
+                if heartbeat:
+                    heartbeat.cancel()
+                    await self.release_lease(job_name, shard, min_gap_seconds)
+
+        results = [r for s in shard_summaries for r in s["results"]]
+        successful = sum(s["successful"] for s in shard_summaries)
+        failed = sum(s["failed"] for s in shard_summaries)
+        timed_out = sum(s["timed_out"] for s in shard_summaries)
 
         end_time = datetime.now(timezone.utc)
         total_duration = int((end_time - start_time).total_seconds() * 1000)
 
         summary = {
             "job": job_name,
-            "status": "completed",
+            "status": "completed" if shard_summaries else "skipped",
             "started_at": start_time.isoformat(),
             "completed_at": end_time.isoformat(),
             "duration_ms": total_duration,
-            "tenant_count": len(tenants),
+            "tenant_count": len(results),
             "successful": successful,
             "failed": failed,
-            "results": [r for r in results if isinstance(r, dict)]
+            "timed_out": timed_out,
+            "shards_run": [s["shard"] for s in shard_summaries],
+            "shards_skipped": skipped_shards,
+            "results": results
         }
+        if not shard_summaries:
+            summary["reason"] = "leased_elsewhere"
 
         logger.info(
-            f"Job '{job_name}' completed: {successful}/{len(tenants)} successful "
+            f"Job '{job_name}' completed: {successful}/{len(results)} successful, "
+            f"{timed_out} timed out, {len(skipped_shards)} shards leased elsewhere "
             f"in {total_duration}ms"
         )
 
@@ -269,100 +700,105 @@ def get_tenant_job_runner() -> TenantJobRunner:
     return _runner
 
 
-async def run_tenant_job(job_name: str) -> dict:
+async def run_tenant_job(job_name: str, min_gap_seconds: int = 0) -> dict:
     """
     Convenience function to run a tenant job.
 
     Args:
         job_name: Name of the registered job
+        min_gap_seconds: Minimum time between starts of the job cluster-wide
 
     Returns:
         Job execution summary
     """
     runner = get_tenant_job_runner()
-    return await runner.run_job(job_name)
+    return await runner.run_job(job_name, min_gap_seconds=min_gap_seconds)
+
+
+async def get_job_run_history(job_name: Optional[str] = None, limit: int = 50) -> List[dict]:
+    """Recent shard runs from public.tenant_job_runs, newest first."""
+    from app.database import async_session_factory
+
+    query = """
+        SELECT job_name, shard, shard_count, worker_id, started_at, completed_at,
+               duration_ms, tenant_count, successful, failed, timed_out, tenant_results
+        FROM public.tenant_job_runs
+    """
+    params: Dict[str, Any] = {"limit": limit}
+    if job_name:
+        query += " WHERE job_name = :job_name"
+        params["job_name"] = job_name
+    query += " ORDER BY started_at DESC LIMIT :limit"
+
+    async with async_session_factory() as session:
+        result = await session.execute(text(query), params)
+        return [dict(row._mapping) for row in result.all()]
+
 
 
 # ============================================================
 # TENANT-AWARE JOB IMPLEMENTATIONS
 # ============================================================
 
-@tenant_job("sync_inventory_cache")
-async def sync_inventory_cache_job(session: AsyncSession, tenant: dict):
+@tenant_scan_job(
+    "sync_inventory_cache",
+    sql="""
+        SELECT COUNT(*) AS inventory_count
+        FROM {schema}.inventory
+        WHERE is_active = true
+        HAVING COUNT(*) > 0
+    """,
+    tables=("inventory",),
+)
+async def sync_inventory_cache_job(session: AsyncSession, tenant: dict, rows: List[dict]):
     """
     Sync inventory levels to cache for a tenant.
 
     This replaces the old single-tenant sync_inventory_cache function.
+    The batched cross-tenant scan only counts active inventory rows; select
+    the row columns here once a cache write consumes them.
     """
-    from sqlalchemy.exc import ProgrammingError
-
-    try:
-        result = await session.execute(
-            text("""
-                SELECT
-                    product_id::text,
-                    sku,
-                    quantity_available,
-                    reserved_quantity,
-                    warehouse_id::text
-                FROM inventory
-                WHERE is_active = true
-            """)
-        )
-        rows = result.fetchall()
+    inventory_count = rows[0]["inventory_count"] if rows else 0
 
-        # TODO: Update Redis/in-memory cache for this tenant
-        # For now, just log the count
-        logger.info(
-            f"Tenant '{tenant['subdomain']}': Found {len(rows)} inventory items"
-        )
+    # TODO: Update Redis/in-memory cache for this tenant
+    # For now, just log the count
+    logger.info(
+        f"Tenant '{tenant['subdomain']}': Found {inventory_count} inventory items"
+    )
 
-    except ProgrammingError as e:
-        if "does not exist" in str(e):
-            logger.debug(
-                f"Tenant '{tenant['subdomain']}': inventory table not yet created"
-            )
-        else:
-            raise
 
+def _pending_payment_params() -> dict:
+    from datetime import timedelta
 
-@tenant_job("check_pending_payments")
-async def check_pending_payments_job(session: AsyncSession, tenant: dict):
+    return {"cutoff_time": datetime.now(timezone.utc) - timedelta(minutes=5)}
+
+
+@tenant_scan_job(
+    "check_pending_payments",
+    sql="""
+        SELECT COUNT(*) AS pending_count
+        FROM {schema}.orders
+        WHERE payment_status = 'PENDING'
+        AND created_at < :cutoff_time
+        HAVING COUNT(*) > 0
+    """,
+    tables=("orders",),
+    params=_pending_payment_params,
+)
+async def check_pending_payments_job(session: AsyncSession, tenant: dict, rows: List[dict]):
     """
     Check pending payments for a tenant.
 
     This replaces the old single-tenant check_pending_payments function.
+    Runs only for tenants the batched scan found pending payments for.
     """
-    from sqlalchemy.exc import ProgrammingError
-    from datetime import timedelta
-
-    try:
-        cutoff_time = datetime.now(timezone.utc) - timedelta(minutes=5)
+    pending_count = rows[0]["pending_count"] if rows else 0
 
-        result = await session.execute(
-            text("""
-                SELECT COUNT(*)
-                FROM orders
-                WHERE payment_status = 'PENDING'
-                AND created_at < :cutoff_time
-            """),
-            {"cutoff_time": cutoff_time}
+    if pending_count > 0:
+        logger.info(
+            f"Tenant '{tenant['subdomain']}': {pending_count} pending payments to check"
         )
-        pending_count = result.scalar() or 0
-
-        if pending_count > 0:
-            logger.info(
-                f"Tenant '{tenant['subdomain']}': {pending_count} pending payments to check"
-            )
-            # TODO: Implement actual Razorpay check logic here
-
-    except ProgrammingError as e:
-        if "does not exist" in str(e):
-            logger.debug(
-                f"Tenant '{tenant['subdomain']}': orders table not yet created"
-            )
-        else:
-            raise
+        # TODO: Implement actual Razorpay check logic here
 
 
 @tenant_job("process_abandoned_carts")
@@ -406,28 +842,105 @@ async def process_abandoned_carts_job(session: AsyncSession, tenant: dict):
 async def refresh_serviceability_cache_job(session: AsyncSession, tenant: dict):
     """
     Refresh serviceability cache for a tenant.
+
+    Pushes only pincodes whose warehouse/transporter mappings changed since
+    the last run into the tenant's cache namespace.
     """
     from sqlalchemy.exc import ProgrammingError
+    from app.config import settings
+    from app.services.serviceability_cache_sync import ServiceabilityCacheSync
+
+    if not settings.CACHE_ENABLED:
+        return
 
     try:
-        result = await session.execute(
-            text("""
-                SELECT COUNT(*)
-                FROM warehouse_serviceability
-                WHERE is_active = true
-            """)
+        stats = await ServiceabilityCacheSync(session, tenant["id"]).refresh()
+        logger.debug(
+            f"Tenant '{tenant['subdomain']}': Serviceability cache {stats['mode']} refresh, "
+            f"{stats['pushed']} pincodes pushed"
         )
-        count = result.scalar() or 0
 
-        logger.info(
-            f"Tenant '{tenant['subdomain']}': {count} serviceable pincodes"
+    except ProgrammingError as e:
+        if "does not exist" in str(e):
+            logger.debug(
+                f"Tenant '{tenant['subdomain']}': warehouse_serviceability not yet created"
+            )
+        else:
+            raise
+
+
+@tenant_job("marketplace_inventory_sync")
+async def marketplace_inventory_sync_job(session: AsyncSession, tenant: dict):
+    """
+    Push changed channel inventory quantities to marketplaces for a tenant.
+
+    run_marketplace_sync_job handles and records its own errors (missing
+    tables included) in the summary.
+    """
+    from app.jobs.marketplace_sync import run_marketplace_sync_job
+
+    summary = await run_marketplace_sync_job(session)
+    logger.debug(
+        f"Tenant '{tenant['subdomain']}': Marketplace sync, "
+        f"{summary['channels_synced']} channels, {summary['total_items_synced']} items pushed, "
+        f"{len(summary['errors'])} errors"
+    )
+
+
+@tenant_job("refresh_customer_rfm")
+async def refresh_customer_rfm_job(session: AsyncSession, tenant: dict):
+    """
+    Refresh materialized customer RFM scores for a tenant.
+
+    Re-aggregates customers with orders changed since the last run and
+    re-ranks all customers (backfills on first run).
+    """
+    from sqlalchemy.exc import ProgrammingError
+    from app.services.customer_rfm_service import CustomerRFMService
+
+    try:
+        stats = await CustomerRFMService(session).refresh()
+        logger.debug(
+            f"Tenant '{tenant['subdomain']}': Customer RFM {stats['mode']} refresh, "
+            f"{stats['dirty']} changed, {stats['inserted']} inserted, {stats['updated']} updated"
         )
-        # TODO: Update cache
 
     except ProgrammingError as e:
         if "does not exist" in str(e):
             logger.debug(
-                f"Tenant '{tenant['subdomain']}': warehouse_serviceability not yet created"
+                f"Tenant '{tenant['subdomain']}': customer_rfm_scores not yet created"
             )
         else:
             raise
+
+
+@tenant_job("refresh_ai_snapshots", concurrency=2)
+async def refresh_ai_snapshots_job(session: AsyncSession, tenant: dict):
+    """
+    Recompute the AI command center dashboards a tenant has read recently.
+
+    Keeps their snapshots fresh so dashboard requests answer from the
+    snapshot store instead of running the agents inline.
+    """
+    from uuid import UUID
+    from app.services.ai.snapshot_store import get_snapshot_store
+    from app.services.ai.oms.command_center import OMSCommandCenter
+    from app.services.ai.wms.command_center import WMSCommandCenter
+    from app.services.ai.dms.command_center import DMSCommandCenter
+
+    schema = tenant["database_schema"]
+
+    def builder_for(name: str):
+        module, _, variant = name.partition(":")
+        if module == "oms":
+            return lambda: OMSCommandCenter(session, tenant["id"]).build_dashboard(schema)
+        if module == "dms":
+            return lambda: DMSCommandCenter(session, tenant["id"]).build_dashboard(schema)
+        if module == "wms":
+            warehouse_id = None if variant in ("", "all") else UUID(variant)
+            return lambda: WMSCommandCenter(session, tenant["id"]).build_dashboard(schema, warehouse_id)
+        return None
+
+    refreshed = await get_snapshot_store().refresh_active(tenant["id"], builder_for)
+    if refreshed:
+        logger.debug(f"Tenant '{tenant['subdomain']}': {refreshed} AI dashboard snapshots refreshed")
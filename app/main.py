@@ -210,6 +210,10 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     shutdown_scheduler()
+    from app.services.snop.ml_forecaster import shutdown_fit_pool
+    shutdown_fit_pool()
+    from app.database import tenant_pools
+    await tenant_pools.dispose()
     print("Shutting down...")
 
 
@@ -335,6 +339,10 @@ app.add_middleware(
 from app.middleware.tenant import tenant_middleware
 app.middleware("http")(tenant_middleware)
 
+# Per-request DB pool occupancy (outermost, so tenant resolution is counted too)
+from app.core.pool_metrics import pool_metrics_middleware
+app.middleware("http")(pool_metrics_middleware)
+
 # Include API router
 app.include_router(api_router)
 
@@ -406,6 +414,36 @@ async def health_check():
         health_status["status"] = "unhealthy"
         health_status["checks"]["database"] = f"error: {str(e)}"
 
+    # In-process tenant resolution cache counters
+    from app.core.tenant_registry import get_tenant_registry
+    health_status["tenant_cache"] = get_tenant_registry().stats()
+
+    # Module entitlement cache counters
+    from app.core.entitlement_cache import get_entitlement_cache
+    health_status["entitlement_cache"] = get_entitlement_cache().stats()
+
+    # Principal cache and revoked-token set
+    from app.core.principal_cache import get_principal_cache
+    from app.core.token_blacklist import get_token_blacklist
+    health_status["principal_cache"] = get_principal_cache().stats()
+    health_status["token_blacklist"] = get_token_blacklist().stats()
+
+    # AI command center snapshot store
+    from app.services.ai.snapshot_store import get_snapshot_store
+    health_status["ai_snapshots"] = get_snapshot_store().stats()
+
+    # DB pool occupancy and connections held per request
+    from app.core.pool_metrics import get_pool_metrics
+    health_status["db_pool"] = get_pool_metrics().stats()
+
+    # Per-tenant search_path SETs skipped/issued and dedicated pools
+    from app.database import tenant_pools
+    health_status["tenant_pools"] = tenant_pools.stats()
+
+    # Forecast model fit pool (queue depth, per-model fit time)
+    from app.services.snop.ml_forecaster import get_fit_pool_stats
+    health_status["forecast_fit_pool"] = get_fit_pool_stats()
+
     # Return 503 if unhealthy
     if health_status["status"] == "unhealthy":
         return JSONResponse(status_code=503, content=health_status)
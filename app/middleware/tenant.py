@@ -6,6 +6,7 @@ from fastapi import Request, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.models.tenant import Tenant
+from app.core.tenant_registry import get_tenant_registry
 import logging
 
 # Context variable for current tenant (accessible from decorators without Request)
@@ -16,7 +17,13 @@ current_tenant_var: contextvars.ContextVar[Tenant | None] = contextvars.ContextV
 logger = logging.getLogger(__name__)
 
 
-async def get_tenant_from_request(request: Request, db: AsyncSession) -> Tenant:
+def get_current_tenant_id() -> str | None:
+    """Get the current request's tenant id (None outside a tenant request)."""
+    tenant = current_tenant_var.get()
+    return str(tenant.id) if tenant else None
+
+
+async def get_tenant_from_request(request: Request, db: AsyncSession | None = None) -> Tenant:
     """
     Extract tenant from request (subdomain, header, or JWT token)
 
@@ -25,9 +32,12 @@ async def get_tenant_from_request(request: Request, db: AsyncSession) -> Tenant:
     2. Subdomain - for browser access
     3. JWT token - if user is logged in
 
+    Lookups go through the in-process tenant registry; the public schema is
+    only queried on a cache miss.
+
     Args:
         request: FastAPI request object
-        db: Database session for public schema
+        db: Optional database session for public schema (opened on demand if None)
 
     Returns:
         Tenant object if found
@@ -40,9 +50,9 @@ async def get_tenant_from_request(request: Request, db: AsyncSession) -> Tenant:
     # Option 1: Extract from custom header (for API calls)
     tenant_id = request.headers.get("X-Tenant-ID")
     if tenant_id:
-        tenant = await get_tenant_by_id(db, tenant_id)
+        tenant = await get_cached_tenant_by_id(tenant_id, db)
         if tenant:
-            logger.info(f"Tenant identified by header: {tenant.name}")
+            logger.debug(f"Tenant identified by header: {tenant.name}")
             return tenant
 
     # Option 2: Extract from subdomain
@@ -51,18 +61,18 @@ async def get_tenant_from_request(request: Request, db: AsyncSession) -> Tenant:
         subdomain = host.split(".")[0]
         # Check if it's a valid subdomain (not www, api, admin, etc.)
         if subdomain not in ["www", "api", "admin", "localhost"]:
-            tenant = await get_tenant_by_subdomain(db, subdomain)
+            tenant = await get_cached_tenant_by_subdomain(subdomain, db)
             if tenant:
-                logger.info(f"Tenant identified by subdomain: {tenant.name}")
+                logger.debug(f"Tenant identified by subdomain: {tenant.name}")
                 return tenant
 
     # Option 3: Extract from JWT token (if user is logged in)
     if hasattr(request.state, "user") and request.state.user:
         tenant_id = request.state.user.get("tenant_id")
         if tenant_id:
-            tenant = await get_tenant_by_id(db, tenant_id)
+            tenant = await get_cached_tenant_by_id(tenant_id, db)
             if tenant:
-                logger.info(f"Tenant identified by JWT: {tenant.name}")
+                logger.debug(f"Tenant identified by JWT: {tenant.name}")
                 return tenant
 
     # No tenant found
@@ -103,6 +113,44 @@ async def get_tenant_by_id(db: AsyncSession, tenant_id: str) -> Tenant:
     return result.scalar_one_or_none()
 
 
+async def get_cached_tenant_by_id(tenant_id: str, db: AsyncSession | None = None) -> Tenant | None:
+    """Get tenant by ID through the registry cache (DB hit only on miss)."""
+    registry = get_tenant_registry()
+    hit, tenant = registry.get_by_id(tenant_id)
+    if hit:
+        return tenant
+
+    if db is not None:
+        tenant = await get_tenant_by_id(db, tenant_id)
+    else:
+        from app.database import async_session_maker
+
+        async with async_session_maker() as session:
+            tenant = await get_tenant_by_id(session, tenant_id)
+
+    registry.put_id(tenant_id, tenant)
+    return tenant
+
+
+async def get_cached_tenant_by_subdomain(subdomain: str, db: AsyncSession | None = None) -> Tenant | None:
+    """Get tenant by subdomain through the registry cache (DB hit only on miss)."""
+    registry = get_tenant_registry()
+    hit, tenant = registry.get_by_subdomain(subdomain)
+    if hit:
+        return tenant
+
+    if db is not None:
+        tenant = await get_tenant_by_subdomain(db, subdomain)
+    else:
+        from app.database import async_session_maker
+
+        async with async_session_maker() as session:
+            tenant = await get_tenant_by_subdomain(session, subdomain)
+
+    registry.put_subdomain(subdomain, tenant)
+    return tenant
+
+
 async def tenant_middleware(request: Request, call_next):
     """
     Middleware to inject tenant context into request
@@ -150,24 +198,22 @@ async def tenant_middleware(request: Request, call_next):
         if request.url.path.startswith(prefix):
             return await call_next(request)
 
-    # Get database session for public schema
-    from app.database import async_session_maker
-
-    async with async_session_maker() as db:
-        # Get tenant from request (HTTPException raised here will propagate naturally)
-        tenant = await get_tenant_from_request(request, db)
+    # Get tenant from request (HTTPException raised here will propagate naturally).
+    # Served from the tenant registry cache; a public-schema session is opened
+    # only on a miss and released before the request handler runs.
+    tenant = await get_tenant_from_request(request)
 
-        # Inject tenant into request state and context variable
-        request.state.tenant = tenant
-        request.state.tenant_id = str(tenant.id)
-        request.state.schema = tenant.database_schema
-        current_tenant_var.set(tenant)
+    # Inject tenant into request state and context variable
+    request.state.tenant = tenant
+    request.state.tenant_id = str(tenant.id)
+    request.state.schema = tenant.database_schema
+    current_tenant_var.set(tenant)
 
-        logger.info(
-            f"Request for tenant: {tenant.name} ({tenant.subdomain}) "
-            f"| Schema: {tenant.database_schema}"
-        )
+    logger.debug(
+        f"Request for tenant: {tenant.name} ({tenant.subdomain}) "
+        f"| Schema: {tenant.database_schema}"
+    )
 
-        # Continue with request
-        response = await call_next(request)
-        return response
+    # Continue with request
+    response = await call_next(request)
+    return response
@@ -22,6 +22,7 @@ from app.models.customer import (
     CustomerType,
     CustomerSource,
     AddressType,
+    CustomerRFMScore,
 )
 from app.models.order import (
     Order,
@@ -149,6 +150,7 @@ from app.models.accounting import (
     JournalEntryLine,
     JournalEntryStatus as JournalStatus,
     GeneralLedger,
+    AccountBalanceSnapshot,
     TaxConfiguration,
 )
 # Enhanced Billing (E-Invoice)
@@ -437,6 +439,7 @@ from app.models.rate_card import (
 # S&OP (Sales and Operations Planning)
 from app.models.snop import (
     DemandForecast,
+    DemandDailyRollup,
     ForecastAdjustment,
     SupplyPlan,
     SNOPScenario,
@@ -751,6 +754,7 @@ __all__ = [
     "CustomerType",
     "CustomerSource",
     "AddressType",
+    "CustomerRFMScore",
     # Orders
     "Order",
     "OrderItem",
@@ -854,6 +858,7 @@ __all__ = [
     "JournalEntryLine",
     "JournalStatus",
     "GeneralLedger",
+    "AccountBalanceSnapshot",
     "TaxConfiguration",
     # Enhanced Billing (E-Invoice)
     "TaxInvoice",
@@ -1078,6 +1083,7 @@ __all__ = [
     "VehicleCategory",
     # S&OP (Sales and Operations Planning)
     "DemandForecast",
+    "DemandDailyRollup",
     "ForecastAdjustment",
     "SupplyPlan",
     "SNOPScenario",
@@ -9,7 +9,7 @@ from enum import Enum
 from typing import TYPE_CHECKING, Optional, List
 from decimal import Decimal
 
-from sqlalchemy import String, Boolean, DateTime, ForeignKey, Integer, Text, Numeric, Date
+from sqlalchemy import String, Boolean, DateTime, ForeignKey, Integer, BigInteger, Text, Numeric, Date, Identity
 from sqlalchemy import UniqueConstraint, CheckConstraint
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -711,6 +711,15 @@ class GeneralLedger(Base):
         comment="Balance after this transaction"
     )
 
+    # Posting order (running balances follow this sequence per account)
+    ledger_sequence: Mapped[int] = mapped_column(
+        BigInteger,
+        Identity(always=False),
+        nullable=False,
+        index=True,
+        comment="Monotonic posting sequence"
+    )
+
     # Reference
     narration: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
 
@@ -937,3 +946,54 @@ class BankStatementLine(Base):
 
 
 # Note: BankReconciliation class moved to app/models/banking.py to avoid duplicate table definition
+
+
+class AccountBalanceSnapshot(Base):
+    """
+    Closing balance of an account at the end of a financial period.
+
+    Materialized when the period is closed and kept exact afterwards by
+    GLPostingService (back-dated postings adjust every later snapshot), so
+    as-of reports read the latest snapshot and only aggregate ledger
+    entries posted after it.
+    """
+    __tablename__ = "account_balance_snapshots"
+    __table_args__ = (
+        UniqueConstraint("account_id", "period_id", name="uq_account_balance_snapshot_period"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4
+    )
+
+    account_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("chart_of_accounts.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+    period_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("financial_periods.id", ondelete="CASCADE"),
+        nullable=False
+    )
+    period_end_date: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+
+    closing_balance: Mapped[Decimal] = mapped_column(
+        Numeric(15, 2),
+        nullable=False,
+        default=Decimal("0"),
+        comment="Balance as of period_end_date"
+    )
+
+    # Timestamps
+    materialized_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<AccountBalanceSnapshot(account={self.account_id}, as_of={self.period_end_date}, balance={self.closing_balance})>"
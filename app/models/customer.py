@@ -4,7 +4,7 @@ from decimal import Decimal
 from enum import Enum
 from typing import TYPE_CHECKING, Optional, List
 
-from sqlalchemy import String, Boolean, DateTime, Date, ForeignKey, Text, Numeric, Index
+from sqlalchemy import String, Boolean, DateTime, Date, ForeignKey, Text, Numeric, Index, Integer
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -457,3 +457,65 @@ class CustomerLedger(Base):
 
     def __repr__(self) -> str:
         return f"<CustomerLedger(customer_id='{self.customer_id}', ref='{self.reference_number}', balance={self.balance})>"
+
+
+class CustomerRFMScore(Base):
+    """
+    Materialized RFM (Recency, Frequency, Monetary) scores per customer.
+
+    Maintained by CustomerRFMService: order aggregates are refreshed only for
+    customers with changed orders, then scores, segment and churn risk are
+    re-ranked across all customers in one pass.
+    """
+    __tablename__ = "customer_rfm_scores"
+    __table_args__ = (
+        Index("ix_customer_rfm_scores_segment", "segment"),
+        Index("ix_customer_rfm_scores_churn_risk", "churn_risk_score"),
+        Index("ix_customer_rfm_scores_total_spent", "total_spent"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4
+    )
+
+    customer_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("customers.id", ondelete="CASCADE"),
+        nullable=False,
+        unique=True
+    )
+
+    # Order aggregates (non-cancelled orders)
+    last_order_date: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    order_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total_spent: Mapped[Decimal] = mapped_column(Numeric(15, 2), nullable=False, default=Decimal("0"))
+
+    # Scores (1-5 quintiles across all customers)
+    r_score: Mapped[int] = mapped_column(Integer, nullable=False, default=3)
+    f_score: Mapped[int] = mapped_column(Integer, nullable=False, default=3)
+    m_score: Mapped[int] = mapped_column(Integer, nullable=False, default=3)
+    rfm_score: Mapped[int] = mapped_column(Integer, nullable=False, default=9)
+
+    segment: Mapped[str] = mapped_column(
+        String(30),
+        nullable=False,
+        comment="champions, loyal_customers, potential_loyalists, new_customers, at_risk, hibernating, lost"
+    )
+    churn_risk_score: Mapped[Decimal] = mapped_column(
+        Numeric(5, 2),
+        nullable=False,
+        default=Decimal("0"),
+        comment="0-1 churn risk"
+    )
+
+    refreshed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+        comment="Order updated_at watermark of the refresh that wrote this row"
+    )
+
+    def __repr__(self) -> str:
+        return f"<CustomerRFMScore(customer_id='{self.customer_id}', rfm={self.rfm_score}, segment='{self.segment}')>"
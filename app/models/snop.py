@@ -873,3 +873,53 @@ class DemandSignal(Base):
         Index("ix_demand_signals_effective", "effective_start", "effective_end"),
         Index("ix_demand_signals_product", "product_id"),
     )
+
+
+class DemandDailyRollup(Base):
+    """
+    Daily delivered-order demand, maintained incrementally.
+
+    One row per (day, product, warehouse, region, channel). Rows with
+    product_id NULL hold the all-product totals for the same dimensions, so
+    channel/region order counts stay exact (an order spans many products).
+
+    Weekly/monthly demand is derived with date_trunc over this table instead
+    of re-aggregating orders x order_items. Maintained by DemandRollupService.
+    """
+    __tablename__ = "demand_daily_rollups"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4
+    )
+
+    day: Mapped[date] = mapped_column(Date, nullable=False, comment="Order creation date")
+    product_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("products.id", ondelete="CASCADE"),
+        nullable=True,
+        comment="NULL = all-product total row"
+    )
+    warehouse_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True), nullable=True)
+    region_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True), nullable=True)
+    channel: Mapped[Optional[str]] = mapped_column(String(50), nullable=True, comment="Order source")
+
+    quantity: Mapped[Decimal] = mapped_column(Numeric(15, 2), default=Decimal("0"))
+    revenue: Mapped[Decimal] = mapped_column(Numeric(15, 2), default=Decimal("0"))
+    order_count: Mapped[int] = mapped_column(Integer, default=0)
+
+    # Incremental refresh watermark (orders updated after it are re-scanned)
+    refreshed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_demand_daily_rollups_product_day", "product_id", "day"),
+        Index("ix_demand_daily_rollups_day", "day"),
+        Index("ix_demand_daily_rollups_refreshed", "refreshed_at"),
+        Index(
+            "uq_demand_daily_rollups_key",
+            "day", "product_id", "warehouse_id", "region_id", "channel",
+            unique=True,
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
@@ -1,7 +1,7 @@
 """
 Tenant management models for multi-tenant architecture
 """
-from sqlalchemy import String, Integer, Boolean, Numeric, DateTime, Text, ForeignKey
+from sqlalchemy import String, Integer, Boolean, Numeric, DateTime, Text, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime, timezone
@@ -371,3 +371,51 @@ class TokenBlacklist(Base):
         DateTime(timezone=True),
         nullable=False
     )
+
+
+class TenantJobLease(Base):
+    """
+    Cluster-wide lease for one shard of a tenant-aware background job.
+
+    Held by one worker while it runs the shard, then kept until the job's
+    minimum gap has passed so other workers skip the same interval.
+    """
+    __tablename__ = "tenant_job_leases"
+    __table_args__ = {'schema': 'public'}
+
+    job_name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    shard: Mapped[int] = mapped_column(Integer, primary_key=True)
+    holder: Mapped[str] = mapped_column(String(255), nullable=False)  # hostname:pid
+    acquired_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    leased_until: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class TenantJobRun(Base):
+    """
+    Run history of tenant-aware background jobs, one row per shard run.
+
+    tenant_results holds the per-tenant status, duration and error.
+    """
+    __tablename__ = "tenant_job_runs"
+    __table_args__ = (
+        Index("ix_tenant_job_runs_job_started", "job_name", "started_at"),
+        {'schema': 'public'},
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4
+    )
+    job_name: Mapped[str] = mapped_column(String(100), nullable=False)
+    shard: Mapped[int] = mapped_column(Integer, nullable=False)
+    shard_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    worker_id: Mapped[str] = mapped_column(String(255), nullable=False)
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    completed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    duration_ms: Mapped[int] = mapped_column(Integer, nullable=False)
+    tenant_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    successful: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    failed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    timed_out: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    tenant_results: Mapped[list] = mapped_column(JSONB, default=list, nullable=False)
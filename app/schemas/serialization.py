@@ -159,7 +159,9 @@ class GenerateSerialsResponse(BaseResponseSchema):
     supplier_code: str
     total_generated: int
     items: List["GeneratedSerialSummary"]
-    barcodes: List[str]
+    # Only for small runs; larger runs are read back through the serial export
+    barcodes: List[str] = []
+    barcodes_truncated: bool = False
 
 
 class GeneratedSerialSummary(BaseModel):
@@ -207,6 +209,13 @@ class POSerialsListResponse(BaseResponseSchema):
     total: int
     by_status: dict
     serials: List[POSerialResponse]
+    next_cursor: Optional[str] = None  # Pass as `after` for the next page
+
+
+class ScanHistoryResponse(BaseResponseSchema):
+    """Received (scanned) serials, newest first."""
+    items: List[POSerialResponse]
+    next_cursor: Optional[str] = None  # Pass as `before` for the next page
 
 
 # ==================== Serial Scan/Validation Schemas ====================
@@ -840,7 +840,7 @@ class MultiSourceRequest(BaseModel):
 class MonteCarloRequest(BaseModel):
     """Request for Monte Carlo simulation."""
     scenario_id: uuid.UUID
-    num_simulations: int = Field(1000, ge=100, le=10000)
+    num_simulations: int = Field(1000, ge=100, le=200000)
     demand_cv: float = Field(0.15, ge=0.01, le=0.5, description="Demand coefficient of variation")
     supply_cv: float = Field(0.10, ge=0.01, le=0.5, description="Supply coefficient of variation")
     lead_time_cv: float = Field(0.20, ge=0.01, le=0.5, description="Lead time coefficient of variation")
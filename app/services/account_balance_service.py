@@ -0,0 +1,199 @@
+"""
+Point-in-time Account Balances
+
+Answers "what was the balance of each account on date D" without scanning
+the whole general ledger:
+
+- AccountBalanceSnapshot stores every account's closing balance at the end
+  of each closed financial period (materialize_period, called on close)
+- GLPostingService keeps snapshots exact when an entry is posted on or
+  before a snapshot date (apply_posting)
+- balances_as_of(D) reads the latest snapshot on or before D and adds one
+  grouped aggregate of the ledger entries between the snapshot and D
+
+Balances are anchored on ChartOfAccount.current_balance: with no snapshot,
+the balance on D is current_balance minus the ledger movement after D, which
+is also how snapshots are materialized. Both paths therefore agree with the
+running balance even for accounts created with an opening balance.
+"""
+
+import logging
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import select, update, delete, insert, case, func, literal, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.accounting import (
+    AccountBalanceSnapshot,
+    AccountType,
+    ChartOfAccount,
+    FinancialPeriod,
+    GeneralLedger,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _signed_amount():
+    """SQL balance change of a ledger row (see gl_posting_service.balance_change)."""
+    return case(
+        (
+            ChartOfAccount.account_type.in_([AccountType.ASSET.value, AccountType.EXPENSE.value]),
+            GeneralLedger.debit_amount - GeneralLedger.credit_amount,
+        ),
+        else_=GeneralLedger.credit_amount - GeneralLedger.debit_amount,
+    )
+
+
+def _movement_query(after: Optional[date] = None, through: Optional[date] = None):
+    """Per-account net balance change for ledger rows in (after, through]."""
+    conditions = []
+    if after is not None:
+        conditions.append(GeneralLedger.transaction_date > after)
+    if through is not None:
+        conditions.append(GeneralLedger.transaction_date <= through)
+    return (
+        select(
+            GeneralLedger.account_id.label("account_id"),
+            func.sum(_signed_amount()).label("delta"),
+        )
+        .join(ChartOfAccount, ChartOfAccount.id == GeneralLedger.account_id)
+        .where(and_(*conditions))
+        .group_by(GeneralLedger.account_id)
+    )
+
+
+class AccountBalanceService:
+    """Materializes and reads point-in-time account balances."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    # ==================== Snapshots ====================
+
+    async def materialize_period(self, period: FinancialPeriod) -> int:
+        """
+        Snapshot every account's balance at period.end_date. Does not commit.
+
+        The INSERT ... SELECT reads current_balance and the later ledger
+        movement in one statement, so concurrent postings can't skew it.
+        Re-closing a reopened period replaces its snapshot.
+        """
+        later = _movement_query(after=period.end_date).subquery()
+        await self.db.execute(
+            delete(AccountBalanceSnapshot).where(AccountBalanceSnapshot.period_id == period.id)
+        )
+        result = await self.db.execute(
+            insert(AccountBalanceSnapshot).from_select(
+                ["id", "account_id", "period_id", "period_end_date", "closing_balance", "materialized_at"],
+                select(
+                    func.gen_random_uuid(),
+                    ChartOfAccount.id,
+                    literal(period.id),
+                    literal(period.end_date),
+                    func.coalesce(ChartOfAccount.current_balance, 0) - func.coalesce(later.c.delta, 0),
+                    literal(datetime.now(timezone.utc)),
+                )
+                .outerjoin(later, later.c.account_id == ChartOfAccount.id)
+            )
+        )
+        logger.info(
+            f"Balance snapshot materialized for period {period.period_name} "
+            f"({period.end_date.isoformat()}): {result.rowcount} accounts"
+        )
+        return result.rowcount
+
+    async def apply_posting(self, entry_date: date, deltas: Dict[uuid.UUID, Decimal]) -> None:
+        """Add a posting's balance deltas to snapshots dated on or after entry_date."""
+        if not deltas:
+            return
+        await self.db.execute(
+            update(AccountBalanceSnapshot)
+            .where(
+                and_(
+                    AccountBalanceSnapshot.period_end_date >= entry_date,
+                    AccountBalanceSnapshot.account_id.in_(list(deltas)),
+                )
+            )
+            .values(
+                closing_balance=AccountBalanceSnapshot.closing_balance
+                + case(deltas, value=AccountBalanceSnapshot.account_id, else_=0)
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    # ==================== Reads ====================
+
+    async def _anchored_balances(
+        self,
+        as_of_date: date,
+        account_ids: Optional[Iterable[uuid.UUID]] = None,
+    ) -> Dict[uuid.UUID, Decimal]:
+        """current_balance minus movement after as_of_date (no snapshot needed)."""
+        later = _movement_query(after=as_of_date).subquery()
+        query = select(
+            ChartOfAccount.id,
+            func.coalesce(ChartOfAccount.current_balance, 0) - func.coalesce(later.c.delta, 0),
+        ).outerjoin(later, later.c.account_id == ChartOfAccount.id)
+        if account_ids is not None:
+            query = query.where(ChartOfAccount.id.in_(list(account_ids)))
+        result = await self.db.execute(query)
+        return {account_id: Decimal(str(balance)) for account_id, balance in result.all()}
+
+    async def balances_as_of(self, as_of_date: date) -> Dict[uuid.UUID, Decimal]:
+        """Balance of every account at the end of as_of_date."""
+        snapshot_date = (await self.db.execute(
+            select(func.max(AccountBalanceSnapshot.period_end_date))
+            .where(AccountBalanceSnapshot.period_end_date <= as_of_date)
+        )).scalar()
+
+        if snapshot_date is None:
+            return await self._anchored_balances(as_of_date)
+
+        snapshot_result = await self.db.execute(
+            select(AccountBalanceSnapshot.account_id, AccountBalanceSnapshot.closing_balance)
+            .where(AccountBalanceSnapshot.period_end_date == snapshot_date)
+        )
+        # Overlapping periods (month/quarter/year) share end dates and values
+        balances = {account_id: Decimal(str(balance)) for account_id, balance in snapshot_result.all()}
+
+        if as_of_date > snapshot_date:
+            movement = await self.db.execute(_movement_query(after=snapshot_date, through=as_of_date))
+            for account_id, delta in movement.all():
+                if account_id in balances:
+                    balances[account_id] += Decimal(str(delta or 0))
+
+        # Accounts created after the snapshot
+        account_ids = set((await self.db.execute(select(ChartOfAccount.id))).scalars().all())
+        missing = account_ids - set(balances)
+        if missing:
+            balances.update(await self._anchored_balances(as_of_date, missing))
+        return balances
+
+    async def period_movements(
+        self,
+        start_date: date,
+        end_date: date,
+    ) -> Dict[uuid.UUID, Tuple[Decimal, Decimal]]:
+        """Total (debit, credit) posted to each account in [start_date, end_date]."""
+        result = await self.db.execute(
+            select(
+                GeneralLedger.account_id,
+                func.coalesce(func.sum(GeneralLedger.debit_amount), 0),
+                func.coalesce(func.sum(GeneralLedger.credit_amount), 0),
+            )
+            .where(
+                and_(
+                    GeneralLedger.transaction_date >= start_date,
+                    GeneralLedger.transaction_date <= end_date,
+                )
+            )
+            .group_by(GeneralLedger.account_id)
+        )
+        return {
+            account_id: (Decimal(str(debit)), Decimal(str(credit)))
+            for account_id, debit, credit in result.all()
+        }
@@ -21,6 +21,7 @@ from app.models.accounting import (
     GeneralLedger, FinancialPeriod, JournalEntryStatus,
     FinancialPeriodStatus, AccountType,
 )
+from app.services.gl_posting_service import GLPostingService
 
 
 class AccountingService:
@@ -217,41 +218,7 @@ class AccountingService:
 
     async def _post_journal_entry(self, journal_entry: JournalEntry, created_lines: List):
         """Post journal entry to general ledger."""
-        for line_id, line in created_lines:
-            # Get current account balance for running balance calculation
-            account_result = await self.db.execute(
-                select(ChartOfAccount).where(ChartOfAccount.id == line.account_id)
-            )
-            account = account_result.scalar_one()
-
-            # Calculate balance change
-            # For Asset/Expense: Debit increases, Credit decreases
-            # For Liability/Equity/Revenue: Credit increases, Debit decreases
-            if account.account_type in [AccountType.ASSET, AccountType.EXPENSE]:
-                balance_change = line.debit_amount - line.credit_amount
-            else:
-                balance_change = line.credit_amount - line.debit_amount
-
-            new_balance = account.current_balance + balance_change
-
-            # Create GL entry
-            gl_entry = GeneralLedger(
-                id=uuid.uuid4(),
-                account_id=line.account_id,
-                period_id=journal_entry.period_id,
-                transaction_date=journal_entry.entry_date,
-                journal_entry_id=journal_entry.id,
-                journal_line_id=line_id,
-                debit_amount=line.debit_amount,
-                credit_amount=line.credit_amount,
-                running_balance=new_balance,
-                narration=line.description or journal_entry.narration,
-                channel_id=journal_entry.channel_id,
-            )
-            self.db.add(gl_entry)
-
-            # Update account balance
-            account.current_balance = new_balance
+        await GLPostingService(self.db).post(journal_entry, [line for _, line in created_lines])
 
         # Update journal entry status
         journal_entry.status = JournalEntryStatus.POSTED.value
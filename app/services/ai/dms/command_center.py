@@ -3,11 +3,11 @@ DMS AI Command Center
 
 Aggregator for all 4 DMS AI agents.
 Returns combined status, alerts, and recommendations.
-Uses parallel execution and in-memory caching for fast response.
+Uses parallel execution; dashboards are served from shared snapshots
+(app.services.ai.snapshot_store) refreshed in the background.
 """
 
 import asyncio
-import time
 from datetime import datetime, timezone
 from typing import Dict, List, Optional
 from uuid import UUID
@@ -15,34 +15,35 @@ from uuid import UUID
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.middleware.tenant import get_current_tenant_id
+from app.services.ai.snapshot_store import get_snapshot_store
+
 from app.services.ai.dms.dealer_performance import DMSDealerPerformanceAgent
 from app.services.ai.dms.collection_optimizer import DMSCollectionOptimizerAgent
 from app.services.ai.dms.scheme_effectiveness import DMSSchemeEffectivenessAgent
 from app.services.ai.dms.demand_sensing import DMSDemandSensingAgent
 
-# In-memory TTL cache: {schema: {"data": ..., "ts": ...}}
-_dashboard_cache: Dict[str, Dict] = {}
-_CACHE_TTL = 120  # seconds
-
 
 class DMSCommandCenter:
     """
     Aggregates all DMS AI agents into a unified command center.
     """
 
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, tenant_id=None):
         self.db = db
+        self.tenant_id = tenant_id
 
     async def _get_schema(self) -> str:
+        schema = self.db.info.get("tenant_schema")
+        if schema:
+            return schema
         result = await self.db.execute(text("SELECT current_setting('search_path')"))
-        return result.scalar() or "public"
+        return (result.scalar() or "public").split(",")[0].strip().strip('"')
 
     async def _run_agent(self, agent_class, schema: str, **kwargs) -> tuple:
         """Run a single agent with its own DB session for parallel execution."""
-        from app.database import engine
-        async with engine.connect() as conn:
-            await conn.execute(text(f'SET search_path TO {schema}'))
-            session = AsyncSession(bind=conn, expire_on_commit=False)
+        from app.database import tenant_session_scope
+        async with tenant_session_scope(schema) as session:
             try:
                 agent = agent_class(session)
                 await agent.analyze(**kwargs)
@@ -53,18 +54,15 @@ class DMSCommandCenter:
                 agent = agent_class(session)
                 status = await agent.get_status()
                 return status, []
-            finally:
-                await session.close()
 
     async def get_dashboard(self) -> Dict:
-        """Get full DMS AI dashboard data (cached, parallel agents)."""
+        """Get full DMS AI dashboard data from its snapshot (recomputed in the background)."""
         schema = await self._get_schema()
+        tenant_id = self.tenant_id or get_current_tenant_id() or schema
+        return await get_snapshot_store().get(tenant_id, "dms", lambda: self.build_dashboard(schema))
 
-        # Check cache
-        cached = _dashboard_cache.get(schema)
-        if cached and (time.time() - cached["ts"]) < _CACHE_TTL:
-            return cached["data"]
-
+    async def build_dashboard(self, schema: str) -> Dict:
+        """Compute the DMS AI dashboard by running all agents in parallel."""
         # Run all 4 agents in parallel, each with its own DB session
         agent_classes = [
             DMSDealerPerformanceAgent,
@@ -109,8 +107,6 @@ class DMSCommandCenter:
             "recommendations": all_recommendations[:30],
         }
 
-        # Store in cache
-        _dashboard_cache[schema] = {"data": data, "ts": time.time()}
         return data
 
     def _agent_map(self) -> Dict:
@@ -12,23 +12,48 @@ Weighted scoring (0-100) for order fraud risk:
 
 Output: risk_score, risk_level (LOW/MEDIUM/HIGH/CRITICAL), factors[]
 
+Scoring is split into feature extraction and a pure scorer. Features for a
+whole batch of orders come from three grouped queries (orders, item
+quantities, per-customer order/velocity/return counts), whatever the batch
+size. score_new_order is the inline entry point for order creation: it uses
+the in-memory order and items and one bounded customer-features query.
+
 No external ML libraries required - pure Python implementation.
 """
 
+from dataclasses import dataclass
 from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
-from typing import List, Dict, Optional, Tuple, Any
+from typing import Iterable, List, Dict, Optional, Sequence, Tuple, Any
 from uuid import UUID
+import logging
 import math
 from collections import defaultdict
 
-from sqlalchemy import select, func, and_, or_, desc
+from sqlalchemy import select, func, and_, or_, desc, text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.order import Order, OrderItem, OrderStatus, PaymentMethod
 from app.models.customer import Customer
 from app.models.return_order import ReturnOrder
 
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FraudFeatures:
+    """Per-order inputs of the DB-backed factors."""
+    total_quantity: int = 0
+    max_item_quantity: int = 0
+    orders_24h: int = 0  # Customer's orders in the last 24h, this one included
+    total_orders: int = 0  # Customer's orders, this one included
+    total_returns: int = 0
+
+    @property
+    def prior_orders(self) -> int:
+        return max(self.total_orders - 1, 0)
+
 
 class OMSFraudDetectionAgent:
     """
@@ -79,21 +104,12 @@ class OMSFraudDetectionAgent:
                 return 10, f"Moderately high COD order: INR {total:,.0f}"
         return 0, None
 
-    async def _score_velocity(self, customer_id: UUID) -> Tuple[float, Optional[str]]:
+    def _score_velocity(self, order: Any, features: FraudFeatures) -> Tuple[float, Optional[str]]:
         """Check order velocity from same customer in 24h."""
-        cutoff = datetime.now(timezone.utc) - timedelta(hours=24)
-
-        result = await self.db.execute(
-            select(func.count(Order.id))
-            .where(
-                and_(
-                    Order.customer_id == customer_id,
-                    Order.created_at >= cutoff,
-                )
-            )
-        )
-        count = result.scalar() or 0
+        if not order.customer_id:
+            return 0, None
 
+        count = features.orders_24h
         if count > 5:
             return 20, f"Customer placed {count} orders in 24h - very unusual velocity"
         elif count > 3:
@@ -102,22 +118,12 @@ class OMSFraudDetectionAgent:
             return 5, f"Customer placed {count} orders in 24h"
         return 0, None
 
-    async def _score_new_customer_high_value(self, order: Any) -> Tuple[float, Optional[str]]:
+    def _score_new_customer_high_value(self, order: Any, features: FraudFeatures) -> Tuple[float, Optional[str]]:
         """Score for new customer placing high-value order."""
         if not order.customer_id:
             return 0, None
 
-        # Check customer order history
-        result = await self.db.execute(
-            select(func.count(Order.id))
-            .where(
-                and_(
-                    Order.customer_id == order.customer_id,
-                    Order.id != order.id,
-                )
-            )
-        )
-        prev_orders = result.scalar() or 0
+        prev_orders = features.prior_orders
         total = float(order.total_amount or 0)
 
         if prev_orders == 0 and total > 20000:
@@ -126,21 +132,13 @@ class OMSFraudDetectionAgent:
             return 10, f"New customer (only {prev_orders} prior orders) with order value INR {total:,.0f}"
         return 0, None
 
-    async def _score_return_history(self, customer_id: UUID) -> Tuple[float, Optional[str]]:
+    def _score_return_history(self, order: Any, features: FraudFeatures) -> Tuple[float, Optional[str]]:
         """Score based on customer return rate."""
-        if not customer_id:
+        if not order.customer_id:
             return 0, None
 
-        order_count_result = await self.db.execute(
-            select(func.count(Order.id)).where(Order.customer_id == customer_id)
-        )
-        total_orders = order_count_result.scalar() or 0
-
-        return_count_result = await self.db.execute(
-            select(func.count(ReturnOrder.id)).where(ReturnOrder.customer_id == customer_id)
-        )
-        total_returns = return_count_result.scalar() or 0
-
+        total_orders = features.total_orders
+        total_returns = features.total_returns
         if total_orders == 0:
             return 0, None
 
@@ -151,13 +149,10 @@ class OMSFraudDetectionAgent:
             return 8, f"Elevated return rate: {return_rate:.0%} ({total_returns}/{total_orders})"
         return 0, None
 
-    def _score_quantity_anomaly(self, order: Any, items: List[Any]) -> Tuple[float, Optional[str]]:
+    def _score_quantity_anomaly(self, order: Any, features: FraudFeatures) -> Tuple[float, Optional[str]]:
         """Score for unusual quantity patterns."""
-        if not items:
-            return 0, None
-
-        total_qty = sum(getattr(item, 'quantity', 0) for item in items)
-        max_single = max((getattr(item, 'quantity', 0) for item in items), default=0)
+        total_qty = features.total_quantity
+        max_single = features.max_item_quantity
 
         if max_single > 50:
             return 12, f"Single item quantity of {max_single} - unusually high"
@@ -176,72 +171,100 @@ class OMSFraudDetectionAgent:
             return 8, f"Order placed at unusual hour: {hour}:00"
         return 0, None
 
-    # ==================== Score an Order ====================
+    # ==================== Feature Extraction ====================
 
-    async def score_order(self, order_id: UUID) -> Dict:
-        """Score a single order for fraud risk."""
+    async def _order_quantities(self, order_ids: Sequence[UUID]) -> Dict[UUID, Tuple[int, int]]:
+        """(total quantity, largest line quantity) per order, in one grouped query."""
+        if not order_ids:
+            return {}
         result = await self.db.execute(
-            select(Order).where(Order.id == order_id)
+            select(
+                OrderItem.order_id,
+                func.coalesce(func.sum(OrderItem.quantity), 0),
+                func.coalesce(func.max(OrderItem.quantity), 0),
+            )
+            .where(OrderItem.order_id.in_(order_ids))
+            .group_by(OrderItem.order_id)
         )
-        order = result.scalar_one_or_none()
+        return {row[0]: (int(row[1]), int(row[2])) for row in result.all()}
 
-        if not order:
-            return {"error": f"Order {order_id} not found"}
+    async def _customer_stats(self, customer_ids: Iterable[UUID]) -> Dict[UUID, Tuple[int, int, int]]:
+        """(orders, orders in last 24h, returns) per customer, in one grouped query."""
+        customer_ids = list({cid for cid in customer_ids if cid})
+        if not customer_ids:
+            return {}
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=24)
 
-        # Get order items
-        items_result = await self.db.execute(
-            select(OrderItem).where(OrderItem.order_id == order_id)
+        orders = (
+            select(
+                Order.customer_id.label("customer_id"),
+                func.count(Order.id).label("total_orders"),
+                func.count(Order.id).filter(Order.created_at >= cutoff).label("orders_24h"),
+            )
+            .where(Order.customer_id.in_(customer_ids))
+            .group_by(Order.customer_id)
+            .subquery()
         )
-        items = items_result.scalars().all()
-
-        # Calculate all factor scores
-        factors = []
-        total_score = 0
-
-        # 1. Address mismatch
-        score, reason = self._score_address_mismatch(order)
-        if score > 0:
-            factors.append({"factor": "address_mismatch", "score": score, "reason": reason})
-            total_score += score
-
-        # 2. High-value COD
-        score, reason = self._score_high_value_cod(order)
-        if score > 0:
-            factors.append({"factor": "high_value_cod", "score": score, "reason": reason})
-            total_score += score
+        returns = (
+            select(
+                ReturnOrder.customer_id.label("customer_id"),
+                func.count(ReturnOrder.id).label("total_returns"),
+            )
+            .where(ReturnOrder.customer_id.in_(customer_ids))
+            .group_by(ReturnOrder.customer_id)
+            .subquery()
+        )
+        result = await self.db.execute(
+            select(
+                orders.c.customer_id,
+                orders.c.total_orders,
+                orders.c.orders_24h,
+                func.coalesce(returns.c.total_returns, 0),
+            ).select_from(
+                orders.outerjoin(returns, returns.c.customer_id == orders.c.customer_id)
+            )
+        )
+        return {row[0]: (int(row[1]), int(row[2]), int(row[3])) for row in result.all()}
+
+    async def extract_features(self, orders: Sequence[Any]) -> Dict[UUID, FraudFeatures]:
+        """Features for a batch of persisted orders (two grouped queries)."""
+        quantities = await self._order_quantities([o.id for o in orders])
+        stats = await self._customer_stats(o.customer_id for o in orders)
+
+        features = {}
+        for order in orders:
+            total_qty, max_qty = quantities.get(order.id, (0, 0))
+            total_orders, orders_24h, total_returns = stats.get(order.customer_id, (0, 0, 0))
+            features[order.id] = FraudFeatures(
+                total_quantity=total_qty,
+                max_item_quantity=max_qty,
+                orders_24h=orders_24h,
+                total_orders=total_orders,
+                total_returns=total_returns,
+            )
+        return features
 
-        # 3. Velocity
-        if order.customer_id:
-            score, reason = await self._score_velocity(order.customer_id)
-            if score > 0:
-                factors.append({"factor": "velocity", "score": score, "reason": reason})
-                total_score += score
+    # ==================== Score an Order ====================
 
-        # 4. New customer + high value
-        score, reason = await self._score_new_customer_high_value(order)
-        if score > 0:
-            factors.append({"factor": "new_customer_high_value", "score": score, "reason": reason})
-            total_score += score
+    def score_features(self, order: Any, features: FraudFeatures) -> Dict:
+        """Score one order from its extracted features (no I/O)."""
+        checks = (
+            ("address_mismatch", self._score_address_mismatch(order)),
+            ("high_value_cod", self._score_high_value_cod(order)),
+            ("velocity", self._score_velocity(order, features)),
+            ("new_customer_high_value", self._score_new_customer_high_value(order, features)),
+            ("return_history", self._score_return_history(order, features)),
+            ("quantity_anomaly", self._score_quantity_anomaly(order, features)),
+            ("time_of_day", self._score_time_of_day(order)),
+        )
 
-        # 5. Return history
-        if order.customer_id:
-            score, reason = await self._score_return_history(order.customer_id)
+        factors = []
+        total_score = 0
+        for name, (score, reason) in checks:
             if score > 0:
-                factors.append({"factor": "return_history", "score": score, "reason": reason})
+                factors.append({"factor": name, "score": score, "reason": reason})
                 total_score += score
 
-        # 6. Quantity anomaly
-        score, reason = self._score_quantity_anomaly(order, items)
-        if score > 0:
-            factors.append({"factor": "quantity_anomaly", "score": score, "reason": reason})
-            total_score += score
-
-        # 7. Time of day
-        score, reason = self._score_time_of_day(order)
-        if score > 0:
-            factors.append({"factor": "time_of_day", "score": score, "reason": reason})
-            total_score += score
-
         # Cap at 100
         risk_score = min(100, total_score)
 
@@ -256,7 +279,7 @@ class OMSFraudDetectionAgent:
             risk_level = "LOW"
 
         return {
-            "order_id": str(order_id),
+            "order_id": str(order.id),
             "risk_score": risk_score,
             "risk_level": risk_level,
             "factors": factors,
@@ -266,6 +289,67 @@ class OMSFraudDetectionAgent:
             "scored_at": datetime.now(timezone.utc).isoformat(),
         }
 
+    async def score_orders(self, orders: Sequence[Any]) -> List[Dict]:
+        """Score a batch of persisted orders with grouped feature queries."""
+        features = await self.extract_features(orders)
+        return [self.score_features(order, features[order.id]) for order in orders]
+
+    async def score_order(self, order_id: UUID) -> Dict:
+        """Score a single order for fraud risk."""
+        result = await self.db.execute(
+            select(Order).where(Order.id == order_id)
+        )
+        order = result.scalar_one_or_none()
+
+        if not order:
+            return {"error": f"Order {order_id} not found"}
+
+        return (await self.score_orders([order]))[0]
+
+    async def score_new_order(
+        self,
+        order: Any,
+        item_quantities: Sequence[int],
+        budget_ms: int = 150,
+    ) -> Dict:
+        """
+        Score a just-created order inline.
+
+        Uses the in-memory order and its item quantities; the customer
+        features come from one query bounded by a statement_timeout of
+        budget_ms. If it does not finish in time the order is scored on its
+        own factors and the result is marked "partial".
+
+        Safe on the caller's open transaction (the order need not be
+        committed yet): the features query runs in a SAVEPOINT with SET
+        LOCAL statement_timeout, and the savepoint is always rolled back.
+        That reverts the timeout and, on a timeout, only the failed query;
+        the caller's changes and transaction stay intact.
+        """
+        features = FraudFeatures(
+            total_quantity=sum(item_quantities),
+            max_item_quantity=max(item_quantities, default=0),
+        )
+        partial = False
+        if order.customer_id:
+            savepoint = await self.db.begin_nested()
+            try:
+                await self.db.execute(text(f"SET LOCAL statement_timeout = {int(budget_ms)}"))
+                stats = await self._customer_stats([order.customer_id])
+                features.total_orders, features.orders_24h, features.total_returns = stats.get(
+                    order.customer_id, (0, 0, 0)
+                )
+            except DBAPIError as e:
+                partial = True
+                logger.warning(f"Fraud features for order {order.id} not loaded within {budget_ms}ms: {e}")
+            finally:
+                # Read-only work: ROLLBACK TO SAVEPOINT also restores statement_timeout
+                await savepoint.rollback()
+
+        result = self.score_features(order, features)
+        result["partial"] = partial
+        return result
+
     # ==================== Batch Analysis ====================
 
     async def analyze(self, days: int = 7, limit: int = 50) -> Dict:
@@ -275,21 +359,17 @@ class OMSFraudDetectionAgent:
             cutoff = datetime.now(timezone.utc) - timedelta(days=days)
 
             result = await self.db.execute(
-                select(Order.id)
+                select(Order)
                 .where(Order.created_at >= cutoff)
                 .order_by(desc(Order.created_at))
                 .limit(limit)
             )
-            order_ids = [row[0] for row in result.all()]
+            orders = result.scalars().all()
 
-            scored_orders = []
+            scored_orders = await self.score_orders(orders)
             risk_counts = defaultdict(int)
-
-            for oid in order_ids:
-                score = await self.score_order(oid)
-                if "error" not in score:
-                    scored_orders.append(score)
-                    risk_counts[score["risk_level"]] += 1
+            for score in scored_orders:
+                risk_counts[score["risk_level"]] += 1
 
             # Sort by risk score descending
             scored_orders.sort(key=lambda x: x["risk_score"], reverse=True)
@@ -0,0 +1,235 @@
+"""
+AI Command Center Snapshot Store
+
+Dashboards of the OMS/WMS/DMS command centers are served from snapshots
+kept in CacheService (Redis when configured, so every worker shares them):
+
+- Fresh snapshot (younger than AI_SNAPSHOT_FRESH_SECONDS): served as is
+- Stale snapshot (up to AI_SNAPSHOT_MAX_STALE_SECONDS): served immediately
+  while one background refresh recomputes it (stale-while-revalidate)
+- No snapshot: computed inline, once - concurrent requests in the process
+  await the same computation, and other workers wait briefly for the
+  snapshot of whichever worker holds the refresh lock
+
+Recomputation is single-flight: in-process through the in-flight task map,
+across workers through a short lock counter in CacheService.
+
+Reads record which dashboards a tenant uses; the refresh_ai_snapshots
+tenant job recomputes those ahead of expiry, so dashboards in use answer
+from a snapshot without running agents on the request path.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# CacheService keys (tenant prefix added by CacheService)
+_SNAPSHOT_KEY = "ai_snapshot:{name}"
+_LOCK_KEY = "ai_snapshot:{name}:lock"
+_ACTIVE_KEY = "ai_snapshot:active"
+
+# Seconds between read markers written per dashboard by one process
+_READ_MARK_INTERVAL = 60
+# Poll interval while another worker computes a missing snapshot
+_COLD_POLL_SECONDS = 0.25
+
+Builder = Callable[[], Awaitable[Dict[str, Any]]]
+
+
+class AISnapshotStore:
+    """Shared dashboard snapshots with single-flight, stale-while-revalidate refresh."""
+
+    def __init__(
+        self,
+        fresh_seconds: int = 120,
+        max_stale_seconds: int = 3600,
+        lock_seconds: int = 300,
+        active_seconds: int = 1800,
+        cold_wait_seconds: int = 20,
+        cache=None,
+    ):
+        self._fresh = fresh_seconds
+        self._max_stale = max_stale_seconds
+        self._lock_seconds = lock_seconds
+        self._active_seconds = active_seconds
+        self._cold_wait = cold_wait_seconds
+        self._shared = cache
+        # Format: {(tenant_id, name): Task}
+        self._inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+        # Format: {(tenant_id, name): last read marker written (epoch)}
+        self._read_marks: Dict[Tuple[str, str], float] = {}
+        self._fresh_hits = 0
+        self._stale_hits = 0
+        self._cold_misses = 0
+        self._refreshes = 0
+        self._refresh_errors = 0
+
+    def _cache(self):
+        if self._shared is None:
+            from app.services.cache_service import get_cache
+            self._shared = get_cache()
+        return self._shared
+
+    async def get(self, tenant_id, name: str, build: Builder) -> Dict[str, Any]:
+        """Dashboard `name` for a tenant, from its snapshot whenever one exists."""
+        tenant_id = str(tenant_id)
+        snapshot_key = _SNAPSHOT_KEY.format(name=name)
+        lock_key = _LOCK_KEY.format(name=name)
+        await self._mark_read(tenant_id, name)
+
+        values = await self._cache().get_many(tenant_id, [snapshot_key, lock_key])
+        snapshot = values.get(snapshot_key)
+        if snapshot is not None:
+            if time.time() - snapshot["computed_at"] < self._fresh:
+                self._fresh_hits += 1
+            else:
+                self._stale_hits += 1
+                if lock_key not in values:
+                    self._start(tenant_id, name, build, force=False)
+            return snapshot["data"]
+
+        self._cold_misses += 1
+        if lock_key in values:
+            # Another worker is computing it: wait for its snapshot first
+            deadline = time.monotonic() + self._cold_wait
+            while time.monotonic() < deadline:
+                await asyncio.sleep(_COLD_POLL_SECONDS)
+                snapshot = await self._cache().get(tenant_id, snapshot_key)
+                if snapshot is not None:
+                    return snapshot["data"]
+        data = await asyncio.shield(self._start(tenant_id, name, build, force=True))
+        if data is None:
+            # Joined a background refresh that yielded to another worker's lock
+            snapshot = await self._cache().get(tenant_id, snapshot_key)
+            if snapshot is not None:
+                return snapshot["data"]
+            data = await self._compute(tenant_id, name, build, force=True)
+        return data
+
+    async def refresh(self, tenant_id, name: str, build: Builder) -> bool:
+        """
+        Recompute a snapshot unless another process is already doing so.
+
+        Returns True if this call stored a new snapshot.
+        """
+        tenant_id = str(tenant_id)
+        try:
+            task = self._start(tenant_id, name, build, force=False)
+            return await asyncio.shield(task) is not None
+        except Exception:
+            return False
+
+    async def refresh_active(self, tenant_id, builder_for: Callable[[str], Optional[Builder]]) -> int:
+        """
+        Recompute the tenant's recently read dashboards that are past half
+        their freshness window. Returns the number refreshed.
+        """
+        tenant_id = str(tenant_id)
+        active = await self._cache().get(tenant_id, _ACTIVE_KEY) or {}
+        now = time.time()
+        refreshed = 0
+        for name, read_at in active.items():
+            if now - read_at >= self._active_seconds:
+                continue
+            snapshot = await self._cache().get(tenant_id, _SNAPSHOT_KEY.format(name=name))
+            if snapshot is not None and now - snapshot["computed_at"] < self._fresh / 2:
+                continue
+            build = builder_for(name)
+            if build is not None and await self.refresh(tenant_id, name, build):
+                refreshed += 1
+        return refreshed
+
+    def _start(self, tenant_id: str, name: str, build: Builder, force: bool) -> asyncio.Task:
+        """The in-flight computation for a snapshot, starting one if needed."""
+        key = (tenant_id, name)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._compute(tenant_id, name, build, force))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, key=key: self._finished(key, t))
+        return task
+
+    def _finished(self, key: Tuple[str, str], task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"AI snapshot {key[1]} for tenant {key[0]} failed: {task.exception()}")
+
+    async def _compute(self, tenant_id: str, name: str, build: Builder, force: bool) -> Optional[Dict[str, Any]]:
+        lock_key = _LOCK_KEY.format(name=name)
+        acquired = await self._acquire(tenant_id, lock_key)
+        if not acquired and not force:
+            return None
+        try:
+            data = jsonable_encoder(await build())
+            await self._cache().set(
+                tenant_id,
+                _SNAPSHOT_KEY.format(name=name),
+                {"data": data, "computed_at": time.time()},
+                ttl=self._max_stale,
+            )
+            self._refreshes += 1
+            return data
+        except Exception:
+            self._refresh_errors += 1
+            raise
+        finally:
+            if acquired:
+                await self._cache().delete(tenant_id, lock_key)
+
+    async def _acquire(self, tenant_id: str, lock_key: str) -> bool:
+        """Take the cross-worker refresh lock (expires after lock_seconds)."""
+        try:
+            return await self._cache().incr_by(tenant_id, lock_key, 1, ttl=self._lock_seconds) == 1
+        except Exception as e:
+            # Shared backend unreachable: single-flight stays per process
+            logger.warning(f"AI snapshot lock unavailable: {e}")
+            return True
+
+    async def _mark_read(self, tenant_id: str, name: str) -> None:
+        """Record that a dashboard is in use (throttled per process)."""
+        now = time.time()
+        key = (tenant_id, name)
+        if now - self._read_marks.get(key, 0) < _READ_MARK_INTERVAL:
+            return
+        self._read_marks[key] = now
+        active = await self._cache().get(tenant_id, _ACTIVE_KEY) or {}
+        active[name] = now
+        active = {n: t for n, t in active.items() if now - t < self._active_seconds}
+        await self._cache().set(tenant_id, _ACTIVE_KEY, active, ttl=self._active_seconds)
+
+    def stats(self) -> dict:
+        """Hit/refresh counters for monitoring."""
+        return {
+            "fresh_hits": self._fresh_hits,
+            "stale_hits": self._stale_hits,
+            "cold_misses": self._cold_misses,
+            "refreshes": self._refreshes,
+            "refresh_errors": self._refresh_errors,
+            "inflight": len(self._inflight),
+        }
+
+
+# Singleton store instance
+_snapshot_store: Optional[AISnapshotStore] = None
+
+
+def get_snapshot_store() -> AISnapshotStore:
+    """Get the AI snapshot store singleton."""
+    global _snapshot_store
+
+    if _snapshot_store is None:
+        _snapshot_store = AISnapshotStore(
+            fresh_seconds=settings.AI_SNAPSHOT_FRESH_SECONDS,
+            max_stale_seconds=settings.AI_SNAPSHOT_MAX_STALE_SECONDS,
+            lock_seconds=settings.AI_SNAPSHOT_LOCK_SECONDS,
+            active_seconds=settings.AI_SNAPSHOT_ACTIVE_SECONDS,
+        )
+
+    return _snapshot_store
@@ -17,7 +17,9 @@ Priority-Based Flow:
 5. Log allocation decision with cost breakdown
 """
 import uuid
+import logging
 from typing import Optional, List, Dict, Any, Tuple
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from decimal import Decimal
 import json
@@ -41,6 +43,7 @@ from app.models.order import Order, OrderItem, OrderStatus
 from app.models.channel import ChannelInventory, SalesChannel
 from app.services.cache_service import get_cache
 from app.services.channel_inventory_service import ChannelInventoryService
+from app.middleware.tenant import get_current_tenant_id
 from app.config import settings
 from app.schemas.serviceability import (
     OrderAllocationRequest,
@@ -64,11 +67,86 @@ except ImportError:
     PRICING_ENGINE_AVAILABLE = False
 
 
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StockAvailabilityMatrix:
+    """
+    Channel and shared-pool availability for a set of (warehouse, product) pairs.
+
+    Built by AllocationService.get_stock_availability_matrix() with set-based
+    queries and a single soft-reservation multi-get, so per-warehouse stock
+    checks are dictionary lookups.
+    """
+    channel_id: Optional[uuid.UUID] = None
+    # {(warehouse_id, product_id): allocated - buffer - reserved} for the channel
+    channel_available: Dict[Tuple[uuid.UUID, uuid.UUID], int] = field(default_factory=dict)
+    # {(warehouse_id, product_id): (available_quantity, reserved_quantity)} from InventorySummary
+    summary: Dict[Tuple[uuid.UUID, uuid.UUID], Tuple[int, int]] = field(default_factory=dict)
+    # {product_id: qty} checkout soft reservations (shared pool / channel)
+    soft_reserved: Dict[uuid.UUID, int] = field(default_factory=dict)
+    channel_soft_reserved: Dict[uuid.UUID, int] = field(default_factory=dict)
+
+    def shared_available(self, warehouse_id: uuid.UUID, product_id: uuid.UUID) -> Optional[int]:
+        """Shared-pool available = DB available - DB reserved - soft reserved (None if no summary row)."""
+        row = self.summary.get((warehouse_id, product_id))
+        if row is None:
+            return None
+        db_available, db_reserved = row
+        return db_available - db_reserved - self.soft_reserved.get(product_id, 0)
+
+    def has_stock(
+        self,
+        warehouse_id: uuid.UUID,
+        product_ids: List[str],
+        quantities: Optional[Dict[str, int]] = None
+    ) -> bool:
+        """
+        Check if a warehouse has stock for all products.
+
+        Channel inventory is checked first when the matrix was built for a
+        channel; D2C_FALLBACK_STRATEGY decides whether a shortfall falls
+        through to the shared pool.
+        """
+        if not product_ids:
+            return True
+
+        fallback = getattr(settings, 'D2C_FALLBACK_STRATEGY', 'SHARED_POOL')
+
+        for product_id in product_ids:
+            try:
+                pid = uuid.UUID(str(product_id))
+            except ValueError:
+                continue
+
+            # Get required quantity (default 1 if not specified)
+            required_qty = quantities.get(product_id, 1) if quantities else 1
+
+            if self.channel_id is not None:
+                channel_available = self.channel_available.get((warehouse_id, pid))
+                if channel_available is not None:
+                    actual_available = channel_available - self.channel_soft_reserved.get(pid, 0)
+                    if actual_available >= required_qty:
+                        continue  # This product is available, check next
+                if fallback == 'NO_FALLBACK':
+                    return False
+                # Fall through to shared pool check
+
+            actual_available = self.shared_available(warehouse_id, pid)
+            if actual_available is None or actual_available < required_qty:
+                return False
+
+        return True
+
+
 class AllocationService:
     """Service for allocating orders to warehouses."""
 
     def __init__(self, db: AsyncSession):
         self.db = db
+        # Channel lookups memoized per service instance
+        self._channel_cache: Dict[str, Optional[SalesChannel]] = {}
 
     async def allocate_order(
         self,
@@ -373,12 +451,23 @@ class AllocationService:
             decision_factors["failure"] = "No warehouse supports payment mode"
             return None, decision_factors
 
+        # Availability for every (candidate, product) pair in one pass
+        matrix = await self.get_stock_availability_matrix(
+            product_ids,
+            warehouse_ids=[ws.warehouse_id for ws in candidates],
+            channel_code=channel_code,
+        )
+        stock_ok = {
+            ws.warehouse_id: matrix.has_stock(ws.warehouse_id, product_ids, quantities)
+            for ws in candidates
+        }
+
         # Handle FIXED allocation
         if rule.allocation_type == AllocationType.FIXED and rule.fixed_warehouse_id:
             for ws in candidates:
                 if ws.warehouse_id == rule.fixed_warehouse_id:
                     # Check stock with quantities and channel
-                    has_stock = await self._check_stock(ws.warehouse_id, product_ids, quantities, channel_code)
+                    has_stock = stock_ok[ws.warehouse_id]
                     if has_stock:
                         decision_factors["selected_by"] = "FIXED_WAREHOUSE"
                         return ws, decision_factors
@@ -398,8 +487,7 @@ class AllocationService:
                     # Use priority (lower = better, so invert for scoring)
                     score += (1000 - ws.priority)
                 elif factor == "INVENTORY":
-                    has_stock = await self._check_stock(ws.warehouse_id, product_ids, quantities, channel_code)
-                    if has_stock:
+                    if stock_ok[ws.warehouse_id]:
                         score += 500
                 elif factor == "COST":
                     if ws.shipping_cost:
@@ -417,8 +505,7 @@ class AllocationService:
 
         # Select best candidate with stock
         for ws, score in scored_candidates:
-            has_stock = await self._check_stock(ws.warehouse_id, product_ids, quantities, channel_code)
-            if has_stock or not product_ids:  # If no products specified, any warehouse works
+            if stock_ok[ws.warehouse_id] or not product_ids:  # If no products specified, any warehouse works
                 decision_factors["selected_by"] = priority_factors[0] if priority_factors else "PRIORITY"
                 decision_factors["score"] = score
                 return ws, decision_factors
@@ -427,7 +514,10 @@ class AllocationService:
         return None, decision_factors
 
     async def _get_channel_by_code(self, channel_code: str) -> Optional[SalesChannel]:
-        """Get sales channel by code."""
+        """Get sales channel by code (memoized for the lifetime of the service)."""
+        if channel_code in self._channel_cache:
+            return self._channel_cache[channel_code]
+
         result = await self.db.execute(
             select(SalesChannel).where(
                 and_(
@@ -439,157 +529,146 @@ class AllocationService:
                 )
             ).order_by(SalesChannel.created_at)
         )
-        return result.scalars().first()
+        channel = result.scalars().first()
+        self._channel_cache[channel_code] = channel
+        return channel
 
-    async def _check_stock(
+    async def get_stock_availability_matrix(
         self,
-        warehouse_id: uuid.UUID,
-        product_ids: List[str],
-        quantities: Optional[Dict[str, int]] = None,
+        product_ids: List[Any],
+        warehouse_ids: Optional[List[uuid.UUID]] = None,
         channel_code: Optional[str] = None
-    ) -> bool:
+    ) -> StockAvailabilityMatrix:
         """
-        Check if warehouse has stock for all products.
+        Fetch availability for all (warehouse, product) pairs at once.
 
-        Now channel-aware: if channel_code is provided and CHANNEL_INVENTORY_ENABLED,
-        checks ChannelInventory for that channel instead of InventorySummary.
+        Issues at most one ChannelInventory query, one InventorySummary query
+        and one soft-reservation multi-get, regardless of how many warehouses
+        and products are checked.
 
         Args:
-            warehouse_id: Warehouse to check
-            product_ids: List of product IDs to check
-            quantities: Optional dict of {product_id: quantity_needed}
-            channel_code: Optional channel code for channel-specific inventory check
+            product_ids: Product IDs to check (invalid IDs are ignored)
+            warehouse_ids: Candidate warehouses (None = all warehouses)
+            channel_code: Optional channel code for channel-specific inventory
 
         Returns:
-            True if warehouse has sufficient stock for all products
+            StockAvailabilityMatrix for the requested pairs
         """
-        if not product_ids:
-            return True
-
-        import logging
-        logger = logging.getLogger(__name__)
-
-        # Check if channel-specific inventory should be used
-        use_channel_inventory = False
-        channel_obj = None
-
-        logger.info(f"_check_stock: warehouse_id={warehouse_id}, product_ids={product_ids}, channel_code={channel_code}")
-
-        if channel_code and getattr(settings, 'CHANNEL_INVENTORY_ENABLED', True):
-            channel_obj = await self._get_channel_by_code(channel_code)
-            logger.info(f"_check_stock: D2C channel lookup result: {channel_obj.id if channel_obj else 'NOT FOUND'}")
-            if channel_obj:
-                use_channel_inventory = True
-
-        logger.info(f"_check_stock: use_channel_inventory={use_channel_inventory}")
+        matrix = StockAvailabilityMatrix()
 
+        pids = []
         for product_id in product_ids:
             try:
-                pid = uuid.UUID(str(product_id))
+                pids.append(uuid.UUID(str(product_id)))
             except ValueError:
                 continue
+        pids = list(dict.fromkeys(pids))
 
-            # Get required quantity (default 1 if not specified)
-            required_qty = quantities.get(product_id, 1) if quantities else 1
+        if not pids or (warehouse_ids is not None and not warehouse_ids):
+            return matrix
 
-            if use_channel_inventory:
-                # Check channel-specific inventory
-                logger.info(f"_check_stock: Checking ChannelInventory for channel_id={channel_obj.id}, warehouse_id={warehouse_id}, product_id={pid}")
-                query = select(ChannelInventory).where(
-                    and_(
-                        ChannelInventory.channel_id == channel_obj.id,
-                        ChannelInventory.warehouse_id == warehouse_id,
-                        ChannelInventory.product_id == pid,
-                        ChannelInventory.is_active == True,
-                    )
-                )
-                result = await self.db.execute(query)
-                channel_inv = result.scalar_one_or_none()
-                logger.info(f"_check_stock: ChannelInventory result: {channel_inv.id if channel_inv else 'NOT FOUND'}")
-
-                if not channel_inv:
-                    # No channel inventory - check fallback strategy
-                    fallback = getattr(settings, 'D2C_FALLBACK_STRATEGY', 'SHARED_POOL')
-                    logger.info(f"_check_stock: No ChannelInventory, fallback strategy={fallback}")
-                    if fallback == 'NO_FALLBACK':
-                        return False
-                    # Fall through to shared pool check
-                else:
-                    # Channel inventory exists - check availability
-                    # Available = allocated - buffer - reserved
-                    channel_available = max(0,
-                        (channel_inv.allocated_quantity or 0) -
-                        (channel_inv.buffer_quantity or 0) -
-                        (channel_inv.reserved_quantity or 0)
-                    )
-
-                    # Get channel-specific soft reserved
-                    soft_reserved = await self._get_channel_soft_reserved(str(channel_obj.id), product_id)
-                    actual_available = channel_available - soft_reserved
+        # Channel-specific inventory
+        channel_obj = None
+        if channel_code and getattr(settings, 'CHANNEL_INVENTORY_ENABLED', True):
+            channel_obj = await self._get_channel_by_code(channel_code)
 
-                    if actual_available >= required_qty:
-                        continue  # This product is available, check next
-                    else:
-                        # Check fallback strategy
-                        fallback = getattr(settings, 'D2C_FALLBACK_STRATEGY', 'SHARED_POOL')
-                        if fallback == 'NO_FALLBACK':
-                            return False
-                        # Fall through to shared pool check
-
-            # Legacy/fallback: check InventorySummary (shared pool)
-            logger.info(f"_check_stock: Checking InventorySummary for warehouse_id={warehouse_id}, product_id={pid}")
-            query = select(InventorySummary).where(
+        if channel_obj:
+            matrix.channel_id = channel_obj.id
+            channel_query = select(
+                ChannelInventory.warehouse_id,
+                ChannelInventory.product_id,
+                ChannelInventory.allocated_quantity,
+                ChannelInventory.buffer_quantity,
+                ChannelInventory.reserved_quantity,
+            ).where(
                 and_(
-                    InventorySummary.warehouse_id == warehouse_id,
-                    InventorySummary.product_id == pid
+                    ChannelInventory.channel_id == channel_obj.id,
+                    ChannelInventory.product_id.in_(pids),
+                    ChannelInventory.is_active == True,
                 )
             )
-            result = await self.db.execute(query)
-            inventory = result.scalar_one_or_none()
+            if warehouse_ids is not None:
+                channel_query = channel_query.where(ChannelInventory.warehouse_id.in_(warehouse_ids))
+
+            channel_result = await self.db.execute(channel_query)
+            for warehouse_id, product_id, allocated, buffer, reserved in channel_result.all():
+                # Available = allocated - buffer - reserved
+                matrix.channel_available[(warehouse_id, product_id)] = max(
+                    0, (allocated or 0) - (buffer or 0) - (reserved or 0)
+                )
 
-            if not inventory:
-                logger.warning(f"_check_stock: NO InventorySummary found for warehouse_id={warehouse_id}, product_id={pid} - RETURNING FALSE")
-                return False
+        # Shared pool (InventorySummary)
+        summary_query = select(
+            InventorySummary.warehouse_id,
+            InventorySummary.product_id,
+            InventorySummary.available_quantity,
+            InventorySummary.reserved_quantity,
+        ).where(InventorySummary.product_id.in_(pids))
+        if warehouse_ids is not None:
+            summary_query = summary_query.where(InventorySummary.warehouse_id.in_(warehouse_ids))
+
+        summary_result = await self.db.execute(summary_query)
+        for warehouse_id, product_id, available, reserved in summary_result.all():
+            matrix.summary[(warehouse_id, product_id)] = (available or 0, reserved or 0)
+
+        # Checkout soft reservations in one multi-get
+        try:
+            shared, channel = await get_cache().get_soft_reserved_many(
+                get_current_tenant_id(),
+                [str(pid) for pid in pids],
+                channel_id=str(channel_obj.id) if channel_obj else None,
+            )
+            matrix.soft_reserved = {uuid.UUID(pid): qty for pid, qty in shared.items()}
+            matrix.channel_soft_reserved = {uuid.UUID(pid): qty for pid, qty in channel.items()}
+        except Exception as e:
+            logger.warning(f"Soft reservation lookup failed, assuming none: {e}")
 
-            # Calculate actual available = DB available - DB reserved - soft reserved
-            db_available = inventory.available_quantity or 0
-            db_reserved = inventory.reserved_quantity or 0
-            soft_reserved = await self._get_soft_reserved(product_id)
+        logger.debug(
+            f"Stock matrix: {len(pids)} products, "
+            f"{len(warehouse_ids) if warehouse_ids is not None else 'all'} warehouses, "
+            f"channel={channel_code}, channel_rows={len(matrix.channel_available)}, "
+            f"summary_rows={len(matrix.summary)}"
+        )
+        return matrix
 
-            actual_available = db_available - db_reserved - soft_reserved
-            logger.info(f"_check_stock: InventorySummary found - db_available={db_available}, db_reserved={db_reserved}, soft_reserved={soft_reserved}, actual_available={actual_available}, required_qty={required_qty}")
+    async def _check_stock(
+        self,
+        warehouse_id: uuid.UUID,
+        product_ids: List[str],
+        quantities: Optional[Dict[str, int]] = None,
+        channel_code: Optional[str] = None
+    ) -> bool:
+        """
+        Check if warehouse has stock for all products.
 
-            if actual_available < required_qty:
-                logger.warning(f"_check_stock: Insufficient stock - actual_available ({actual_available}) < required_qty ({required_qty}) - RETURNING FALSE")
-                return False
+        Now channel-aware: if channel_code is provided and CHANNEL_INVENTORY_ENABLED,
+        checks ChannelInventory for that channel instead of InventorySummary.
+        For several warehouses, build one get_stock_availability_matrix() instead.
 
-        logger.info(f"_check_stock: All products have sufficient stock - RETURNING TRUE")
-        return True
+        Args:
+            warehouse_id: Warehouse to check
+            product_ids: List of product IDs to check
+            quantities: Optional dict of {product_id: quantity_needed}
+            channel_code: Optional channel code for channel-specific inventory check
 
-    async def _get_channel_soft_reserved(self, channel_id: str, product_id: str) -> int:
-        """Get channel-specific soft-reserved quantity from cache."""
-        try:
-            cache = get_cache()
-            key = f"channel:soft_reserved:{channel_id}:{product_id}"
-            value = await cache.get(key)
-            return int(value) if value else 0
-        except Exception:
-            return 0
-
-    async def _get_soft_reserved(self, product_id: str) -> int:
-        """Get total soft-reserved quantity from cache (checkout reservations)."""
-        try:
-            cache = get_cache()
-            key = f"stock:reserved:{product_id}"
-            value = await cache.get(key)
-            return int(value) if value else 0
-        except Exception:
-            return 0
+        Returns:
+            True if warehouse has sufficient stock for all products
+        """
+        if not product_ids:
+            return True
+
+        matrix = await self.get_stock_availability_matrix(
+            product_ids,
+            warehouse_ids=[warehouse_id],
+            channel_code=channel_code,
+        )
+        return matrix.has_stock(warehouse_id, product_ids, quantities)
 
     async def check_inventory_availability(
         self,
         warehouse_id: uuid.UUID,
-        items: List[Dict[str, Any]]
+        items: List[Dict[str, Any]],
+        matrix: Optional[StockAvailabilityMatrix] = None
     ) -> Dict[str, Any]:
         """
         Detailed inventory check with availability breakdown.
@@ -597,6 +676,7 @@ class AllocationService:
         Args:
             warehouse_id: Warehouse to check
             items: List of {product_id, quantity} dicts
+            matrix: Pre-fetched availability matrix (fetched if not provided)
 
         Returns:
             Detailed availability info including:
@@ -605,6 +685,12 @@ class AllocationService:
             - total_available: int
             - total_requested: int
         """
+        if matrix is None:
+            matrix = await self.get_stock_availability_matrix(
+                [item.get("product_id") for item in items],
+                warehouse_ids=[warehouse_id],
+            )
+
         result = {
             "is_available": True,
             "warehouse_id": str(warehouse_id),
@@ -631,17 +717,9 @@ class AllocationService:
                 result["is_available"] = False
                 continue
 
-            # Get inventory from database
-            query = select(InventorySummary).where(
-                and_(
-                    InventorySummary.warehouse_id == warehouse_id,
-                    InventorySummary.product_id == pid
-                )
-            )
-            db_result = await self.db.execute(query)
-            inventory = db_result.scalar_one_or_none()
+            summary = matrix.summary.get((warehouse_id, pid))
 
-            if not inventory:
+            if summary is None:
                 result["items"].append({
                     "product_id": product_id,
                     "requested": requested_qty,
@@ -656,9 +734,8 @@ class AllocationService:
                 continue
 
             # Calculate availability
-            db_available = inventory.available_quantity or 0
-            db_reserved = inventory.reserved_quantity or 0
-            soft_reserved = await self._get_soft_reserved(product_id)
+            db_available, db_reserved = summary
+            soft_reserved = matrix.soft_reserved.get(pid, 0)
 
             actual_available = max(0, db_available - db_reserved - soft_reserved)
             is_item_available = actual_available >= requested_qty
@@ -722,6 +799,12 @@ class AllocationService:
                 "warehouses_checked": len(serviceable)
             }
 
+        # Fetch availability for all candidates at once
+        matrix = await self.get_stock_availability_matrix(
+            [item.get("product_id") for item in items],
+            warehouse_ids=[ws.warehouse_id for ws in candidates],
+        )
+
         # Check each warehouse for availability
         best_warehouse = None
         best_score = -1
@@ -730,7 +813,8 @@ class AllocationService:
         for ws in candidates:
             availability = await self.check_inventory_availability(
                 warehouse_id=ws.warehouse_id,
-                items=items
+                items=items,
+                matrix=matrix
             )
 
             warehouse_result = {
@@ -1378,41 +1378,7 @@ class AutoJournalService:
 
     async def _post_journal_entry(self, journal: JournalEntry, lines: List):
         """Post journal entry to general ledger."""
-        from app.models.accounting import GeneralLedger, AccountType
-        import uuid as uuid_module
-
-        for line_id, line in lines:
-            # Get account for balance type determination
-            account = await self.get_account_by_id(line.account_id)
-            if not account:
-                continue
-
-            # Calculate balance change based on account type
-            # Asset/Expense: Debit increases, Credit decreases
-            # Liability/Equity/Revenue: Credit increases, Debit decreases
-            if account.account_type in ["ASSET", "EXPENSE"]:
-                balance_change = (line.debit_amount or Decimal("0")) - (line.credit_amount or Decimal("0"))
-            else:
-                balance_change = (line.credit_amount or Decimal("0")) - (line.debit_amount or Decimal("0"))
-
-            new_balance = (account.current_balance or Decimal("0")) + balance_change
-
-            # Create GL entry
-            gl_entry = GeneralLedger(
-                id=uuid_module.uuid4(),
-                account_id=line.account_id,
-                period_id=journal.period_id,
-                transaction_date=journal.entry_date,
-                journal_entry_id=journal.id,
-                journal_line_id=line.id if hasattr(line, 'id') and line.id else line_id,
-                debit_amount=line.debit_amount or Decimal("0"),
-                credit_amount=line.credit_amount or Decimal("0"),
-                running_balance=new_balance,
-                narration=line.description or journal.narration,
-            )
-            self.db.add(gl_entry)
-
-            # Update account balance
-            account.current_balance = new_balance
+        from app.services.gl_posting_service import GLPostingService
 
+        await GLPostingService(self.db).post(journal, [line for _, line in lines])
         await self.db.flush()
@@ -6,20 +6,34 @@ Machine learning-based bank statement reconciliation with:
 - Weighted scoring for match confidence
 - Auto-reconciliation above threshold
 - Learning from historical matches
+
+Suggestions are computed in batch: candidate entries for all unreconciled
+transactions are loaded with one query, bucketed by date window and
+direction, and every feature is evaluated as a transactions x entries
+matrix. Text similarity uses one n-gram vocabulary fitted over the whole
+corpus; the per-pair TF-IDF weighting (each pair is its own two-document
+corpus) is reproduced from sparse count products, so scores are identical
+to pairwise scoring with extract_features().
 """
 
+import math
 import re
 from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
 from typing import Optional, Dict, Any, List, Tuple
 from uuid import UUID
 
-from sqlalchemy import select, and_, or_, func
+import numpy as np
+
+from sqlalchemy import select, update, and_, or_, func, case
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.models.banking import BankAccount, BankTransaction, BankReconciliation
-from app.models.accounting import JournalEntry, JournalEntryLine
+from app.models.accounting import JournalEntry, JournalEntryLine, JournalEntryStatus
+
+# TfidfVectorizer idf (smooth_idf) of a term found in one of two documents;
+# terms found in both get idf 1
+_PAIR_UNIQUE_IDF = 1.0 + math.log(3.0 / 2.0)
 
 
 class BankReconciliationMLService:
@@ -148,6 +162,62 @@ class BankReconciliationMLService:
 
             return intersection / union if union > 0 else 0.0
 
+    def _pairwise_text_similarity(
+        self,
+        left: List[Optional[str]],
+        right: List[Optional[str]],
+    ) -> np.ndarray:
+        """
+        _calculate_text_similarity for every (left, right) pair as a matrix.
+
+        Fits one CountVectorizer over all texts, then derives each pair's
+        two-document TF-IDF cosine from sparse products: shared terms weigh
+        1, terms in only one text weigh _PAIR_UNIQUE_IDF.
+        """
+        left_norm = [self._normalize_text(t or "") for t in left]
+        right_norm = [self._normalize_text(t or "") for t in right]
+        similarity = np.zeros((len(left_norm), len(right_norm)), dtype=np.float64)
+        if not left_norm or not right_norm:
+            return similarity
+
+        try:
+            from sklearn.feature_extraction.text import CountVectorizer
+        except ImportError:
+            for i, text1 in enumerate(left_norm):
+                if not text1:
+                    continue
+                for j, text2 in enumerate(right_norm):
+                    if text2:
+                        similarity[i, j] = self._calculate_text_similarity(text1, text2)
+            return similarity
+
+        vectorizer = CountVectorizer(ngram_range=(1, 2), min_df=1, stop_words=None, dtype=np.float64)
+        try:
+            vectorizer.fit([t for t in left_norm + right_norm if t])
+        except ValueError:
+            # No usable tokens anywhere in the corpus
+            return similarity
+
+        a = vectorizer.transform(left_norm).tocsr()
+        b = vectorizer.transform(right_norm).tocsr()
+        a_sq = a.multiply(a).tocsr()
+        b_sq = b.multiply(b).tocsr()
+        a_bin = (a > 0).astype(np.float64)
+        b_bin = (b > 0).astype(np.float64)
+
+        dot = (a @ b.T).toarray()
+        a_shared_sq = (a_sq @ b_bin.T).toarray()
+        b_shared_sq = (a_bin @ b_sq.T).toarray()
+        a_total_sq = np.asarray(a_sq.sum(axis=1)).reshape(-1, 1)
+        b_total_sq = np.asarray(b_sq.sum(axis=1)).reshape(1, -1)
+
+        c2 = _PAIR_UNIQUE_IDF ** 2
+        a_norm_sq = c2 * a_total_sq - (c2 - 1.0) * a_shared_sq
+        b_norm_sq = c2 * b_total_sq - (c2 - 1.0) * b_shared_sq
+        denom = np.sqrt(np.clip(a_norm_sq, 0.0, None) * np.clip(b_norm_sq, 0.0, None))
+        np.divide(dot, denom, out=similarity, where=denom > 0)
+        return np.clip(similarity, 0.0, 1.0)
+
     def _calculate_party_match(
         self,
         bank_txn: BankTransaction,
@@ -214,6 +284,43 @@ class BankReconciliationMLService:
 
         return 0.0
 
+    def _bank_reference_set(self, bank_txn: BankTransaction) -> set:
+        refs = self._extract_reference_numbers(bank_txn.description)
+        if bank_txn.reference_number:
+            refs.append(bank_txn.reference_number)
+        if bank_txn.cheque_number:
+            refs.append(bank_txn.cheque_number)
+        return set(ref.upper() for ref in refs)
+
+    def _journal_reference_set(self, journal_entry: JournalEntry) -> set:
+        refs = []
+        if journal_entry.narration:
+            refs = self._extract_reference_numbers(journal_entry.narration)
+        if hasattr(journal_entry, 'reference_number') and journal_entry.reference_number:
+            refs.append(journal_entry.reference_number)
+        return set(ref.upper() for ref in refs)
+
+    @staticmethod
+    def _reference_score(bank_refs: set, journal_refs: set) -> float:
+        """Same rules as _calculate_reference_match on pre-extracted sets."""
+        if not bank_refs or not journal_refs:
+            return 0.0
+        if bank_refs & journal_refs:
+            return 1.0
+        for bank_ref in bank_refs:
+            for journal_ref in journal_refs:
+                if bank_ref in journal_ref or journal_ref in bank_ref:
+                    return 0.7
+        return 0.0
+
+    def _journal_party(self, journal_entry: JournalEntry) -> Optional[str]:
+        journal_party = None
+        if journal_entry.narration:
+            journal_party = self._extract_party_name(journal_entry.narration)
+        if not journal_party and hasattr(journal_entry, 'party_name'):
+            journal_party = journal_entry.party_name
+        return journal_party
+
     def extract_features(
         self,
         bank_txn: BankTransaction,
@@ -334,43 +441,120 @@ class BankReconciliationMLService:
         # Determine if we're looking for debit or credit entries
         is_credit = bank_txn.transaction_type == "CREDIT"
 
-        query = (
-            select(JournalEntry)
-            .options(selectinload(JournalEntry.lines))
+        candidates = await self._load_candidate_entries(bank_account, start_date, end_date)
+        return [entry for entry, has_credit, has_debit in candidates
+                if (has_credit if is_credit else has_debit)]
+
+    async def _load_candidate_entries(
+        self,
+        bank_account: BankAccount,
+        start_date: date,
+        end_date: date,
+    ) -> List[Tuple[JournalEntry, bool, bool]]:
+        """
+        Posted journal entries in [start_date, end_date] with a line on the
+        bank's ledger account, as (entry, has_credit_line, has_debit_line).
+        """
+        if not bank_account.ledger_account_id:
+            return []
+
+        lines_query = (
+            select(
+                JournalEntryLine.journal_entry_id,
+                func.max(JournalEntryLine.credit_amount).label("max_credit"),
+                func.max(JournalEntryLine.debit_amount).label("max_debit"),
+            )
+            .join(JournalEntry, JournalEntry.id == JournalEntryLine.journal_entry_id)
             .where(
                 and_(
+                    JournalEntryLine.account_id == bank_account.ledger_account_id,
                     JournalEntry.entry_date >= start_date,
                     JournalEntry.entry_date <= end_date,
-                    JournalEntry.is_posted == True,
+                    JournalEntry.status == JournalEntryStatus.POSTED.value,
                 )
             )
+            .group_by(JournalEntryLine.journal_entry_id)
+        ).subquery()
+
+        result = await self.db.execute(
+            select(JournalEntry, lines_query.c.max_credit, lines_query.c.max_debit)
+            .join(lines_query, lines_query.c.journal_entry_id == JournalEntry.id)
+            .order_by(JournalEntry.entry_date, JournalEntry.entry_number)
         )
+        return [
+            (entry, bool(max_credit and float(max_credit) > 0), bool(max_debit and float(max_debit) > 0))
+            for entry, max_credit, max_debit in result.all()
+        ]
 
-        result = await self.db.execute(query)
-        entries = list(result.scalars().all())
+    def _score_matrix(
+        self,
+        transactions: List[BankTransaction],
+        entries: List[JournalEntry],
+        eligible: np.ndarray,
+        weights: Optional[Dict[str, float]] = None,
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        calculate_match_score(extract_features(txn, entry)) for every
+        eligible pair; ineligible pairs score 0.
+        """
+        weights = weights or self.DEFAULT_WEIGHTS
+        n, m = eligible.shape
 
-        # Filter entries that have a line with the bank account ledger
-        filtered_entries = []
-        for entry in entries:
-            if not bank_account.ledger_account_id:
-                continue
+        bank_amounts = np.array([abs(float(t.amount)) for t in transactions], dtype=np.float64)
+        journal_amounts = np.array(
+            [abs(float(e.total_debit or e.total_credit or 0)) for e in entries], dtype=np.float64
+        )
+        amount_diff = np.abs(bank_amounts[:, None] - journal_amounts[None, :])
+        amount_match = (amount_diff < 0.01).astype(np.float64)
+        amount_variance = amount_diff / np.maximum(bank_amounts, 1)[:, None]
 
-            for line in entry.lines:
-                if line.ledger_account_id == bank_account.ledger_account_id:
-                    # Check debit/credit direction
-                    if is_credit and line.credit_amount and float(line.credit_amount) > 0:
-                        filtered_entries.append(entry)
-                        break
-                    elif not is_credit and line.debit_amount and float(line.debit_amount) > 0:
-                        filtered_entries.append(entry)
-                        break
+        bank_days = np.array([t.transaction_date.toordinal() for t in transactions], dtype=np.int64)
+        journal_days = np.array([e.entry_date.toordinal() for e in entries], dtype=np.int64)
+        date_diff = np.abs(bank_days[:, None] - journal_days[None, :]).astype(np.float64)
+        date_proximity = np.where(date_diff <= 7, np.maximum(0, 1 - (date_diff / 7)), 0.0)
 
-        return filtered_entries
+        text_similarity = self._pairwise_text_similarity(
+            [t.description for t in transactions], [e.narration for e in entries]
+        )
+
+        bank_parties = [self._extract_party_name(t.description) or t.party_name for t in transactions]
+        journal_parties = [self._journal_party(e) for e in entries]
+        party_match = self._pairwise_text_similarity(bank_parties, journal_parties)
+
+        reference_match = np.zeros((n, m), dtype=np.float64)
+        bank_refs = [self._bank_reference_set(t) for t in transactions]
+        journal_refs = [self._journal_reference_set(e) for e in entries]
+        for i, j in zip(*np.nonzero(eligible)):
+            reference_match[i, j] = self._reference_score(bank_refs[i], journal_refs[j])
+
+        score = (
+            amount_match * weights['amount_match'] +
+            date_proximity * weights['date_proximity'] +
+            text_similarity * weights['text_similarity'] +
+            party_match * weights['party_match'] +
+            reference_match * weights['reference_match']
+        )
+        score = np.where(amount_match == 1.0, np.minimum(score + 0.1, 1.0), score)
+        score = np.where(date_diff > 3, score * 0.9, score)
+        score = np.clip(score, 0.0, 1.0)
+        score = np.where(eligible, score, 0.0)
+
+        features = {
+            'amount_match': amount_match,
+            'amount_variance': amount_variance,
+            'date_diff': date_diff,
+            'date_proximity': date_proximity,
+            'text_similarity': text_similarity,
+            'party_match': party_match,
+            'reference_match': reference_match,
+        }
+        return score, features
 
     async def get_reconciliation_suggestions(
         self,
         bank_account_id: UUID,
-        limit: int = 50
+        limit: int = 50,
+        date_range_days: int = 7,
     ) -> List[Dict]:
         """
         Get ML-powered reconciliation suggestions.
@@ -387,42 +571,55 @@ class BankReconciliationMLService:
             return []
 
         # Get unreconciled transactions
-        transactions = await self.get_unreconciled_transactions(bank_account_id)
+        transactions = (await self.get_unreconciled_transactions(bank_account_id))[:limit]
+        if not transactions:
+            return []
 
-        suggestions = []
+        # One candidate load covering every transaction's date window
+        window = timedelta(days=date_range_days)
+        candidates = await self._load_candidate_entries(
+            bank_account,
+            min(t.transaction_date for t in transactions) - window,
+            max(t.transaction_date for t in transactions) + window,
+        )
+        if not candidates:
+            return []
+        entries = [entry for entry, _, _ in candidates]
+
+        # Buckets: date window and debit/credit direction
+        bank_days = np.array([t.transaction_date.toordinal() for t in transactions], dtype=np.int64)
+        journal_days = np.array([e.entry_date.toordinal() for e in entries], dtype=np.int64)
+        is_credit = np.array([t.transaction_type == "CREDIT" for t in transactions])
+        has_credit = np.array([c for _, c, _ in candidates])
+        has_debit = np.array([d for _, _, d in candidates])
+        eligible = (
+            (np.abs(bank_days[:, None] - journal_days[None, :]) <= date_range_days)
+            & np.where(is_credit[:, None], has_credit[None, :], has_debit[None, :])
+        )
+
+        scores, features = self._score_matrix(transactions, entries, eligible)
 
-        for txn in transactions[:limit]:
-            # Get candidate journal entries
-            candidates = await self.get_candidate_journal_entries(bank_account, txn)
-
-            best_match = None
-            best_score = 0.0
-            best_features = None
-
-            for entry in candidates:
-                # Calculate features and score
-                features = self.extract_features(txn, entry)
-                score = self.calculate_match_score(features)
-
-                if score > best_score and score >= self.MINIMUM_THRESHOLD:
-                    best_score = score
-                    best_match = entry
-                    best_features = features
-
-            if best_match:
-                suggestions.append({
-                    'bank_transaction_id': str(txn.id),
-                    'bank_transaction_date': txn.transaction_date.isoformat(),
-                    'bank_description': txn.description,
-                    'bank_amount': float(txn.amount),
-                    'journal_entry_id': str(best_match.id),
-                    'journal_entry_number': best_match.entry_number,
-                    'journal_entry_date': best_match.entry_date.isoformat(),
-                    'journal_narration': best_match.narration,
-                    'confidence_score': round(best_score, 4),
-                    'is_auto_match': best_score >= self.AUTO_MATCH_THRESHOLD,
-                    'features': {k: round(v, 4) for k, v in best_features.items()},
-                })
+        suggestions = []
+        best_idx = np.argmax(scores, axis=1)
+        for i, txn in enumerate(transactions):
+            j = int(best_idx[i])
+            best_score = float(scores[i, j])
+            if not eligible[i, j] or best_score <= 0.0 or best_score < self.MINIMUM_THRESHOLD:
+                continue
+            best_match = entries[j]
+            suggestions.append({
+                'bank_transaction_id': str(txn.id),
+                'bank_transaction_date': txn.transaction_date.isoformat(),
+                'bank_description': txn.description,
+                'bank_amount': float(txn.amount),
+                'journal_entry_id': str(best_match.id),
+                'journal_entry_number': best_match.entry_number,
+                'journal_entry_date': best_match.entry_date.isoformat(),
+                'journal_narration': best_match.narration,
+                'confidence_score': round(best_score, 4),
+                'is_auto_match': best_score >= self.AUTO_MATCH_THRESHOLD,
+                'features': {k: round(float(v[i, j]), 4) for k, v in features.items()},
+            })
 
         # Sort by confidence score
         suggestions.sort(key=lambda x: x['confidence_score'], reverse=True)
@@ -443,24 +640,12 @@ class BankReconciliationMLService:
 
         suggestions = await self.get_reconciliation_suggestions(bank_account_id)
 
-        auto_matched = []
-        skipped = []
-
-        for suggestion in suggestions:
-            if suggestion['confidence_score'] >= threshold:
-                # Perform the match
-                try:
-                    await self._match_transaction(
-                        UUID(suggestion['bank_transaction_id']),
-                        UUID(suggestion['journal_entry_id'])
-                    )
-                    auto_matched.append(suggestion)
-                except Exception as e:
-                    suggestion['error'] = str(e)
-                    skipped.append(suggestion)
-            else:
-                skipped.append(suggestion)
+        auto_matched = [s for s in suggestions if s['confidence_score'] >= threshold]
+        skipped = [s for s in suggestions if s['confidence_score'] < threshold]
 
+        await self._match_transactions({
+            UUID(s['bank_transaction_id']): UUID(s['journal_entry_id']) for s in auto_matched
+        })
         await self.db.commit()
 
         return {
@@ -471,22 +656,26 @@ class BankReconciliationMLService:
             'low_confidence': [s for s in skipped if s['confidence_score'] < self.SUGGEST_THRESHOLD],
         }
 
-    async def _match_transaction(
-        self,
-        bank_transaction_id: UUID,
-        journal_entry_id: UUID
-    ) -> None:
-        """Mark a bank transaction as matched with a journal entry."""
-        result = await self.db.execute(
-            select(BankTransaction).where(BankTransaction.id == bank_transaction_id)
+    async def _match_transactions(self, matches: Dict[UUID, UUID]) -> None:
+        """Mark bank transactions as matched ({transaction_id: journal_entry_id}) in one UPDATE."""
+        if not matches:
+            return
+        await self.db.execute(
+            update(BankTransaction)
+            .where(
+                and_(
+                    BankTransaction.id.in_(list(matches)),
+                    BankTransaction.is_reconciled == False,
+                )
+            )
+            .values(
+                is_reconciled=True,
+                reconciled_at=datetime.now(timezone.utc),
+                matched_journal_entry_id=case(matches, value=BankTransaction.id),
+                reconciliation_status="MATCHED",
+            )
+            .execution_options(synchronize_session="fetch")
         )
-        txn = result.scalar_one_or_none()
-
-        if txn:
-            txn.is_reconciled = True
-            txn.reconciled_at = datetime.now(timezone.utc)
-            txn.matched_journal_entry_id = journal_entry_id
-            txn.reconciliation_status = "MATCHED"
 
     async def get_reconciliation_stats(
         self,
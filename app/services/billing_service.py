@@ -14,6 +14,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
 from app.models.tenant import Tenant, TenantSubscription, ErpModule as Module, BillingHistory
+from app.core.tenant_registry import invalidate_tenant
+from app.core.entitlement_cache import invalidate_entitlements
 
 
 class BillingService:
@@ -206,6 +208,7 @@ class BillingService:
             subscription.ends_at = datetime.now(timezone.utc)
 
         await self.db.commit()
+        await invalidate_entitlements(tenant_id)
 
         return {
             'status': 'success',
@@ -231,6 +234,7 @@ class BillingService:
         if tenant:
             tenant.status = 'suspended'
             await self.db.commit()
+            invalidate_tenant(tenant.id, tenant.subdomain)
 
             return {
                 'status': 'success',
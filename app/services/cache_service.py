@@ -20,7 +20,7 @@ Usage:
 """
 import json
 import hashlib
-from typing import Any, Optional, Dict
+from typing import Any, Optional, Dict, List, Tuple
 from datetime import datetime, timedelta, timezone
 from abc import ABC, abstractmethod
 import asyncio
@@ -54,6 +54,63 @@ class CacheBackend(ABC):
         """Clear all keys matching pattern."""
         pass
 
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Get multiple values in one round trip. Missing keys are omitted."""
+        values = {}
+        for key in keys:
+            value = await self.get(key)
+            if value is not None:
+                values[key] = value
+        return values
+
+    async def set_many(self, items: Dict[str, Any], ttl: int = 3600) -> bool:
+        """Set multiple values with the same TTL in one round trip."""
+        ok = True
+        for key, value in items.items():
+            ok = await self.set(key, value, ttl) and ok
+        return ok
+
+    async def delete_many(self, keys: List[str]) -> int:
+        """Delete multiple keys in one round trip."""
+        deleted = 0
+        for key in keys:
+            if await self.delete(key):
+                deleted += 1
+        return deleted
+
+    @abstractmethod
+    async def incr_by(self, key: str, amount: int, ttl: Optional[int] = None) -> int:
+        """Atomically add amount to an integer counter and return the new value."""
+        pass
+
+    @abstractmethod
+    async def decr_by(self, key: str, amount: int, ttl: Optional[int] = None) -> int:
+        """
+        Atomically subtract amount from an integer counter, flooring at zero.
+
+        The key is deleted when it reaches zero. Returns the new value.
+        """
+        pass
+
+    @abstractmethod
+    async def incr_many_within_limits(
+        self,
+        increments: Dict[str, Tuple[int, int]],
+        ttl: Optional[int] = None
+    ) -> List[str]:
+        """
+        Atomically check and increment several counters.
+
+        Args:
+            increments: {key: (amount, limit)}; each counter may not exceed limit
+            ttl: Optional TTL (seconds) applied to every incremented key
+
+        Returns:
+            Keys that would exceed their limit. Empty list means every counter
+            was incremented; otherwise nothing was changed.
+        """
+        pass
+
 
 class InMemoryCache(CacheBackend):
     """
@@ -90,6 +147,92 @@ class InMemoryCache(CacheBackend):
                 return True
             return False
 
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        async with self._lock:
+            now = datetime.now(timezone.utc)
+            values = {}
+            for key in keys:
+                entry = self._cache.get(key)
+                if entry is None:
+                    continue
+                value, expires_at = entry
+                if expires_at > now:
+                    values[key] = value
+                else:
+                    del self._cache[key]
+            return values
+
+    async def set_many(self, items: Dict[str, Any], ttl: int = 3600) -> bool:
+        async with self._lock:
+            expires_at = datetime.now(timezone.utc) + timedelta(seconds=ttl)
+            for key, value in items.items():
+                self._cache[key] = (value, expires_at)
+            return True
+
+    async def delete_many(self, keys: List[str]) -> int:
+        async with self._lock:
+            deleted = 0
+            for key in keys:
+                if self._cache.pop(key, None) is not None:
+                    deleted += 1
+            return deleted
+
+    def _counter_value(self, key: str, now: datetime) -> int:
+        """Current counter value (lock must be held)."""
+        entry = self._cache.get(key)
+        if entry is None:
+            return 0
+        value, expires_at = entry
+        if expires_at <= now:
+            del self._cache[key]
+            return 0
+        return int(value or 0)
+
+    def _set_counter(self, key: str, value: int, ttl: Optional[int], now: datetime) -> None:
+        """Store counter value, keeping the existing expiry if ttl is None (lock must be held)."""
+        if ttl:
+            expires_at = now + timedelta(seconds=ttl)
+        elif key in self._cache:
+            expires_at = self._cache[key][1]
+        else:
+            expires_at = datetime.max.replace(tzinfo=timezone.utc)
+        self._cache[key] = (value, expires_at)
+
+    async def incr_by(self, key: str, amount: int, ttl: Optional[int] = None) -> int:
+        async with self._lock:
+            now = datetime.now(timezone.utc)
+            new_value = self._counter_value(key, now) + amount
+            self._set_counter(key, new_value, ttl, now)
+            return new_value
+
+    async def decr_by(self, key: str, amount: int, ttl: Optional[int] = None) -> int:
+        async with self._lock:
+            now = datetime.now(timezone.utc)
+            new_value = self._counter_value(key, now) - amount
+            if new_value <= 0:
+                self._cache.pop(key, None)
+                return 0
+            self._set_counter(key, new_value, ttl, now)
+            return new_value
+
+    async def incr_many_within_limits(
+        self,
+        increments: Dict[str, Tuple[int, int]],
+        ttl: Optional[int] = None
+    ) -> List[str]:
+        async with self._lock:
+            now = datetime.now(timezone.utc)
+            current = {key: self._counter_value(key, now) for key in increments}
+            exceeded = [
+                key for key, (amount, limit) in increments.items()
+                if current[key] + amount > limit
+            ]
+            if exceeded:
+                return exceeded
+            for key, (amount, _) in increments.items():
+                self._set_counter(key, current[key] + amount, ttl, now)
+            return []
+
     async def clear_pattern(self, pattern: str) -> int:
         """Clear keys matching pattern (simple prefix match)."""
         async with self._lock:
@@ -115,9 +258,60 @@ class InMemoryCache(CacheBackend):
 class RedisCache(CacheBackend):
     """Redis cache backend for production."""
 
+    # INCRBY with optional EXPIRE. ARGV: amount, ttl (0 = keep existing TTL)
+    _INCR_SCRIPT = """
+        local value = redis.call('INCRBY', KEYS[1], ARGV[1])
+        if tonumber(ARGV[2]) > 0 then
+            redis.call('EXPIRE', KEYS[1], ARGV[2])
+        end
+        return value
+    """
+
+    # DECRBY floored at zero; deletes the key at zero. ARGV: amount, ttl
+    _DECR_FLOOR_SCRIPT = """
+        local value = tonumber(redis.call('GET', KEYS[1]) or '0') - tonumber(ARGV[1])
+        if value <= 0 then
+            redis.call('DEL', KEYS[1])
+            return 0
+        end
+        if tonumber(ARGV[2]) > 0 then
+            redis.call('SET', KEYS[1], value, 'EX', ARGV[2])
+        else
+            redis.call('SET', KEYS[1], value, 'KEEPTTL')
+        end
+        return value
+    """
+
+    # Check every counter against its limit, then increment all or none.
+    # ARGV: ttl, amount_1, limit_1, amount_2, limit_2, ...
+    # Returns the 1-based indexes of keys that would exceed their limit.
+    _INCR_MANY_SCRIPT = """
+        local exceeded = {}
+        for i, key in ipairs(KEYS) do
+            local current = tonumber(redis.call('GET', key) or '0')
+            local amount = tonumber(ARGV[i * 2])
+            local limit = tonumber(ARGV[i * 2 + 1])
+            if current + amount > limit then
+                table.insert(exceeded, i)
+            end
+        end
+        if #exceeded > 0 then
+            return exceeded
+        end
+        local ttl = tonumber(ARGV[1])
+        for i, key in ipairs(KEYS) do
+            redis.call('INCRBY', key, ARGV[i * 2])
+            if ttl > 0 then
+                redis.call('EXPIRE', key, ttl)
+            end
+        end
+        return exceeded
+    """
+
     def __init__(self, redis_url: str):
         self._redis_url = redis_url
         self._client = None
+        self._scripts: Dict[str, Any] = {}
 
     async def _get_client(self):
         if self._client is None:
@@ -138,6 +332,54 @@ class RedisCache(CacheBackend):
         except Exception:
             return None
 
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        if not keys:
+            return {}
+        try:
+            client = await self._get_client()
+            raw_values = await client.mget(keys)
+            return {
+                key: json.loads(value)
+                for key, value in zip(keys, raw_values)
+                if value
+            }
+        except Exception:
+            return {}
+
+    async def _script(self, name: str, source: str):
+        """Register a Lua script once per client (EVALSHA with EVAL fallback)."""
+        if name not in self._scripts:
+            client = await self._get_client()
+            self._scripts[name] = client.register_script(source)
+        return self._scripts[name]
+
+    # Counter operations raise on Redis errors: silently returning 0 would
+    # let checkout oversell.
+
+    async def incr_by(self, key: str, amount: int, ttl: Optional[int] = None) -> int:
+        script = await self._script("incr", self._INCR_SCRIPT)
+        return int(await script(keys=[key], args=[int(amount), int(ttl or 0)]))
+
+    async def decr_by(self, key: str, amount: int, ttl: Optional[int] = None) -> int:
+        script = await self._script("decr_floor", self._DECR_FLOOR_SCRIPT)
+        return int(await script(keys=[key], args=[int(amount), int(ttl or 0)]))
+
+    async def incr_many_within_limits(
+        self,
+        increments: Dict[str, Tuple[int, int]],
+        ttl: Optional[int] = None
+    ) -> List[str]:
+        if not increments:
+            return []
+        keys = list(increments)
+        args: List[int] = [int(ttl or 0)]
+        for key in keys:
+            amount, limit = increments[key]
+            args.extend([int(amount), int(limit)])
+        script = await self._script("incr_many", self._INCR_MANY_SCRIPT)
+        exceeded = await script(keys=keys, args=args)
+        return [keys[int(i) - 1] for i in exceeded or []]
+
     async def set(self, key: str, value: Any, ttl: int = 3600) -> bool:
         try:
             client = await self._get_client()
@@ -154,6 +396,28 @@ class RedisCache(CacheBackend):
         except Exception:
             return False
 
+    async def set_many(self, items: Dict[str, Any], ttl: int = 3600) -> bool:
+        if not items:
+            return True
+        try:
+            client = await self._get_client()
+            pipe = client.pipeline(transaction=False)
+            for key, value in items.items():
+                pipe.set(key, json.dumps(value), ex=ttl)
+            await pipe.execute()
+            return True
+        except Exception:
+            return False
+
+    async def delete_many(self, keys: List[str]) -> int:
+        if not keys:
+            return 0
+        try:
+            client = await self._get_client()
+            return await client.delete(*keys)
+        except Exception:
+            return 0
+
     async def clear_pattern(self, pattern: str) -> int:
         try:
             client = await self._get_client()
@@ -196,6 +460,11 @@ class CacheService:
         self._backend = backend
         self._namespace = namespace
 
+    @property
+    def is_shared(self) -> bool:
+        """True if the backend is shared across processes (Redis)."""
+        return isinstance(self._backend, RedisCache)
+
     def _make_key(self, tenant_id: str, key: str) -> str:
         """
         Create namespaced, tenant-isolated cache key.
@@ -221,14 +490,53 @@ class CacheService:
         """Get value from tenant-specific cache."""
         return await self._backend.get(self._make_key(tenant_id, key))
 
+    async def get_many(self, tenant_id: str, keys: List[str]) -> Dict[str, Any]:
+        """Get multiple values from tenant-specific cache (one round trip)."""
+        full_keys = {self._make_key(tenant_id, key): key for key in keys}
+        values = await self._backend.get_many(list(full_keys))
+        return {full_keys[full_key]: value for full_key, value in values.items()}
+
     async def set(self, tenant_id: str, key: str, value: Any, ttl: int = 3600) -> bool:
         """Set value in tenant-specific cache."""
         return await self._backend.set(self._make_key(tenant_id, key), value, ttl)
 
+    async def set_many(self, tenant_id: str, items: Dict[str, Any], ttl: int = 3600) -> bool:
+        """Set multiple values in tenant-specific cache (one round trip)."""
+        return await self._backend.set_many(
+            {self._make_key(tenant_id, key): value for key, value in items.items()},
+            ttl
+        )
+
+    async def incr_by(self, tenant_id: str, key: str, amount: int, ttl: Optional[int] = None) -> int:
+        """Atomically increment a tenant-specific counter."""
+        return await self._backend.incr_by(self._make_key(tenant_id, key), amount, ttl)
+
+    async def decr_by(self, tenant_id: str, key: str, amount: int, ttl: Optional[int] = None) -> int:
+        """Atomically decrement a tenant-specific counter (floored at zero)."""
+        return await self._backend.decr_by(self._make_key(tenant_id, key), amount, ttl)
+
+    async def incr_many_within_limits(
+        self,
+        tenant_id: str,
+        increments: Dict[str, Tuple[int, int]],
+        ttl: Optional[int] = None
+    ) -> List[str]:
+        """Atomically check-and-increment several tenant-specific counters (all or none)."""
+        full_keys = {self._make_key(tenant_id, key): key for key in increments}
+        exceeded = await self._backend.incr_many_within_limits(
+            {full_key: increments[key] for full_key, key in full_keys.items()},
+            ttl
+        )
+        return [full_keys[full_key] for full_key in exceeded]
+
     async def delete(self, tenant_id: str, key: str) -> bool:
         """Delete key from tenant-specific cache."""
         return await self._backend.delete(self._make_key(tenant_id, key))
 
+    async def delete_many(self, tenant_id: str, keys: List[str]) -> int:
+        """Delete multiple keys from tenant-specific cache (one round trip)."""
+        return await self._backend.delete_many([self._make_key(tenant_id, key) for key in keys])
+
     async def clear_pattern(self, tenant_id: str, pattern: str) -> int:
         """Clear all keys matching pattern for a tenant."""
         return await self._backend.clear_pattern(self._make_key(tenant_id, pattern))
@@ -292,6 +600,35 @@ class CacheService:
             # Clear all serviceability cache for tenant and channel
             return await self.clear_pattern(tenant_id, f"serviceability:{channel}:*")
 
+    async def set_serviceability_many(
+        self,
+        tenant_id: str,
+        results: Dict[str, dict],
+        channel: str = "D2C",
+        ttl: Optional[int] = None
+    ) -> bool:
+        """Cache serviceability results for many pincodes of a tenant."""
+        ttl = ttl or settings.SERVICEABILITY_CACHE_TTL
+        return await self.set_many(
+            tenant_id,
+            {self._serviceability_key(pincode, channel): data for pincode, data in results.items()},
+            ttl
+        )
+
+    async def invalidate_serviceability_pincodes(
+        self,
+        tenant_id: str,
+        pincodes: List[str],
+        channels: List[str]
+    ) -> int:
+        """Invalidate specific pincodes of a tenant across channels."""
+        keys = [
+            self._serviceability_key(pincode, channel)
+            for pincode in pincodes
+            for channel in channels
+        ]
+        return await self.delete_many(tenant_id, keys) if keys else 0
+
     # ==================== Product Cache ====================
 
     def _product_key(self, product_id: str) -> str:
@@ -437,6 +774,85 @@ class CacheService:
         """Invalidate all inventory caches for a tenant."""
         return await self.clear_pattern(tenant_id, "inventory:*")
 
+    # ==================== Stock Reservation Cache ====================
+
+    def _soft_reserved_key(self, product_id: str) -> str:
+        """Generate cache key for shared-pool soft-reserved quantity."""
+        return f"stock:reserved:{product_id}"
+
+    def _channel_soft_reserved_key(self, channel_id: str, product_id: str) -> str:
+        """Generate cache key for channel-specific soft-reserved quantity."""
+        return f"channel:soft_reserved:{channel_id}:{product_id}"
+
+    async def get_soft_reserved_many(
+        self,
+        tenant_id: str,
+        product_ids: List[str],
+        channel_id: Optional[str] = None
+    ) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """
+        Get checkout soft reservations for many products in one round trip.
+
+        Returns:
+            (shared_pool, channel) dicts of {product_id: soft_reserved_qty}
+        """
+        shared_keys = {self._soft_reserved_key(pid): pid for pid in product_ids}
+        channel_keys = {}
+        if channel_id:
+            channel_keys = {
+                self._channel_soft_reserved_key(channel_id, pid): pid
+                for pid in product_ids
+            }
+
+        values = await self.get_many(tenant_id, list(shared_keys) + list(channel_keys))
+
+        shared = {pid: int(values.get(key) or 0) for key, pid in shared_keys.items()}
+        channel = {pid: int(values.get(key) or 0) for key, pid in channel_keys.items()}
+        return shared, channel
+
+    def _soft_reserved_counter_key(self, product_id: str, channel_id: Optional[str] = None) -> str:
+        if channel_id:
+            return self._channel_soft_reserved_key(channel_id, product_id)
+        return self._soft_reserved_key(product_id)
+
+    async def reserve_soft_stock(
+        self,
+        tenant_id: str,
+        items: Dict[str, Tuple[int, int]],
+        channel_id: Optional[str] = None,
+        ttl: Optional[int] = None
+    ) -> List[str]:
+        """
+        Atomically soft-reserve several products (all or none).
+
+        Args:
+            items: {product_id: (quantity, capacity)} where capacity is the
+                   stock available before soft reservations
+            channel_id: Reserve against the channel counters instead of the shared pool
+
+        Returns:
+            Product IDs whose capacity would be exceeded (empty = reserved)
+        """
+        keys = {self._soft_reserved_counter_key(pid, channel_id): pid for pid in items}
+        exceeded = await self.incr_many_within_limits(
+            tenant_id,
+            {key: items[pid] for key, pid in keys.items()},
+            ttl
+        )
+        return [keys[key] for key in exceeded]
+
+    async def release_soft_stock(
+        self,
+        tenant_id: str,
+        product_id: str,
+        quantity: int,
+        channel_id: Optional[str] = None,
+        ttl: Optional[int] = None
+    ) -> int:
+        """Atomically release a soft reservation (floored at zero). Returns the new total."""
+        key = self._soft_reserved_counter_key(product_id, channel_id)
+        return await self.decr_by(tenant_id, key, quantity, ttl)
+
     # ==================== Bulk Invalidation ====================
 
     async def invalidate_storefront(self, tenant_id: str) -> int:
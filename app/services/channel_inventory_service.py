@@ -23,6 +23,7 @@ from app.models.channel import SalesChannel, ChannelInventory, ChannelType
 from app.models.inventory import InventorySummary, StockItem
 from app.models.warehouse import Warehouse
 from app.services.cache_service import get_cache
+from app.middleware.tenant import get_current_tenant_id
 from app.config import settings
 
 
@@ -44,9 +45,10 @@ class ChannelInventoryService:
     - Auto-replenishment keeps channels stocked
     """
 
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, tenant_id: Optional[str] = None):
         self.db = db
         self.cache = get_cache()
+        self.tenant_id = tenant_id or get_current_tenant_id()
 
     # ==================== Channel Availability ====================
 
@@ -191,10 +193,13 @@ class ChannelInventoryService:
                 "reserved": row.total_reserved or 0,
             }
 
-        # Get soft reservations for all products
+        # Get soft reservations for all products in one round trip
+        _, channel_soft = await self.cache.get_soft_reserved_many(
+            self.tenant_id, [str(pid) for pid in product_ids], channel_id=str(channel.id)
+        )
         for pid in product_ids:
             inv = inventory_map.get(pid, {"allocated": 0, "buffer": 0, "reserved": 0})
-            soft_reserved = await self._get_channel_soft_reserved(channel.id, pid)
+            soft_reserved = channel_soft.get(str(pid), 0)
 
             available = max(0, inv["allocated"] - inv["buffer"] - inv["reserved"] - soft_reserved)
 
@@ -261,6 +266,12 @@ class ChannelInventoryService:
                     "product_id": str(product_id),
                     "quantity": quantity,
                     "channel_id": str(channel.id),
+                    # Stock before soft reservations, used for the atomic re-check
+                    "capacity": max(0,
+                        availability["allocated_quantity"] -
+                        availability["buffer_quantity"] -
+                        availability["reserved_quantity"]
+                    ),
                 })
             else:
                 failed_items.append({
@@ -279,6 +290,35 @@ class ChannelInventoryService:
                 "failed_items": failed_items,
             }
 
+        # Atomically re-check and increment soft reserved for every product
+        requested: Dict[str, int] = {}
+        capacity: Dict[str, int] = {}
+        for item in reserved_items:
+            requested[item["product_id"]] = requested.get(item["product_id"], 0) + item["quantity"]
+            capacity[item["product_id"]] = item.pop("capacity")
+
+        exceeded = await self.cache.reserve_soft_stock(
+            self.tenant_id,
+            {pid: (qty, capacity[pid]) for pid, qty in requested.items()},
+            channel_id=str(channel.id),
+            ttl=ttl_seconds + 60,  # Slightly longer TTL for cleanup
+        )
+        if exceeded:
+            return {
+                "success": False,
+                "reservation_id": None,
+                "error": f"{len(exceeded)} item(s) have insufficient channel inventory",
+                "reserved_items": [],
+                "failed_items": [
+                    {
+                        "product_id": pid,
+                        "requested": requested[pid],
+                        "reason": "Insufficient channel inventory",
+                    }
+                    for pid in exceeded
+                ],
+            }
+
         # Create soft reservations in cache
         reservation_data = {
             "reservation_id": reservation_id,
@@ -291,20 +331,12 @@ class ChannelInventoryService:
 
         # Store reservation
         await self.cache.set(
+            self.tenant_id,
             f"channel:reservation:{reservation_id}",
             reservation_data,
             ttl=ttl_seconds
         )
 
-        # Increment soft reserved for each product
-        for item in reserved_items:
-            await self._increment_channel_soft_reserved(
-                channel.id,
-                uuid.UUID(item["product_id"]),
-                item["quantity"],
-                ttl_seconds + 60  # Slightly longer TTL for cleanup
-            )
-
         return {
             "success": True,
             "reservation_id": reservation_id,
@@ -330,7 +362,7 @@ class ChannelInventoryService:
             True if successful
         """
         # Get reservation from cache
-        reservation = await self.cache.get(f"channel:reservation:{reservation_id}")
+        reservation = await self.cache.get(self.tenant_id, f"channel:reservation:{reservation_id}")
         if not reservation:
             return False
 
@@ -345,6 +377,7 @@ class ChannelInventoryService:
         reservation["confirmed_at"] = datetime.now(timezone.utc).isoformat()
 
         await self.cache.set(
+            self.tenant_id,
             f"channel:reservation:{reservation_id}",
             reservation,
             ttl=300  # Keep for 5 minutes for audit
@@ -373,7 +406,7 @@ class ChannelInventoryService:
         Returns:
             True if successful
         """
-        reservation = await self.cache.get(f"channel:reservation:{reservation_id}")
+        reservation = await self.cache.get(self.tenant_id, f"channel:reservation:{reservation_id}")
         if not reservation:
             return False
 
@@ -389,7 +422,7 @@ class ChannelInventoryService:
             await self._decrement_channel_soft_reserved(channel_id, product_id, quantity)
 
         # Delete reservation
-        await self.cache.delete(f"channel:reservation:{reservation_id}")
+        await self.cache.delete(self.tenant_id, f"channel:reservation:{reservation_id}")
 
         return True
 
@@ -787,7 +820,7 @@ class ChannelInventoryService:
     ) -> int:
         """Get soft-reserved quantity for channel from cache."""
         key = f"channel:soft_reserved:{channel_id}:{product_id}"
-        value = await self.cache.get(key)
+        value = await self.cache.get(self.tenant_id, key)
         return int(value) if value else 0
 
     async def _increment_channel_soft_reserved(
@@ -797,10 +830,10 @@ class ChannelInventoryService:
         quantity: int,
         ttl: int = 660
     ) -> bool:
-        """Increment soft-reserved quantity in cache."""
+        """Atomically increment soft-reserved quantity in cache."""
         key = f"channel:soft_reserved:{channel_id}:{product_id}"
-        current = await self._get_channel_soft_reserved(channel_id, product_id)
-        return await self.cache.set(key, current + quantity, ttl=ttl)
+        await self.cache.incr_by(self.tenant_id, key, quantity, ttl=ttl)
+        return True
 
     async def _decrement_channel_soft_reserved(
         self,
@@ -808,14 +841,11 @@ class ChannelInventoryService:
         product_id: uuid.UUID,
         quantity: int
     ) -> bool:
-        """Decrement soft-reserved quantity in cache."""
-        key = f"channel:soft_reserved:{channel_id}:{product_id}"
-        current = await self._get_channel_soft_reserved(channel_id, product_id)
-        new_value = max(0, current - quantity)
-        if new_value == 0:
-            await self.cache.delete(key)
-            return True
-        return await self.cache.set(key, new_value, ttl=660)
+        """Atomically decrement soft-reserved quantity in cache (floored at zero)."""
+        await self.cache.release_soft_stock(
+            self.tenant_id, str(product_id), quantity, channel_id=str(channel_id), ttl=660
+        )
+        return True
 
     async def _increment_channel_reserved(
         self,
@@ -0,0 +1,267 @@
+"""
+Customer RFM Materialization
+
+Scores every customer on Recency, Frequency and Monetary value and stores
+the result in customer_rfm_scores, so customer insights read precomputed
+rows instead of re-scoring all customers on every request.
+
+Scoring is array based: each dimension is binned into quintiles with one
+sort + searchsorted over all customers (O(n log n)), giving the same 1-5
+scores as counting values <= x per customer.
+
+Refresh strategy (refresh_customer_rfm job):
+- Order aggregates are recomputed only for customers whose orders changed
+  since the last refresh (Order.updated_at watermark); a first run backfills
+- Scores, segment and churn risk are then re-ranked for all customers in
+  memory, and only rows whose values changed are written
+"""
+
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from sqlalchemy import select, func, update, delete, and_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.customer import CustomerRFMScore
+from app.models.order import Order, OrderStatus
+
+logger = logging.getLogger(__name__)
+
+# Re-scan window before the last refresh, for transactions committed late
+_WATERMARK_OVERLAP = timedelta(minutes=5)
+
+SEGMENTS = [
+    "champions",
+    "loyal_customers",
+    "potential_loyalists",
+    "new_customers",
+    "at_risk",
+    "hibernating",
+    "lost",
+]
+
+
+# ==================== Scoring ====================
+
+def quintile_scores(values: np.ndarray) -> np.ndarray:
+    """
+    Score 1-5 by the share of customers with a value <= each value.
+
+    One sort plus a binary search per value, instead of a linear count per
+    value over a re-sorted list.
+    """
+    n = len(values)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    sorted_values = np.sort(values)
+    position = np.searchsorted(sorted_values, values, side="right") / n
+    return np.clip((position * 5).astype(np.int64) + 1, 1, 5)
+
+
+def score_customers(
+    days_since_last_order: np.ndarray,
+    order_count: np.ndarray,
+    total_spent: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """RFM scores, segment and churn risk for all customers at once."""
+    # Recency: fewer days = higher score
+    r = 6 - quintile_scores(days_since_last_order)
+    f = quintile_scores(order_count)
+    m = quintile_scores(total_spent)
+
+    segment = np.select(
+        [
+            (r >= 4) & (f >= 4) & (m >= 4),
+            f >= 4,
+            (r >= 4) & (f >= 2),
+            (r >= 4) & (f == 1),
+            (r <= 2) & (f >= 2),
+            (r <= 2) & (f <= 2) & (days_since_last_order < 180),
+        ],
+        SEGMENTS[:-1],
+        default="lost",
+    )
+
+    recency_risk = np.select(
+        [days_since_last_order > 90, days_since_last_order > 60, days_since_last_order > 30],
+        [40, 25, 10],
+        default=0,
+    )
+    frequency_risk = np.select(
+        [order_count <= 1, order_count <= 3, order_count <= 6],
+        [30, 20, 10],
+        default=0,
+    )
+    monetary_risk = 30 - (m * 6)  # Lower monetary = higher risk
+    churn_risk = (recency_risk + frequency_risk + monetary_risk) / 100.0
+
+    return {
+        "r_score": r,
+        "f_score": f,
+        "m_score": m,
+        "rfm_score": r + f + m,
+        "segment": segment,
+        "churn_risk_score": churn_risk,
+    }
+
+
+def days_since(last_order_date: Optional[datetime], now: datetime) -> int:
+    """Whole days since the last order (365 when unknown)."""
+    return (now - last_order_date).days if last_order_date else 365
+
+
+# ==================== Materialization ====================
+
+class CustomerRFMService:
+    """Maintains customer_rfm_scores for the current tenant schema."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _watermark(self) -> Optional[datetime]:
+        """Order updated_at watermark of the last refresh."""
+        return (await self.db.execute(
+            select(func.max(CustomerRFMScore.refreshed_at))
+        )).scalar()
+
+    async def _order_aggregates(
+        self,
+        customer_ids: Optional[List[uuid.UUID]] = None,
+    ) -> Dict[uuid.UUID, Tuple[datetime, int, Decimal]]:
+        """(last_order_date, order_count, total_spent) per customer from non-cancelled orders."""
+        query = (
+            select(
+                Order.customer_id,
+                func.max(Order.created_at),
+                func.count(Order.id),
+                func.coalesce(func.sum(Order.total_amount), 0),
+            )
+            .where(and_(Order.status != OrderStatus.CANCELLED, Order.customer_id.isnot(None)))
+            .group_by(Order.customer_id)
+        )
+        if customer_ids is not None:
+            query = query.where(Order.customer_id.in_(customer_ids))
+        result = await self.db.execute(query)
+        return {row[0]: (row[1], row[2], Decimal(str(row[3]))) for row in result.all()}
+
+    async def refresh(self, full: bool = False) -> Dict[str, int]:
+        """
+        Refresh order aggregates for changed customers and re-rank everyone.
+
+        Commits. Returns {"mode", "dirty", "inserted", "updated", "deleted"}.
+        """
+        started_at = datetime.now(timezone.utc)
+        last_refresh = None if full else await self._watermark()
+
+        if last_refresh is None:
+            mode = "full"
+            aggregates = await self._order_aggregates()
+            dirty = None
+        else:
+            mode = "incremental"
+            dirty_result = await self.db.execute(
+                select(Order.customer_id.distinct()).where(
+                    and_(
+                        Order.updated_at >= last_refresh - _WATERMARK_OVERLAP,
+                        Order.customer_id.isnot(None),
+                    )
+                )
+            )
+            dirty = list(dirty_result.scalars().all())
+            aggregates = await self._order_aggregates(dirty) if dirty else {}
+
+        existing_result = await self.db.execute(
+            select(
+                CustomerRFMScore.id,
+                CustomerRFMScore.customer_id,
+                CustomerRFMScore.last_order_date,
+                CustomerRFMScore.order_count,
+                CustomerRFMScore.total_spent,
+                CustomerRFMScore.r_score,
+                CustomerRFMScore.f_score,
+                CustomerRFMScore.m_score,
+                CustomerRFMScore.segment,
+                CustomerRFMScore.churn_risk_score,
+            )
+        )
+        existing = {row.customer_id: row for row in existing_result.all()}
+
+        # Merge refreshed aggregates over the stored ones
+        recomputed = set(existing) if dirty is None else set(dirty)
+        merged: Dict[uuid.UUID, Tuple[datetime, int, Decimal]] = {
+            customer_id: (row.last_order_date, row.order_count, Decimal(str(row.total_spent)))
+            for customer_id, row in existing.items()
+            if customer_id not in recomputed
+        }
+        merged.update(aggregates)
+        removed = [customer_id for customer_id in existing if customer_id not in merged]
+
+        customer_ids = list(merged)
+        stats = {"mode": mode, "dirty": len(recomputed), "inserted": 0, "updated": 0, "deleted": len(removed)}
+
+        if removed:
+            await self.db.execute(
+                delete(CustomerRFMScore).where(CustomerRFMScore.customer_id.in_(removed))
+            )
+
+        if customer_ids:
+            days = np.array([days_since(merged[c][0], started_at) for c in customer_ids], dtype=np.int64)
+            counts = np.array([merged[c][1] for c in customer_ids], dtype=np.int64)
+            spent = np.array([float(merged[c][2]) for c in customer_ids], dtype=np.float64)
+            scores = score_customers(days, counts, spent)
+
+            inserts = []
+            updates = []
+            for i, customer_id in enumerate(customer_ids):
+                last_order_date, order_count, total_spent = merged[customer_id]
+                values = {
+                    "last_order_date": last_order_date,
+                    "order_count": order_count,
+                    "total_spent": total_spent,
+                    "r_score": int(scores["r_score"][i]),
+                    "f_score": int(scores["f_score"][i]),
+                    "m_score": int(scores["m_score"][i]),
+                    "rfm_score": int(scores["rfm_score"][i]),
+                    "segment": str(scores["segment"][i]),
+                    "churn_risk_score": Decimal(str(round(float(scores["churn_risk_score"][i]), 2))),
+                    "refreshed_at": started_at,
+                }
+                row = existing.get(customer_id)
+                if row is None:
+                    inserts.append({"id": uuid.uuid4(), "customer_id": customer_id, **values})
+                elif (
+                    customer_id in recomputed
+                    or row.r_score != values["r_score"]
+                    or row.f_score != values["f_score"]
+                    or row.m_score != values["m_score"]
+                    or row.segment != values["segment"]
+                    or Decimal(str(row.churn_risk_score)) != values["churn_risk_score"]
+                ):
+                    updates.append({"id": row.id, **values})
+
+            if inserts:
+                # A concurrent refresh (e.g. two first reads) may have inserted the same customers
+                stmt = pg_insert(CustomerRFMScore)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[CustomerRFMScore.customer_id],
+                    set_={key: stmt.excluded[key] for key in inserts[0] if key not in ("id", "customer_id")},
+                )
+                await self.db.execute(stmt, inserts)
+            if updates:
+                await self.db.execute(update(CustomerRFMScore), updates)
+            stats["inserted"] = len(inserts)
+            stats["updated"] = len(updates)
+
+        await self.db.commit()
+        return stats
+
+    async def ensure_materialized(self) -> None:
+        """Build the scores on first use if the refresh job has not run yet."""
+        if await self._watermark() is None:
+            await self.refresh(full=True)
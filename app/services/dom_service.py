@@ -420,36 +420,32 @@ class DOMService:
         Returns:
             Dict[product_id, Dict[node_id, available_qty]]
         """
-        availability: Dict[uuid.UUID, Dict[uuid.UUID, int]] = {}
+        from app.services.allocation_service import AllocationService
 
-        for item in order.items:
-            product_id = item.product_id
+        product_ids = [item.product_id for item in order.items]
+        availability: Dict[uuid.UUID, Dict[uuid.UUID, int]] = {
+            product_id: {} for product_id in product_ids
+        }
 
-            # Get inventory across all nodes
-            query = select(
-                InventorySummary.warehouse_id,
-                InventorySummary.available_quantity
-            ).where(
-                InventorySummary.product_id == product_id,
-                InventorySummary.available_quantity > 0
-            )
+        # Inventory across all warehouses for every product in one query
+        matrix = await AllocationService(self.db).get_stock_availability_matrix(product_ids)
+        warehouse_ids = {warehouse_id for warehouse_id, _ in matrix.summary}
+        if not warehouse_ids:
+            return availability
 
-            result = await self.db.execute(query)
-            rows = result.all()
+        # Map warehouse_id to node_id in one query
+        node_result = await self.db.execute(
+            select(FulfillmentNode.warehouse_id, FulfillmentNode.id).where(
+                FulfillmentNode.warehouse_id.in_(warehouse_ids),
+                FulfillmentNode.is_active == True
+            )
+        )
+        node_by_warehouse = {warehouse_id: node_id for warehouse_id, node_id in node_result.all()}
 
-            # Map warehouse_id to node_id
-            availability[product_id] = {}
-            for warehouse_id, qty in rows:
-                # Get node for this warehouse
-                node_result = await self.db.execute(
-                    select(FulfillmentNode.id).where(
-                        FulfillmentNode.warehouse_id == warehouse_id,
-                        FulfillmentNode.is_active == True
-                    )
-                )
-                node_id = node_result.scalar_one_or_none()
-                if node_id:
-                    availability[product_id][node_id] = qty
+        for (warehouse_id, product_id), (qty, _) in matrix.summary.items():
+            node_id = node_by_warehouse.get(warehouse_id)
+            if node_id and qty > 0 and product_id in availability:
+                availability[product_id][node_id] = qty
 
         return availability
 
@@ -0,0 +1,137 @@
+"""
+General Ledger Posting Engine
+
+Posts journal entry lines to the general ledger without a read-modify-write
+on ChartOfAccount rows:
+
+1. Load the account types for all of the entry's accounts in one query
+2. Apply the per-account balance deltas with one atomic
+   UPDATE ... SET current_balance = current_balance + delta ... RETURNING
+3. Derive each line's running balance from the returned balance, walking the
+   entry's lines backwards
+
+The UPDATE holds the account row locks only until commit, and the balance
+is never computed from a stale read, so concurrent invoices posting to the
+same hot accounts (AR, Sales, GST Output) no longer lose updates.
+GeneralLedger.ledger_sequence gives the per-account posting order that the
+running balances follow. Back-dated postings also adjust any closed-period
+balance snapshots dated on or after the entry (AccountBalanceService).
+"""
+
+import logging
+import uuid
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import select, update, case, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.accounting import (
+    ChartOfAccount,
+    GeneralLedger,
+    JournalEntry,
+    JournalEntryLine,
+    AccountType,
+)
+from app.services.account_balance_service import AccountBalanceService
+
+logger = logging.getLogger(__name__)
+
+
+def balance_change(account_type, debit: Optional[Decimal], credit: Optional[Decimal]) -> Decimal:
+    """
+    Signed change to an account's balance.
+
+    Asset/Expense: Debit increases, Credit decreases
+    Liability/Equity/Revenue: Credit increases, Debit decreases
+    """
+    debit = debit or Decimal("0")
+    credit = credit or Decimal("0")
+    if account_type in [AccountType.ASSET, AccountType.EXPENSE]:
+        return debit - credit
+    return credit - debit
+
+
+class GLPostingService:
+    """Posts journal entries to the general ledger with atomic balance updates."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _apply_deltas(self, deltas: Dict[uuid.UUID, Decimal]) -> Dict[uuid.UUID, Decimal]:
+        """Add deltas to current_balance in one UPDATE; returns the new balances."""
+        result = await self.db.execute(
+            update(ChartOfAccount)
+            .where(ChartOfAccount.id.in_(list(deltas)))
+            .values(
+                current_balance=func.coalesce(ChartOfAccount.current_balance, 0)
+                + case(deltas, value=ChartOfAccount.id, else_=0)
+            )
+            .returning(ChartOfAccount.id, ChartOfAccount.current_balance)
+            .execution_options(synchronize_session="fetch")
+        )
+        return {row.id: row.current_balance for row in result.all()}
+
+    async def post(
+        self,
+        journal_entry: JournalEntry,
+        lines: Iterable[JournalEntryLine],
+    ) -> List[GeneralLedger]:
+        """
+        Post journal lines to the general ledger.
+
+        Adds the GeneralLedger rows and updates account balances; does not
+        change the journal status or commit.
+        """
+        lines = list(lines)
+        if not lines:
+            return []
+        if any(line.id is None for line in lines):
+            await self.db.flush()
+
+        account_ids = {line.account_id for line in lines}
+        type_result = await self.db.execute(
+            select(ChartOfAccount.id, ChartOfAccount.account_type)
+            .where(ChartOfAccount.id.in_(account_ids))
+        )
+        account_types = dict(type_result.all())
+        missing = account_ids - set(account_types)
+        if missing:
+            raise ValueError(f"Account not found: {', '.join(str(a) for a in missing)}")
+
+        line_deltas = [
+            balance_change(account_types[line.account_id], line.debit_amount, line.credit_amount)
+            for line in lines
+        ]
+        totals: Dict[uuid.UUID, Decimal] = {}
+        for line, delta in zip(lines, line_deltas):
+            totals[line.account_id] = totals.get(line.account_id, Decimal("0")) + delta
+
+        # Running balance after each line: returned balance minus later lines' deltas
+        remaining = await self._apply_deltas(totals)
+        await AccountBalanceService(self.db).apply_posting(journal_entry.entry_date, totals)
+        running: List[Decimal] = [Decimal("0")] * len(lines)
+        for idx in range(len(lines) - 1, -1, -1):
+            account_id = lines[idx].account_id
+            running[idx] = remaining[account_id]
+            remaining[account_id] -= line_deltas[idx]
+
+        gl_entries = [
+            GeneralLedger(
+                id=uuid.uuid4(),
+                account_id=line.account_id,
+                period_id=journal_entry.period_id,
+                transaction_date=journal_entry.entry_date,
+                journal_entry_id=journal_entry.id,
+                journal_line_id=line.id,
+                debit_amount=line.debit_amount or Decimal("0"),
+                credit_amount=line.credit_amount or Decimal("0"),
+                running_balance=running[idx],
+                narration=line.description or journal_entry.narration,
+                cost_center_id=line.cost_center_id,
+                channel_id=journal_entry.channel_id,
+            )
+            for idx, line in enumerate(lines)
+        ]
+        self.db.add_all(gl_entries)
+        return gl_entries
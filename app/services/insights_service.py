@@ -6,7 +6,9 @@ Statistical algorithms for predictive analytics:
 - Inventory recommendations (demand forecasting, stockout prediction)
 - Customer intelligence (RFM segmentation, churn risk scoring)
 
-No external AI APIs - all computations done locally.
+No external AI APIs - all computations done locally. Customer RFM scores,
+segments and churn risk are read from customer_rfm_scores, maintained by
+CustomerRFMService.
 """
 
 from datetime import date, datetime, timedelta, timezone
@@ -23,9 +25,10 @@ from sqlalchemy.orm import selectinload
 from app.models.order import Order, OrderItem, OrderStatus
 from app.models.product import Product
 from app.models.category import Category
-from app.models.customer import Customer
+from app.models.customer import Customer, CustomerRFMScore
 from app.models.inventory import StockItem, InventorySummary
 from app.models.channel import SalesChannel
+from app.services.customer_rfm_service import CustomerRFMService, SEGMENTS, days_since
 
 
 # ==================== Statistical Utility Functions ====================
@@ -678,80 +681,50 @@ class InsightsService:
 
     # ==================== CUSTOMER INSIGHTS ====================
 
-    async def get_customer_rfm_data(self) -> List[Dict]:
-        """
-        Calculate RFM (Recency, Frequency, Monetary) scores for all customers.
-        """
-        # Get customer order summary
+    async def _rfm_rows(self, *conditions, order_by=None, limit: Optional[int] = None):
+        """Materialized RFM rows joined with customer contact details."""
+        await CustomerRFMService(self.db).ensure_materialized()
         query = select(
-            Customer.id,
-            Customer.name,
+            CustomerRFMScore,
+            Customer.first_name,
+            Customer.last_name,
             Customer.email,
             Customer.phone,
-            func.max(Order.created_at).label('last_order_date'),
-            func.count(Order.id).label('order_count'),
-            func.sum(Order.total_amount).label('total_spent')
-        ).join(
-            Order, Customer.id == Order.customer_id
-        ).where(
-            Order.status != OrderStatus.CANCELLED
-        ).group_by(
-            Customer.id, Customer.name, Customer.email, Customer.phone
-        )
-
+        ).join(Customer, Customer.id == CustomerRFMScore.customer_id)
+        if conditions:
+            query = query.where(and_(*conditions))
+        if order_by is not None:
+            query = query.order_by(order_by)
+        if limit is not None:
+            query = query.limit(limit)
         result = await self.db.execute(query)
-        rows = result.all()
+        return result.all()
 
-        if not rows:
-            return []
-
-        # Calculate RFM scores
-        customers_data = []
-        for row in rows:
-            days_since_order = (datetime.now(timezone.utc) - row.last_order_date).days if row.last_order_date else 365
-
-            customers_data.append({
-                "id": str(row.id),
-                "name": row.name,
-                "email": row.email,
-                "phone": row.phone,
-                "days_since_last_order": days_since_order,
-                "order_count": row.order_count,
-                "total_spent": float(row.total_spent or 0)
-            })
-
-        # Calculate percentiles for scoring
-        all_recency = [c["days_since_last_order"] for c in customers_data]
-        all_frequency = [c["order_count"] for c in customers_data]
-        all_monetary = [c["total_spent"] for c in customers_data]
-
-        def get_percentile_score(value: float, values: List[float], reverse: bool = False) -> int:
-            """Get score 1-5 based on percentile."""
-            sorted_vals = sorted(values, reverse=reverse)
-            if not sorted_vals:
-                return 3
-
-            position = sum(1 for v in sorted_vals if v <= value) / len(sorted_vals)
-            return min(5, max(1, int(position * 5) + 1))
-
-        for customer in customers_data:
-            # Recency: lower days = higher score
-            customer["r_score"] = 6 - get_percentile_score(
-                customer["days_since_last_order"], all_recency
-            )
-            # Frequency: higher = higher score
-            customer["f_score"] = get_percentile_score(
-                customer["order_count"], all_frequency
-            )
-            # Monetary: higher = higher score
-            customer["m_score"] = get_percentile_score(
-                customer["total_spent"], all_monetary
-            )
-
-            # Combined RFM score
-            customer["rfm_score"] = customer["r_score"] + customer["f_score"] + customer["m_score"]
+    def _rfm_dict(self, row, now: datetime) -> Dict:
+        score = row.CustomerRFMScore
+        name = f"{row.first_name} {row.last_name}" if row.last_name else row.first_name
+        return {
+            "id": str(score.customer_id),
+            "name": name,
+            "email": row.email,
+            "phone": row.phone,
+            "days_since_last_order": days_since(score.last_order_date, now),
+            "order_count": score.order_count,
+            "total_spent": float(score.total_spent or 0),
+            "r_score": score.r_score,
+            "f_score": score.f_score,
+            "m_score": score.m_score,
+            "rfm_score": score.rfm_score,
+            "segment": score.segment,
+            "churn_risk_score": float(score.churn_risk_score or 0),
+        }
 
-        return customers_data
+    async def get_customer_rfm_data(self) -> List[Dict]:
+        """
+        Get RFM (Recency, Frequency, Monetary) scores for all customers.
+        """
+        now = datetime.now(timezone.utc)
+        return [self._rfm_dict(row, now) for row in await self._rfm_rows()]
 
     async def get_churn_risk_customers(
         self,
@@ -761,116 +734,88 @@ class InsightsService:
         """
         Identify customers at high risk of churning.
         """
-        customers = await self.get_customer_rfm_data()
+        rows = await self._rfm_rows(
+            CustomerRFMScore.churn_risk_score >= Decimal(str(threshold)),
+            order_by=CustomerRFMScore.churn_risk_score.desc(),
+            limit=limit,
+        )
+        now = datetime.now(timezone.utc)
 
         at_risk = []
-        for customer in customers:
-            # Churn risk scoring
-            recency_risk = 0
-            if customer["days_since_last_order"] > 90:
-                recency_risk = 40
-            elif customer["days_since_last_order"] > 60:
-                recency_risk = 25
-            elif customer["days_since_last_order"] > 30:
-                recency_risk = 10
-
-            frequency_risk = 0
-            if customer["order_count"] <= 1:
-                frequency_risk = 30
-            elif customer["order_count"] <= 3:
-                frequency_risk = 20
-            elif customer["order_count"] <= 6:
-                frequency_risk = 10
-
-            monetary_risk = 30 - (customer["m_score"] * 6)  # Lower monetary = higher risk
-
-            risk_score = (recency_risk + frequency_risk + monetary_risk) / 100.0
-
-            if risk_score >= threshold:
-                # Determine recommended action
-                if risk_score >= 0.8:
-                    action = "URGENT_CALL"
-                elif risk_score >= 0.7:
-                    action = "PERSONAL_EMAIL"
-                elif risk_score >= 0.6:
-                    action = "SPECIAL_OFFER"
-                else:
-                    action = "LOYALTY_PROGRAM"
-
-                avg_order_value = customer["total_spent"] / customer["order_count"] if customer["order_count"] > 0 else 0
-
-                at_risk.append({
-                    "customer_id": customer["id"],
-                    "customer_name": customer["name"],
-                    "email": customer["email"],
-                    "phone": customer["phone"],
-                    "risk_score": round(risk_score, 2),
-                    "days_since_last_order": customer["days_since_last_order"],
-                    "total_orders": customer["order_count"],
-                    "total_spent": customer["total_spent"],
-                    "avg_order_value": round(avg_order_value, 2),
-                    "recommended_action": action
-                })
-
-        # Sort by risk score
-        at_risk.sort(key=lambda x: x["risk_score"], reverse=True)
+        for row in rows:
+            customer = self._rfm_dict(row, now)
+            risk_score = customer["churn_risk_score"]
+
+            # Determine recommended action
+            if risk_score >= 0.8:
+                action = "URGENT_CALL"
+            elif risk_score >= 0.7:
+                action = "PERSONAL_EMAIL"
+            elif risk_score >= 0.6:
+                action = "SPECIAL_OFFER"
+            else:
+                action = "LOYALTY_PROGRAM"
+
+            avg_order_value = customer["total_spent"] / customer["order_count"] if customer["order_count"] > 0 else 0
+
+            at_risk.append({
+                "customer_id": customer["id"],
+                "customer_name": customer["name"],
+                "email": customer["email"],
+                "phone": customer["phone"],
+                "risk_score": round(risk_score, 2),
+                "days_since_last_order": customer["days_since_last_order"],
+                "total_orders": customer["order_count"],
+                "total_spent": customer["total_spent"],
+                "avg_order_value": round(avg_order_value, 2),
+                "recommended_action": action
+            })
 
-        return at_risk[:limit]
+        return at_risk
 
     async def get_customer_segments(self) -> Dict:
         """
         Segment customers using RFM analysis.
         """
-        customers = await self.get_customer_rfm_data()
+        await CustomerRFMService(self.db).ensure_materialized()
+        result = await self.db.execute(
+            select(
+                CustomerRFMScore.segment,
+                func.count(CustomerRFMScore.id).label("customer_count"),
+                func.coalesce(func.sum(CustomerRFMScore.total_spent), 0).label("total_revenue"),
+                func.coalesce(func.sum(
+                    CustomerRFMScore.total_spent / func.nullif(CustomerRFMScore.order_count, 0)
+                ), 0).label("sum_order_value"),
+            ).group_by(CustomerRFMScore.segment)
+        )
+        by_segment = {row.segment: row for row in result.all()}
 
-        if not customers:
+        total_customers = sum(row.customer_count for row in by_segment.values())
+        if total_customers == 0:
             return self._empty_segments()
 
-        segments = {
-            "champions": {"customers": [], "description": "Best customers - high RFM scores"},
-            "loyal_customers": {"customers": [], "description": "Frequent buyers"},
-            "potential_loyalists": {"customers": [], "description": "Recent with good frequency"},
-            "new_customers": {"customers": [], "description": "Recent first-time buyers"},
-            "at_risk": {"customers": [], "description": "Haven't ordered recently"},
-            "hibernating": {"customers": [], "description": "Long time no order"},
-            "lost": {"customers": [], "description": "No activity for very long"}
+        descriptions = {
+            "champions": "Best customers - high RFM scores",
+            "loyal_customers": "Frequent buyers",
+            "potential_loyalists": "Recent with good frequency",
+            "new_customers": "Recent first-time buyers",
+            "at_risk": "Haven't ordered recently",
+            "hibernating": "Long time no order",
+            "lost": "No activity for very long",
         }
 
-        for customer in customers:
-            r, f, m = customer["r_score"], customer["f_score"], customer["m_score"]
-
-            if r >= 4 and f >= 4 and m >= 4:
-                segments["champions"]["customers"].append(customer)
-            elif f >= 4:
-                segments["loyal_customers"]["customers"].append(customer)
-            elif r >= 4 and f >= 2:
-                segments["potential_loyalists"]["customers"].append(customer)
-            elif r >= 4 and f == 1:
-                segments["new_customers"]["customers"].append(customer)
-            elif r <= 2 and f >= 2:
-                segments["at_risk"]["customers"].append(customer)
-            elif r <= 2 and f <= 2 and customer["days_since_last_order"] < 180:
-                segments["hibernating"]["customers"].append(customer)
-            else:
-                segments["lost"]["customers"].append(customer)
-
-        # Calculate segment stats
-        total_customers = len(customers)
         result = {"total_customers": total_customers}
-
-        for segment_name, segment_data in segments.items():
-            segment_customers = segment_data["customers"]
-            count = len(segment_customers)
+        for segment_name in SEGMENTS:
+            row = by_segment.get(segment_name)
+            count = row.customer_count if row else 0
 
             result[segment_name] = {
                 "segment_name": segment_name.replace("_", " ").title(),
-                "description": segment_data["description"],
+                "description": descriptions[segment_name],
                 "customer_count": count,
                 "percentage": round((count / total_customers) * 100, 1) if total_customers > 0 else 0,
-                "avg_order_value": round(
-                    sum(c["total_spent"] / c["order_count"] for c in segment_customers if c["order_count"] > 0) / count, 2
-                ) if count > 0 else 0,
-                "total_revenue": round(sum(c["total_spent"] for c in segment_customers), 2),
+                "avg_order_value": round(float(row.sum_order_value) / count, 2) if count > 0 else 0,
+                "total_revenue": round(float(row.total_revenue), 2) if row else 0,
                 "characteristics": self._get_segment_characteristics(segment_name)
             }
 
@@ -915,7 +860,9 @@ class InsightsService:
         """
         Get top customers by total spend and predicted lifetime value.
         """
-        customers = await self.get_customer_rfm_data()
+        now = datetime.now(timezone.utc)
+        rows = await self._rfm_rows(order_by=CustomerRFMScore.total_spent.desc(), limit=limit)
+        customers = [self._rfm_dict(row, now) for row in rows]
 
         # Calculate CLV (simplified: avg order value * predicted orders per year)
         for customer in customers:
@@ -938,9 +885,6 @@ class InsightsService:
             else:
                 customer["segment"] = "At Risk"
 
-        # Sort by total spent
-        customers.sort(key=lambda x: x["total_spent"], reverse=True)
-
         return [
             {
                 "customer_id": c["id"],
@@ -951,7 +895,7 @@ class InsightsService:
                 "predicted_clv": c["predicted_lifetime_value"],
                 "segment": c["segment"]
             }
-            for c in customers[:limit]
+            for c in customers
         ]
 
     # ==================== DASHBOARD SUMMARY ====================
@@ -23,6 +23,7 @@ from app.models.stock_adjustment import (
     InventoryAudit,
 )
 from app.models.product import Product, ProductVariant
+from app.services.stock_receipt_service import BulkStockReceiver
 
 
 class InventoryService:
@@ -235,74 +236,23 @@ class InventoryService:
         purchase_order_id: Optional[uuid.UUID] = None,
         vendor_id: Optional[uuid.UUID] = None,
         created_by: uuid.UUID = None,
-    ) -> List[StockItem]:
-        """Bulk receive stock items (GRN)."""
-        created_items = []
-
-        for item_data in items:
-            product_id = item_data["product_id"]
-            variant_id = item_data.get("variant_id")
-            quantity = item_data["quantity"]
-            serial_numbers = item_data.get("serial_numbers", [])
-
-            # If serial numbers provided, create individual items
-            if serial_numbers:
-                for serial in serial_numbers:
-                    stock_item = StockItem(
-                        product_id=product_id,
-                        variant_id=variant_id,
-                        warehouse_id=warehouse_id,
-                        serial_number=serial,
-                        batch_number=item_data.get("batch_number"),
-                        grn_number=grn_number,
-                        purchase_order_id=purchase_order_id,
-                        vendor_id=vendor_id,
-                        purchase_price=item_data.get("purchase_price", 0),
-                        manufacturing_date=item_data.get("manufacturing_date"),
-                        expiry_date=item_data.get("expiry_date"),
-                        status=StockItemStatus.AVAILABLE,
-                    )
-                    self.db.add(stock_item)
-                    created_items.append(stock_item)
-            else:
-                # Create non-serialized items
-                for _ in range(quantity):
-                    stock_item = StockItem(
-                        product_id=product_id,
-                        variant_id=variant_id,
-                        warehouse_id=warehouse_id,
-                        batch_number=item_data.get("batch_number"),
-                        grn_number=grn_number,
-                        purchase_order_id=purchase_order_id,
-                        vendor_id=vendor_id,
-                        purchase_price=item_data.get("purchase_price", 0),
-                        manufacturing_date=item_data.get("manufacturing_date"),
-                        expiry_date=item_data.get("expiry_date"),
-                        status=StockItemStatus.AVAILABLE,
-                    )
-                    self.db.add(stock_item)
-                    created_items.append(stock_item)
-
-            # Update inventory summary
-            await self._update_inventory_summary(
-                warehouse_id, product_id, variant_id, quantity_change=quantity
-            )
-
-            # Create stock movement
-            await self._create_stock_movement(
-                movement_type=StockMovementType.RECEIPT,
-                warehouse_id=warehouse_id,
-                product_id=product_id,
-                variant_id=variant_id,
-                quantity=quantity,
-                unit_cost=item_data.get("purchase_price", 0),
-                reference_type="grn",
-                reference_number=grn_number,
-                created_by=created_by,
-            )
+    ) -> int:
+        """
+        Bulk receive stock items (GRN).
 
+        Streams the stock items and writes summaries and movements in bulk
+        (BulkStockReceiver). Returns the number of stock items received.
+        """
+        received = await BulkStockReceiver(self.db).receive(
+            warehouse_id=warehouse_id,
+            grn_number=grn_number,
+            items=items,
+            purchase_order_id=purchase_order_id,
+            vendor_id=vendor_id,
+            created_by=created_by,
+        )
         await self.db.commit()
-        return created_items
+        return received
 
     async def allocate_stock_for_order(
         self,
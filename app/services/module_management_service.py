@@ -7,6 +7,7 @@ from sqlalchemy import select, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.tenant import Tenant, ErpModule, TenantSubscription
+from app.core.entitlement_cache import invalidate_entitlements
 
 
 class ModuleManagementService:
@@ -198,6 +199,9 @@ class ModuleManagementService:
 
         await self.db.commit()
 
+        # New subscriptions take effect immediately on every worker
+        await invalidate_entitlements(tenant_id)
+
         return new_subscriptions
 
     async def unsubscribe_from_modules(
@@ -257,4 +261,7 @@ class ModuleManagementService:
 
         await self.db.commit()
 
+        # Revocations take effect immediately on every worker
+        await invalidate_entitlements(tenant_id)
+
         return count
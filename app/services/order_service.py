@@ -19,6 +19,7 @@ from app.models.product import Product, ProductVariant
 from app.models.community_partner import CommunityPartner, PartnerOrder, PartnerCommission
 from app.schemas.order import OrderCreate, OrderUpdate, OrderItemCreate
 from app.services.pricing_service import PricingService
+from app.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -477,7 +478,7 @@ class OrderService:
                 customer.credit_used = (customer.credit_used or Decimal("0")) + total_amount
 
             await self.db.commit()
-            return await self.get_order_by_id(order.id, include_all=True)
+            order_id = order.id
 
         except IntegrityError as e:
             await self.db.rollback()
@@ -492,6 +493,35 @@ class OrderService:
             logger.error(f"Unexpected error creating order: {e}")
             raise
 
+        await self._screen_new_order(order, [item["quantity"] for item in items_data])
+        return await self.get_order_by_id(order_id, include_all=True)
+
+    async def _screen_new_order(self, order: Order, item_quantities: List[int]) -> None:
+        """
+        Inline fraud screen for a just-created order.
+
+        HIGH/CRITICAL risk puts the order ON_HOLD. Scoring is bounded by
+        FRAUD_SCORING_BUDGET_MS and runs in a savepoint, so a scoring failure
+        or timeout never blocks or undoes order creation.
+        """
+        order_id = order.id
+        try:
+            from app.services.ai.oms.fraud_detection import OMSFraudDetectionAgent
+            fraud_result = await OMSFraudDetectionAgent(self.db).score_new_order(
+                order, item_quantities, budget_ms=settings.FRAUD_SCORING_BUDGET_MS
+            )
+        except Exception:
+            logger.warning(f"Fraud scoring failed for order {order_id}, continuing without hold", exc_info=True)
+            return
+
+        if fraud_result["risk_level"] in ("HIGH", "CRITICAL"):
+            await self.update_order_status(
+                order_id,
+                OrderStatus.ON_HOLD,
+                changed_by=None,
+                notes=f"Auto-held by AI fraud detection (score: {fraud_result['risk_score']}, level: {fraud_result['risk_level']})",
+            )
+
     async def update_order_status(
         self,
         order_id: uuid.UUID,
@@ -507,6 +537,10 @@ class OrderService:
         old_status = order.status
         order.status = new_status
 
+        # Keep the S&OP daily demand rollup in step with delivered orders
+        from app.services.snop.demand_rollup import DemandRollupService
+        await DemandRollupService(self.db).on_order_status_change(order, old_status, new_status)
+
         # Update timestamps based on status
         if new_status == OrderStatus.CONFIRMED:
             order.confirmed_at = datetime.now(timezone.utc)
@@ -9,6 +9,7 @@ from app.models.user import User, UserRole
 from app.models.role import Role, RoleLevel
 from app.models.permission import Permission, RolePermission
 from app.models.module import Module
+from app.core.principal_cache import invalidate_principals_on_commit
 from app.schemas.role import RoleCreate, RoleUpdate
 from app.schemas.permission import (
     PermissionsByModule,
@@ -157,6 +158,7 @@ class RBACService:
                     continue
                 setattr(role, field, value)
 
+        invalidate_principals_on_commit(self.db)
         await self.db.commit()
         await self.db.refresh(role)
         return role
@@ -168,6 +170,7 @@ class RBACService:
             return False
 
         role.is_active = False
+        invalidate_principals_on_commit(self.db)
         await self.db.commit()
         return True
 
@@ -269,6 +272,8 @@ class RBACService:
             self.db.add(role_perm)
 
         await self.db.flush()
+        # The caller commits; cached permission sets go stale once it does
+        invalidate_principals_on_commit(self.db)
 
     # ==================== USER-ROLE METHODS ====================
 
@@ -304,6 +309,7 @@ class RBACService:
             )
             self.db.add(user_role)
 
+        invalidate_principals_on_commit(self.db)
         await self.db.commit()
 
     async def add_role_to_user(
@@ -328,6 +334,7 @@ class RBACService:
             assigned_by=assigned_by
         )
         self.db.add(user_role)
+        invalidate_principals_on_commit(self.db)
         await self.db.commit()
         return True
 
@@ -343,6 +350,7 @@ class RBACService:
                 UserRole.role_id == role_id
             )
         )
+        invalidate_principals_on_commit(self.db)
         await self.db.commit()
         return result.rowcount > 0
 
@@ -35,12 +35,16 @@ Same spare part item can have TWO series:
 - SPPRG001 → APSTAAPR00000001 (Premium from STOS)
 """
 
+import base64
+import logging
 import uuid
 from datetime import datetime, timezone
-from typing import List, Optional, Dict, Tuple
-from sqlalchemy import select, func, and_
+from typing import AsyncIterator, Iterator, List, Optional, Dict, Tuple
+from sqlalchemy import select, func, and_, update, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.database import copy_rows
+
 from app.models.serialization import (
     SerialSequence,
     ProductSerialSequence,
@@ -65,6 +69,8 @@ from app.schemas.serialization import (
     FGCodeGenerateResponse,
 )
 
+logger = logging.getLogger(__name__)
+
 
 class SerializationService:
     """Service for generating and managing product serial numbers/barcodes"""
@@ -196,6 +202,35 @@ class SerializationService:
     SERIAL_DIGITS = 8
     MAX_SERIAL = 99999999
 
+    # po_serials rows per COPY batch during generation
+    SERIAL_CHUNK_SIZE = 5000
+
+    # Largest run whose barcodes are returned inline by generate_serials_for_po
+    RESPONSE_BARCODE_LIMIT = 1000
+
+    # Rows fetched per server-side cursor round trip in serial exports
+    EXPORT_CHUNK_SIZE = 2000
+
+    # Columns written for each generated serial, in COPY order
+    PO_SERIAL_COLUMNS = (
+        "id",
+        "po_id",
+        "po_item_id",
+        "product_id",
+        "product_sku",
+        "model_code",
+        "item_type",
+        "brand_prefix",
+        "supplier_code",
+        "year_code",
+        "month_code",
+        "serial_number",
+        "barcode",
+        "status",
+        "created_at",
+        "updated_at",
+    )
+
     def generate_fg_barcode(
         self,
         year_code: str,
@@ -434,24 +469,38 @@ class SerializationService:
         """
         Reserve a range of serial numbers from product sequence.
 
+        The range is claimed with one atomic UPDATE ... RETURNING, so
+        concurrent generation runs for the same model never overlap.
+
         Returns (start_serial, end_serial)
         """
-        start_serial = sequence.last_serial + 1
-        end_serial = start_serial + quantity - 1
+        result = await self.db.execute(
+            update(ProductSerialSequence)
+            .where(
+                and_(
+                    ProductSerialSequence.id == sequence.id,
+                    ProductSerialSequence.last_serial + quantity <= ProductSerialSequence.max_serial,
+                )
+            )
+            .values(
+                last_serial=ProductSerialSequence.last_serial + quantity,
+                total_generated=func.coalesce(ProductSerialSequence.total_generated, 0) + quantity,
+                updated_at=datetime.now(timezone.utc),
+            )
+            .returning(ProductSerialSequence.last_serial)
+            .execution_options(synchronize_session="fetch")
+        )
+        end_serial = result.scalar_one_or_none()
 
-        if end_serial > sequence.max_serial:
+        if end_serial is None:
+            await self.db.refresh(sequence)
             raise ValueError(
                 f"Serial number overflow for {sequence.model_code}! "
-                f"Max is {sequence.max_serial}, requested end: {end_serial}. "
+                f"Max is {sequence.max_serial}, requested end: {sequence.last_serial + quantity}. "
                 f"Current last serial: {sequence.last_serial}"
             )
 
-        # Update sequence
-        sequence.last_serial = end_serial
-        sequence.total_generated += quantity
-        sequence.updated_at = datetime.now(timezone.utc)
-
-        return start_serial, end_serial
+        return end_serial - quantity + 1, end_serial
 
     async def get_product_sequence_status(
         self,
@@ -540,23 +589,27 @@ class SerializationService:
         - Serial numbers do NOT reset by year/month
         - Year/month codes are still included in barcode for traceability
 
+        Each item's range is reserved atomically, then its po_serials rows are
+        generated and bulk loaded (COPY) in chunks of SERIAL_CHUNK_SIZE. The
+        response carries the per-item ranges; the barcode list is included only
+        for runs up to RESPONSE_BARCODE_LIMIT, larger runs are read back through
+        the serial export.
+
         This is called when a PO is sent to the vendor.
         """
-        import logging
-        logging.info(f"[SerializationService] generate_serials_for_po called: po_id={request.po_id}, supplier={request.supplier_code}, items={len(request.items)}")
+        logger.info(f"[SerializationService] generate_serials_for_po called: po_id={request.po_id}, supplier={request.supplier_code}, items={len(request.items)}")
 
         # Year/month codes for barcode (traceability only, not for sequence lookup)
         year_code = self.get_year_code()
         month_code = self.get_month_code()
-        logging.info(f"[SerializationService] year_code={year_code}, month_code={month_code}")
 
-        all_barcodes = []
+        total_generated = sum(item.quantity for item in request.items)
+        include_barcodes = total_generated <= self.RESPONSE_BARCODE_LIMIT
+        barcodes: List[str] = []
         item_summaries = []
 
-        for idx, item in enumerate(request.items):
-            logging.info(f"[SerializationService] Processing item {idx+1}/{len(request.items)}: model={item.model_code}, qty={item.quantity}, type={item.item_type}")
-
-            # NEW: Use product-level sequencing (continuous per model)
+        for item in request.items:
+            # Product-level sequencing (continuous per model)
             product_sequence = await self.get_or_create_product_sequence(
                 model_code=item.model_code,
                 product_id=item.product_id,
@@ -564,77 +617,88 @@ class SerializationService:
                 product_sku=item.product_sku,
                 item_type=item.item_type,
             )
-            logging.info(f"[SerializationService] Got sequence: id={product_sequence.id}, last_serial={product_sequence.last_serial}")
 
             # Reserve serial range from product sequence
             start_serial, end_serial = await self.get_next_product_serial_range(
                 product_sequence, item.quantity
             )
-            logging.info(f"[SerializationService] Reserved range: {start_serial} - {end_serial}")
-
-            # Generate individual serial records
-            item_barcodes = []
-
-            # For spare parts, get the channel code
-            channel_code = None
-            if item.item_type == ItemType.SPARE_PART:
-                channel_code = self.get_channel_from_supplier(request.supplier_code)
-
-            for serial_num in range(start_serial, end_serial + 1):
-                barcode = self.generate_barcode(
-                    supplier_code=request.supplier_code,
-                    year_code=year_code,
-                    month_code=month_code,
-                    model_code=item.model_code,
-                    serial_number=serial_num,
-                    item_type=item.item_type,
-                )
+            logger.info(f"[SerializationService] {item.model_code.upper()}: reserved {start_serial} - {end_serial}")
 
-                # Database columns are VARCHAR(36) for po_id, po_item_id, product_id
-                # Store as strings to match database schema
-                po_serial = POSerial(
-                    id=str(uuid.uuid4()),
-                    po_id=str(request.po_id),
-                    po_item_id=str(item.po_item_id) if item.po_item_id else None,
-                    product_id=str(item.product_id) if item.product_id else None,
-                    product_sku=item.product_sku,
-                    model_code=item.model_code.upper(),
-                    item_type=item.item_type.value if hasattr(item.item_type, 'value') else str(item.item_type),
-                    brand_prefix=self.BRAND_PREFIX,
-                    supplier_code=request.supplier_code.upper(),
-                    year_code=year_code if item.item_type != ItemType.SPARE_PART else year_code[0],
-                    month_code=month_code,
-                    serial_number=serial_num,
-                    barcode=barcode,
-                    status=SerialStatus.GENERATED.value,
-                )
-                self.db.add(po_serial)
-                item_barcodes.append(barcode)
+            # Barcode = fixed prefix + zero-padded serial
+            prefix = self.generate_barcode(
+                supplier_code=request.supplier_code,
+                year_code=year_code,
+                month_code=month_code,
+                model_code=item.model_code,
+                serial_number=0,
+                item_type=item.item_type,
+            )[:-self.SERIAL_DIGITS]
+
+            for chunk in self._po_serial_chunks(
+                request, item, prefix, year_code, month_code, start_serial, end_serial
+            ):
+                await copy_rows(self.db, POSerial, self.PO_SERIAL_COLUMNS, chunk)
 
-            all_barcodes.extend(item_barcodes)
+            if include_barcodes:
+                barcodes.extend(
+                    f"{prefix}{serial_num:08d}" for serial_num in range(start_serial, end_serial + 1)
+                )
 
-            # Create summary for this item
             item_summaries.append(GeneratedSerialSummary(
                 model_code=item.model_code.upper(),
                 quantity=item.quantity,
                 start_serial=start_serial,
                 end_serial=end_serial,
-                start_barcode=item_barcodes[0],
-                end_barcode=item_barcodes[-1],
+                start_barcode=f"{prefix}{start_serial:08d}",
+                end_barcode=f"{prefix}{end_serial:08d}",
             ))
 
-        logging.info(f"[SerializationService] Committing {len(all_barcodes)} serial records to database...")
         await self.db.commit()
-        logging.info(f"[SerializationService] COMMIT SUCCESS: {len(all_barcodes)} serials generated for PO {request.po_id}")
+        logger.info(f"[SerializationService] {total_generated} serials generated for PO {request.po_id}")
 
         return GenerateSerialsResponse(
             po_id=request.po_id,
             supplier_code=request.supplier_code.upper(),
-            total_generated=len(all_barcodes),
+            total_generated=total_generated,
             items=item_summaries,
-            barcodes=all_barcodes,
+            barcodes=barcodes,
+            barcodes_truncated=not include_barcodes,
         )
 
+    def _po_serial_chunks(
+        self,
+        request: GenerateSerialsRequest,
+        item: GenerateSerialItem,
+        prefix: str,
+        year_code: str,
+        month_code: str,
+        start_serial: int,
+        end_serial: int,
+    ) -> Iterator[List[tuple]]:
+        """po_serials rows (in PO_SERIAL_COLUMNS order) for a range, SERIAL_CHUNK_SIZE at a time."""
+        now = datetime.now(timezone.utc)
+        # Database columns are VARCHAR(36) for id; store the other ids as strings too
+        fixed = (
+            str(request.po_id),
+            str(item.po_item_id) if item.po_item_id else None,
+            str(item.product_id) if item.product_id else None,
+            item.product_sku,
+            item.model_code.upper(),
+            item.item_type.value if hasattr(item.item_type, 'value') else str(item.item_type),
+            self.BRAND_PREFIX,
+            request.supplier_code.upper(),
+            year_code if item.item_type != ItemType.SPARE_PART else year_code[0],
+            month_code,
+        )
+        status = SerialStatus.GENERATED.value
+
+        for chunk_start in range(start_serial, end_serial + 1, self.SERIAL_CHUNK_SIZE):
+            chunk_end = min(chunk_start + self.SERIAL_CHUNK_SIZE - 1, end_serial)
+            yield [
+                (str(uuid.uuid4()), *fixed, serial_num, f"{prefix}{serial_num:08d}", status, now, now)
+                for serial_num in range(chunk_start, chunk_end + 1)
+            ]
+
     # ==================== Serial Retrieval ====================
 
     async def get_serials_by_po(
@@ -642,9 +706,15 @@ class SerializationService:
         po_id: str,
         status: SerialStatus = None,
         limit: int = 1000,
-        offset: int = 0
+        offset: int = 0,
+        after: Optional[str] = None,
     ) -> List[POSerial]:
-        """Get all serials for a PO"""
+        """
+        Get serials for a PO, ordered by (serial_number, barcode).
+
+        Pass the previous page's next cursor (encode_serial_cursor) as
+        `after` for keyset pagination; `offset` is kept for older clients.
+        """
         # po_id is VARCHAR(36) in database, use string comparison
         po_id_str = str(po_id) if po_id else None
 
@@ -653,11 +723,126 @@ class SerializationService:
         if status:
             query = query.where(POSerial.status == status)
 
-        query = query.order_by(POSerial.serial_number).offset(offset).limit(limit)
+        if after:
+            serial_number, barcode = self.decode_serial_cursor(after)
+            query = query.where(tuple_(POSerial.serial_number, POSerial.barcode) > (serial_number, barcode))
+        else:
+            query = query.offset(offset)
+
+        query = query.order_by(POSerial.serial_number, POSerial.barcode).limit(limit)
+
+        result = await self.db.execute(query)
+        return result.scalars().all()
+
+    @staticmethod
+    def encode_serial_cursor(serial_number: int, barcode: str) -> str:
+        """Keyset cursor for get_serials_by_po."""
+        return f"{serial_number}:{barcode}"
+
+    @staticmethod
+    def decode_serial_cursor(cursor: str) -> Tuple[int, str]:
+        try:
+            serial_number, barcode = cursor.split(":", 1)
+            return int(serial_number), barcode
+        except ValueError:
+            raise ValueError(f"Invalid serial cursor: {cursor}")
+
+    async def iter_serials_by_po(
+        self,
+        po_id: str,
+        status: SerialStatus = None,
+    ) -> AsyncIterator[list]:
+        """
+        Stream a PO's serials as row chunks of EXPORT_CHUNK_SIZE.
+
+        Uses a server-side cursor and selects only the export columns, so a
+        large PO is never loaded into the worker at once.
+        """
+        po_id_str = str(po_id) if po_id else None
+        query = (
+            select(POSerial.barcode, POSerial.model_code, POSerial.serial_number, POSerial.status)
+            .where(POSerial.po_id == po_id_str)
+            .order_by(POSerial.serial_number, POSerial.barcode)
+        )
+        if status:
+            query = query.where(POSerial.status == status)
+
+        result = await self.db.stream(query.execution_options(yield_per=self.EXPORT_CHUNK_SIZE))
+        async for chunk in result.partitions():
+            yield chunk
+
+    def _scan_history_query(self, po_id: Optional[str] = None, grn_id: Optional[str] = None):
+        query = select(POSerial).where(POSerial.received_at.isnot(None))
+        if po_id:
+            query = query.where(POSerial.po_id == str(po_id))
+        if grn_id:
+            query = query.where(POSerial.grn_id == str(grn_id))
+        return query
+
+    async def get_scan_history(
+        self,
+        po_id: Optional[str] = None,
+        grn_id: Optional[str] = None,
+        limit: int = 100,
+        before: Optional[str] = None,
+    ) -> List[POSerial]:
+        """
+        Received (scanned) serials, newest first.
+
+        Pass the previous page's next cursor (encode_scan_cursor) as `before`.
+        """
+        query = self._scan_history_query(po_id, grn_id)
+        if before:
+            received_at, serial_id = self.decode_scan_cursor(before)
+            query = query.where(tuple_(POSerial.received_at, POSerial.id) < (received_at, serial_id))
+        query = query.order_by(POSerial.received_at.desc(), POSerial.id.desc()).limit(limit)
 
         result = await self.db.execute(query)
         return result.scalars().all()
 
+    @staticmethod
+    def encode_scan_cursor(received_at: datetime, serial_id: str) -> str:
+        """
+        Opaque keyset cursor for get_scan_history.
+
+        URL-safe base64 of "received_at|serial_id", so it survives query
+        strings without encoding (an ISO offset's "+" would arrive as a space).
+        """
+        raw = f"{received_at.isoformat()}|{serial_id}".encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @staticmethod
+    def decode_scan_cursor(cursor: str) -> Tuple[datetime, str]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+            received_at, serial_id = raw.split("|", 1)
+            return datetime.fromisoformat(received_at), serial_id
+        except ValueError:
+            raise ValueError(f"Invalid scan history cursor: {cursor}")
+
+    async def iter_scan_history(
+        self,
+        po_id: Optional[str] = None,
+        grn_id: Optional[str] = None,
+    ) -> AsyncIterator[list]:
+        """Stream received serials as row chunks of EXPORT_CHUNK_SIZE (server-side cursor)."""
+        query = (
+            self._scan_history_query(po_id, grn_id)
+            .with_only_columns(
+                POSerial.barcode,
+                POSerial.model_code,
+                POSerial.serial_number,
+                POSerial.status,
+                POSerial.grn_id,
+                POSerial.received_at,
+                POSerial.received_by,
+            )
+            .order_by(POSerial.received_at.desc(), POSerial.id.desc())
+        )
+        result = await self.db.stream(query.execution_options(yield_per=self.EXPORT_CHUNK_SIZE))
+        async for chunk in result.partitions():
+            yield chunk
+
     async def get_serial_by_barcode(self, barcode: str) -> Optional[POSerial]:
         """Get serial details by barcode"""
         result = await self.db.execute(
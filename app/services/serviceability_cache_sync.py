@@ -0,0 +1,123 @@
+"""
+Serviceability Cache Delta Sync
+
+Keeps a tenant's cached pincode check results (CacheService serviceability
+keys) in step with the database without rebuilding every pincode:
+
+- Write paths in ServiceabilityService invalidate the pincodes they touch
+- The refresh_serviceability_cache job finds pincodes whose warehouse or
+  transporter mappings changed since the last run (updated_at watermark,
+  including warehouse/transporter rows themselves) and pushes fresh results
+  for just those pincodes; it also notifies the in-process pincode index
+- The watermark lives in the tenant's cache namespace; when it is missing
+  (first run, cache flushed) the tenant's serviceability keys are dropped
+  once and rebuilt lazily on read
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import select, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.serviceability import WarehouseServiceability
+from app.models.transporter import Transporter, TransporterServiceability
+from app.models.warehouse import Warehouse
+from app.services.cache_service import CacheService, get_cache
+from app.services.serviceability_index import notify_serviceability_changed
+from app.services.serviceability_service import (
+    SERVICEABILITY_CACHE_CHANNELS,
+    ServiceabilityService,
+)
+
+logger = logging.getLogger(__name__)
+
+# Re-scan window before the last refresh, for transactions committed late
+_WATERMARK_OVERLAP = timedelta(minutes=5)
+
+# Outside the serviceability:{channel}:* keys so channel clears keep it
+_WATERMARK_KEY = "serviceability_sync:watermark"
+_WATERMARK_TTL = 7 * 24 * 3600
+
+# Pincodes per snapshot query
+_PUSH_BATCH_SIZE = 500
+
+# Channel the storefront reads; other channels are invalidated and refill on read
+_PUSH_CHANNEL = "D2C"
+
+
+class ServiceabilityCacheSync:
+    """Pushes changed pincodes into one tenant's serviceability cache."""
+
+    def __init__(self, db: AsyncSession, tenant_id: str, cache: Optional[CacheService] = None):
+        self.db = db
+        self.tenant_id = tenant_id
+        self.cache = cache or get_cache()
+
+    async def _watermark(self) -> Optional[datetime]:
+        value = await self.cache.get(self.tenant_id, _WATERMARK_KEY)
+        return datetime.fromisoformat(value) if value else None
+
+    async def _set_watermark(self, value: datetime) -> None:
+        await self.cache.set(self.tenant_id, _WATERMARK_KEY, value.isoformat(), ttl=_WATERMARK_TTL)
+
+    async def changed_pincodes(self, since: datetime) -> Set[str]:
+        """Destination pincodes whose check result may have changed since `since`."""
+        warehouse_result = await self.db.execute(
+            select(WarehouseServiceability.pincode.distinct())
+            .join(Warehouse, Warehouse.id == WarehouseServiceability.warehouse_id)
+            .where(
+                or_(
+                    WarehouseServiceability.updated_at >= since,
+                    Warehouse.updated_at >= since,
+                )
+            )
+        )
+        transporter_result = await self.db.execute(
+            select(TransporterServiceability.destination_pincode.distinct())
+            .join(Transporter, Transporter.id == TransporterServiceability.transporter_id)
+            .where(
+                or_(
+                    TransporterServiceability.updated_at >= since,
+                    Transporter.updated_at >= since,
+                )
+            )
+        )
+        return set(warehouse_result.scalars().all()) | set(transporter_result.scalars().all())
+
+    async def push_pincodes(self, pincodes: List[str]) -> int:
+        """Recompute and cache results for pincodes; returns the number pushed."""
+        service = ServiceabilityService(self.db)
+        other_channels = [c for c in SERVICEABILITY_CACHE_CHANNELS if c != _PUSH_CHANNEL]
+        pincodes = sorted(pincodes)
+
+        for offset in range(0, len(pincodes), _PUSH_BATCH_SIZE):
+            batch = pincodes[offset:offset + _PUSH_BATCH_SIZE]
+            snapshots: Dict[str, dict] = await service.build_cache_snapshots(batch)
+            await self.cache.set_serviceability_many(self.tenant_id, snapshots, _PUSH_CHANNEL)
+            await self.cache.invalidate_serviceability_pincodes(self.tenant_id, batch, other_channels)
+        return len(pincodes)
+
+    async def refresh(self) -> Dict[str, int]:
+        """
+        Push pincodes changed since the last refresh.
+
+        Returns {"mode", "pushed"}.
+        """
+        started_at = datetime.now(timezone.utc)
+        last_refresh = await self._watermark()
+
+        if last_refresh is None:
+            cleared = await self.cache.clear_pattern(self.tenant_id, "serviceability:*")
+            await self._set_watermark(started_at)
+            logger.info(f"Serviceability cache reset for tenant {self.tenant_id}: {cleared} keys cleared")
+            return {"mode": "reset", "pushed": 0}
+
+        changed = await self.changed_pincodes(last_refresh - _WATERMARK_OVERLAP)
+        pushed = 0
+        if changed:
+            await notify_serviceability_changed(self.tenant_id)
+            pushed = await self.push_pincodes(list(changed))
+        await self._set_watermark(started_at)
+        return {"mode": "incremental", "pushed": pushed}
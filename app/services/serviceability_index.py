@@ -0,0 +1,419 @@
+"""
+In-process Pincode Serviceability Index
+
+Answers "which warehouses and transporters serve pincode P" without SQL on
+the storefront hot path. Each tenant gets a compact, immutable snapshot:
+
+- A sorted pincode table searched with bisect (O(log n) per lookup)
+- Warehouse candidates and deduplicated transporter routes stored as packed
+  parallel arrays in CSR layout: pincode i owns rows offsets[i]:offsets[i+1]
+- Warehouses and transporters are stored once and referenced by index
+
+Routes are resolved at build time exactly as the SQL path does per request:
+only routes from the origins of warehouses serving the pincode count, ordered
+by rate, keeping the cheapest route per transporter. Stock is not indexed;
+callers that pass product_ids still check it (one query).
+
+Freshness (ServiceabilityIndexRegistry):
+    Writers call `await notify_serviceability_changed(tenant_id)`, which bumps
+    a per-tenant version stamp in CacheService (shared across workers with
+    Redis) and drops the local snapshot. Readers compare the stamp at most
+    every SERVICEABILITY_INDEX_VERSION_CHECK seconds and rebuild on change;
+    SERVICEABILITY_INDEX_MAX_AGE bounds staleness from out-of-band edits.
+"""
+import asyncio
+import logging
+import math
+import time
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.serviceability import WarehouseServiceability
+from app.models.transporter import Transporter, TransporterServiceability
+from app.models.warehouse import Warehouse
+from app.schemas.serviceability import WarehouseCandidate, TransporterOption
+
+logger = logging.getLogger(__name__)
+
+# CacheService key (tenant prefix added by CacheService)
+_VERSION_KEY = "serviceability_index:version"
+
+# Packed flag bits
+_COD = 1
+_PREPAID = 2
+_EXPRESS = 4
+
+# Sentinels for NULL in packed numeric columns
+_NO_DAYS = -1
+_NO_COST = math.nan
+
+
+def _flags(cod: bool, prepaid: bool, express: bool = False) -> int:
+    return (_COD if cod else 0) | (_PREPAID if prepaid else 0) | (_EXPRESS if express else 0)
+
+
+def _days(value: int) -> Optional[int]:
+    return None if value == _NO_DAYS else value
+
+
+def _cost(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
+
+
+class PincodeServiceabilityIndex:
+    """Immutable pincode -> (warehouse candidates, transporter routes) snapshot."""
+
+    def __init__(self):
+        self.pincodes: List[str] = []
+        # Warehouse table: (id, code, name, city)
+        self.warehouses: List[tuple] = []
+        # Transporter table: (id, code, name)
+        self.transporters: List[tuple] = []
+
+        # Warehouse candidates per pincode, by priority
+        self.ws_offsets = array("l", [0])
+        self.ws_warehouse = array("l")
+        self.ws_days = array("l")
+        self.ws_cost = array("d")
+        self.ws_priority = array("l")
+        self.ws_flags = array("B")
+
+        # Cheapest route per transporter per pincode, by rate
+        self.route_offsets = array("l", [0])
+        self.route_transporter = array("l")
+        self.route_days = array("l")
+        self.route_rate = array("d")
+        self.route_flags = array("B")
+
+        self.built_at = time.time()
+        self.build_ms = 0.0
+
+    def __len__(self) -> int:
+        return len(self.pincodes)
+
+    # ==================== Build ====================
+
+    @classmethod
+    async def build(cls, db: AsyncSession) -> "PincodeServiceabilityIndex":
+        """Load a tenant's serviceability into a new index (two queries)."""
+        started = time.perf_counter()
+        index = cls()
+
+        ws_result = await db.execute(
+            select(
+                WarehouseServiceability.pincode,
+                WarehouseServiceability.estimated_days,
+                WarehouseServiceability.shipping_cost,
+                WarehouseServiceability.priority,
+                WarehouseServiceability.cod_available,
+                WarehouseServiceability.prepaid_available,
+                Warehouse.id,
+                Warehouse.code,
+                Warehouse.name,
+                Warehouse.city,
+                Warehouse.pincode,
+            )
+            .join(Warehouse, Warehouse.id == WarehouseServiceability.warehouse_id)
+            .where(
+                and_(
+                    WarehouseServiceability.is_serviceable == True,
+                    WarehouseServiceability.is_active == True,
+                    Warehouse.is_active == True,
+                    Warehouse.can_fulfill_orders == True
+                )
+            )
+            .order_by(WarehouseServiceability.priority)
+        )
+        # Stable sort: priority order kept within a pincode; bisect needs
+        # Python string order, not the database collation
+        ws_rows = sorted(ws_result.all(), key=lambda row: row[0])
+
+        warehouse_index: Dict = {}
+        warehouse_origin: List[Optional[str]] = []
+        origins_by_pincode: Dict[str, set] = {}
+        for row in ws_rows:
+            w = warehouse_index.get(row[6])
+            if w is None:
+                w = warehouse_index[row[6]] = len(index.warehouses)
+                index.warehouses.append((row[6], row[7], row[8], row[9]))
+                warehouse_origin.append(row[10])
+
+            pincode = row[0]
+            if not index.pincodes or index.pincodes[-1] != pincode:
+                if index.pincodes:
+                    index.ws_offsets.append(len(index.ws_warehouse))
+                index.pincodes.append(pincode)
+            index.ws_warehouse.append(w)
+            index.ws_days.append(_NO_DAYS if row[1] is None else row[1])
+            index.ws_cost.append(_NO_COST if row[2] is None else float(row[2]))
+            index.ws_priority.append(row[3])
+            index.ws_flags.append(_flags(row[4], row[5]))
+            if row[10]:
+                origins_by_pincode.setdefault(pincode, set()).add(row[10])
+        if index.pincodes:
+            index.ws_offsets.append(len(index.ws_warehouse))
+
+        # Routes from any warehouse origin, cheapest first per destination
+        all_origins = {origin for origin in warehouse_origin if origin}
+        routes_by_pincode: Dict[str, list] = {}
+        if all_origins:
+            ts_result = await db.execute(
+                select(
+                    TransporterServiceability.destination_pincode,
+                    TransporterServiceability.origin_pincode,
+                    TransporterServiceability.estimated_days,
+                    TransporterServiceability.rate,
+                    TransporterServiceability.cod_available,
+                    TransporterServiceability.prepaid_available,
+                    TransporterServiceability.express_available,
+                    Transporter.id,
+                    Transporter.code,
+                    Transporter.name,
+                )
+                .join(Transporter, Transporter.id == TransporterServiceability.transporter_id)
+                .where(
+                    and_(
+                        TransporterServiceability.origin_pincode.in_(all_origins),
+                        TransporterServiceability.is_serviceable == True,
+                        Transporter.is_active == True
+                    )
+                )
+                .order_by(TransporterServiceability.rate)
+            )
+            for row in ts_result.all():
+                routes_by_pincode.setdefault(row[0], []).append(row)
+
+        transporter_index: Dict = {}
+        for pincode in index.pincodes:
+            origins = origins_by_pincode.get(pincode, set())
+            seen = set()
+            for row in routes_by_pincode.get(pincode, ()):
+                if row[1] not in origins or row[7] in seen:
+                    continue
+                seen.add(row[7])
+                t = transporter_index.get(row[7])
+                if t is None:
+                    t = transporter_index[row[7]] = len(index.transporters)
+                    index.transporters.append((row[7], row[8], row[9]))
+                index.route_transporter.append(t)
+                index.route_days.append(_NO_DAYS if row[2] is None else row[2])
+                index.route_rate.append(_NO_COST if row[3] is None else float(row[3]))
+                index.route_flags.append(_flags(row[4], row[5], row[6]))
+            index.route_offsets.append(len(index.route_transporter))
+
+        index.build_ms = round((time.perf_counter() - started) * 1000, 2)
+        return index
+
+    # ==================== Lookup ====================
+
+    def find(self, pincode: str) -> int:
+        """Position of pincode in the table, or -1."""
+        i = bisect_left(self.pincodes, pincode)
+        if i < len(self.pincodes) and self.pincodes[i] == pincode:
+            return i
+        return -1
+
+    def warehouse_ids(self, pincode: str) -> list:
+        """Ids of the warehouses serving a pincode, by priority."""
+        i = self.find(pincode)
+        if i < 0:
+            return []
+        return [self.warehouses[self.ws_warehouse[j]][0] for j in range(self.ws_offsets[i], self.ws_offsets[i + 1])]
+
+    def lookup(
+        self,
+        pincode: str,
+        stock: Optional[Dict] = None,
+    ) -> Tuple[List[WarehouseCandidate], List[TransporterOption]]:
+        """
+        Warehouse candidates and transporter options for a pincode.
+
+        stock maps warehouse_id -> (stock_available, available_qty). Transporter
+        options are not filtered by payment mode.
+        """
+        i = self.find(pincode)
+        if i < 0:
+            return [], []
+
+        candidates = []
+        for j in range(self.ws_offsets[i], self.ws_offsets[i + 1]):
+            warehouse_id, code, name, city = self.warehouses[self.ws_warehouse[j]]
+            stock_available, available_qty = (stock or {}).get(warehouse_id, (None, None))
+            flags = self.ws_flags[j]
+            candidates.append(WarehouseCandidate(
+                warehouse_id=warehouse_id,
+                warehouse_code=code,
+                warehouse_name=name,
+                city=city,
+                estimated_days=_days(self.ws_days[j]),
+                shipping_cost=_cost(self.ws_cost[j]),
+                priority=self.ws_priority[j],
+                cod_available=bool(flags & _COD),
+                prepaid_available=bool(flags & _PREPAID),
+                stock_available=stock_available,
+                available_quantity=available_qty
+            ))
+
+        options = []
+        for j in range(self.route_offsets[i], self.route_offsets[i + 1]):
+            transporter_id, code, name = self.transporters[self.route_transporter[j]]
+            flags = self.route_flags[j]
+            options.append(TransporterOption(
+                transporter_id=transporter_id,
+                transporter_code=code,
+                transporter_name=name,
+                estimated_days=_days(self.route_days[j]),
+                shipping_cost=_cost(self.route_rate[j]),
+                cod_available=bool(flags & _COD),
+                prepaid_available=bool(flags & _PREPAID),
+                express_available=bool(flags & _EXPRESS)
+            ))
+
+        return candidates, options
+
+    def stats(self) -> dict:
+        return {
+            "pincodes": len(self.pincodes),
+            "warehouse_rows": len(self.ws_warehouse),
+            "routes": len(self.route_transporter),
+            "build_ms": self.build_ms,
+        }
+
+
+class _Entry:
+    __slots__ = ("index", "version", "built_at", "checked_at")
+
+    def __init__(self, index: PincodeServiceabilityIndex, version: int, now: float):
+        self.index = index
+        self.version = version
+        self.built_at = now
+        self.checked_at = now
+
+
+class ServiceabilityIndexRegistry:
+    """
+    Per-tenant index snapshots with version-stamp invalidation.
+
+    Rebuilds are single-flight per tenant; while one is running, other
+    requests keep reading the previous snapshot.
+    """
+
+    def __init__(self, max_age_seconds: int = 900, version_check_seconds: int = 5, shared=None):
+        self._max_age = max_age_seconds
+        self._version_check = version_check_seconds
+        self._shared = shared
+        self._entries: Dict[str, _Entry] = {}
+        self._build_locks: Dict[str, asyncio.Lock] = {}
+        self._hits = 0
+        self._stale_hits = 0
+        self._builds = 0
+        self._invalidations = 0
+
+    @staticmethod
+    def _key(tenant_id) -> str:
+        return str(tenant_id).lower()
+
+    def _cache(self):
+        if self._shared is None:
+            from app.services.cache_service import get_cache
+            self._shared = get_cache()
+        return self._shared
+
+    async def _version(self, tenant_id: str) -> int:
+        try:
+            return int(await self._cache().get(tenant_id, _VERSION_KEY) or 0)
+        except Exception as e:
+            logger.warning(f"Serviceability index version check failed: {e}")
+            return -1
+
+    async def get_index(self, tenant_id, db: AsyncSession) -> PincodeServiceabilityIndex:
+        """Current index for a tenant, rebuilding from db when stale."""
+        tenant_id = self._key(tenant_id)
+        entry = self._entries.get(tenant_id)
+        now = time.monotonic()
+
+        if entry is not None and now - entry.built_at < self._max_age:
+            if now - entry.checked_at < self._version_check:
+                self._hits += 1
+                return entry.index
+            version = await self._version(tenant_id)
+            entry.checked_at = now
+            if version == entry.version:
+                self._hits += 1
+                return entry.index
+
+        lock = self._build_locks.setdefault(tenant_id, asyncio.Lock())
+        if entry is not None and lock.locked():
+            self._stale_hits += 1
+            return entry.index
+
+        async with lock:
+            current = self._entries.get(tenant_id)
+            if current is not None and current is not entry:
+                self._hits += 1
+                return current.index
+
+            # Read the stamp first so a change during the build triggers another
+            version = await self._version(tenant_id)
+            index = await PincodeServiceabilityIndex.build(db)
+            self._entries[tenant_id] = _Entry(index, version, time.monotonic())
+            self._builds += 1
+            logger.info(
+                f"Serviceability index built for tenant {tenant_id}: "
+                f"{len(index)} pincodes in {index.build_ms}ms"
+            )
+            return index
+
+    async def notify_changed(self, tenant_id) -> None:
+        """Mark a tenant's index stale in every process."""
+        tenant_id = self._key(tenant_id)
+        self._entries.pop(tenant_id, None)
+        self._invalidations += 1
+        try:
+            await self._cache().incr_by(tenant_id, _VERSION_KEY, 1)
+        except Exception as e:
+            logger.warning(f"Serviceability index version bump failed: {e}")
+
+    def clear(self) -> None:
+        """Drop every local snapshot."""
+        self._entries.clear()
+        self._invalidations += 1
+
+    def stats(self) -> dict:
+        """Hit/build counters and per-tenant index sizes."""
+        return {
+            "tenants": len(self._entries),
+            "hits": self._hits,
+            "stale_hits": self._stale_hits,
+            "builds": self._builds,
+            "invalidations": self._invalidations,
+            "indexes": {tenant_id: entry.index.stats() for tenant_id, entry in self._entries.items()},
+        }
+
+
+# Singleton registry instance
+_registry_instance: Optional[ServiceabilityIndexRegistry] = None
+
+
+def get_serviceability_index_registry() -> ServiceabilityIndexRegistry:
+    """Get the serviceability index registry singleton."""
+    global _registry_instance
+
+    if _registry_instance is None:
+        _registry_instance = ServiceabilityIndexRegistry(
+            max_age_seconds=settings.SERVICEABILITY_INDEX_MAX_AGE,
+            version_check_seconds=settings.SERVICEABILITY_INDEX_VERSION_CHECK,
+        )
+
+    return _registry_instance
+
+
+async def notify_serviceability_changed(tenant_id) -> None:
+    """Invalidate a tenant's serviceability index after mappings change."""
+    if tenant_id:
+        await get_serviceability_index_registry().notify_changed(tenant_id)
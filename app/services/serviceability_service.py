@@ -6,7 +6,14 @@ Handles:
 2. Finding available warehouses for a pincode
 3. Finding available transporters for the route
 4. Final serviceability = Warehouse pincodes ∩ Transporter pincodes
+
+Checks are answered from an in-process per-tenant pincode index
+(serviceability_index) and cached per tenant (CacheService serviceability
+keys). Write paths below notify both for the pincodes they touch; the
+refresh_serviceability_cache job handles rows changed elsewhere
+(ServiceabilityCacheSync).
 """
+import logging
 import uuid
 from typing import Optional, List, Dict, Any
 from datetime import datetime
@@ -15,6 +22,8 @@ from sqlalchemy import select, func, and_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.config import settings
+from app.middleware.tenant import get_current_tenant_id
 from app.models.serviceability import WarehouseServiceability, AllocationRule, ChannelCode
 from app.models.transporter import Transporter, TransporterServiceability
 from app.models.warehouse import Warehouse
@@ -32,6 +41,96 @@ from app.schemas.serviceability import (
     BulkPincodeUploadResponse,
     ServiceabilityDashboard,
 )
+from app.services.cache_service import get_cache
+from app.services.serviceability_index import (
+    PincodeServiceabilityIndex,
+    get_serviceability_index_registry,
+    notify_serviceability_changed,
+)
+
+logger = logging.getLogger(__name__)
+
+# Channel keys a pincode's cached result can live under
+SERVICEABILITY_CACHE_CHANNELS = [c.value for c in ChannelCode]
+
+
+def serviceability_cache_payload(result: ServiceabilityCheckResponse) -> dict:
+    """JSON-safe cache value for a check response."""
+    return result.model_dump(mode="json")
+
+
+def is_cacheable_check(request: ServiceabilityCheckRequest) -> bool:
+    """
+    Whether a check's result can be shared through the pincode cache.
+
+    Cache keys carry only tenant, channel and pincode, so stock-checked and
+    payment-filtered answers are computed per request.
+    """
+    return (
+        not request.product_ids
+        and not request.payment_mode
+        and (request.channel_code or "D2C") in SERVICEABILITY_CACHE_CHANNELS
+    )
+
+
+def build_check_response(
+    pincode: str,
+    warehouse_candidates: List[WarehouseCandidate],
+    transporter_options: List[TransporterOption],
+    payment_mode: Optional[str] = None,
+    stock_checked: bool = False
+) -> ServiceabilityCheckResponse:
+    """
+    Assemble a check response from a pincode's warehouse candidates (by
+    priority) and transporter options (cheapest route per transporter).
+    """
+    if not warehouse_candidates:
+        return ServiceabilityCheckResponse(
+            pincode=pincode,
+            is_serviceable=False,
+            message="Location not serviceable - no warehouse covers this pincode",
+            cod_available=False,
+            prepaid_available=False
+        )
+
+    # Track overall availability
+    overall_cod = any(w.cod_available for w in warehouse_candidates)
+    overall_prepaid = any(w.prepaid_available for w in warehouse_candidates)
+    days = [w.estimated_days for w in warehouse_candidates if w.estimated_days]
+    costs = [w.shipping_cost for w in warehouse_candidates if w.shipping_cost]
+    min_days = min(days) if days else None
+    min_cost = min(costs) if costs else None
+
+    # Filter by payment mode if specified
+    if payment_mode == "COD":
+        transporter_options = [t for t in transporter_options if t.cod_available]
+        warehouse_candidates = [w for w in warehouse_candidates if w.cod_available]
+        overall_cod = len(warehouse_candidates) > 0
+    elif payment_mode == "PREPAID":
+        transporter_options = [t for t in transporter_options if t.prepaid_available]
+        warehouse_candidates = [w for w in warehouse_candidates if w.prepaid_available]
+        overall_prepaid = len(warehouse_candidates) > 0
+
+    # Final serviceability
+    is_serviceable = len(warehouse_candidates) > 0
+
+    # Check stock availability for final response
+    stock_available = None
+    if stock_checked and warehouse_candidates:
+        stock_available = any(w.stock_available for w in warehouse_candidates if w.stock_available is not None)
+
+    return ServiceabilityCheckResponse(
+        pincode=pincode,
+        is_serviceable=is_serviceable,
+        message="Location is serviceable" if is_serviceable else "Location not serviceable",
+        cod_available=overall_cod,
+        prepaid_available=overall_prepaid,
+        estimated_delivery_days=min_days,
+        minimum_shipping_cost=min_cost,
+        warehouse_options=warehouse_candidates,
+        transporter_options=transporter_options,
+        stock_available=stock_available
+    )
 
 
 class ServiceabilityService:
@@ -52,17 +151,101 @@ class ServiceabilityService:
         2. Find transporters that can deliver to this pincode
         3. Final serviceability = warehouses with valid transporter routes
 
-        Returns warehouse and transporter options.
+        Served from the tenant's in-process pincode index when enabled (no
+        SQL unless product_ids need a stock check); otherwise from the DB.
         """
+        tenant_id = get_current_tenant_id()
+        if settings.SERVICEABILITY_INDEX_ENABLED and tenant_id:
+            index = await get_serviceability_index_registry().get_index(tenant_id, self.db)
+            return await self.check_serviceability_indexed(index, request)
+        return await self.check_serviceability_from_db(request)
+
+    async def check_serviceability_indexed(
+        self,
+        index: PincodeServiceabilityIndex,
+        request: ServiceabilityCheckRequest
+    ) -> ServiceabilityCheckResponse:
+        """Check a pincode against a prebuilt serviceability index."""
+        stock = None
+        if request.product_ids:
+            stock = await self._stock_by_warehouse(index.warehouse_ids(request.pincode), request.product_ids)
+
+        candidates, transporter_options = index.lookup(request.pincode, stock)
+        return build_check_response(
+            request.pincode, candidates, transporter_options, request.payment_mode, stock is not None
+        )
+
+    async def check_serviceability_from_db(
+        self,
+        request: ServiceabilityCheckRequest
+    ) -> ServiceabilityCheckResponse:
+        """Check a pincode with per-request queries (no index)."""
         pincode = request.pincode
 
         # 1. Find warehouses serving this pincode
+        warehouse_serviceability = await self._warehouse_rows([pincode])
+
+        # 2. Check stock if products specified
+        stock = None
+        if request.product_ids:
+            stock = await self._stock_by_warehouse(
+                [ws.warehouse_id for ws in warehouse_serviceability], request.product_ids
+            )
+
+        # 3. Find transporters for these warehouse-pincode routes
+        origin_pincodes = {ws.warehouse.pincode for ws in warehouse_serviceability if ws.warehouse.pincode}
+        transporter_rows = await self._transporter_rows(origin_pincodes, [pincode])
+
+        return build_check_response(
+            pincode,
+            self._candidates_from_rows(warehouse_serviceability, stock),
+            self._transporter_options(transporter_rows),
+            request.payment_mode,
+            stock is not None
+        )
+
+    async def build_cache_snapshots(self, pincodes: List[str]) -> Dict[str, dict]:
+        """
+        Channel-independent check results (no products, no payment mode) for
+        many pincodes, as cache payloads.
+
+        Two queries per call instead of three per pincode.
+        """
+        pincodes = sorted(set(pincodes))
+        if not pincodes:
+            return {}
+
+        warehouse_rows = await self._warehouse_rows(pincodes)
+        origin_pincodes = {ws.warehouse.pincode for ws in warehouse_rows if ws.warehouse.pincode}
+        transporter_rows = await self._transporter_rows(origin_pincodes, pincodes)
+
+        ws_by_pincode: Dict[str, List[WarehouseServiceability]] = {p: [] for p in pincodes}
+        for ws in warehouse_rows:
+            ws_by_pincode[ws.pincode].append(ws)
+        ts_by_pincode: Dict[str, List[TransporterServiceability]] = {p: [] for p in pincodes}
+        for ts in transporter_rows:
+            ts_by_pincode[ts.destination_pincode].append(ts)
+
+        snapshots = {}
+        for pincode in pincodes:
+            # Routes only count from origins of warehouses serving this pincode
+            origins = {ws.warehouse.pincode for ws in ws_by_pincode[pincode]}
+            routes = [ts for ts in ts_by_pincode[pincode] if ts.origin_pincode in origins]
+            snapshots[pincode] = serviceability_cache_payload(build_check_response(
+                pincode,
+                self._candidates_from_rows(ws_by_pincode[pincode]),
+                self._transporter_options(routes)
+            ))
+        return snapshots
+
+    async def _warehouse_rows(self, pincodes: List[str]) -> List[WarehouseServiceability]:
+        """Active serviceable warehouse mappings for pincodes, by priority."""
         warehouse_query = (
             select(WarehouseServiceability)
             .join(Warehouse)
             .where(
                 and_(
-                    WarehouseServiceability.pincode == pincode,
+                    WarehouseServiceability.pincode.in_(pincodes),
                     WarehouseServiceability.is_serviceable == True,
                     WarehouseServiceability.is_active == True,
                     Warehouse.is_active == True,
@@ -72,44 +255,46 @@ class ServiceabilityService:
             .options(selectinload(WarehouseServiceability.warehouse))
             .order_by(WarehouseServiceability.priority)
         )
-        ws_result = await self.db.execute(warehouse_query)
-        warehouse_serviceability = ws_result.scalars().all()
+        result = await self.db.execute(warehouse_query)
+        return list(result.scalars().all())
 
-        if not warehouse_serviceability:
-            return ServiceabilityCheckResponse(
-                pincode=pincode,
-                is_serviceable=False,
-                message="Location not serviceable - no warehouse covers this pincode",
-                cod_available=False,
-                prepaid_available=False
-            )
+    async def _transporter_rows(
+        self,
+        origin_pincodes,
+        destination_pincodes: List[str]
+    ) -> List[TransporterServiceability]:
+        """Active transporter routes from any origin to the destinations, cheapest first."""
+        if not origin_pincodes:
+            return []
 
-        # 2. Get warehouse details and check stock if products specified
-        warehouse_candidates: List[WarehouseCandidate] = []
-        overall_cod = False
-        overall_prepaid = False
-        min_days = None
-        min_cost = None
+        ts_query = (
+            select(TransporterServiceability)
+            .join(Transporter)
+            .where(
+                and_(
+                    TransporterServiceability.origin_pincode.in_(list(origin_pincodes)),
+                    TransporterServiceability.destination_pincode.in_(destination_pincodes),
+                    TransporterServiceability.is_serviceable == True,
+                    Transporter.is_active == True
+                )
+            )
+            .options(selectinload(TransporterServiceability.transporter))
+            .order_by(TransporterServiceability.rate)
+        )
+        result = await self.db.execute(ts_query)
+        return list(result.scalars().all())
 
+    def _candidates_from_rows(
+        self,
+        warehouse_serviceability: List[WarehouseServiceability],
+        stock: Optional[Dict[uuid.UUID, tuple]] = None
+    ) -> List[WarehouseCandidate]:
+        """Warehouse candidates from loaded mappings (stock: warehouse_id -> (available, qty))."""
+        candidates = []
         for ws in warehouse_serviceability:
             wh = ws.warehouse
-
-            # Check stock availability if products specified
-            stock_available = None
-            available_qty = None
-
-            import logging
-            logger = logging.getLogger(__name__)
-
-            if request.product_ids:
-                logger.info(f"Serviceability: Checking stock for warehouse {wh.id} ({wh.code}), products: {request.product_ids}")
-                stock_available, available_qty = await self._check_stock_availability(
-                    wh.id,
-                    request.product_ids
-                )
-                logger.info(f"Serviceability: Stock check result - available={stock_available}, qty={available_qty}")
-
-            candidate = WarehouseCandidate(
+            stock_available, available_qty = (stock or {}).get(wh.id, (None, None))
+            candidates.append(WarehouseCandidate(
                 warehouse_id=wh.id,
                 warehouse_code=wh.code,
                 warehouse_name=wh.name,
@@ -121,134 +306,14 @@ class ServiceabilityService:
                 prepaid_available=ws.prepaid_available,
                 stock_available=stock_available,
                 available_quantity=available_qty
-            )
-            warehouse_candidates.append(candidate)
-
-            # Track overall availability
-            if ws.cod_available:
-                overall_cod = True
-            if ws.prepaid_available:
-                overall_prepaid = True
-            if ws.estimated_days:
-                if min_days is None or ws.estimated_days < min_days:
-                    min_days = ws.estimated_days
-            if ws.shipping_cost:
-                if min_cost is None or ws.shipping_cost < min_cost:
-                    min_cost = ws.shipping_cost
-
-        # 3. Find transporters for these warehouse-pincode routes
-        transporter_options = await self._find_transporters(
-            warehouse_candidates,
-            pincode,
-            request.payment_mode
-        )
-
-        # Filter by payment mode if specified
-        if request.payment_mode == "COD":
-            warehouse_candidates = [w for w in warehouse_candidates if w.cod_available]
-            overall_cod = len(warehouse_candidates) > 0
-        elif request.payment_mode == "PREPAID":
-            warehouse_candidates = [w for w in warehouse_candidates if w.prepaid_available]
-            overall_prepaid = len(warehouse_candidates) > 0
-
-        # Final serviceability
-        is_serviceable = len(warehouse_candidates) > 0
-
-        # Check stock availability for final response
-        stock_available = None
-        if request.product_ids and warehouse_candidates:
-            stock_available = any(w.stock_available for w in warehouse_candidates if w.stock_available is not None)
-
-        return ServiceabilityCheckResponse(
-            pincode=pincode,
-            is_serviceable=is_serviceable,
-            message="Location is serviceable" if is_serviceable else "Location not serviceable",
-            cod_available=overall_cod,
-            prepaid_available=overall_prepaid,
-            estimated_delivery_days=min_days,
-            minimum_shipping_cost=min_cost,
-            warehouse_options=warehouse_candidates,
-            transporter_options=transporter_options,
-            stock_available=stock_available
-        )
-
-    async def _check_stock_availability(
-        self,
-        warehouse_id: uuid.UUID,
-        product_ids: List[uuid.UUID]
-    ) -> tuple:
-        """Check if products are available in warehouse."""
-        import logging
-        logger = logging.getLogger(__name__)
-
-        logger.info(f"_check_stock_availability: warehouse_id={warehouse_id}, product_ids={product_ids}")
-
-        # Check inventory summary
-        query = select(InventorySummary).where(
-            and_(
-                InventorySummary.warehouse_id == warehouse_id,
-                InventorySummary.product_id.in_(product_ids)
-            )
-        )
-        result = await self.db.execute(query)
-        summaries = result.scalars().all()
-
-        logger.info(f"_check_stock_availability: Found {len(summaries)} inventory records")
-        for s in summaries:
-            logger.info(f"  - product_id={s.product_id}, available_quantity={s.available_quantity}")
-
-        if not summaries:
-            logger.warning(f"_check_stock_availability: NO inventory found for warehouse_id={warehouse_id}, product_ids={product_ids}")
-            return False, 0
-
-        total_available = sum(s.available_quantity for s in summaries)
-        all_available = all(s.available_quantity > 0 for s in summaries)
-
-        logger.info(f"_check_stock_availability: total_available={total_available}, all_available={all_available}")
-        return all_available, total_available
+            ))
+        return candidates
 
-    async def _find_transporters(
+    def _transporter_options(
         self,
-        warehouse_candidates: List[WarehouseCandidate],
-        destination_pincode: str,
-        payment_mode: Optional[str] = None
+        transporter_serviceability: List[TransporterServiceability]
     ) -> List[TransporterOption]:
-        """Find transporters that can deliver to destination pincode."""
-        if not warehouse_candidates:
-            return []
-
-        # Get warehouse pincodes for origin
-        warehouse_ids = [w.warehouse_id for w in warehouse_candidates]
-
-        # Get warehouse details for origin pincodes
-        wh_query = select(Warehouse).where(Warehouse.id.in_(warehouse_ids))
-        wh_result = await self.db.execute(wh_query)
-        warehouses = {wh.id: wh for wh in wh_result.scalars().all()}
-
-        origin_pincodes = list(set(wh.pincode for wh in warehouses.values() if wh.pincode))
-
-        if not origin_pincodes:
-            return []
-
-        # Find transporters with routes from any origin to destination
-        ts_query = (
-            select(TransporterServiceability)
-            .join(Transporter)
-            .where(
-                and_(
-                    TransporterServiceability.origin_pincode.in_(origin_pincodes),
-                    TransporterServiceability.destination_pincode == destination_pincode,
-                    TransporterServiceability.is_serviceable == True,
-                    Transporter.is_active == True
-                )
-            )
-            .options(selectinload(TransporterServiceability.transporter))
-            .order_by(TransporterServiceability.rate)
-        )
-        ts_result = await self.db.execute(ts_query)
-        transporter_serviceability = ts_result.scalars().all()
-
-        # Build transporter options (deduplicate by transporter)
+        """Transporter options from routes (cheapest route per transporter)."""
         seen_transporters = set()
         options: List[TransporterOption] = []
 
@@ -258,13 +323,6 @@ class ServiceabilityService:
             seen_transporters.add(ts.transporter_id)
 
             transporter = ts.transporter
-
-            # Filter by payment mode
-            if payment_mode == "COD" and not ts.cod_available:
-                continue
-            if payment_mode == "PREPAID" and not ts.prepaid_available:
-                continue
-
             options.append(TransporterOption(
                 transporter_id=transporter.id,
                 transporter_code=transporter.code,
@@ -278,6 +336,55 @@ class ServiceabilityService:
 
         return options
 
+    async def _stock_by_warehouse(
+        self,
+        warehouse_ids: List[uuid.UUID],
+        product_ids: List[uuid.UUID]
+    ) -> Dict[uuid.UUID, tuple]:
+        """
+        (all_available, total_available) per warehouse for the products, in
+        one query. Warehouses without inventory rows get (False, 0).
+        """
+        quantities: Dict[uuid.UUID, List[int]] = {wid: [] for wid in warehouse_ids}
+        if warehouse_ids:
+            result = await self.db.execute(
+                select(InventorySummary.warehouse_id, InventorySummary.available_quantity)
+                .where(
+                    and_(
+                        InventorySummary.warehouse_id.in_(list(quantities)),
+                        InventorySummary.product_id.in_(product_ids)
+                    )
+                )
+            )
+            for warehouse_id, available_quantity in result.all():
+                quantities[warehouse_id].append(available_quantity or 0)
+
+        return {
+            wid: (all(q > 0 for q in qtys), sum(qtys)) if qtys else (False, 0)
+            for wid, qtys in quantities.items()
+        }
+
+    # ==================== Change Notification ====================
+
+    async def _notify_pincodes_changed(self, pincodes: List[str]) -> None:
+        """
+        Invalidate the pincode index and cached check results after a write.
+
+        Deletes are invisible to the refresh job's updated_at watermark, so
+        every write path notifies here, after its commit.
+        """
+        tenant_id = get_current_tenant_id()
+        if not tenant_id or not pincodes:
+            return
+        try:
+            await notify_serviceability_changed(tenant_id)
+            if settings.CACHE_ENABLED:
+                await get_cache().invalidate_serviceability_pincodes(
+                    tenant_id, sorted(set(pincodes)), SERVICEABILITY_CACHE_CHANNELS
+                )
+        except Exception as e:
+            logger.warning(f"Serviceability cache invalidation failed: {e}")
+
     # ==================== CRUD Operations ====================
 
     async def create_warehouse_serviceability(
@@ -302,6 +409,7 @@ class ServiceabilityService:
         self.db.add(ws)
         await self.db.commit()
         await self.db.refresh(ws)
+        await self._notify_pincodes_changed([ws.pincode])
         return ws
 
     async def bulk_create_warehouse_serviceability(
@@ -325,6 +433,7 @@ class ServiceabilityService:
             created.append(ws)
 
         await self.db.commit()
+        await self._notify_pincodes_changed(list(data.pincodes))
         return created
 
     async def upload_pincodes_bulk(
@@ -335,6 +444,7 @@ class ServiceabilityService:
         successful = 0
         failed = 0
         errors = []
+        added_pincodes = []
 
         for item in data.pincodes:
             try:
@@ -371,12 +481,14 @@ class ServiceabilityService:
                     is_active=True
                 )
                 self.db.add(ws)
+                added_pincodes.append(pincode)
                 successful += 1
             except Exception as e:
                 errors.append({"pincode": item.get("pincode", ""), "error": str(e)})
                 failed += 1
 
         await self.db.commit()
+        await self._notify_pincodes_changed(added_pincodes)
 
         return BulkPincodeUploadResponse(
             warehouse_id=data.warehouse_id,
@@ -443,6 +555,7 @@ class ServiceabilityService:
         if ws:
             await self.db.delete(ws)
             await self.db.commit()
+            await self._notify_pincodes_changed([pincode])
             return True
         return False
 
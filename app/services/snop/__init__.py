@@ -11,6 +11,7 @@ Provides comprehensive demand forecasting, supply planning, and inventory optimi
 - ScenarioEngine: Advanced scenario planning (Monte Carlo, P&L, sensitivity, comparison)
 - PlanningAgents: Autonomous AI agents (exception detection, reorder, forecast bias, alert center)
 - NLPlanner: Natural language planning interface (conversational S&OP queries)
+- ForecastRegenerationPipeline: Bulk, checkpointed SKU forecast regeneration
 """
 
 from app.services.snop.demand_planner import DemandPlannerService
@@ -23,6 +24,7 @@ from app.services.snop.planning_agents import PlanningAgents
 from app.services.snop.nl_planner import NLPlanner
 from app.services.snop.snop_service import SNOPService
 from app.services.snop.inventory_network_service import InventoryNetworkService
+from app.services.snop.forecast_pipeline import ForecastRegenerationPipeline
 
 __all__ = [
     "DemandPlannerService",
@@ -36,4 +38,5 @@ __all__ = [
     "NLPlanner",
     "SNOPService",
     "InventoryNetworkService",
+    "ForecastRegenerationPipeline",
 ]
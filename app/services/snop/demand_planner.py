@@ -15,7 +15,7 @@ from typing import List, Dict, Optional, Tuple, Any
 from collections import defaultdict
 import math
 
-from sqlalchemy import select, func, and_, or_, desc, extract, literal_column
+from sqlalchemy import select, func, and_, or_, desc, extract, literal_column, cast, Date
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -26,6 +26,7 @@ from app.models.warehouse import Warehouse
 from app.models.region import Region
 from app.models.snop import (
     DemandForecast,
+    DemandDailyRollup,
     ForecastAdjustment,
     ExternalFactor,
     ForecastGranularity,
@@ -56,6 +57,22 @@ class DemandPlannerService:
         self.db = db
 
     # ==================== Historical Data Aggregation ====================
+    # All reads come from demand_daily_rollups (maintained by DemandRollupService)
+
+    # date_trunc unit per granularity
+    _PERIOD_UNITS = {
+        ForecastGranularity.DAILY: "day",
+        ForecastGranularity.WEEKLY: "week",
+        ForecastGranularity.MONTHLY: "month",
+        ForecastGranularity.QUARTERLY: "quarter",
+    }
+
+    @staticmethod
+    def _rollup_window(start_date: date, end_date: date):
+        return and_(
+            DemandDailyRollup.day >= start_date,
+            DemandDailyRollup.day <= end_date,
+        )
 
     async def get_historical_demand(
         self,
@@ -71,6 +88,9 @@ class DemandPlannerService:
         """
         Get historical demand data aggregated by the specified granularity.
 
+        Weekly/monthly/quarterly periods are derived from the daily rollup;
+        "date" is the period start.
+
         Returns list of dicts: [{"date": date, "quantity": Decimal, "revenue": Decimal}, ...]
         """
         if start_date is None:
@@ -78,73 +98,50 @@ class DemandPlannerService:
         if end_date is None:
             end_date = date.today()
 
-        # Build base query for delivered orders
+        unit = self._PERIOD_UNITS.get(granularity, "day")
+        # literal_column keeps GROUP BY and ORDER BY on the same expression
+        period = cast(func.date_trunc(literal_column(f"'{unit}'"), DemandDailyRollup.day), Date)
+
         query = (
             select(
-                func.min(Order.created_at).label("order_date"),
-                func.sum(OrderItem.quantity).label("quantity"),
-                func.sum(OrderItem.total_amount).label("revenue")
-            )
-            .join(OrderItem, Order.id == OrderItem.order_id)
-            .join(Product, OrderItem.product_id == Product.id)
-            .where(
-                and_(
-                    Order.status.in_([OrderStatus.DELIVERED, OrderStatus.PARTIALLY_DELIVERED]),
-                    Order.created_at >= start_date,
-                    Order.created_at <= end_date
-                )
+                period.label("period"),
+                func.sum(DemandDailyRollup.quantity).label("quantity"),
+                func.sum(DemandDailyRollup.revenue).label("revenue")
             )
+            .where(self._rollup_window(start_date, end_date))
+            .group_by(period)
+            .order_by(period)
         )
 
-        # Apply filters
-        if product_id:
-            query = query.where(OrderItem.product_id == product_id)
-        if category_id:
-            query = query.where(Product.category_id == category_id)
+        # Product-level rows when filtering by product/category, else total rows
+        if product_id or category_id:
+            query = query.where(DemandDailyRollup.product_id.isnot(None))
+            if product_id:
+                query = query.where(DemandDailyRollup.product_id == product_id)
+            if category_id:
+                query = query.join(Product, DemandDailyRollup.product_id == Product.id).where(
+                    Product.category_id == category_id
+                )
+        else:
+            query = query.where(DemandDailyRollup.product_id.is_(None))
+
         if warehouse_id:
-            query = query.where(Order.warehouse_id == warehouse_id)
+            query = query.where(DemandDailyRollup.warehouse_id == warehouse_id)
         if region_id:
-            query = query.where(Order.region_id == region_id)
+            query = query.where(DemandDailyRollup.region_id == region_id)
         if channel:
-            query = query.where(Order.source == channel)
-
-        # Group by granularity
-        if granularity == ForecastGranularity.DAILY:
-            # Use literal_column for 'day' to avoid separate bound parameters in GROUP BY vs ORDER BY
-            day_period = func.date_trunc(literal_column("'day'"), Order.created_at)
-            query = query.group_by(day_period).order_by(day_period)
-        elif granularity == ForecastGranularity.WEEKLY:
-            # Group by ISO week
-            query = query.group_by(
-                extract('year', Order.created_at),
-                extract('week', Order.created_at)
-            ).order_by(
-                extract('year', Order.created_at),
-                extract('week', Order.created_at)
-            )
-        elif granularity == ForecastGranularity.MONTHLY:
-            query = query.group_by(
-                extract('year', Order.created_at),
-                extract('month', Order.created_at)
-            ).order_by(
-                extract('year', Order.created_at),
-                extract('month', Order.created_at)
-            )
+            query = query.where(DemandDailyRollup.channel == channel)
 
         result = await self.db.execute(query)
-        rows = result.all()
 
-        # Convert to standardized format
-        demand_data = []
-        for row in rows:
-            row_date = row.order_date if hasattr(row, 'order_date') else start_date
-            demand_data.append({
-                "date": row_date,
+        return [
+            {
+                "date": row.period,
                 "quantity": Decimal(str(row.quantity or 0)),
                 "revenue": Decimal(str(row.revenue or 0))
-                })
-
-        return demand_data
+            }
+            for row in result.all()
+        ]
 
     async def get_demand_by_product(
         self,
@@ -162,26 +159,19 @@ class DemandPlannerService:
                 Product.id.label("product_id"),
                 Product.name.label("product_name"),
                 Product.sku.label("product_sku"),
-                func.sum(OrderItem.quantity).label("total_quantity"),
-                func.sum(OrderItem.total_amount).label("total_revenue"),
-                func.count(Order.id.distinct()).label("order_count")
-            )
-            .join(OrderItem, OrderItem.product_id == Product.id)
-            .join(Order, Order.id == OrderItem.order_id)
-            .where(
-                and_(
-                    Order.status.in_([OrderStatus.DELIVERED, OrderStatus.PARTIALLY_DELIVERED]),
-                    Order.created_at >= start_date,
-                    Order.created_at <= end_date
-                )
+                func.sum(DemandDailyRollup.quantity).label("total_quantity"),
+                func.sum(DemandDailyRollup.revenue).label("total_revenue"),
+                func.sum(DemandDailyRollup.order_count).label("order_count")
             )
+            .join(DemandDailyRollup, DemandDailyRollup.product_id == Product.id)
+            .where(self._rollup_window(start_date, end_date))
             .group_by(Product.id, Product.name, Product.sku)
-            .order_by(desc(func.sum(OrderItem.quantity)))
+            .order_by(desc(func.sum(DemandDailyRollup.quantity)))
             .limit(top_n)
         )
 
         if warehouse_id:
-            query = query.where(Order.warehouse_id == warehouse_id)
+            query = query.where(DemandDailyRollup.warehouse_id == warehouse_id)
         if category_id:
             query = query.where(Product.category_id == category_id)
 
@@ -195,7 +185,7 @@ class DemandPlannerService:
                 "product_sku": row.product_sku,
                 "total_quantity": Decimal(str(row.total_quantity or 0)),
                 "total_revenue": Decimal(str(row.total_revenue or 0)),
-                "order_count": row.order_count
+                "order_count": int(row.order_count or 0)
             }
             for row in rows
         ]
@@ -213,26 +203,19 @@ class DemandPlannerService:
             select(
                 Category.id.label("category_id"),
                 Category.name.label("category_name"),
-                func.sum(OrderItem.quantity).label("total_quantity"),
-                func.sum(OrderItem.total_amount).label("total_revenue"),
+                func.sum(DemandDailyRollup.quantity).label("total_quantity"),
+                func.sum(DemandDailyRollup.revenue).label("total_revenue"),
                 func.count(Product.id.distinct()).label("product_count")
             )
             .join(Product, Product.category_id == Category.id)
-            .join(OrderItem, OrderItem.product_id == Product.id)
-            .join(Order, Order.id == OrderItem.order_id)
-            .where(
-                and_(
-                    Order.status.in_([OrderStatus.DELIVERED, OrderStatus.PARTIALLY_DELIVERED]),
-                    Order.created_at >= start_date,
-                    Order.created_at <= end_date
-                )
-            )
+            .join(DemandDailyRollup, DemandDailyRollup.product_id == Product.id)
+            .where(self._rollup_window(start_date, end_date))
             .group_by(Category.id, Category.name)
-            .order_by(desc(func.sum(OrderItem.quantity)))
+            .order_by(desc(func.sum(DemandDailyRollup.quantity)))
         )
 
         if warehouse_id:
-            query = query.where(Order.warehouse_id == warehouse_id)
+            query = query.where(DemandDailyRollup.warehouse_id == warehouse_id)
 
         result = await self.db.execute(query)
         rows = result.all()
@@ -259,25 +242,20 @@ class DemandPlannerService:
         """
         query = (
             select(
-                Order.source.label("channel"),
-                func.sum(OrderItem.quantity).label("total_quantity"),
-                func.sum(OrderItem.total_amount).label("total_revenue"),
-                func.count(Order.id.distinct()).label("order_count")
+                DemandDailyRollup.channel.label("channel"),
+                func.sum(DemandDailyRollup.quantity).label("total_quantity"),
+                func.sum(DemandDailyRollup.revenue).label("total_revenue"),
+                func.sum(DemandDailyRollup.order_count).label("order_count")
             )
-            .join(OrderItem, OrderItem.order_id == Order.id)
-            .where(
-                and_(
-                    Order.status.in_([OrderStatus.DELIVERED, OrderStatus.PARTIALLY_DELIVERED]),
-                    Order.created_at >= start_date,
-                    Order.created_at <= end_date
-                )
-            )
-            .group_by(Order.source)
-            .order_by(desc(func.sum(OrderItem.quantity)))
+            .where(self._rollup_window(start_date, end_date))
+            .group_by(DemandDailyRollup.channel)
+            .order_by(desc(func.sum(DemandDailyRollup.quantity)))
         )
 
         if product_id:
-            query = query.where(OrderItem.product_id == product_id)
+            query = query.where(DemandDailyRollup.product_id == product_id)
+        else:
+            query = query.where(DemandDailyRollup.product_id.is_(None))
 
         result = await self.db.execute(query)
         rows = result.all()
@@ -287,7 +265,7 @@ class DemandPlannerService:
                 "channel": row.channel if row.channel else "UNKNOWN",
                 "total_quantity": Decimal(str(row.total_quantity or 0)),
                 "total_revenue": Decimal(str(row.total_revenue or 0)),
-                "order_count": row.order_count
+                "order_count": int(row.order_count or 0)
             }
             for row in rows
         ]
@@ -301,33 +279,34 @@ class DemandPlannerService:
     ) -> List[Dict[str, Any]]:
         """
         Get demand aggregated by region.
+
+        With a category filter, order_count sums per-product counts (an order
+        with several products of the category is counted once per product).
         """
         query = (
             select(
                 Region.id.label("region_id"),
                 Region.name.label("region_name"),
-                func.sum(OrderItem.quantity).label("total_quantity"),
-                func.sum(OrderItem.total_amount).label("total_revenue"),
-                func.count(Order.id.distinct()).label("order_count")
-            )
-            .join(Order, Order.region_id == Region.id)
-            .join(OrderItem, OrderItem.order_id == Order.id)
-            .join(Product, OrderItem.product_id == Product.id)
-            .where(
-                and_(
-                    Order.status.in_([OrderStatus.DELIVERED, OrderStatus.PARTIALLY_DELIVERED]),
-                    Order.created_at >= start_date,
-                    Order.created_at <= end_date
-                )
+                func.sum(DemandDailyRollup.quantity).label("total_quantity"),
+                func.sum(DemandDailyRollup.revenue).label("total_revenue"),
+                func.sum(DemandDailyRollup.order_count).label("order_count")
             )
+            .join(DemandDailyRollup, DemandDailyRollup.region_id == Region.id)
+            .where(self._rollup_window(start_date, end_date))
             .group_by(Region.id, Region.name)
-            .order_by(desc(func.sum(OrderItem.quantity)))
+            .order_by(desc(func.sum(DemandDailyRollup.quantity)))
         )
 
-        if product_id:
-            query = query.where(OrderItem.product_id == product_id)
-        if category_id:
-            query = query.where(Product.category_id == category_id)
+        if product_id or category_id:
+            query = query.where(DemandDailyRollup.product_id.isnot(None))
+            if product_id:
+                query = query.where(DemandDailyRollup.product_id == product_id)
+            if category_id:
+                query = query.join(Product, DemandDailyRollup.product_id == Product.id).where(
+                    Product.category_id == category_id
+                )
+        else:
+            query = query.where(DemandDailyRollup.product_id.is_(None))
 
         result = await self.db.execute(query)
         rows = result.all()
@@ -338,7 +317,7 @@ class DemandPlannerService:
                 "region_name": row.region_name,
                 "total_quantity": Decimal(str(row.total_quantity or 0)),
                 "total_revenue": Decimal(str(row.total_revenue or 0)),
-                "order_count": row.order_count
+                "order_count": int(row.order_count or 0)
             }
             for row in rows
         ]
@@ -418,17 +397,13 @@ class DemandPlannerService:
             trend = "stable"
 
         # Seasonality detection (simple check based on monthly variance)
-        monthly_demand = await self.get_historical_demand(
-            product_id=product_id,
-            category_id=category_id,
-            warehouse_id=warehouse_id,
-            start_date=start_date,
-            end_date=end_date,
-            granularity=ForecastGranularity.MONTHLY
-        )
+        # Monthly totals derived from the daily series already loaded
+        monthly_totals: Dict[Tuple[int, int], float] = defaultdict(float)
+        for d in daily_demand:
+            monthly_totals[(d["date"].year, d["date"].month)] += float(d["quantity"])
 
-        if len(monthly_demand) >= 12:
-            monthly_quantities = [float(d["quantity"]) for d in monthly_demand]
+        if len(monthly_totals) >= 12:
+            monthly_quantities = list(monthly_totals.values())
             monthly_mean = sum(monthly_quantities) / len(monthly_quantities)
             monthly_variance = sum((q - monthly_mean) ** 2 for q in monthly_quantities) / len(monthly_quantities)
             monthly_cv = math.sqrt(monthly_variance) / monthly_mean if monthly_mean > 0 else 0
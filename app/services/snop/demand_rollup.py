@@ -0,0 +1,241 @@
+"""
+Daily Demand Rollup Maintenance
+
+Keeps demand_daily_rollups in sync with delivered orders so demand planning
+reads O(days) pre-aggregated rows instead of scanning orders x order_items.
+
+Refresh strategy:
+- refresh_days(): recompute whole days (idempotent DELETE + INSERT ... SELECT)
+- OrderService.update_order_status applies the order's own rows as a delta
+  (upsert on the rollup key) when it enters or leaves a delivered status
+- The snop_demand_rollup_refresh job recomputes days touched by any order
+  updated since the last refresh (catches status changes made elsewhere,
+  e.g. courier webhooks) and backfills an empty table
+
+Concurrency: day rebuilds and order deltas take a transaction advisory lock
+per (tenant schema, day), and a full rebuild locks the table against
+writers, so two writers never rebuild or adjust the same day at once. The
+unique key (day, product, warehouse, region, channel) with NULLS NOT
+DISTINCT backs the delta upsert and rejects duplicate rows outright.
+"""
+
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable, List, Optional
+
+from sqlalchemy import select, func, delete, insert, literal, and_, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.order import Order, OrderItem, OrderStatus
+from app.models.snop import DemandDailyRollup
+
+logger = logging.getLogger(__name__)
+
+# Orders that count as realised demand
+DEMAND_STATUSES = [OrderStatus.DELIVERED, OrderStatus.PARTIALLY_DELIVERED]
+DEMAND_STATUS_VALUES = {s.value for s in DEMAND_STATUSES}
+
+# Re-scan window before the last refresh, for transactions committed late
+_WATERMARK_OVERLAP = timedelta(minutes=5)
+
+_ROLLUP_COLUMNS = [
+    "id", "day", "product_id", "warehouse_id", "region_id", "channel",
+    "quantity", "revenue", "order_count", "refreshed_at",
+]
+_ROLLUP_KEY = ["day", "product_id", "warehouse_id", "region_id", "channel"]
+
+
+class DemandRollupService:
+    """Maintains the daily demand rollup for the current tenant schema."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def _aggregate(self, condition, refreshed_at: datetime, by_product: bool):
+        """SELECT producing rollup rows for orders matching condition."""
+        order_day = func.date(Order.created_at)
+        product_col = OrderItem.product_id if by_product else literal(None).label("product_id")
+        group_by = [order_day, Order.warehouse_id, Order.region_id, Order.source]
+        if by_product:
+            group_by.insert(1, OrderItem.product_id)
+
+        return (
+            select(
+                func.gen_random_uuid(),
+                order_day,
+                product_col,
+                Order.warehouse_id,
+                Order.region_id,
+                Order.source,
+                func.coalesce(func.sum(OrderItem.quantity), 0),
+                func.coalesce(func.sum(OrderItem.total_amount), 0),
+                func.count(Order.id.distinct()),
+                literal(refreshed_at),
+            )
+            .join(OrderItem, Order.id == OrderItem.order_id)
+            .where(and_(Order.status.in_(DEMAND_STATUSES), condition))
+            .group_by(*group_by)
+        )
+
+    async def _lock_days(self, days: List[date]) -> None:
+        """Serialize rollup writes per (tenant schema, day) until the transaction ends."""
+        await self.db.execute(
+            text(
+                "SELECT count(pg_advisory_xact_lock("
+                "hashtext(current_schema() || '.demand_daily_rollups'), d - DATE '2000-01-01')) "
+                "FROM (SELECT unnest(CAST(:days AS date[])) AS d ORDER BY 1) AS locked_days"
+            ),
+            {"days": days},
+        )
+
+    async def _rebuild_where(self, day_condition, order_condition, refreshed_at: Optional[datetime]) -> None:
+        await self.db.execute(delete(DemandDailyRollup).where(day_condition))
+        for by_product in (True, False):
+            await self.db.execute(
+                insert(DemandDailyRollup).from_select(
+                    _ROLLUP_COLUMNS, self._aggregate(order_condition, refreshed_at, by_product)
+                )
+            )
+
+    async def _watermark(self) -> Optional[datetime]:
+        """Order updated_at watermark of the last incremental refresh."""
+        return (await self.db.execute(
+            select(func.max(DemandDailyRollup.refreshed_at))
+        )).scalar()
+
+    async def refresh_days(self, days: Iterable[date], refreshed_at: Optional[datetime] = None) -> int:
+        """
+        Recompute the rollup for specific days. Does not commit.
+
+        refreshed_at is stamped on the rebuilt rows and acts as the incremental
+        watermark; out-of-band refreshes pass the current watermark so they
+        don't advance it past orders the job has not seen yet.
+        """
+        days = sorted(set(days))
+        if not days:
+            return 0
+
+        order_day = func.date(Order.created_at)
+        # Range predicate lets the created_at index narrow the scan
+        order_condition = and_(
+            Order.created_at >= days[0],
+            Order.created_at < days[-1] + timedelta(days=1),
+            order_day.in_(days),
+        )
+        # Days in order, so concurrent refreshes cannot deadlock
+        await self._lock_days(days)
+        await self._rebuild_where(DemandDailyRollup.day.in_(days), order_condition, refreshed_at)
+        return len(days)
+
+    async def rebuild(self, start_date: Optional[date] = None) -> None:
+        """Rebuild the rollup from start_date (default: SNOP_DEMAND_ROLLUP_BACKFILL_DAYS ago)."""
+        if start_date is None:
+            start_date = date.today() - timedelta(days=settings.SNOP_DEMAND_ROLLUP_BACKFILL_DAYS)
+        # Blocks day refreshes and order deltas (they write the table) until commit
+        await self.db.execute(text("LOCK TABLE demand_daily_rollups IN EXCLUSIVE MODE"))
+        await self._rebuild_where(
+            DemandDailyRollup.day >= start_date,
+            Order.created_at >= start_date,
+            datetime.now(timezone.utc),
+        )
+        await self.db.commit()
+        logger.info(f"Demand rollup rebuilt from {start_date.isoformat()}")
+
+    async def refresh_incremental(self) -> dict:
+        """
+        Recompute days with orders updated since the last refresh.
+
+        Backfills when the rollup is empty. Commits.
+        """
+        started_at = datetime.now(timezone.utc)
+        last_refresh = await self._watermark()
+
+        if last_refresh is None:
+            await self.rebuild()
+            return {"mode": "backfill", "days": settings.SNOP_DEMAND_ROLLUP_BACKFILL_DAYS}
+
+        result = await self.db.execute(
+            select(func.date(Order.created_at).distinct())
+            .where(Order.updated_at >= last_refresh - _WATERMARK_OVERLAP)
+        )
+        dirty_days: List[date] = list(result.scalars().all())
+
+        refreshed = await self.refresh_days(dirty_days, refreshed_at=started_at)
+        await self.db.commit()
+        return {"mode": "incremental", "days": refreshed}
+
+    def _order_delta(self, order_id, sign: int, refreshed_at: Optional[datetime], by_product: bool):
+        """SELECT producing one order's rollup rows, signed (+1 entering demand, -1 leaving)."""
+        order_day = func.date(Order.created_at)
+        product_col = OrderItem.product_id if by_product else literal(None).label("product_id")
+        group_by = [order_day, Order.warehouse_id, Order.region_id, Order.source]
+        if by_product:
+            group_by.insert(1, OrderItem.product_id)
+
+        return (
+            select(
+                func.gen_random_uuid(),
+                order_day,
+                product_col,
+                Order.warehouse_id,
+                Order.region_id,
+                Order.source,
+                sign * func.coalesce(func.sum(OrderItem.quantity), 0),
+                sign * func.coalesce(func.sum(OrderItem.total_amount), 0),
+                literal(sign),
+                literal(refreshed_at),
+            )
+            .join(OrderItem, Order.id == OrderItem.order_id)
+            .where(Order.id == order_id)
+            .group_by(*group_by)
+        )
+
+    async def _apply_order_delta(self, order_id, order_day: date, sign: int) -> None:
+        refreshed_at = await self._watermark()
+        table = DemandDailyRollup.__table__
+        for by_product in (True, False):
+            stmt = pg_insert(DemandDailyRollup).from_select(
+                _ROLLUP_COLUMNS, self._order_delta(order_id, sign, refreshed_at, by_product)
+            )
+            await self.db.execute(stmt.on_conflict_do_update(
+                index_elements=_ROLLUP_KEY,
+                set_={
+                    "quantity": table.c.quantity + stmt.excluded.quantity,
+                    "revenue": table.c.revenue + stmt.excluded.revenue,
+                    "order_count": table.c.order_count + stmt.excluded.order_count,
+                },
+            ))
+        # Dimensions whose last delivered order left
+        await self.db.execute(
+            delete(DemandDailyRollup).where(
+                DemandDailyRollup.day == order_day, DemandDailyRollup.order_count <= 0
+            )
+        )
+
+    async def on_order_status_change(self, order: Order, old_status, new_status) -> None:
+        """
+        Add or remove an order's demand when it enters or leaves a delivered status.
+
+        Applies only the order's own rows as a delta instead of recomputing
+        its day. Runs in a savepoint so a rollup failure never blocks the
+        status update.
+        """
+        old_value = getattr(old_status, "value", old_status)
+        new_value = getattr(new_status, "value", new_status)
+        entering = new_value in DEMAND_STATUS_VALUES
+        if (old_value in DEMAND_STATUS_VALUES) == entering:
+            return
+        try:
+            async with self.db.begin_nested():
+                await self.db.flush()
+                # Day as computed by the DB (session time zone), same as the rollup
+                order_day = (await self.db.execute(
+                    select(func.date(Order.created_at)).where(Order.id == order.id)
+                )).scalar()
+                if order_day is not None:
+                    await self._lock_days([order_day])
+                    await self._apply_order_delta(order.id, order_day, 1 if entering else -1)
+        except Exception as e:
+            logger.warning(f"Demand rollup update skipped for order {order.id}: {e}")
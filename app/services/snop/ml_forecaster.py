@@ -10,7 +10,10 @@ Production-grade forecasting using real ML libraries:
 """
 
 import math
+import time
+import asyncio
 import logging
+import multiprocessing
 import uuid
 from datetime import date, datetime, timedelta
 from decimal import Decimal
@@ -31,10 +34,259 @@ from app.models.snop import (
     ExternalFactor,
 )
 from app.services.snop.demand_planner import DemandPlannerService
+from app.config import settings
 
 logger = logging.getLogger(__name__)
 
 
+# ==================== Model Fit Pool ====================
+
+# Candidate models fitted by auto_forecast: name -> MLForecaster method
+FIT_MODELS = {
+    "prophet": "prophet_forecast",
+    "xgboost": "xgboost_forecast",
+    "arima": "arima_forecast",
+    "holt_winters": "holt_winters_forecast",
+}
+
+
+class FitPoolMetrics:
+    """Queue depth and per-model fit time counters for the model fit pool."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.submitted = 0
+        self.failed = 0
+        self.timed_out = 0
+        # Format: {model_name: {"fits", "fit_seconds_total", "fit_seconds_max", ...}}
+        self.models: Dict[str, Dict[str, float]] = {}
+
+    def record_fit(self, model_name: str, fit_seconds: float, wall_seconds: float) -> None:
+        entry = self.models.setdefault(model_name, {
+            "fits": 0,
+            "fit_seconds_total": 0.0,
+            "fit_seconds_max": 0.0,
+            "fit_seconds_last": 0.0,
+            "wait_seconds_total": 0.0,
+        })
+        entry["fits"] += 1
+        entry["fit_seconds_total"] += fit_seconds
+        entry["fit_seconds_max"] = max(entry["fit_seconds_max"], fit_seconds)
+        entry["fit_seconds_last"] = fit_seconds
+        entry["wait_seconds_total"] += max(0.0, wall_seconds - fit_seconds)
+
+    def stats(self) -> dict:
+        workers = max(settings.SNOP_FORECAST_WORKERS, 0)
+        return {
+            "workers": workers,
+            "in_flight": self.in_flight,
+            "queue_depth": max(0, self.in_flight - workers) if workers else 0,
+            "submitted": self.submitted,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "models": {
+                name: {
+                    "fits": int(m["fits"]),
+                    "avg_fit_seconds": round(m["fit_seconds_total"] / m["fits"], 3),
+                    "max_fit_seconds": round(m["fit_seconds_max"], 3),
+                    "last_fit_seconds": round(m["fit_seconds_last"], 3),
+                    "avg_wait_seconds": round(m["wait_seconds_total"] / m["fits"], 3),
+                }
+                for name, m in self.models.items()
+            },
+        }
+
+
+_fit_pool: Optional["FitWorkerPool"] = None
+_fit_metrics = FitPoolMetrics()
+
+# Per-process forecaster used inside fit workers (no DB session)
+_worker_forecaster: Optional["MLForecaster"] = None
+
+
+def _fit_worker_main(conn) -> None:
+    """Fit worker loop: receive fit arguments, send back ("ok", result) or ("error", message)."""
+    while True:
+        try:
+            args = conn.recv()
+        except (EOFError, OSError):
+            return
+        if args is None:
+            return
+        try:
+            conn.send(("ok", _fit_model(*args)))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+class _FitWorker:
+    """One spawned fit process, serving one fit at a time over its own pipe."""
+
+    def __init__(self, ctx):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_fit_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def kill(self) -> None:
+        """Stop the process now, whatever it is running."""
+        self.process.kill()
+        self.process.join(timeout=1)
+        self.conn.close()
+
+    def close(self) -> None:
+        """Ask an idle worker to exit."""
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.conn.close()
+
+
+class FitWorkerPool:
+    """
+    Fixed number of fit slots backed by reusable worker processes.
+
+    Unlike a ProcessPoolExecutor, each fit owns its worker while it runs:
+    a fit that times out (or whose caller is cancelled) has only its own
+    process killed and replaced, and fits of other callers keep running.
+    """
+
+    def __init__(self, workers: int):
+        # spawn: forking a process with a running event loop and DB pool is unsafe
+        self._ctx = multiprocessing.get_context("spawn")
+        self._slots = asyncio.Semaphore(workers)
+        self._idle: List[_FitWorker] = []
+        self._busy: set = set()
+        self.killed = 0
+
+    async def run(self, args: tuple, timeout: float):
+        """Run _fit_model(*args) in a worker; raises asyncio.TimeoutError after timeout seconds."""
+        loop = asyncio.get_running_loop()
+        async with self._slots:
+            worker = self._idle.pop() if self._idle else _FitWorker(self._ctx)
+            self._busy.add(worker)
+            done = False
+            try:
+                worker.conn.send(args)
+                # recv blocks a default-executor thread; killing the worker ends it with EOFError
+                status, payload = await asyncio.wait_for(
+                    loop.run_in_executor(None, worker.conn.recv), timeout=timeout
+                )
+                done = True
+            finally:
+                self._busy.discard(worker)
+                if done:
+                    self._idle.append(worker)
+                else:
+                    # Timed out, cancelled or died: only this fit's process goes
+                    worker.kill()
+                    self.killed += 1
+        if status == "error":
+            raise RuntimeError(payload)
+        return payload
+
+    def shutdown(self) -> None:
+        """Stop idle workers and kill running fits."""
+        for worker in self._idle:
+            worker.close()
+        for worker in list(self._busy):
+            worker.kill()
+        self._idle.clear()
+        self._busy.clear()
+
+
+def _get_fit_pool() -> Optional[FitWorkerPool]:
+    """Get the shared model fit pool (None when SNOP_FORECAST_WORKERS=0)."""
+    global _fit_pool
+    if _fit_pool is None and settings.SNOP_FORECAST_WORKERS > 0:
+        _fit_pool = FitWorkerPool(settings.SNOP_FORECAST_WORKERS)
+        logger.info(f"Forecast fit pool started with {settings.SNOP_FORECAST_WORKERS} workers")
+    return _fit_pool
+
+
+def shutdown_fit_pool() -> None:
+    """Stop the model fit pool's worker processes."""
+    global _fit_pool
+    if _fit_pool is not None:
+        _fit_pool.shutdown()
+        _fit_pool = None
+
+
+def get_fit_pool_stats() -> dict:
+    """Fit pool counters for monitoring."""
+    stats = _fit_metrics.stats()
+    stats["workers_killed"] = _fit_pool.killed if _fit_pool is not None else 0
+    return stats
+
+
+def _fit_model(
+    model_name: str,
+    data: List[float],
+    dates: List[date],
+    forecast_periods: int,
+    granularity: "ForecastGranularity",
+    confidence_level: float,
+) -> Tuple[List[float], List[Dict[str, float]], Dict[str, float], float]:
+    """Fit one candidate model. Runs inside a fit worker; returns (fc, ci, metrics, seconds)."""
+    global _worker_forecaster
+    if _worker_forecaster is None:
+        _worker_forecaster = MLForecaster(db=None)
+
+    started = time.perf_counter()
+    method = getattr(_worker_forecaster, FIT_MODELS[model_name])
+    if model_name == "prophet":
+        fc, ci, met = method(data, dates, forecast_periods, granularity, confidence_level)
+    else:
+        fc, ci, met = method(data, dates, forecast_periods, granularity)
+    return fc, ci, met, time.perf_counter() - started
+
+
+async def _run_fit(
+    model_name: str,
+    data: List[float],
+    dates: List[date],
+    forecast_periods: int,
+    granularity: "ForecastGranularity",
+    confidence_level: float,
+) -> Optional[Dict[str, Any]]:
+    """
+    Fit a model off the event loop with a timeout.
+
+    Returns None when the fit fails or times out. In the worker pool a fit
+    that times out (or whose caller is cancelled) has its worker process
+    killed; other fits are unaffected. With SNOP_FORECAST_WORKERS=0 the fit
+    runs in a thread, which cannot be stopped: its result is discarded.
+    """
+    args = (model_name, data, dates, forecast_periods, granularity, confidence_level)
+    pool = _get_fit_pool()
+    _fit_metrics.submitted += 1
+    _fit_metrics.in_flight += 1
+    started = time.perf_counter()
+    try:
+        if pool is not None:
+            fc, ci, met, fit_seconds = await pool.run(args, settings.SNOP_FORECAST_FIT_TIMEOUT)
+        else:
+            fc, ci, met, fit_seconds = await asyncio.wait_for(
+                asyncio.get_running_loop().run_in_executor(None, _fit_model, *args),
+                timeout=settings.SNOP_FORECAST_FIT_TIMEOUT,
+            )
+    except asyncio.TimeoutError:
+        _fit_metrics.timed_out += 1
+        logger.warning(f"{model_name} fit timed out after {settings.SNOP_FORECAST_FIT_TIMEOUT}s")
+        return None
+    except Exception as e:
+        # Includes a worker that died mid-fit (e.g. OOM): it is replaced on the next fit
+        _fit_metrics.failed += 1
+        logger.warning(f"{model_name} fit failed: {e}")
+        return None
+    finally:
+        _fit_metrics.in_flight -= 1
+
+    _fit_metrics.record_fit(model_name, fit_seconds, time.perf_counter() - started)
+    return {"forecasts": fc, "ci": ci, "metrics": met}
+
+
 # ==================== ABC-XYZ Demand Classification ====================
 
 class DemandClassifier:
@@ -135,7 +387,7 @@ class MLForecaster:
     falls back to pure Python implementations when not installed.
     """
 
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: Optional[AsyncSession]):
         self.db = db
         self.demand_planner = DemandPlannerService(db)
         self.classifier = DemandClassifier()
@@ -813,27 +1065,42 @@ class MLForecaster:
             for h in historical
         ]
 
-        # Classify demand pattern
-        classification = DemandClassifier.classify_demand(data)
-
-        # Run all models
-        models = {}
+        return await self.auto_forecast_series(
+            data, dates_list, end_date, forecast_periods, granularity, confidence_level
+        )
 
-        # Prophet
-        fc, ci, met = self.prophet_forecast(data, dates_list, forecast_periods, granularity, confidence_level)
-        models["prophet"] = {"forecasts": fc, "ci": ci, "metrics": met}
+    async def auto_forecast_series(
+        self,
+        data: List[float],
+        dates_list: List[date],
+        end_date: date,
+        forecast_periods: int = 30,
+        granularity: ForecastGranularity = ForecastGranularity.DAILY,
+        confidence_level: float = 0.95,
+    ) -> Dict[str, Any]:
+        """
+        Automatic model selection on an already loaded demand series.
 
-        # XGBoost
-        fc, ci, met = self.xgboost_forecast(data, dates_list, forecast_periods, granularity)
-        models["xgboost"] = {"forecasts": fc, "ci": ci, "metrics": met}
+        Used by auto_forecast and by batch pipelines that load history for
+        many SKUs in one query.
+        """
+        if not data:
+            return self._empty_forecast(end_date, forecast_periods, granularity)
 
-        # ARIMA / SARIMAX
-        fc, ci, met = self.arima_forecast(data, dates_list, forecast_periods, granularity)
-        models["arima"] = {"forecasts": fc, "ci": ci, "metrics": met}
+        # Classify demand pattern
+        classification = DemandClassifier.classify_demand(data)
 
-        # Holt-Winters
-        fc, ci, met = self.holt_winters_forecast(data, dates_list, forecast_periods, granularity)
-        models["holt_winters"] = {"forecasts": fc, "ci": ci, "metrics": met}
+        # Fit all models concurrently in the fit pool (Prophet, XGBoost, SARIMAX, Holt-Winters)
+        results = await asyncio.gather(*(
+            _run_fit(name, data, dates_list, forecast_periods, granularity, confidence_level)
+            for name in FIT_MODELS
+        ))
+        models = {name: result for name, result in zip(FIT_MODELS, results) if result is not None}
+
+        if not models:
+            # Every fit failed or timed out: use the cheap pure Python Holt-Winters
+            fc, ci, met = self._hw_fallback(data, forecast_periods, granularity)
+            models["holt_winters"] = {"forecasts": fc, "ci": ci, "metrics": met}
 
         # Pick best model by MAPE
         best_name = min(models, key=lambda k: models[k]["metrics"].get("mape", 100))
@@ -13,12 +13,17 @@ Competitive with: o9 Solutions Digital Twin, SAP IBP Scenario Planning, Anaplan
 
 import uuid
 import math
-import random
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
+from functools import partial
 from typing import List, Dict, Optional, Any, Tuple
 from collections import defaultdict
 
+import numpy as np
+
 from sqlalchemy import select, func, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -32,6 +37,170 @@ from app.models.snop import (
 )
 from app.models.product import Product
 from app.models.inventory import InventorySummary
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# ==================== Vectorized Monte Carlo Core ====================
+
+MONTE_CARLO_METRICS = [
+    "revenue", "cogs", "gross_margin", "margin_pct", "net_profit",
+    "units_sold", "lost_sales", "excess_inventory", "holding_cost",
+    "lost_sales_cost", "service_level", "lead_time",
+    "inventory_turns", "working_capital",
+]
+
+# Simulations run off the event loop; NumPy releases the GIL for the array work
+_simulation_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _get_simulation_pool() -> ThreadPoolExecutor:
+    """Get the shared Monte Carlo worker pool."""
+    global _simulation_pool
+    if _simulation_pool is None:
+        _simulation_pool = ThreadPoolExecutor(
+            max_workers=settings.SNOP_SIMULATION_WORKERS,
+            thread_name_prefix="snop-monte-carlo",
+        )
+    return _simulation_pool
+
+
+def simulate_monte_carlo(
+    base_demand: float,
+    base_revenue_per_unit: float,
+    base_cost_per_unit: float,
+    base_supply_capacity: float,
+    base_lead_time: float,
+    simulation_days: int,
+    num_simulations: int,
+    demand_cv: float,
+    supply_cv: float,
+    lead_time_cv: float,
+    price_cv: float,
+    seed: int = 42,
+) -> Dict[str, Any]:
+    """
+    Run all Monte Carlo iterations as NumPy arrays and aggregate them.
+
+    Each iteration samples demand and supply (normal, clamped >= 0), lead time
+    (lognormal) and price (normal, >= 0.01). Pure CPU work with no I/O, so it
+    is safe to run in a worker thread or process.
+    """
+    n = num_simulations
+    rng = np.random.default_rng(seed)  # Reproducibility
+
+    # Sample demand and supply capacity (normal, clamp >=0)
+    demand = np.maximum(0.0, rng.normal(base_demand, abs(base_demand) * demand_cv, n)) * simulation_days
+    supply = np.maximum(0.0, rng.normal(base_supply_capacity, abs(base_supply_capacity) * supply_cv, n)) * simulation_days
+
+    # Sample lead time (lognormal to ensure positive)
+    if base_lead_time > 0:
+        lt_sigma = math.sqrt(math.log(1 + lead_time_cv ** 2))
+        lt_mu = math.log(base_lead_time) - lt_sigma ** 2 / 2
+        lead_time = rng.lognormal(lt_mu, lt_sigma, n)
+        lt_ratio = lead_time / base_lead_time
+    else:
+        lead_time = np.zeros(n)
+        lt_ratio = np.ones(n)
+
+    # Sample price
+    price = np.maximum(0.01, rng.normal(base_revenue_per_unit, abs(base_revenue_per_unit) * price_cv, n))
+
+    # Lead time impact: longer lead time causes demand loss (customer defection)
+    service_penalty = np.maximum(0.5, 1 - (lt_ratio - 1) * 0.3)
+    effective_demand = demand * service_penalty
+
+    # Calculate outcomes
+    units_sold = np.minimum(effective_demand, supply)
+    lost_sales = np.maximum(0.0, effective_demand - supply)
+    excess_inventory = np.maximum(0.0, supply - effective_demand)
+
+    revenue = units_sold * price
+    cogs = units_sold * base_cost_per_unit
+    gross_margin = revenue - cogs
+    margin_pct = np.divide(gross_margin * 100, revenue, out=np.zeros(n), where=revenue > 0)
+
+    # Holding cost for excess inventory (monthly) and lost-sales opportunity cost
+    holding_cost = excess_inventory * base_cost_per_unit * 0.25 / 12
+    lost_sales_cost = lost_sales * price * 0.5
+    net_profit = gross_margin - holding_cost - lost_sales_cost
+
+    # Service level
+    service_level = np.divide(units_sold * 100, demand, out=np.full(n, 100.0), where=demand > 0)
+    stockout = lost_sales > 0
+
+    # Working capital (average inventory value)
+    avg_inventory = (supply - units_sold / 2) * base_cost_per_unit
+    inventory_turns = np.divide(cogs, avg_inventory, out=np.zeros(n), where=avg_inventory > 0)
+
+    samples = {
+        "revenue": revenue,
+        "cogs": cogs,
+        "gross_margin": gross_margin,
+        "margin_pct": margin_pct,
+        "net_profit": net_profit,
+        "units_sold": units_sold,
+        "lost_sales": lost_sales,
+        "excess_inventory": excess_inventory,
+        "holding_cost": holding_cost,
+        "lost_sales_cost": lost_sales_cost,
+        "service_level": service_level,
+        "lead_time": lead_time,
+        "inventory_turns": inventory_turns,
+        "working_capital": np.maximum(0.0, avg_inventory),
+    }
+
+    return _aggregate_monte_carlo(samples, stockout, n)
+
+
+def _aggregate_monte_carlo(
+    samples: Dict[str, np.ndarray], stockout: np.ndarray, n: int
+) -> Dict[str, Any]:
+    """Aggregate Monte Carlo sample arrays into statistics."""
+    percentile_idx = {
+        f"p{int(q * 100)}": int(n * q) for q in (0.05, 0.25, 0.50, 0.75, 0.95)
+    }
+
+    stats = {}
+    for metric in MONTE_CARLO_METRICS:
+        values = np.sort(samples[metric])
+        stats[metric] = {
+            "mean": round(float(values.mean()), 2),
+            "std": round(float(values.std()), 2),
+            "min": round(float(values[0]), 2),
+            "max": round(float(values[-1]), 2),
+            **{name: round(float(values[idx]), 2) for name, idx in percentile_idx.items()},
+        }
+
+    # Stockout probability
+    stockout_prob = round(int(stockout.sum()) / n, 4)
+
+    # Revenue distribution histogram (10 buckets, last bucket open-ended)
+    revenue = samples["revenue"]
+    rev_min, rev_max = float(revenue.min()), float(revenue.max())
+    bucket_size = (rev_max - rev_min) / 10 if rev_max > rev_min else 1
+    bucket_idx = np.clip(np.floor((revenue - rev_min) / bucket_size), 0, 9).astype(np.int64)
+    counts = np.bincount(bucket_idx, minlength=10)
+
+    histogram = []
+    for i in range(10):
+        lo = rev_min + i * bucket_size
+        hi = lo + bucket_size
+        count = int(counts[i])
+        histogram.append({
+            "range_start": round(lo, 0),
+            "range_end": round(hi, 0),
+            "count": count,
+            "probability": round(count / n, 4),
+        })
+
+    return {
+        **stats,
+        "stockout_probability": stockout_prob,
+        "num_simulations": n,
+        "revenue_histogram": histogram,
+    }
 
 
 class ScenarioEngine:
@@ -100,27 +269,25 @@ class ScenarioEngine:
             base_lead_time *= scenario.lead_time_multiplier
             base_revenue_per_unit *= (1 + scenario.price_change_pct / 100.0)
 
-            # Run simulations
-            sim_results = []
-            random.seed(42)  # Reproducibility
-
-            for _ in range(num_simulations):
-                sim = self._run_single_simulation(
+            # Run vectorized simulations in the worker pool (keeps the event loop free)
+            loop = asyncio.get_running_loop()
+            mc_result = await loop.run_in_executor(
+                _get_simulation_pool(),
+                partial(
+                    simulate_monte_carlo,
                     base_demand=base_demand,
                     base_revenue_per_unit=base_revenue_per_unit,
                     base_cost_per_unit=base_cost_per_unit,
                     base_supply_capacity=base_supply_capacity,
                     base_lead_time=base_lead_time,
                     simulation_days=simulation_days,
+                    num_simulations=num_simulations,
                     demand_cv=demand_cv,
                     supply_cv=supply_cv,
                     lead_time_cv=lead_time_cv,
                     price_cv=price_cv,
-                )
-                sim_results.append(sim)
-
-            # Aggregate results
-            mc_result = self._aggregate_monte_carlo(sim_results, num_simulations)
+                ),
+            )
 
             # Update scenario with results
             scenario.results = {
@@ -145,145 +312,6 @@ class ScenarioEngine:
             await self.db.commit()
             raise
 
-    def _run_single_simulation(
-        self,
-        base_demand: float,
-        base_revenue_per_unit: float,
-        base_cost_per_unit: float,
-        base_supply_capacity: float,
-        base_lead_time: float,
-        simulation_days: int,
-        demand_cv: float,
-        supply_cv: float,
-        lead_time_cv: float,
-        price_cv: float,
-    ) -> Dict[str, float]:
-        """Run a single Monte Carlo iteration."""
-
-        # Sample demand (normal, clamp >=0)
-        demand_std = base_demand * demand_cv
-        simulated_demand = max(0, random.gauss(base_demand, demand_std)) * simulation_days
-
-        # Sample supply capacity
-        supply_std = base_supply_capacity * supply_cv
-        simulated_supply = max(0, random.gauss(base_supply_capacity, supply_std)) * simulation_days
-
-        # Sample lead time (lognormal to ensure positive)
-        lt_sigma = math.sqrt(math.log(1 + lead_time_cv ** 2))
-        lt_mu = math.log(base_lead_time) - lt_sigma ** 2 / 2
-        simulated_lead_time = random.lognormvariate(lt_mu, lt_sigma)
-
-        # Sample price
-        price_std = base_revenue_per_unit * price_cv
-        simulated_price = max(0.01, random.gauss(base_revenue_per_unit, price_std))
-
-        # Lead time impact: longer lead time causes demand loss (customer defection)
-        lt_ratio = simulated_lead_time / base_lead_time if base_lead_time > 0 else 1.0
-        service_penalty = max(0.5, 1 - (lt_ratio - 1) * 0.3)
-        effective_demand = simulated_demand * service_penalty
-
-        # Calculate outcomes
-        units_sold = min(effective_demand, simulated_supply)
-        lost_sales = max(0, effective_demand - simulated_supply)
-        excess_inventory = max(0, simulated_supply - effective_demand)
-
-        revenue = units_sold * simulated_price
-        cogs = units_sold * base_cost_per_unit
-        gross_margin = revenue - cogs
-        margin_pct = (gross_margin / revenue * 100) if revenue > 0 else 0
-
-        # Holding cost for excess inventory
-        holding_cost = excess_inventory * base_cost_per_unit * 0.25 / 12  # Monthly holding
-        lost_sales_cost = lost_sales * simulated_price * 0.5  # Opportunity cost
-
-        net_profit = gross_margin - holding_cost - lost_sales_cost
-
-        # Service level
-        service_level = (units_sold / simulated_demand * 100) if simulated_demand > 0 else 100
-        stockout = 1 if lost_sales > 0 else 0
-
-        # Working capital (average inventory value)
-        avg_inventory = (simulated_supply - units_sold / 2) * base_cost_per_unit
-        inventory_turns = (cogs / avg_inventory) if avg_inventory > 0 else 0
-
-        return {
-            "revenue": revenue,
-            "cogs": cogs,
-            "gross_margin": gross_margin,
-            "margin_pct": margin_pct,
-            "net_profit": net_profit,
-            "units_sold": units_sold,
-            "lost_sales": lost_sales,
-            "excess_inventory": excess_inventory,
-            "holding_cost": holding_cost,
-            "lost_sales_cost": lost_sales_cost,
-            "service_level": service_level,
-            "stockout": stockout,
-            "lead_time": simulated_lead_time,
-            "inventory_turns": inventory_turns,
-            "working_capital": max(0, avg_inventory),
-        }
-
-    def _aggregate_monte_carlo(
-        self, results: List[Dict[str, float]], n: int
-    ) -> Dict[str, Any]:
-        """Aggregate Monte Carlo simulation results into statistics."""
-
-        metrics = [
-            "revenue", "cogs", "gross_margin", "margin_pct", "net_profit",
-            "units_sold", "lost_sales", "excess_inventory", "holding_cost",
-            "lost_sales_cost", "service_level", "lead_time",
-            "inventory_turns", "working_capital",
-        ]
-
-        stats = {}
-        for metric in metrics:
-            values = sorted([r[metric] for r in results])
-            n_vals = len(values)
-
-            mean_val = sum(values) / n_vals
-            variance = sum((v - mean_val) ** 2 for v in values) / n_vals
-            std_val = math.sqrt(variance)
-
-            stats[metric] = {
-                "mean": round(mean_val, 2),
-                "std": round(std_val, 2),
-                "min": round(values[0], 2),
-                "max": round(values[-1], 2),
-                "p5": round(values[int(n_vals * 0.05)], 2),
-                "p25": round(values[int(n_vals * 0.25)], 2),
-                "p50": round(values[int(n_vals * 0.50)], 2),
-                "p75": round(values[int(n_vals * 0.75)], 2),
-                "p95": round(values[int(n_vals * 0.95)], 2),
-            }
-
-        # Stockout probability
-        stockout_count = sum(1 for r in results if r["stockout"] == 1)
-        stockout_prob = round(stockout_count / n, 4)
-
-        # Revenue distribution histogram (10 buckets)
-        rev_values = sorted([r["revenue"] for r in results])
-        rev_min, rev_max = rev_values[0], rev_values[-1]
-        bucket_size = (rev_max - rev_min) / 10 if rev_max > rev_min else 1
-        histogram = []
-        for i in range(10):
-            lo = rev_min + i * bucket_size
-            hi = lo + bucket_size
-            count = sum(1 for v in rev_values if lo <= v < hi) if i < 9 else sum(1 for v in rev_values if v >= lo)
-            histogram.append({
-                "range_start": round(lo, 0),
-                "range_end": round(hi, 0),
-                "count": count,
-                "probability": round(count / n, 4),
-            })
-
-        return {
-            **stats,
-            "stockout_probability": stockout_prob,
-            "num_simulations": n,
-            "revenue_histogram": histogram,
-        }
-
     # ==================== Financial P&L Projection ====================
 
     async def project_financial_pl(
@@ -0,0 +1,259 @@
+"""
+Bulk Stock Receipt (GRN)
+
+Receives a goods receipt into a warehouse without building one ORM object
+per unit:
+
+1. Apply each GRN line's quantity to InventorySummary with one atomic
+   UPDATE ... RETURNING per (warehouse, product, variant), inserting the
+   summary rows that do not exist yet
+2. Write one RECEIPT movement per GRN line in a single bulk insert, with
+   balances derived from the returned totals (walking the lines backwards)
+3. Stream the stock_items rows in fixed-size chunks - PostgreSQL COPY on
+   psycopg connections, executemany inserts without RETURNING otherwise
+
+Rows are generated per chunk, so memory stays flat however many units a
+line carries. Everything runs in the caller's transaction; nothing commits.
+"""
+
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import select, func, insert, update, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import copy_rows
+from app.models.inventory import (
+    StockItem, StockItemStatus,
+    InventorySummary,
+    StockMovement, StockMovementType,
+)
+
+logger = logging.getLogger(__name__)
+
+# Stock item rows per COPY / executemany batch
+_CHUNK_SIZE = 5000
+
+# Columns written for each received unit, in COPY order
+_STOCK_ITEM_COLUMNS = (
+    "id",
+    "product_id",
+    "variant_id",
+    "warehouse_id",
+    "serial_number",
+    "batch_number",
+    "grn_number",
+    "purchase_order_id",
+    "vendor_id",
+    "purchase_price",
+    "landed_cost",
+    "manufacturing_date",
+    "expiry_date",
+    "received_date",
+    "status",
+    "created_at",
+    "updated_at",
+)
+
+SummaryKey = Tuple[uuid.UUID, Optional[uuid.UUID]]
+
+
+def line_units(item_data: dict) -> int:
+    """Units a GRN line receives: one per serial number, else its quantity."""
+    serial_numbers = item_data.get("serial_numbers") or []
+    return len(serial_numbers) if serial_numbers else item_data["quantity"]
+
+
+class BulkStockReceiver:
+    """Bulk GRN receipt for the current tenant schema."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def receive(
+        self,
+        warehouse_id: uuid.UUID,
+        grn_number: str,
+        items: List[dict],
+        purchase_order_id: Optional[uuid.UUID] = None,
+        vendor_id: Optional[uuid.UUID] = None,
+        created_by: Optional[uuid.UUID] = None,
+    ) -> int:
+        """
+        Receive GRN lines into a warehouse.
+
+        Does not commit. Returns the number of stock items created.
+        """
+        items = [item for item in items if line_units(item) > 0]
+        if not items:
+            return 0
+        now = datetime.now(timezone.utc)
+
+        totals: Dict[SummaryKey, int] = {}
+        for item_data in items:
+            key = (item_data["product_id"], item_data.get("variant_id"))
+            totals[key] = totals.get(key, 0) + line_units(item_data)
+
+        balances = await self._apply_summary_deltas(warehouse_id, totals, now)
+        await self._insert_movements(warehouse_id, grn_number, items, balances, created_by, now)
+
+        received = 0
+        for chunk in self._stock_item_chunks(
+            warehouse_id, grn_number, items, purchase_order_id, vendor_id, now
+        ):
+            received += await copy_rows(self.db, StockItem, _STOCK_ITEM_COLUMNS, chunk)
+
+        logger.info(f"GRN {grn_number}: received {received} units over {len(items)} lines")
+        return received
+
+    async def _apply_summary_deltas(
+        self,
+        warehouse_id: uuid.UUID,
+        totals: Dict[SummaryKey, int],
+        now: datetime,
+    ) -> Dict[SummaryKey, int]:
+        """Add received quantities to InventorySummary; returns the new totals."""
+        balances: Dict[SummaryKey, int] = {}
+        missing: List[dict] = []
+
+        for (product_id, variant_id), quantity in totals.items():
+            variant_clause = (
+                InventorySummary.variant_id == variant_id
+                if variant_id
+                else InventorySummary.variant_id.is_(None)
+            )
+            result = await self.db.execute(
+                update(InventorySummary)
+                .where(
+                    and_(
+                        InventorySummary.warehouse_id == warehouse_id,
+                        InventorySummary.product_id == product_id,
+                        variant_clause,
+                    )
+                )
+                .values(
+                    total_quantity=func.coalesce(InventorySummary.total_quantity, 0) + quantity,
+                    available_quantity=func.coalesce(InventorySummary.available_quantity, 0) + quantity,
+                    last_stock_in_date=now,
+                )
+                .returning(InventorySummary.total_quantity)
+                .execution_options(synchronize_session="fetch")
+            )
+            new_totals = result.scalars().all()
+            if new_totals:
+                balances[(product_id, variant_id)] = new_totals[0]
+                continue
+
+            missing.append({
+                "id": uuid.uuid4(),
+                "warehouse_id": warehouse_id,
+                "product_id": product_id,
+                "variant_id": variant_id,
+                "total_quantity": quantity,
+                "available_quantity": quantity,
+                "reserved_quantity": 0,
+                "allocated_quantity": 0,
+                "damaged_quantity": 0,
+                "in_transit_quantity": 0,
+                "last_stock_in_date": now,
+            })
+            balances[(product_id, variant_id)] = quantity
+
+        if missing:
+            await self.db.execute(insert(InventorySummary), missing)
+        return balances
+
+    async def _next_movement_sequence(self, date_part: str) -> int:
+        """First free MOV-{date}-NNNN sequence (same scheme as InventoryService)."""
+        count = await self.db.scalar(
+            select(func.count()).select_from(StockMovement).where(
+                StockMovement.movement_number.like(f"MOV-{date_part}%")
+            )
+        )
+        return (count or 0) + 1
+
+    async def _insert_movements(
+        self,
+        warehouse_id: uuid.UUID,
+        grn_number: str,
+        items: List[dict],
+        balances: Dict[SummaryKey, int],
+        created_by: Optional[uuid.UUID],
+        now: datetime,
+    ) -> None:
+        """One RECEIPT movement per GRN line, in a single insert."""
+        date_part = now.strftime("%Y%m%d")
+        sequence = await self._next_movement_sequence(date_part)
+
+        # Balance after each line: returned total minus later lines' quantities
+        remaining = dict(balances)
+        balance_after: List[int] = [0] * len(items)
+        for idx in range(len(items) - 1, -1, -1):
+            key = (items[idx]["product_id"], items[idx].get("variant_id"))
+            balance_after[idx] = remaining[key]
+            remaining[key] -= line_units(items[idx])
+
+        rows = []
+        for idx, item_data in enumerate(items):
+            quantity = line_units(item_data)
+            unit_cost = item_data.get("purchase_price", 0) or 0
+            rows.append({
+                "id": uuid.uuid4(),
+                "movement_number": f"MOV-{date_part}-{sequence + idx:04d}",
+                "movement_type": StockMovementType.RECEIPT.value,
+                "movement_date": now,
+                "warehouse_id": warehouse_id,
+                "product_id": item_data["product_id"],
+                "variant_id": item_data.get("variant_id"),
+                "quantity": quantity,
+                "balance_before": balance_after[idx] - quantity,
+                "balance_after": balance_after[idx],
+                "reference_type": "grn",
+                "reference_number": grn_number,
+                "unit_cost": unit_cost,
+                "total_cost": quantity * unit_cost,
+                "created_by": created_by,
+            })
+        await self.db.execute(insert(StockMovement), rows)
+
+    def _stock_item_chunks(
+        self,
+        warehouse_id: uuid.UUID,
+        grn_number: str,
+        items: List[dict],
+        purchase_order_id: Optional[uuid.UUID],
+        vendor_id: Optional[uuid.UUID],
+        now: datetime,
+    ) -> Iterator[List[tuple]]:
+        """Stock item rows (in _STOCK_ITEM_COLUMNS order), _CHUNK_SIZE at a time."""
+        chunk: List[tuple] = []
+        for item_data in items:
+            serial_numbers = item_data.get("serial_numbers") or []
+            serials = serial_numbers if serial_numbers else (None for _ in range(item_data["quantity"]))
+            for serial in serials:
+                chunk.append((
+                    uuid.uuid4(),
+                    item_data["product_id"],
+                    item_data.get("variant_id"),
+                    warehouse_id,
+                    serial,
+                    item_data.get("batch_number"),
+                    grn_number,
+                    purchase_order_id,
+                    vendor_id,
+                    item_data.get("purchase_price", 0),
+                    0,
+                    item_data.get("manufacturing_date"),
+                    item_data.get("expiry_date"),
+                    now,
+                    StockItemStatus.AVAILABLE.value,
+                    now,
+                    now,
+                ))
+                if len(chunk) >= _CHUNK_SIZE:
+                    yield chunk
+                    chunk = []
+        if chunk:
+            yield chunk
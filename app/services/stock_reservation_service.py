@@ -18,6 +18,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.inventory import InventorySummary, StockItem
 from app.models.channel import ChannelInventory, SalesChannel
 from app.services.cache_service import get_cache
+from app.middleware.tenant import get_current_tenant_id
 from app.config import settings
 
 
@@ -58,12 +59,15 @@ class StockReservationService:
     2. confirm_reservation() - Called when payment succeeds
     3. release_reservation() - Called when payment fails/times out
 
-    Uses Redis for fast reservation tracking with auto-expiry.
+    Uses Redis for fast reservation tracking with auto-expiry. Soft-reserved
+    counters are updated with atomic cache primitives, and a reservation
+    checks and increments every line in one atomic step.
     """
 
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, tenant_id: Optional[str] = None):
         self.db = db
         self.cache = get_cache()
+        self.tenant_id = tenant_id or get_current_tenant_id()
 
     def _reservation_key(self, reservation_id: str) -> str:
         """Generate cache key for reservation."""
@@ -95,7 +99,7 @@ class StockReservationService:
     async def _get_channel_soft_reserved(self, channel_id: str, product_id: str) -> int:
         """Get channel-specific soft-reserved quantity from cache."""
         key = self._channel_reserved_key(channel_id, product_id)
-        value = await self.cache.get(key)
+        value = await self.cache.get(self.tenant_id, key)
         return int(value) if value else 0
 
     async def check_availability(
@@ -116,6 +120,13 @@ class StockReservationService:
         channel_obj = await self._get_channel_by_code(channel)
         use_channel_inventory = channel_obj and getattr(settings, 'CHANNEL_INVENTORY_ENABLED', True)
 
+        # Soft reservations for every item in one round trip
+        shared_soft, channel_soft = await self.cache.get_soft_reserved_many(
+            self.tenant_id,
+            [str(item.product_id) for item in items],
+            channel_id=str(channel_obj.id) if use_channel_inventory else None,
+        )
+
         for item in items:
             if use_channel_inventory:
                 # Query channel-specific inventory
@@ -149,8 +160,8 @@ class StockReservationService:
                 total_reserved = row.total_reserved or 0 if row else 0
                 total_allocated = row.total_allocated or 0 if row else 0
 
-                # Get channel-specific soft reservations from cache
-                soft_reserved = await self._get_channel_soft_reserved(str(channel_obj.id), item.product_id)
+                # Channel-specific soft reservations
+                soft_reserved = channel_soft.get(str(item.product_id), 0)
 
                 # Actual available = channel available - channel soft reserved
                 actual_available = total_available - soft_reserved
@@ -160,6 +171,7 @@ class StockReservationService:
                     "requested": item.quantity,
                     "available": max(0, actual_available),
                     "is_available": actual_available >= item.quantity,
+                    "capacity": total_available,
                     "channel_allocated": total_allocated,
                     "channel_reserved": total_reserved,
                     "soft_reserved": soft_reserved,
@@ -182,8 +194,8 @@ class StockReservationService:
                 total_available = row.total_available or 0 if row else 0
                 total_reserved = row.total_reserved or 0 if row else 0
 
-                # Get soft reservations from cache (legacy)
-                soft_reserved = await self._get_soft_reserved(item.product_id)
+                # Shared-pool soft reservations (legacy)
+                soft_reserved = shared_soft.get(str(item.product_id), 0)
 
                 # Actual available = DB available - DB reserved - soft reserved
                 actual_available = total_available - total_reserved - soft_reserved
@@ -193,6 +205,7 @@ class StockReservationService:
                     "requested": item.quantity,
                     "available": max(0, actual_available),
                     "is_available": actual_available >= item.quantity,
+                    "capacity": total_available - total_reserved,
                     "db_available": total_available,
                     "db_reserved": total_reserved,
                     "soft_reserved": soft_reserved,
@@ -204,26 +217,29 @@ class StockReservationService:
     async def _get_soft_reserved(self, product_id: str) -> int:
         """Get total soft-reserved quantity from cache."""
         key = self._product_reserved_key(product_id)
-        value = await self.cache.get(key)
+        value = await self.cache.get(self.tenant_id, key)
         return int(value) if value else 0
 
     async def _increment_soft_reserved(self, product_id: str, quantity: int) -> bool:
-        """Increment soft-reserved quantity in cache."""
+        """Atomically increment soft-reserved quantity in cache."""
         key = self._product_reserved_key(product_id)
-        current = await self._get_soft_reserved(product_id)
-        new_value = current + quantity
-        # Set with longer TTL than individual reservations to handle cleanup
-        return await self.cache.set(key, new_value, ttl=RESERVATION_TTL + 60)
+        # Longer TTL than individual reservations to handle cleanup
+        await self.cache.incr_by(self.tenant_id, key, quantity, ttl=RESERVATION_TTL + 60)
+        return True
 
     async def _decrement_soft_reserved(self, product_id: str, quantity: int) -> bool:
-        """Decrement soft-reserved quantity in cache."""
-        key = self._product_reserved_key(product_id)
-        current = await self._get_soft_reserved(product_id)
-        new_value = max(0, current - quantity)
-        if new_value == 0:
-            await self.cache.delete(key)
-            return True
-        return await self.cache.set(key, new_value, ttl=RESERVATION_TTL + 60)
+        """Atomically decrement soft-reserved quantity in cache (floored at zero)."""
+        await self.cache.release_soft_stock(
+            self.tenant_id, product_id, quantity, ttl=RESERVATION_TTL + 60
+        )
+        return True
+
+    async def _decrement_channel_soft_reserved(self, channel_id: str, product_id: str, quantity: int) -> bool:
+        """Atomically decrement channel-specific soft-reserved quantity (floored at zero)."""
+        await self.cache.release_soft_stock(
+            self.tenant_id, product_id, quantity, channel_id=channel_id, ttl=RESERVATION_TTL + 60
+        )
+        return True
 
     async def create_reservation(
         self,
@@ -281,6 +297,38 @@ class StockReservationService:
                 failed_items=failed_items,
             )
 
+        # Atomically re-check and increment soft-reserved counters for every line.
+        # Capacity is stock before soft reservations, so concurrent checkouts
+        # cannot both pass the availability check and oversell.
+        requested: Dict[str, int] = {}
+        capacity: Dict[str, int] = {}
+        for item in reserved_items:
+            product_id = str(item["product_id"])
+            requested[product_id] = requested.get(product_id, 0) + item["quantity"]
+            capacity[product_id] = availability.get(item["product_id"], {}).get("capacity", 0)
+
+        exceeded = await self.cache.reserve_soft_stock(
+            self.tenant_id,
+            {pid: (qty, capacity[pid]) for pid, qty in requested.items()},
+            channel_id=str(channel_obj.id) if use_channel_inventory else None,
+            ttl=ttl + 60,
+        )
+        if exceeded:
+            return ReservationResult(
+                success=False,
+                message=f"{len(exceeded)} item(s) have insufficient stock",
+                reserved_items=[],
+                failed_items=[
+                    {
+                        "product_id": pid,
+                        "requested": requested[pid],
+                        "available": availability.get(pid, {}).get("available", 0),
+                        "reason": "Insufficient stock",
+                    }
+                    for pid in exceeded
+                ],
+            )
+
         # Create reservation
         reservation_id = str(uuid.uuid4())
         reservation_data = {
@@ -288,7 +336,7 @@ class StockReservationService:
             "customer_id": customer_id,
             "session_id": session_id,
             "channel_code": channel,
-            "channel_id": str(channel_obj.id) if channel_obj else None,
+            "channel_id": str(channel_obj.id) if use_channel_inventory else None,
             "items": reserved_items,
             "created_at": datetime.now(timezone.utc).isoformat(),
             "expires_at": (datetime.now(timezone.utc) + timedelta(seconds=ttl)).isoformat(),
@@ -297,22 +345,12 @@ class StockReservationService:
 
         # Store reservation in cache
         await self.cache.set(
+            self.tenant_id,
             self._reservation_key(reservation_id),
             reservation_data,
             ttl=ttl
         )
 
-        # Increment soft-reserved quantities
-        for item in reserved_items:
-            if use_channel_inventory and channel_obj:
-                # Channel-specific soft reservation
-                key = self._channel_reserved_key(str(channel_obj.id), item["product_id"])
-                current = await self._get_channel_soft_reserved(str(channel_obj.id), item["product_id"])
-                await self.cache.set(key, current + item["quantity"], ttl=ttl + 60)
-            else:
-                # Legacy shared pool reservation
-                await self._increment_soft_reserved(item["product_id"], item["quantity"])
-
         return ReservationResult(
             success=True,
             reservation_id=reservation_id,
@@ -323,7 +361,7 @@ class StockReservationService:
 
     async def get_reservation(self, reservation_id: str) -> Optional[Dict]:
         """Get reservation details by ID."""
-        return await self.cache.get(self._reservation_key(reservation_id))
+        return await self.cache.get(self.tenant_id, self._reservation_key(reservation_id))
 
     async def confirm_reservation(
         self,
@@ -355,6 +393,7 @@ class StockReservationService:
 
         # Store updated reservation (short TTL since it's confirmed)
         await self.cache.set(
+            self.tenant_id,
             self._reservation_key(reservation_id),
             reservation,
             ttl=300  # Keep for 5 minutes for audit
@@ -366,13 +405,7 @@ class StockReservationService:
         for item in reservation.get("items", []):
             if channel_id:
                 # Decrement channel-specific soft reservation
-                key = self._channel_reserved_key(channel_id, item["product_id"])
-                current = await self._get_channel_soft_reserved(channel_id, item["product_id"])
-                new_value = max(0, current - item["quantity"])
-                if new_value == 0:
-                    await self.cache.delete(key)
-                else:
-                    await self.cache.set(key, new_value, ttl=RESERVATION_TTL + 60)
+                await self._decrement_channel_soft_reserved(channel_id, item["product_id"], item["quantity"])
 
                 # Increment hard reserved in ChannelInventory
                 await self._increment_channel_hard_reserved(channel_id, item["product_id"], item["quantity"])
@@ -433,19 +466,13 @@ class StockReservationService:
         for item in reservation.get("items", []):
             if channel_id:
                 # Decrement channel-specific soft reservation
-                key = self._channel_reserved_key(channel_id, item["product_id"])
-                current = await self._get_channel_soft_reserved(channel_id, item["product_id"])
-                new_value = max(0, current - item["quantity"])
-                if new_value == 0:
-                    await self.cache.delete(key)
-                else:
-                    await self.cache.set(key, new_value, ttl=RESERVATION_TTL + 60)
+                await self._decrement_channel_soft_reserved(channel_id, item["product_id"], item["quantity"])
             else:
                 # Legacy: decrement shared pool soft reservation
                 await self._decrement_soft_reserved(item["product_id"], item["quantity"])
 
         # Delete the reservation
-        await self.cache.delete(self._reservation_key(reservation_id))
+        await self.cache.delete(self.tenant_id, self._reservation_key(reservation_id))
 
         return True
 
@@ -477,6 +504,7 @@ class StockReservationService:
 
         # Re-store with new TTL
         await self.cache.set(
+            self.tenant_id,
             self._reservation_key(reservation_id),
             reservation,
             ttl=additional_seconds
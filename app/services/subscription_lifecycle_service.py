@@ -15,6 +15,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.tenant import Tenant
 from app.models.module import TenantSubscription, Module
 from app.models.billing import BillingHistory
+from app.core.tenant_registry import invalidate_tenant
+from app.core.entitlement_cache import invalidate_entitlements
 
 
 class SubscriptionLifecycleService:
@@ -108,6 +110,9 @@ class SubscriptionLifecycleService:
         if suspended_subscriptions:
             await self.db.commit()
 
+            for tenant_id in {item['tenant_id'] for item in suspended_subscriptions}:
+                await invalidate_entitlements(tenant_id)
+
             # TODO: Send expiry notification emails
             # for item in suspended_subscriptions:
             #     await send_expiry_notification_email(item)
@@ -154,6 +159,7 @@ class SubscriptionLifecycleService:
             if tenant and tenant.status == 'active':
                 tenant.status = 'suspended'
                 await self.db.commit()
+                invalidate_tenant(tenant.id, tenant.subdomain)
 
                 # TODO: Send tenant suspension notification
                 # await send_tenant_suspension_email(tenant)
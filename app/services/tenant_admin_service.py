@@ -7,6 +7,7 @@ from sqlalchemy import select, func, and_, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.tenant import Tenant, ErpModule, TenantSubscription, BillingHistory, UsageMetric
+from app.core.tenant_registry import invalidate_tenant
 
 
 class TenantAdminService:
@@ -192,6 +193,9 @@ class TenantAdminService:
         await self.db.commit()
         await self.db.refresh(tenant)
 
+        # Status gates tenant resolution in the middleware
+        invalidate_tenant(tenant.id, tenant.subdomain)
+
         return tenant
 
     async def get_platform_statistics(self) -> dict:
@@ -355,6 +359,8 @@ class TenantAdminService:
         await self.db.delete(tenant)
         await self.db.commit()
 
+        invalidate_tenant(tenant_id, subdomain)
+
         return {
             "success": True,
             "tenant_id": str(tenant_id),
@@ -12,6 +12,8 @@ from app.models.tenant import Tenant, ErpModule, Plan, TenantSubscription
 from app.core.security import get_password_hash, create_access_token
 from app.config import settings
 from app.services.tenant_schema_service import TenantSchemaService
+from app.core.tenant_registry import invalidate_tenant
+from app.core.entitlement_cache import invalidate_entitlements
 
 
 class TenantOnboardingService:
@@ -323,6 +325,10 @@ class TenantOnboardingService:
         # 6. Commit tenant and subscriptions
         await self.db.commit()
 
+        # Drop any negative cache entry for the newly claimed subdomain
+        invalidate_tenant(tenant.id, tenant.subdomain)
+        await invalidate_entitlements(tenant.id)
+
         # 7. Schema setup is deferred - user must call retry endpoint
         # This ensures registration returns quickly without timeout
         # The retry endpoint will complete the schema setup
@@ -371,6 +377,8 @@ class TenantOnboardingService:
         tenant.status = "active"
         await self.db.commit()
 
+        invalidate_tenant(tenant.id, tenant.subdomain)
+
         return True
 
     async def retry_tenant_setup(self, tenant_id: uuid.UUID) -> Tuple[bool, str]:
@@ -0,0 +1,111 @@
+"""
+Benchmark pincode serviceability: per-request SQL vs the in-process index.
+
+Runs ServiceabilityService.check_serviceability_from_db and
+check_serviceability_indexed for a sample of a tenant's pincodes, checks that
+both return the same answer, and prints p50/p95/p99 latency for each.
+
+Usage:
+    python scripts/benchmark_serviceability.py --schema tenant_acme
+    python scripts/benchmark_serviceability.py --schema tenant_acme --pincodes 500 --rounds 20
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import engine
+from app.schemas.serviceability import ServiceabilityCheckRequest
+from app.services.serviceability_index import PincodeServiceabilityIndex
+from app.services.serviceability_service import ServiceabilityService
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    k = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[k]
+
+
+def report(label, samples):
+    print(
+        f"  {label:<8} n={len(samples):<6} "
+        f"p50={percentile(samples, 50):8.3f}ms  "
+        f"p95={percentile(samples, 95):8.3f}ms  "
+        f"p99={percentile(samples, 99):8.3f}ms  "
+        f"max={max(samples):8.3f}ms  "
+        f"mean={statistics.mean(samples):8.3f}ms"
+    )
+
+
+async def run(schema: str, sample_size: int, rounds: int, payment_mode: str):
+    async with engine.connect() as conn:
+        await conn.execute(text(f'SET search_path TO "{schema}"'))
+        db = AsyncSession(bind=conn, expire_on_commit=False)
+        service = ServiceabilityService(db)
+
+        result = await db.execute(text("SELECT DISTINCT pincode FROM warehouse_serviceability"))
+        pincodes = [row[0] for row in result.all()]
+        if not pincodes:
+            print(f"No warehouse_serviceability rows in schema {schema}")
+            return
+        sample = random.sample(pincodes, min(sample_size, len(pincodes)))
+        # Include misses, which the storefront sees too
+        sample += ["999999", "000000"]
+        requests = [
+            ServiceabilityCheckRequest(pincode=p, payment_mode=payment_mode or None)
+            for p in sample
+        ]
+
+        started = time.perf_counter()
+        index = await PincodeServiceabilityIndex.build(db)
+        print(f"Index: {index.stats()} (wall {(time.perf_counter() - started) * 1000:.1f}ms)")
+
+        mismatches = 0
+        for request in requests:
+            expected = await service.check_serviceability_from_db(request)
+            actual = await service.check_serviceability_indexed(index, request)
+            if expected.model_dump(mode="json") != actual.model_dump(mode="json"):
+                mismatches += 1
+                print(f"  MISMATCH for {request.pincode}")
+        print(f"Checked {len(requests)} pincodes, {mismatches} mismatches")
+
+        db_samples, index_samples = [], []
+        for _ in range(rounds):
+            random.shuffle(requests)
+            for request in requests:
+                t0 = time.perf_counter()
+                await service.check_serviceability_from_db(request)
+                db_samples.append((time.perf_counter() - t0) * 1000)
+
+                t0 = time.perf_counter()
+                await service.check_serviceability_indexed(index, request)
+                index_samples.append((time.perf_counter() - t0) * 1000)
+
+        print(f"Latency over {rounds} rounds:")
+        report("sql", db_samples)
+        report("index", index_samples)
+        print(f"  p99 speedup: {percentile(db_samples, 99) / max(percentile(index_samples, 99), 1e-6):.1f}x")
+
+        await db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--schema", required=True, help="Tenant schema, e.g. tenant_acme")
+    parser.add_argument("--pincodes", type=int, default=200, help="Pincodes sampled from the tenant")
+    parser.add_argument("--rounds", type=int, default=10, help="Passes over the sample")
+    parser.add_argument("--payment-mode", default="", help="COD or PREPAID (default: none)")
+    args = parser.parse_args()
+    asyncio.run(run(args.schema, args.pincodes, args.rounds, args.payment_mode))
+
+
+if __name__ == "__main__":
+    main()
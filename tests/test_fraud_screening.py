@@ -0,0 +1,143 @@
+"""
+Inline fraud screening at order creation.
+
+Covers OrderService._screen_new_order / OMSFraudDetectionAgent.score_new_order
+against a recording session: the screen must only ever roll back its own
+savepoint (never the caller's transaction, which holds the new order), a
+HIGH/CRITICAL score must put the order ON_HOLD, and a features-query timeout
+must still score the order (marked partial) and leave the session usable.
+
+Run: pytest tests/test_fraud_screening.py
+"""
+
+import asyncio
+import os
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+os.environ.setdefault("DATABASE_URL", "postgresql+psycopg://localhost/test")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+from sqlalchemy.exc import OperationalError  # noqa: E402
+
+from app.models.order import OrderStatus  # noqa: E402
+from app.services.ai.oms.fraud_detection import OMSFraudDetectionAgent  # noqa: E402
+from app.services.order_service import OrderService  # noqa: E402
+
+
+class RecordingSavepoint:
+    def __init__(self):
+        self.rolled_back = False
+
+    async def rollback(self):
+        self.rolled_back = True
+
+
+class RecordingResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+
+class RecordingSession:
+    """AsyncSession stand-in recording statements, savepoints and rollbacks."""
+
+    def __init__(self, stats_rows=(), timeout=False):
+        self.stats_rows = list(stats_rows)
+        self.timeout = timeout
+        self.statements = []
+        self.savepoints = []
+        self.rollbacks = 0
+
+    async def begin_nested(self):
+        savepoint = RecordingSavepoint()
+        self.savepoints.append(savepoint)
+        return savepoint
+
+    async def execute(self, statement):
+        sql = str(statement)
+        self.statements.append(sql)
+        if "statement_timeout" in sql:
+            return RecordingResult([])
+        if self.timeout:
+            raise OperationalError(sql, {}, Exception("canceling statement due to statement timeout"))
+        return RecordingResult(self.stats_rows)
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+
+def _high_risk_order():
+    """First order of a customer: COD, INR 60,000, billing/shipping in different cities."""
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        customer_id=uuid.uuid4(),
+        total_amount=Decimal("60000"),
+        payment_method="COD",
+        shipping_address={"pincode": "400001", "city": "Mumbai"},
+        billing_address={"pincode": "110001", "city": "Delhi"},
+        created_at=datetime(2026, 1, 15, 12, 0, tzinfo=timezone.utc),
+    )
+
+
+def _screen(session, order):
+    service = OrderService(session)
+    held = []
+
+    async def update_order_status(order_id, new_status, changed_by=None, notes=None):
+        # Runs on the same session after scoring: it must still be usable
+        assert session.rollbacks == 0
+        held.append((order_id, new_status))
+
+    service.update_order_status = update_order_status
+    asyncio.run(service._screen_new_order(order, [1]))
+    return held
+
+
+def test_high_risk_new_order_is_held_without_rolling_back_the_request():
+    order = _high_risk_order()
+    session = RecordingSession(stats_rows=[(order.customer_id, 1, 1, 0)])
+
+    held = _screen(session, order)
+
+    assert held == [(order.id, OrderStatus.ON_HOLD)]
+    assert session.rollbacks == 0
+    assert len(session.savepoints) == 1 and session.savepoints[0].rolled_back
+    assert any("SET LOCAL statement_timeout" in sql for sql in session.statements)
+
+
+def test_features_timeout_scores_partially_and_keeps_the_transaction():
+    order = _high_risk_order()
+    session = RecordingSession(timeout=True)
+
+    result = asyncio.run(OMSFraudDetectionAgent(session).score_new_order(order, [1], budget_ms=50))
+
+    assert result["partial"] is True
+    assert result["risk_level"] in ("HIGH", "CRITICAL")
+    assert session.rollbacks == 0
+    assert session.savepoints[0].rolled_back
+
+
+def test_timeout_during_create_still_holds_the_order():
+    order = _high_risk_order()
+    session = RecordingSession(timeout=True)
+
+    held = _screen(session, order)
+
+    assert held == [(order.id, OrderStatus.ON_HOLD)]
+    assert session.rollbacks == 0
+
+
+def test_low_risk_new_order_is_not_held():
+    order = _high_risk_order()
+    order.total_amount = Decimal("500")
+    order.payment_method = "PREPAID"
+    order.billing_address = order.shipping_address
+    session = RecordingSession(stats_rows=[(order.customer_id, 4, 1, 0)])
+
+    assert _screen(session, order) == []
+    assert session.rollbacks == 0